@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Measure the evaluations of the objective function saved by ``options['auto_radius']`` on badly scaled problems.
+
+The problems are well-scaled test functions composed with the change of variables x -> x / scales, the scales ranging
+over several orders of magnitude. Each problem is solved from a random initial guess and from zero, without scaling,
+with the scales given by x0, and with the probes, and the script reports the numbers of evaluations (including the
+probes) and the final values of the objective functions.
+
+Usage: python bench_auto_radius.py [largest exponent of the scales]
+"""
+import sys
+import warnings
+
+import numpy as np
+from pdfo import pdfo
+
+
+def rosenbrock(y):
+    return np.sum(1e2 * (y[1:] - y[:-1] ** 2) ** 2 + (1. - y[:-1]) ** 2)
+
+
+def quadratic(y):
+    return np.sum((y - 1.) ** 2) + .2 * np.sum((y[:-1] - 1.) * (y[1:] - 1.))
+
+
+def arwhead(y):
+    return np.sum((y[:-1] ** 2 + y[-1] ** 2) ** 2 - 4. * y[:-1] + 3.)
+
+
+if __name__ == '__main__':
+    exponent = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    print('{:>8} {:>10} {:>3} {:>5} {:>14} {:>14} {:>14}'.format('method', 'problem', 'n', 'x0', 'plain',
+                                                                'auto_radius', 'probe'))
+    totals = np.zeros(3, dtype=int)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for method in ['newuoa', 'uobyqa', 'cobyla']:
+            for problem in [rosenbrock, quadratic, arwhead]:
+                for n in [4, 6]:
+                    scales = 10. ** np.linspace(-exponent, exponent, n)
+
+                    def fun(x):
+                        return problem(x / scales)
+
+                    for name, x0 in [('rand', scales * np.random.default_rng(n).uniform(.5, 1.5, n)),
+                                     ('zero', np.zeros(n))]:
+                        cells = []
+                        for k, auto_radius in enumerate([False, True, 'probe']):
+                            res = pdfo(fun, x0, method=method, options={'maxfev': 500 * n,
+                                                                        'auto_radius': auto_radius})
+                            nfev = res.nfev + res.get('probe_nfev', 0)
+                            totals[k] += nfev
+                            cells.append('{:>5} {:8.1e}'.format(nfev, res.fun))
+                        print('{:>8} {:>10} {:>3} {:>5} {}'.format(method, problem.__name__, n, name, ' '.join(cells)))
+    print('{:>8} {:>10} {:>3} {:>5} {:>14} {:>14} {:>14}'.format('total', '', '', '', *totals))
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Calibrate the cost model used by ``method='auto-cost'``.
+
+For each solver configuration of the cost model, the script measures
+
+1. the overhead of the solver per function evaluation, as the difference of
+   the running times of two runs with different budgets on a cheap function,
+   divided by the difference of their numbers of evaluations, and fits it as
+   ``a + b * w``, where ``w`` is the size of the workspace of the solver;
+2. the number of function evaluations needed to converge on a few smooth test
+   problems, and fits its geometric mean as ``c * n ** g``.
+
+The resulting table is printed in the format of ``pdfo._settings.COST_MODEL``
+and can be passed to pdfo as ``options['cost_model']``.
+
+Usage: python bench_cost_model.py [n ...]
+"""
+import pprint
+import sys
+import time
+import warnings
+
+import numpy as np
+from pdfo import pdfo
+from pdfo._common import _workspace_size
+from pdfo._settings import COST_MODEL
+from scipy.optimize import Bounds, LinearConstraint
+
+
+def chrosen(x):
+    """Chained Rosenbrock function."""
+    return np.sum((1 - x[:-1]) ** 2 + 4 * (x[1:] - x[:-1] ** 2) ** 2)
+
+
+def quadratic(x):
+    """Ill-conditioned convex quadratic function."""
+    return np.sum(np.logspace(0, 3, x.size) * (x - 1) ** 2)
+
+
+def trigonometric(x):
+    """Trigonometric function of More, Garbow and Hillstrom."""
+    n = x.size
+    f = n - np.sum(np.cos(x)) + np.arange(1, n + 1) * (1 - np.cos(x)) - np.sin(x)
+    return np.sum(f ** 2)
+
+
+def solve(fun, config, n, maxfev, rhoend):
+    """Solve the problem with the solver configuration `config` of the cost model."""
+    solver, _, level = config.partition(':')
+    options = {'maxfev': maxfev, 'radius_final': rhoend, 'quiet': True}
+    if level:
+        options['npt'] = n + 2 if level == 'n+2' else 2 * n + 1
+    kwargs = {}
+    if solver == 'bobyqa':
+        kwargs['bounds'] = Bounds(np.full(n, -10.), np.full(n, 10.))
+    elif solver == 'lincoa':
+        kwargs['constraints'] = LinearConstraint(np.ones((1, n)), -np.inf, 10. * n)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        start = time.perf_counter()
+        res = pdfo(fun, np.full(n, .5), method=solver, options=options, **kwargs)
+    return time.perf_counter() - start, res.nfev
+
+
+def npt_of(config, n):
+    level = config.partition(':')[2]
+    return {'': 0, 'n+2': n + 2, '2n+1': 2 * n + 1}[level]
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [4, 8, 16, 32, 64]
+    table = {}
+    for config in COST_MODEL:
+        solver = config.partition(':')[0]
+        workspace, overhead, nfevs = [], [], []
+        for n in sizes:
+            if solver == 'uobyqa' and n > 16:
+                continue  # the workspace of UOBYQA grows like n ** 4
+            npt = npt_of(config, n)
+            first = (n + 1) * (n + 2) // 2 + 1 if solver == 'uobyqa' else 10 * n
+            time_1, nfev_1 = solve(chrosen, config, n, first, 1e-14)
+            time_2, nfev_2 = solve(chrosen, config, n, 4 * first, 1e-14)
+            if nfev_2 > nfev_1:
+                workspace.append(_workspace_size(solver, n, npt, 1 if solver == 'lincoa' else 0))
+                overhead.append((time_2 - time_1) / (nfev_2 - nfev_1))
+            counts = [solve(fun, config, n, 500 * n, 1e-6)[1] for fun in [chrosen, quadratic, trigonometric]]
+            nfevs.append(np.exp(np.mean(np.log(counts))))
+        a, b = np.linalg.lstsq(np.c_[np.ones(len(workspace)), workspace], overhead, rcond=None)[0]
+        measured = [n for n in sizes if solver != 'uobyqa' or n <= 16]
+        g, log_c = np.polyfit(np.log(measured), np.log(nfevs), 1)
+        table[config] = {'overhead': (float('{:.3g}'.format(max(a, 0.))), float('{:.3g}'.format(max(b, 0.)))),
+                         'evaluations': (float('{:.3g}'.format(np.exp(log_c))), float('{:.3g}'.format(g)))}
+        print('{:>12}: overhead {:.2e} + {:.2e} * w s/eval, evaluations {:.3g} * n ** {:.3g}'.format(
+            config, *table[config]['overhead'], *table[config]['evaluations']), file=sys.stderr)
+    pprint.pprint(table, sort_dicts=False)
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""Measure the time taken by ``import pdfo`` and by the first solve.
+
+Each measurement is done in a new interpreter, so that no module is cached.
+The time of ``import numpy`` is given as a reference, since the first solve
+requires NumPy anyway.
+
+Usage: python bench_import.py [repeat]
+"""
+import statistics
+import subprocess
+import sys
+
+SNIPPETS = {
+    'import numpy': 'import numpy',
+    'import pdfo': 'import pdfo',
+    'import pdfo + solve': 'import pdfo; pdfo.pdfo(lambda x: sum(x ** 2), [1., 1.], method="newuoa")',
+}
+
+
+def measure(code):
+    """Time (in seconds) spent in `code` by a fresh interpreter."""
+    timed = 'import time; start = time.perf_counter(); {}; print(time.perf_counter() - start)'.format(code)
+    output = subprocess.run([sys.executable, '-c', timed], check=True, capture_output=True, text=True).stdout
+    return float(output.split()[-1])
+
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    print('{:>22} {:>14} {:>14}'.format('', 'median (ms)', 'min (ms)'))
+    for label, code in SNIPPETS.items():
+        timings = [measure(code) for _ in range(repeat)]
+        print('{:>22} {:>14.1f} {:>14.1f}'.format(label, 1e3 * statistics.median(timings), 1e3 * min(timings)))
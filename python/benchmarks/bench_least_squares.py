@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Compare ``method='bobyqa-ls'`` with the default solvers on least-squares fits.
+
+Each problem is solved once by the least-squares solver, given the vector of
+the residuals, and once by the solver selected by pdfo, given the sum of their
+squares. The script reports the number of function evaluations and the final
+values of both, and the ratio of the numbers of evaluations.
+
+Usage: python bench_least_squares.py
+"""
+import warnings
+
+import numpy as np
+from pdfo import pdfo
+from scipy.optimize import Bounds
+
+T = np.linspace(0., 4., 200)
+NOISE = .01 * np.random.default_rng(0).standard_normal(T.size)
+
+
+def exponential(p):
+    """Fit of an exponential decay plus a sinusoid to 200 noisy measurements."""
+    model = p[0] * np.exp(-p[1] * T) + p[2] * np.sin(p[3] * T)
+    return model - (2.5 * np.exp(-1.3 * T) + .5 * np.sin(.8 * T) + NOISE)
+
+
+def osborne(p):
+    """Osborne 1 function (33 residuals)."""
+    t = 10. * np.arange(33)
+    y = np.array([.844, .908, .932, .936, .925, .908, .881, .850, .818, .784, .751, .718, .685, .658, .628, .603, .580,
+                  .558, .538, .522, .506, .490, .478, .467, .457, .448, .438, .431, .424, .420, .414, .411, .406])
+    return y - (p[0] + p[1] * np.exp(-p[3] * t) + p[2] * np.exp(-p[4] * t))
+
+
+def rosenbrock(x):
+    """Chained Rosenbrock function as a least-squares problem."""
+    return np.r_[10. * (x[1:] - x[:-1] ** 2), 1. - x[:-1]]
+
+
+PROBLEMS = [
+    ('exponential', exponential, np.ones(4), None),
+    ('exponential-bounded', exponential, np.ones(4), Bounds(np.zeros(4), [2., 5., 5., 5.])),
+    ('osborne', osborne, np.array([.5, 1.5, -1., .01, .02]), None),
+    ('rosenbrock-10', rosenbrock, np.zeros(10), None),
+    ('rosenbrock-30', rosenbrock, np.zeros(30), None),
+]
+
+
+if __name__ == '__main__':
+    print('{:>20} {:>8} {:>12} {:>10} {:>8} {:>12} {:>7}'.format(
+        'problem', 'ls nfev', 'ls f', 'solver', 'nfev', 'f', 'ratio'))
+    for name, residuals, x0, bounds in PROBLEMS:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            ls = pdfo(residuals, x0, method='bobyqa-ls', bounds=bounds, options={'maxfev': 5000})
+            plain = pdfo(lambda x: np.sum(residuals(x) ** 2), x0, bounds=bounds, options={'maxfev': 5000})
+        print('{:>20} {:>8} {:>12.4e} {:>10} {:>8} {:>12.4e} {:>7.1f}'.format(
+            name, ls.nfev, ls.fun, plain.method, plain.nfev, plain.fun, plain.nfev / ls.nfev))
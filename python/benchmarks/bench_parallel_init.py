@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Measure the running time saved by ``options['parallel_initial_points']``.
+
+The objective function is a quadratic whose evaluation sleeps for a given
+time, as an expensive simulation would. Each problem is solved with and
+without parallel initial points, on a thread pool, and the script reports
+the number of function evaluations, the running times, and their ratio.
+
+Usage: python bench_parallel_init.py [delay in seconds]
+"""
+import sys
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from pdfo import pdfo
+
+
+def make_fun(delay):
+    def fun(x):
+        time.sleep(delay)
+        return np.sum((x - 1.) ** 2) + .1 * np.sum(x[:-1] * x[1:])
+    return fun
+
+
+if __name__ == '__main__':
+    delay = float(sys.argv[1]) if len(sys.argv) > 1 else .01
+    fun = make_fun(delay)
+    print('{:>8} {:>4} {:>6} {:>8} {:>12} {:>12} {:>7}'.format('method', 'n', 'npt', 'nfev', 'plain (s)',
+                                                                 'par. (s)', 'ratio'))
+    with warnings.catch_warnings(), ThreadPoolExecutor(16) as executor:
+        warnings.simplefilter('ignore')
+        for method, n, npt in [('newuoa', 10, 21), ('newuoa', 10, 66), ('uobyqa', 6, 28), ('uobyqa', 10, 66)]:
+            options = {'maxfev': 20 * npt, 'radius_final': 1e-4}
+            if method == 'newuoa':
+                options['npt'] = npt
+            start = time.perf_counter()
+            res = pdfo(fun, np.zeros(n), method=method, options=options)
+            plain = time.perf_counter() - start
+            start = time.perf_counter()
+            pdfo(fun, np.zeros(n), method=method,
+                 options=dict(options, parallel_initial_points=True, executor=executor))
+            parallel = time.perf_counter() - start
+            print('{:>8} {:>4} {:>6} {:>8} {:>12.2f} {:>12.2f} {:>7.2f}'.format(method, n, npt, res.nfev, plain,
+                                                                               parallel, plain / parallel))
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Compare the projection of an infeasible x0 by pdfo and by SLSQP.
+
+The projection of the initial guess onto the bound and linear constraints
+is computed by a dedicated dual active-set method. This script compares it,
+in time and in distance to x0, with the general-purpose SLSQP solver of
+SciPy that was used before, on random feasible polyhedra defined by many
+linear constraints.
+
+Usage: python bench_projection.py [n ...]
+"""
+import sys
+import time
+import warnings
+
+import numpy as np
+from pdfo._common import _project_polyhedron
+from scipy.optimize import Bounds, LinearConstraint, minimize
+
+
+def random_problem(n, m, rng):
+    """Random polyhedron containing the origin, and a point outside it."""
+    a = rng.standard_normal((m, n))
+    alb = -rng.random(m)
+    aub = rng.random(m)
+    alb[::3] = -np.inf
+    aub[1::3] = np.inf
+    lb, ub = -np.ones(n), np.ones(n)
+    x0 = 3 * rng.standard_normal(n)
+    return x0, lb, ub, a, alb, aub
+
+
+def slsqp(x0, lb, ub, a, alb, aub):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return minimize(lambda x: np.dot(x - x0, x - x0) / 2, x0, jac=lambda x: (x - x0), bounds=Bounds(lb, ub),
+                        constraints=LinearConstraint(a, alb, aub), method='SLSQP').x
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10, 50, 100]
+    rng = np.random.default_rng(0)
+    print('{:>6} {:>6} {:>14} {:>14} {:>14}'.format('n', 'm', 'pdfo (s)', 'SLSQP (s)', 'dist. ratio'))
+    for n in sizes:
+        m = 50 * n
+        problem = random_problem(n, m, rng)
+        start = time.perf_counter()
+        x_pdfo = _project_polyhedron(*problem)
+        time_pdfo = time.perf_counter() - start
+        start = time.perf_counter()
+        x_slsqp = slsqp(*problem)
+        time_slsqp = time.perf_counter() - start
+        ratio = np.linalg.norm(x_pdfo - problem[0]) / np.linalg.norm(x_slsqp - problem[0])
+        print('{:>6} {:>6} {:>14.4f} {:>14.4f} {:>14.6f}'.format(n, m, time_pdfo, time_slsqp, ratio))
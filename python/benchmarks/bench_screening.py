@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Measure the evaluations of the objective function saved by ``options['model_screening']``.
+
+Each problem is solved by NEWUOA, BOBYQA, and UOBYQA from two random starting points, with and without the screening,
+and the script reports the numbers of evaluations of the objective function and the relative savings, as well as the
+runs whose solution is worse with the screening.
+
+Usage: python bench_screening.py [initial trust-region radius]
+"""
+import sys
+import warnings
+
+import numpy as np
+from pdfo import pdfo
+
+
+def rosenbrock(x):
+    return np.sum(1e2 * (x[1:] - x[:-1] ** 2) ** 2 + (1. - x[:-1]) ** 2)
+
+
+def quadratic(x):
+    return np.sum(np.arange(1, x.size + 1) * (x - 1.) ** 2) + .1 * np.sum(x[:-1] * x[1:])
+
+
+def trigonometric(x):
+    n = x.size
+    return np.sum((n - np.sum(np.cos(x)) + np.arange(1, n + 1) * (1. - np.cos(x)) - np.sin(x)) ** 2)
+
+
+def zakharov(x):
+    weighted = np.sum(np.arange(1, x.size + 1) * x) / 2.
+    return np.sum(x ** 2) + weighted ** 2 + weighted ** 4
+
+
+def arwhead(x):
+    return np.sum((x[:-1] ** 2 + x[-1] ** 2) ** 2 - 4. * x[:-1] + 3.)
+
+
+def exponential(x):
+    return np.sum(np.exp(3. * x) - 3. * x) + np.sum(x[:-1] * x[1:])
+
+
+def wall(x):
+    return np.sum((x - .5) ** 2) + np.sum(np.expm1(20. * np.maximum(x - 1., 0.)))
+
+
+PROBLEMS = [rosenbrock, quadratic, trigonometric, zakharov, arwhead, exponential, wall]
+
+
+if __name__ == '__main__':
+    radius_init = float(sys.argv[1]) if len(sys.argv) > 1 else 1.
+    print('{:>8} {:>14} {:>8} {:>8} {:>8} {:>6}'.format('method', 'problem', 'plain', 'screen.', 'saved', 'worse'))
+    total_plain = total_screening = 0
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for method in ['newuoa', 'bobyqa', 'uobyqa']:
+            for fun in PROBLEMS:
+                nfev_plain = nfev_screening = worse = 0
+                for n in [2, 4, 6, 8]:
+                    for seed in range(2):
+                        x0 = np.random.default_rng(seed).uniform(-.5, 1.5, n)
+                        options = {'maxfev': 500 * n, 'radius_init': radius_init, 'radius_final': 1e-6}
+                        res_plain = pdfo(fun, x0, method=method, options=options)
+                        res = pdfo(fun, x0, method=method, options=dict(options, model_screening=True))
+                        nfev_plain += res_plain.nfev
+                        nfev_screening += res.nfev - res.screened
+                        worse += res.fun > res_plain.fun + 1e-6 * max(1., abs(res_plain.fun))
+                total_plain += nfev_plain
+                total_screening += nfev_screening
+                print('{:>8} {:>14} {:>8} {:>8} {:>7.1f}% {:>6}'.format(method, fun.__name__, nfev_plain, nfev_screening,
+                                                                      100. * (1. - nfev_screening / nfev_plain), worse))
+    print('{:>8} {:>14} {:>8} {:>8} {:>7.1f}%'.format('total', '', total_plain, total_screening,
+                                                      100. * (1. - total_screening / total_plain)))
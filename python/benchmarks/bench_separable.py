@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Compare plain and partially separable objective functions.
+
+The script solves the chained Rosenbrock function, whose variables are
+randomly permuted so that coupled variables are not contiguous, with
+``method='subspace'``, the function being given either as a plain callable
+or as a ``pdfo.ElementValueCache`` of ``n - 1`` elements of two variables,
+and with ``method='bobyqa-ps'``, which models the elements separately. It
+reports the number of evaluations of the function, the average number of
+evaluations of each element (``nfev`` for the plain callable), the running
+time, and the final value.
+
+Usage: python bench_separable.py [n ...]
+"""
+import sys
+import time
+import warnings
+
+import numpy as np
+from pdfo import ElementValueCache, pdfo
+
+
+def element(z):
+    """Element of the chained Rosenbrock function."""
+    return (1 - z[0]) ** 2 + 4 * (z[1] - z[0] ** 2) ** 2
+
+
+def run(fun, n, method):
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        res = pdfo(fun, np.zeros(n), method=method, options={'maxfev': 200 * n, 'quiet': True})
+    return res, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100, 1000, 5000]
+    print('{:>6} {:>10} {:>10} {:>8} {:>16} {:>9} {:>12}'.format('n', 'method', 'function', 'nfev', 'evals/element',
+                                                                 'time (s)', 'f'))
+    for n in sizes:
+        permutation = np.random.default_rng(0).permutation(n)
+        elements = [(element, permutation[i:i + 2]) for i in range(n - 1)]
+
+        def plain(x):
+            y = x[permutation]
+            return np.sum((1 - y[:-1]) ** 2 + 4 * (y[1:] - y[:-1] ** 2) ** 2)
+
+        for method, name in [('subspace', 'plain'), ('subspace', 'separable'), ('bobyqa-ps', 'separable')]:
+            fun = plain if name == 'plain' else ElementValueCache(elements)
+            res, elapsed = run(fun, n, method)
+            evaluations = res.nfev if fun is plain else np.mean(fun.element_nfev)
+            print('{:>6} {:>10} {:>10} {:>8} {:>16.1f} {:>9.2f} {:>12.4e}'.format(n, method, name, res.nfev,
+                                                                                 evaluations, elapsed, res.fun))
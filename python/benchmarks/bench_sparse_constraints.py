@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Compare the preprocessing cost of dense and sparse linear constraints.
+
+The script builds a banded linear constraint matrix with many rows and
+columns, and measures the time and the peak memory (traced by
+``tracemalloc``) spent by pdfo with a tiny evaluation budget, so that the
+preprocessing (validation, elimination of the equality constraints,
+projection of the initial guess, etc.) dominates.
+
+Usage: python bench_sparse_constraints.py [n ...]
+"""
+import sys
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+from pdfo import pdfo
+from scipy.optimize import LinearConstraint
+from scipy.sparse import diags_array
+
+
+def banded(n, m):
+    """Banded matrix of m rows and n columns, with three nonzeros per row."""
+    return diags_array([np.ones(n), -np.ones(n), np.full(n, .5)], offsets=[0, 1, 2], shape=(m, n), format='csr')
+
+
+def run(n, sparse):
+    m = n // 2
+    a = banded(n, m)
+    if not sparse:
+        a = a.toarray()
+    lb = np.full(m, -np.inf)
+    lb[:m // 10] = 1.  # a tenth of the constraints are equalities
+    constraints = LinearConstraint(a, lb, np.ones(m))
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        pdfo(lambda x: np.dot(x, x), np.zeros(n), method='cobyla', constraints=constraints,
+             options={'maxfev': n + 2, 'quiet': True})
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [200, 400, 800]
+    print('{:>8} {:>8} {:>12} {:>14}'.format('n', 'format', 'time (s)', 'peak (MiB)'))
+    for n in sizes:
+        for sparse in [False, True]:
+            elapsed, peak = run(n, sparse)
+            print('{:>8} {:>8} {:>12.3f} {:>14.2f}'.format(n, 'sparse' if sparse else 'dense', elapsed, peak / 2 ** 20))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Measure the scaling of ``method='subspace'`` with the number of variables.
+
+For each dimension, the script solves a separable ill-conditioned quadratic
+and the chained Rosenbrock function, unconstrained and with bounds that are
+active at the solution, with a budget of ``50 * n`` function evaluations.
+It reports the number of evaluations, the running time, the time spent in
+pdfo per evaluation (the running time minus that of the evaluations, which
+are timed separately), the peak memory traced by ``tracemalloc``, and the
+final value. The memory required by the workspace of NEWUOA on the whole
+space, which grows like ``n ** 2``, is given for comparison.
+
+Usage: python bench_subspace.py [n ...]
+"""
+import sys
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+from pdfo import pdfo
+from pdfo._common import _workspace_size
+from scipy.optimize import Bounds
+
+
+def quadratic(x):
+    """Separable convex quadratic function with condition number 100."""
+    return np.dot(np.logspace(0, 2, x.size), (x - 1) ** 2)
+
+
+def chrosen(x):
+    """Chained Rosenbrock function."""
+    return np.sum((1 - x[:-1]) ** 2 + 4 * (x[1:] - x[:-1] ** 2) ** 2)
+
+
+def run(fun, n, bounded, basis):
+    elapsed = [0.]
+
+    def timed(x):
+        start = time.perf_counter()
+        fx = fun(x)
+        elapsed[0] += time.perf_counter() - start
+        return fx
+
+    bounds = Bounds(np.full(n, -1.), np.full(n, .5)) if bounded else None
+    tracemalloc.start()
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        res = pdfo(timed, np.zeros(n), method='subspace', bounds=bounds,
+                   options={'maxfev': 50 * n, 'subspace_basis': basis, 'quiet': True})
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return res, total, (total - elapsed[0]) / res.nfev, peak
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 2000, 5000, 10000]
+    print('{:>6} {:>9} {:>8} {:>10} {:>8} {:>9} {:>12} {:>10} {:>11} {:>12}'.format(
+        'n', 'function', 'bounds', 'basis', 'nfev', 'time (s)', 'us per eval', 'peak (MiB)', 'full (MiB)', 'f'))
+    for n in sizes:
+        full = 8 * _workspace_size('newuoa', n, 2 * n + 1) / 2 ** 20
+        for fun in [quadratic, chrosen]:
+            for bounded, basis in [(False, 'coordinate'), (False, 'random'), (True, 'coordinate')]:
+                res, total, overhead, peak = run(fun, n, bounded, basis)
+                print('{:>6} {:>9} {:>8} {:>10} {:>8} {:>9.2f} {:>12.1f} {:>10.2f} {:>11.0f} {:>12.4e}'.format(
+                    n, fun.__name__, 'yes' if bounded else 'no', basis, res.nfev, total, 1e6 * overhead,
+                    peak / 2 ** 20, full, res.fun))
@@ -1,13 +1,49 @@
 # -*- coding: utf-8 -*-
-"""Management of the importable functions of pdfo."""
-from ._bobyqa import bobyqa
-from ._cobyla import cobyla
-from ._lincoa import lincoa
-from ._newuoa import newuoa
-from ._uobyqa import uobyqa
-from ._pdfo import pdfo
-from . import tests
-from .tests import test_pdfo as testpdfo
+"""Management of the importable functions of pdfo.
+
+The solvers, the tests, and the heavy dependencies they require (SciPy and the
+Fortran extensions) are only imported when they are first accessed, so that
+``import pdfo`` remains cheap.
+"""
+from importlib import import_module
+
+# Map each public name to the module defining it and to its name in that
+# module (None if the public name is the module itself).
+_lazy_attributes = {
+    'bobyqa': ('._bobyqa', 'bobyqa'),
+    'cobyla': ('._cobyla', 'cobyla'),
+    'lincoa': ('._lincoa', 'lincoa'),
+    'newuoa': ('._newuoa', 'newuoa'),
+    'uobyqa': ('._uobyqa', 'uobyqa'),
+    'pdfo': ('._pdfo', 'pdfo'),
+    'ElementValueCache': ('._separable', 'ElementValueCache'),
+    'lockstep': ('._lockstep', 'lockstep'),
+    'BoundedExecutor': ('._executor', 'BoundedExecutor'),
+    'SocketExecutor': ('._executor', 'SocketExecutor'),
+    'WorkerServer': ('._executor', 'WorkerServer'),
+    'SharedArray': ('._shared', 'SharedArray'),
+    'share': ('._shared', 'share'),
+    'EvaluationCache': ('._cache', 'EvaluationCache'),
+    'elimination_cache_clear': ('._common', 'elimination_cache_clear'),
+    'elimination_cache_info': ('._common', 'elimination_cache_info'),
+    'tests': ('.tests', None),
+    'testpdfo': ('.tests.test_pdfo', None),
+}
+
+
+def __getattr__(name):
+    if name not in _lazy_attributes:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    module_name, attribute = _lazy_attributes[name]
+    module = import_module(module_name, __name__)
+    value = module if attribute is None else getattr(module, attribute)
+    globals()[name] = value  # later accesses do not go through __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
 
 # PEP0440 compatible formatted version, see:
 # https://www.python.org/dev/peps/pep-0440/
@@ -25,4 +61,6 @@ from .tests import test_pdfo as testpdfo
 # 'X.Y.dev0' is the canonical version of 'X.Y.dev'.
 __version__ = '2.1.0'
 
-__all__ = ['bobyqa', 'cobyla', 'lincoa', 'newuoa', 'uobyqa', 'pdfo', 'tests', 'testpdfo']
+__all__ = ['bobyqa', 'cobyla', 'lincoa', 'newuoa', 'uobyqa', 'pdfo', 'ElementValueCache', 'lockstep',
+           'BoundedExecutor', 'SocketExecutor', 'WorkerServer', 'SharedArray', 'share', 'EvaluationCache',
+           'elimination_cache_clear', 'elimination_cache_info', 'tests', 'testpdfo']
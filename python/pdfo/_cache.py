@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""Cache of the values of the objective function shared by several processes, stored in an SQLite file."""
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from ._common import CacheInfo
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS evaluations (
+    namespace TEXT NOT NULL,
+    x BLOB NOT NULL,
+    value BLOB NOT NULL,
+    scalar INTEGER NOT NULL,
+    used INTEGER NOT NULL,
+    PRIMARY KEY (namespace, x)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS evaluations_used ON evaluations (namespace, used);
+CREATE TABLE IF NOT EXISTS sizes (namespace TEXT PRIMARY KEY, count INTEGER NOT NULL) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS evaluations_insert AFTER INSERT ON evaluations
+    BEGIN INSERT INTO sizes VALUES (NEW.namespace, 1) ON CONFLICT (namespace) DO UPDATE SET count = count + 1; END;
+CREATE TRIGGER IF NOT EXISTS evaluations_delete AFTER DELETE ON evaluations
+    BEGIN UPDATE sizes SET count = count - 1 WHERE namespace = OLD.namespace; END;
+"""
+
+# Number of hits whose recency is kept in memory before being written to the database.
+_MAX_PENDING = 256
+
+
+def _key(x):
+    """Key of a point in the cache: the bytes of its float64 entries, adding zero identifying -0.0 with 0.0."""
+    return (np.asarray(x, dtype=np.float64) + 0.).tobytes()
+
+
+class EvaluationCache:
+    """Cache of the values of an objective function, shared by all the processes that open the same file.
+
+    The values are stored in an SQLite database, keyed by the exact bytes of the float64 entries of the points, so that
+    concurrent solves of the same problem (e.g., from several starting points, or with several solvers) in separate
+    processes evaluate each point once. The points are those at which the function of the user is evaluated, before
+    any preprocessing, and the extra arguments of the function are not part of the keys: the functions or arguments
+    that differ must use different files or namespaces.
+
+    When a namespace holds more than `maxsize` values, its least recently used ones are evicted, the other namespaces
+    of the file being bounded by their own `maxsize`. The times at which the values are used are kept in memory and
+    written to the database in batches, with the next value stored (or when there are many of them, or when the cache
+    is closed), so that reading a value does not take the write lock of the database. The eviction therefore ignores
+    the most recent uses by the other processes.
+
+    An instance can be pickled, and each process (and each thread) opens its own connection to the database. The
+    statistics returned by `info` are those of the current process.
+
+    Parameters
+    ----------
+    path : str or os.PathLike
+        File of the database, created if it does not exist.
+    maxsize : int, optional
+        Maximum number of values of the namespace in the database. Default is 100000.
+    namespace : str, optional
+        Namespace of the values, identifying the objective function in a database shared by several ones. Default is
+        the empty string.
+
+    Examples
+    --------
+    The cache is given to the solvers in ``options['evaluation_cache']``.
+
+    >>> import numpy as np
+    >>> from pdfo import EvaluationCache, pdfo
+    >>> cache = EvaluationCache('evaluations.sqlite')  # doctest: +SKIP
+    >>> res = pdfo(np.linalg.norm, [1., 2.], options={'evaluation_cache': cache})  # doctest: +SKIP
+    """
+
+    def __init__(self, path, maxsize=100000, namespace=''):
+        if not isinstance(maxsize, (int, np.integer)) or maxsize < 1:
+            raise ValueError('EvaluationCache: maxsize should be a positive integer.')
+        if not isinstance(namespace, str):
+            raise ValueError('EvaluationCache: namespace should be a string.')
+        self.path = os.fspath(path)
+        self.maxsize = int(maxsize)
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._used = dict()  # times of the hits not written to the database yet
+        self._connect()  # creates the database
+
+    def __getstate__(self):
+        return {'path': self.path, 'maxsize': self.maxsize, 'namespace': self.namespace}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.hits = self.misses = self.evictions = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._used = dict()
+
+    def _connect(self):
+        # The connections cannot be shared by the threads, nor by a process forked from the current one.
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=60., isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')  # the readers do not wait for the writers
+            connection.execute('PRAGMA synchronous=NORMAL')
+            with connection:
+                connection.executescript('BEGIN IMMEDIATE;' + _SCHEMA + 'COMMIT;')
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return connection
+
+    def get(self, x):
+        """Value at `x`, or None if it is not in the cache."""
+        connection = self._connect()
+        key = _key(x)
+        row = connection.execute('SELECT value, scalar FROM evaluations WHERE namespace = ? AND x = ?',
+                                 (self.namespace, key)).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._used[key] = time.time_ns()
+            flush = len(self._used) >= _MAX_PENDING
+        if flush:
+            self._flush(connection, transaction=True)
+        value = np.frombuffer(row[0], dtype=np.float64).copy()
+        return value[0] if row[1] else value
+
+    def put(self, x, value):
+        """Store the value at `x`, which is either a number or a vector of numbers, evicting the least recently used
+        values if the cache is full."""
+        try:
+            value = np.asarray(value, dtype=np.float64)
+        except (TypeError, ValueError):
+            return  # the value is invalid, and the error is raised by the solver
+        connection = self._connect()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            self._flush(connection)
+            connection.execute('INSERT OR IGNORE INTO evaluations VALUES (?, ?, ?, ?, ?)',
+                               (self.namespace, _key(x), value.reshape(-1).tobytes(), int(value.ndim == 0),
+                                time.time_ns()))
+            excess = self._size(connection) - self.maxsize
+            if excess > 0:
+                connection.execute('DELETE FROM evaluations WHERE namespace = ? AND x IN '
+                                   '(SELECT x FROM evaluations WHERE namespace = ? ORDER BY used LIMIT ?)',
+                                   (self.namespace, self.namespace, excess))
+                with self._lock:
+                    self.evictions += excess
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+    def _flush(self, connection, transaction=False):
+        """Write the times of the hits kept in memory to the database, in a transaction of its own if `transaction` is
+        True, and otherwise in the current one."""
+        with self._lock:
+            used, self._used = self._used, dict()
+        if len(used) > 0:
+            rows = [(t, self.namespace, key) for key, t in used.items()]
+            if transaction:
+                connection.execute('BEGIN IMMEDIATE')
+            try:
+                connection.executemany('UPDATE evaluations SET used = ? WHERE namespace = ? AND x = ?', rows)
+                if transaction:
+                    connection.execute('COMMIT')
+            except BaseException:
+                if transaction:
+                    connection.execute('ROLLBACK')
+                raise
+
+    def _size(self, connection):
+        """Number of values of the namespace in the database."""
+        row = connection.execute('SELECT count FROM sizes WHERE namespace = ?', (self.namespace,)).fetchone()
+        return 0 if row is None else row[0]
+
+    def info(self):
+        """Statistics of the cache.
+
+        Returns
+        -------
+        CacheInfo
+            Named tuple with fields ``hits``, ``misses``, and ``evictions`` (in the current process), ``maxsize``, and
+            ``currsize`` (the number of values of the namespace in the database).
+        """
+        currsize = self._size(self._connect())
+        return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, currsize)
+
+    def clear(self):
+        """Remove the values of the namespace from the database, and reset the statistics."""
+        self._connect().execute('DELETE FROM evaluations WHERE namespace = ?', (self.namespace,))
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+            self._used = dict()
+
+    def close(self):
+        """Write the times of the hits to the database, and close the connection of the current thread to it."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            if self._local.pid == os.getpid():
+                self._flush(connection, transaction=True)
+                connection.close()
+            self._local.connection = None
+
+
+class CachedFunction:
+    """Function whose values are looked up in an `EvaluationCache` before being evaluated."""
+
+    def __init__(self, fun, cache):
+        self.fun = fun
+        self.cache = cache
+
+    def __call__(self, x, *args):
+        value = self.cache.get(x)
+        if value is None:
+            value = self.fun(x, *args)
+            self.cache.put(x, value)
+        return value
@@ -1,14 +1,17 @@
 # -*- coding: utf-8 -*-
+import hashlib
 import os
 import sys
+import time
 import warnings
+from collections import OrderedDict, namedtuple
 from contextlib import contextmanager
-from inspect import stack
+from functools import partial
+from importlib import import_module
 
 import numpy as np
-from scipy.optimize import OptimizeResult
 
-from ._settings import ExitStatus, Options, DEFAULT_OPTIONS
+from ._settings import ExitStatus, Options, DEFAULT_OPTIONS, COST_MODEL
 
 python_version = sys.version_info.major
 if python_version >= 3:
@@ -23,6 +26,18 @@ solver_list = ['uobyqa', 'newuoa', 'bobyqa', 'lincoa', 'cobyla']
 invoker_list = solver_list[:]
 invoker_list.append('pdfo')
 
+# Functions that call the solvers on a problem already preprocessed by prepdfo, and that post-process their results.
+preprocessed_invokers = ['pdfo', '_portfolio_solve', '_subspace_solve', '_restart_solve']
+
+# The huge values defined in pdfoconst.F are obtained once and for all when this module is imported. If the Fortran
+# extension cannot be imported, the error is raised only when a solver is called.
+try:
+    from .gethuge import gethuge as _gethuge
+
+    _huge_values = {data_type: _gethuge(data_type) for data_type in ['integer', 'fun', 'con']}
+except ImportError:
+    _huge_values = None
+
 
 class Bounds:
     r"""Simple bound constraints.
@@ -122,8 +137,12 @@ class LinearConstraint:
         if not ((lb is None or hasattr(lb, '__len__')) and (ub is None or hasattr(ub, '__len__'))):
             raise AttributeError('The bounds lb and ub should be vectors.')
 
-        # Either lb, ub or both can be set to None or [] not to precise the bound.
-        self.A = np.array(a if a is not None else [[]], dtype=np.float64, order='F')
+        # Either lb, ub or both can be set to None or [] not to precise the bound. A sparse coefficient matrix is kept
+        # sparse (in CSR format) so that large and sparse linear constraints are never densified.
+        if _issparse(a):
+            self.A = _csr(a, copy=True)
+        else:
+            self.A = np.array(a if a is not None else [[]], dtype=np.float64, order='F')
         if (lb is None or len(lb) == 0) and ub is not None and len(ub) > 0:
             self.lb = np.full(len(ub), -np.inf, dtype=np.float64)
             self.ub = np.array(ub, dtype=np.float64)
@@ -136,7 +155,10 @@ class LinearConstraint:
 
         # If any NaN is detected, the it should not altered the constraint. The NaN will be most likely generated during
         # the conversion of the type of the arrays to np.float64, since np.float64(None) is NaN.
-        self.A[np.isnan(self.A)] = 0  # not to use those variables as constraints
+        if _issparse(self.A):
+            self.A.data[np.isnan(self.A.data)] = 0  # not to use those variables as constraints
+        else:
+            self.A[np.isnan(self.A)] = 0  # not to use those variables as constraints
         self.lb[np.isnan(self.lb)] = -np.inf
         self.ub[np.isnan(self.ub)] = np.inf
 
@@ -166,7 +188,7 @@ class LinearConstraint:
         # Check the length of the attributes.
         if not (len(self.lb.shape) == 1 and len(self.A.shape) == 2 and len(self.ub.shape) == 1 and
                 self.lb.size in [0, self.A.shape[0]] and self.ub.size in [0, self.A.shape[0]]) or \
-                (self.lb.size == 0 and self.ub.size == 0 and self.A.size > 0):
+                (self.lb.size == 0 and self.ub.size == 0 and _matrix_size(self.A) > 0):
             raise AttributeError('The sizes of linear constraints are inconsistent; check the shapes of the arrays.')
 
     def __repr__(self):
@@ -284,6 +306,115 @@ class NonlinearConstraint:
         return '{}({}, {}, {})'.format(type(self).__name__, self.fun, self.lb, self.ub)
 
 
+class CompactOptimizeResult:
+    """Lightweight result of the optimization.
+
+    It has the same fields as the `scipy.optimize.OptimizeResult` returned by pdfo (see the documentation of pdfo),
+    but they are stored in slots rather than in a dictionary, and the histories are views of the arrays returned by the
+    solvers. It is returned if ``options['compact_result']`` is True. As for `scipy.optimize.OptimizeResult`, the
+    fields can also be accessed as items, and the fields that are not set for a given problem (e.g., ``maxcv`` for an
+    unconstrained problem) are missing.
+    """
+
+    __slots__ = ('message', 'success', 'status', 'fun', 'x', 'maxcv', 'constraints', 'nfev', 'fun_history',
+                 'maxcv_history', 'method', 'infeasible_bounds', 'infeasible_linear_constraints',
+                 'infeasible_nonlinear_constraints', 'portfolio', 'restarts', 'noise', 'replicates',
+                 'failures', 'fidelity_nfev', 'screened', 'probe_nfev', 'model_gradient', 'model_hessian',
+                 'model_jacobian', 'warnings')
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        return key in self.__slots__ and hasattr(self, key)
+
+    def keys(self):
+        return [key for key in self.__slots__ if hasattr(self, key)]
+
+    def __repr__(self):
+        fields = ', '.join('{}={!r}'.format(key, getattr(self, key)) for key in self.keys())
+        return '{}({})'.format(type(self).__name__, fields)
+
+
+class _LRUCache:
+    """Bounded mapping that evicts its least recently used entries.
+
+    It is used to store the results of expensive preprocessing steps that only depend on the constraints of the
+    problem, so that they are not computed again when several problems sharing these constraints are solved.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+
+    def get(self, key):
+        if key in self._data:
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.hits = self.misses = self.evictions = 0
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Cache of the factorizations of the linear equality constraints, see _eliminate_linear_equalities.
+_elimination_cache = _LRUCache(maxsize=32)
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+
+def elimination_cache_info():
+    """Statistics of the cache of the elimination of the linear equality constraints.
+
+    When linear equality constraints are eliminated, the factorization of their Jacobian matrix and the reduced form of
+    the linear inequality constraints are stored in a cache, keyed by a fingerprint of the linear constraints and the
+    bounds. Subsequent solves with the same constraints reuse them.
+
+    Returns
+    -------
+    CacheInfo
+        Named tuple with fields ``hits``, ``misses``, ``evictions``, ``maxsize``, and ``currsize``.
+    """
+    return CacheInfo(_elimination_cache.hits, _elimination_cache.misses, _elimination_cache.evictions,
+                     _elimination_cache.maxsize, len(_elimination_cache))
+
+
+def elimination_cache_clear(maxsize=None):
+    """Clear the cache of the elimination of the linear equality constraints and reset its statistics.
+
+    Parameters
+    ----------
+    maxsize: int, optional
+        New maximum number of entries of the cache. The cache is disabled if it is zero.
+    """
+    _elimination_cache.clear()
+    if maxsize is not None:
+        if not isinstance(maxsize, scalar_types) or maxsize < 0:
+            raise ValueError('The maximum size of the cache should be a nonnegative integer.')
+        _elimination_cache.maxsize = int(maxsize)
+
+
 def prepdfo(fun, x0, args=(), method=None, bounds=None, constraints=(), options=None):
     """Pre-processing of the arguments.
 
@@ -337,14 +468,17 @@ def prepdfo(fun, x0, args=(), method=None, bounds=None, constraints=(), options=
 
     Dedicated to the late Professor M. J. D. Powell FRS (1936--2015).
     """
-    fun_name = stack()[0][3]  # name of the current function
+    from ._problem import Composition, FullPoint, Objective, PrecomputedValues, SumOfElements, SumOfSquares, \
+        zero_objective
+
+    fun_name = _frame_names()[0]  # name of the current function
     list_warnings = []
 
-    if len(stack()) < 3 or stack()[1][3].lower() not in invoker_list:
+    if len(_frame_names()) < 3 or _frame_names()[1].lower() not in invoker_list:
         raise SystemError('`{}` should only be called by {}'.format(fun_name, ', '.join(invoker_list)))
-    invoker = stack()[1][3].lower()
+    invoker = _frame_names()[1].lower()
 
-    if len(stack()) >= 4 and stack()[2][3].lower() == 'pdfo':
+    if len(_frame_names()) >= 4 and _frame_names()[2].lower() in preprocessed_invokers:
         # The invoker is a solver called by pdfo, then prepdfo should have been called in pdfo. In this case, we set
         # prob_info to an empty dictionary.
         prob_info = dict()
@@ -386,9 +520,7 @@ def prepdfo(fun, x0, args=(), method=None, bounds=None, constraints=(), options=
     # returns a constant.
     if fun is None:
         prob_info['feasibility_problem'] = True
-
-        def fun(x_loc, *args_loc):
-            return np.float64(0)
+        fun = zero_objective
 
         warn_message = '{}: there is no objective function. A feasibility problem will be solved.'.format(invoker)
         warnings.warn(warn_message, Warning)
@@ -396,34 +528,39 @@ def prepdfo(fun, x0, args=(), method=None, bounds=None, constraints=(), options=
     elif not callable(fun):
         raise ValueError('{}: the objective function should be callable.'.format(invoker))
 
+    # With method='bobyqa-ls', fun returns a vector of residuals, and the objective function is the sum of their
+    # squares. The residuals at the last point evaluated are kept in residuals['value'], so that they are available to
+    # the least-squares solver once the problem has been preprocessed (variables fixed, scaling, etc.).
+    least_squares = invoker == 'pdfo' and isinstance(method, str) and method.lower() == 'bobyqa-ls'
+    residuals = {'value': None}
+    if least_squares and not prob_info['feasibility_problem']:
+        fun = prob_info['raw_data']['objective'] = SumOfSquares(fun, residuals)
+
+    # With method='bobyqa-ps', fun is a pdfo.ElementValueCache, whose elements are modeled separately. The values of the
+    # elements at the last point evaluated are kept in elements['value'], and their index sets in
+    # elements['index_sets'], which are mapped to the variables of the preprocessed problem.
+    separable = invoker == 'pdfo' and isinstance(method, str) and method.lower() == 'bobyqa-ps'
+    elements = {'value': None, 'index_sets': None}
+    if separable and not prob_info['feasibility_problem']:
+        from ._separable import ElementValueCache
+
+        if isinstance(fun, ElementValueCache):
+            elements['index_sets'] = fun.index_sets
+            fun = prob_info['raw_data']['objective'] = SumOfElements(fun.element_values, elements)
+        else:
+            warn_message = '{}: bobyqa-ps requires the objective function to be a pdfo.ElementValueCache; the ' \
+                           'default solver is used instead.'.format(invoker)
+            warnings.warn(warn_message, Warning)
+            list_warnings.append(warn_message)
+
     # The extra-arguments of the objective function should be given as a list or a tuple.
     if args is not None and not hasattr(args, '__len__'):
         args = [args]
 
-    # Get the extreme barrier for the objective function.
-    try:
-        from .gethuge import gethuge
-    except ImportError:
-        import_error_so('gethuge')
-    hugefun = gethuge('fun')
-
-    # The objective function should return a floating-point number.
-    def fun_c(x):
-        try:
-            fun_x = fun(x) if hasattr(args, '__len__') and len(args) == 0 else fun(x, *args)
-        except TypeError:
-            raise TypeError('{}: the number of parameters is inconsistent with `args`.'.format(invoker))
-
-        if hasattr(fun_x, '__len__') and len(fun_x) == 1:
-            fun_x = fun_x[0]
-        elif (hasattr(fun_x, '__len__') or not isinstance(fun_x, scalar_types)) and fun_x is not None:
-            raise ValueError('{}: the objective function should return a scalar.'.format(invoker))
-
-        fun_x = np.float64(fun_x)
-        if not np.isfinite(fun_x) or fun_x > hugefun:
-            fun_x = np.float64(hugefun)
-
-        return fun_x
+    # The objective function should return a floating-point number, replaced by the extreme barrier if it is not finite
+    # or too large. The functions of the preprocessed problem are instances of the classes of pdfo._problem, which can
+    # be pickled, and sent as they are to worker processes.
+    fun_c = Objective(fun, args, invoker, _huge('fun'))
 
     # The initial guess should be an unidimensional ndarray.
     if isinstance(x0, scalar_types):
@@ -504,8 +641,7 @@ def prepdfo(fun, x0, args=(), method=None, bounds=None, constraints=(), options=
         ub = ub[free_indices]
         lenx0 = x0_c.size
 
-        def fun_c_reduced(freex_value):
-            return fun_c(_fullx(freex_value, fixed_values, free_indices, fixed_indices))
+        fun_c_reduced = Composition(fun_c, FullPoint(fixed_values, free_indices, fixed_indices))
     else:
         fun_c_reduced = fun_c
 
@@ -520,15 +656,117 @@ def prepdfo(fun, x0, args=(), method=None, bounds=None, constraints=(), options=
     # scenario, we will select the solver later, and the options may have to be revised accordingly. We will raise a
     # warning when revising an option that is in user_options_fields. No warning is needed if we are dealing with an
     # option that is not in user_options_fields.
+    # With method='auto-cost', the solver is selected automatically, according to the time taken by the first function
+    # evaluations and to a cost model of the solvers.
+    cost_selection = invoker == 'pdfo' and isinstance(method, str) and method.lower() == 'auto-cost'
+    # With method='portfolio', several solver configurations race on worker processes.
+    portfolio = invoker == 'pdfo' and isinstance(method, str) and method.lower() == 'portfolio'
+    # With method='subspace', NEWUOA or BOBYQA minimize the objective function on successive low-dimensional subspaces.
+    subspace = invoker == 'pdfo' and isinstance(method, str) and method.lower() == 'subspace'
+    if cost_selection or portfolio or subspace or least_squares or separable:
+        method = None
     options_c, prob_info['user_options_fields'], method = \
         _options_validation(invoker, options, method, lenx0, lb, ub, list_warnings)
 
+    # The values of the objective function are looked up in the evaluation cache, if any, before being evaluated. For
+    # least-squares and partially separable problems, the cache stores the residuals and the values of the elements.
+    if options_c[Options.EVALUATION_CACHE.value] is not None and not prob_info['feasibility_problem']:
+        from ._cache import CachedFunction
+
+        if isinstance(fun, (SumOfSquares, SumOfElements)):
+            fun.fun = CachedFunction(fun.fun, options_c[Options.EVALUATION_CACHE.value])
+        else:
+            fun = fun_c.fun = CachedFunction(fun, options_c[Options.EVALUATION_CACHE.value])
+    options_c.pop(Options.EVALUATION_CACHE.value, None)
+
+    # The objective function is evaluated under the evaluation policy, if any. Since fun_c calls fun, it suffices to
+    # replace fun in fun_c, and the failed evaluations are then given the extreme barrier by fun_c.
+    prob_info['policy'] = None
+    if options_c[Options.EVALUATION_POLICY.value] is not None and not prob_info['feasibility_problem']:
+        from ._policy import EvaluationPolicy
+
+        fun = fun_c.fun = prob_info['policy'] = EvaluationPolicy(fun, **options_c[Options.EVALUATION_POLICY.value])
+    options_c.pop(Options.EVALUATION_POLICY.value, None)
+
+    # With a low-fidelity objective function, the objective function is only evaluated at the points where the
+    # low-fidelity one, corrected by the difference between the fidelities at the nearest point, predicts a decrease.
+    prob_info['fidelity'] = None
+    if invoker == 'pdfo':
+        low_fidelity = options_c.pop(Options.LOW_FIDELITY.value, None)
+        if low_fidelity is not None and (portfolio or least_squares or separable or options_c[Options.NOISY.value]):
+            warn_message = \
+                '{}: {} is ignored in the portfolio, least-squares, partially separable, and noise-aware modes.'.format(
+                    invoker, Options.LOW_FIDELITY.value)
+            warnings.warn(warn_message, Warning)
+            list_warnings.append(warn_message)
+        elif low_fidelity is not None and not prob_info['feasibility_problem']:
+            from ._fidelity import MultiFidelity
+
+            fun = fun_c.fun = prob_info['fidelity'] = MultiFidelity(fun, low_fidelity)
+
+    # With the model screening, the objective function is not evaluated at the points where a quadratic model of the
+    # values so far predicts a value far above the least one, and the prediction is given to the solver instead.
+    prob_info['screening'] = None
+    if invoker == 'pdfo' and options_c.pop(Options.MODEL_SCREENING.value, False):
+        if portfolio or least_squares or separable or options_c[Options.NOISY.value] or \
+                prob_info['fidelity'] is not None or constraints_c['nonlinear'] is not None:
+            warn_message = '{}: {} is ignored in the portfolio, least-squares, partially separable, noise-aware, and ' \
+                           'multi-fidelity modes, and with nonlinear constraints.'.format(
+                               invoker, Options.MODEL_SCREENING.value)
+            warnings.warn(warn_message, Warning)
+            list_warnings.append(warn_message)
+        elif not prob_info['feasibility_problem']:
+            from ._screening import ModelScreening
+
+            fun = fun_c.fun = prob_info['screening'] = ModelScreening(fun)
+
+    # The large arrays of the extra arguments are placed in shared memory if the objective function may be sent to
+    # worker processes, to which they are then sent by reference, with fun_c.
+    if invoker == 'pdfo' and (options_c[Options.EXECUTOR.value] is not None or portfolio):
+        import multiprocessing
+        from ._executor import _in_threads
+
+        executor = options_c[Options.EXECUTOR.value]
+        if (executor is not None and not _in_threads(executor)) or \
+                (executor is None and multiprocessing.get_start_method() != 'fork'):
+            from ._shared import share_args
+
+            args = fun_c.args = share_args(args)
+
     # Scale the problem if necessary and if intended, x_before_scaling = scaling_factor.*x_after_scaling + shift.
     # This should be done after revising x0, which can affect the shift.
     prob_info['scaled'] = False
     prob_info['scaling_factor'] = np.ones(lenx0)
     prob_info['shift'] = np.zeros_like(x0_c)
-    if options_c[Options.SCALE.value] and not prob_info['nofreex'] and not prob_info['infeasible']:
+    prob_info['probe_nfev'] = None
+    prob_info['precomputed'] = []  # functions whose precomputed values not requested by the solver are counted
+    auto_radius = options_c.pop(Options.AUTO_RADIUS.value, False)
+    if auto_radius and not prob_info['nofreex'] and not prob_info['infeasible']:
+        # Scale and shift the problem so that the initial trust-region radius corresponds, for each variable, to the
+        # range of its bounds, to the magnitude of its component of x0, or to the length of a step estimated by
+        # evaluating the objective function around x0 (see _auto_scaling).
+        probe = auto_radius == 'probe' and not prob_info['feasibility_problem']
+        scaling_factor, shift, values = \
+            _auto_scaling(fun_c_reduced, x0_c, lb, ub, probe, options_c[Options.MAXFEV.value])
+        fun_c_reduced, x0_c, lb, ub, constraints_c, scaling_factor, shift, _ = \
+            _scale_problem(fun_c_reduced, x0_c, lb, ub, constraints_c, list_warnings, scaling_factor, shift)
+        if values is None:
+            warn_message = '{}: the objective function is not probed for {}, as the probes would take too large a ' \
+                           'part of {}.'.format(invoker, Options.AUTO_RADIUS.value, Options.MAXFEV.value)
+            warnings.warn(warn_message, Warning)
+            list_warnings.append(warn_message)
+        elif probe:
+            # The value at x0 is given to the solver when it requests it, and the other ones are not: they are taken
+            # off the budget of the solver, and counted in probe_nfev with the value at x0 if it is not requested.
+            prob_info['probe_nfev'] = max(len(values) - 1, 0)
+            options_c[Options.MAXFEV.value] -= prob_info['probe_nfev']
+            if len(values) > 0:
+                fun_c_reduced = PrecomputedValues(fun_c_reduced, {x0_c.tobytes(): values[0]})
+                prob_info['precomputed'].append(fun_c_reduced)
+        prob_info['scaled'] = True
+        prob_info['scaling_factor'] = scaling_factor
+        prob_info['shift'] = shift
+    elif options_c[Options.SCALE.value] and not prob_info['nofreex'] and not prob_info['infeasible']:
         # Scale and shift the problem so that all the bounds become [-1, 1]. It is done only if all variables have both
         # lower and upper bounds.
         fun_c_reduced, x0_c, lb, ub, constraints_c, scaling_factor, shift, _ = \
@@ -587,7 +825,7 @@ def prepdfo(fun, x0, args=(), method=None, bounds=None, constraints=(), options=
             ctr_fct_ori = constraints_c['nonlinear']['fun']
             constraints_c['nonlinear'] = {
                 'type': 'ineq',
-                'fun': lambda x_red: ctr_fct_ori(space_chg(x_red))
+                'fun': Composition(ctr_fct_ori, space_chg)
             }
 
     # Problem after reduction.
@@ -640,18 +878,219 @@ def prepdfo(fun, x0, args=(), method=None, bounds=None, constraints=(), options=
     # If is possible that both prob_info['reduced'] and prob_info['nofreex'] are True, if the bound constraint fixed
     # some (but not all) constraints and the linear equality constraint fixed the others.
     if space_chg is not None and not prob_info['nofreex']:
-        def fun_c_space(freex_value):
-            return fun_c_reduced(space_chg(freex_value))
+        fun_c_space = Composition(fun_c_reduced, space_chg)
     else:
         fun_c_space = fun_c_reduced  # the variable vector is not reduced
 
+    # Time the first evaluations of the objective function for the cost-model-driven selection of the solver. The
+    # values obtained are returned without evaluating the function again when the solver requests them.
+    prob_info['evaluation_time'] = None
+    if cost_selection and not prob_info['nofreex'] and not prob_info['infeasible'] and \
+            not prob_info['feasibility_problem']:
+        fun_c_space, prob_info['evaluation_time'] = _time_evaluations(
+            fun_c_space, x0_c, lb, ub, prob_info['refined_type'], options_c[Options.RHOBEG.value])
+        prob_info['precomputed'].append(fun_c_space)
+
     # Select a solver if the invoker is 'pdfo' and no one is provided.
     if invoker.lower() == 'pdfo':
-        # lb and ub will be used for defining rhobeg.
-        prob_info['refined_data'] = {'lb': lb, 'ub': ub}
+        # lb and ub will be used for defining rhobeg, and the constraints for estimating the memory of the solvers.
+        prob_info['refined_data'] = {'lb': lb, 'ub': ub, 'constraints': constraints_c}
 
         method = _solver_selection(invoker, method, options_c, prob_info, list_warnings)
 
+        # All the parallel evaluations (portfolio, replicates, initial points) go through the executor,
+        # whose number of tasks in flight may be limited.
+        if options_c[Options.EXECUTOR.value] is not None and options_c[Options.MAX_IN_FLIGHT.value] is not None:
+            from ._executor import BoundedExecutor
+
+            options_c[Options.EXECUTOR.value] = BoundedExecutor(options_c[Options.EXECUTOR.value],
+                                                                options_c[Options.MAX_IN_FLIGHT.value])
+
+        # In the portfolio mode, the solver configurations compatible with the problem race in place of the selected
+        # solver. The constraint violations of the points are computed by the workers, which is why the nonlinearly
+        # constrained problems are excluded.
+        prob_info['portfolio'] = None
+        if portfolio and prob_info['refined_type'] == 'nonlinearly-constrained':
+            warn_message = \
+                '{}: the portfolio mode does not handle nonlinearly constrained problems; {} is used ' \
+                'instead.'.format(invoker, method)
+            warnings.warn(warn_message, Warning)
+            list_warnings.append(warn_message)
+        elif portfolio and not prob_info['nofreex'] and not prob_info['infeasible'] and \
+                not prob_info['feasibility_problem']:
+            from ._portfolio import _default_portfolio
+
+            configurations = options_c[Options.PORTFOLIO.value]
+            if configurations is None:
+                configurations = _default_portfolio(prob_info['refined_type'], lenx0, options_c[Options.MAXFEV.value])
+            else:
+                # No list comprehension here: _prob_solv_match checks the name of the frame of its caller.
+                configurations = []
+                for configuration in options_c[Options.PORTFOLIO.value]:
+                    if _prob_solv_match(prob_info['refined_type'], configuration['method']):
+                        configurations.append(configuration)
+                if len(configurations) < len(options_c[Options.PORTFOLIO.value]):
+                    warn_message = \
+                        '{}: the solver configurations of the portfolio that cannot solve a {} problem are ' \
+                        'ignored.'.format(invoker, prob_info['refined_type'].replace('-', ' '))
+                    warnings.warn(warn_message, Warning)
+                    list_warnings.append(warn_message)
+            # The solvers cannot run concurrently in the threads of a process, hence the workers of the executor must
+            # be processes.
+            from ._executor import _in_threads
+
+            executor = options_c[Options.EXECUTOR.value]
+            if executor is not None and _in_threads(executor):
+                warn_message = \
+                    '{}: the portfolio cannot run on the threads of {}; {} worker processes are used ' \
+                    'instead.'.format(invoker, Options.EXECUTOR.value, Options.WORKERS.value)
+                warnings.warn(warn_message, Warning)
+                list_warnings.append(warn_message)
+                executor = None
+            if len(configurations) > 0:
+                prob_info['portfolio'] = {'configurations': configurations, 'workers': options_c[Options.WORKERS.value],
+                                          'executor': executor}
+
+        # In the subspace mode, NEWUOA (for unconstrained problems) or BOBYQA (for bound-constrained problems) minimize
+        # the objective function on successive low-dimensional subspaces. It is useless if the subspaces would be the
+        # whole space.
+        prob_info['subspace'] = None
+        if subspace and prob_info['refined_type'] not in ['unconstrained', 'bound-constrained']:
+            warn_message = \
+                '{}: the subspace mode handles only unconstrained and bound-constrained problems; {} is used ' \
+                'instead.'.format(invoker, method)
+            warnings.warn(warn_message, Warning)
+            list_warnings.append(warn_message)
+        elif subspace and not prob_info['nofreex'] and not prob_info['infeasible'] and \
+                not prob_info['feasibility_problem']:
+            from ._subspace import _default_subspace_dim
+
+            dim = options_c[Options.SUBSPACE_DIM.value] or _default_subspace_dim(lenx0)
+            basis = options_c[Options.SUBSPACE_BASIS.value]
+            if prob_info['refined_type'] == 'bound-constrained':
+                if basis == 'random':
+                    warn_message = \
+                        '{}: random subspaces do not preserve the bound constraints; coordinate blocks are used ' \
+                        'instead.'.format(invoker)
+                    warnings.warn(warn_message, Warning)
+                    list_warnings.append(warn_message)
+                basis = 'coordinate'
+            if dim < lenx0:
+                # For a partially separable function, the blocks of coordinates follow an order of the variables in
+                # which those appearing in common elements are close to each other.
+                from ._separable import ElementValueCache
+
+                order = None
+                if isinstance(fun, ElementValueCache) and fun.n == prob_info['raw_dim']:
+                    order = fun.variable_order()
+                    if prob_info['reduced']:
+                        order = (np.cumsum(free_indices) - 1)[order[free_indices[order]]]
+                method = 'bobyqa' if prob_info['refined_type'] == 'bound-constrained' else 'newuoa'
+                prob_info['subspace'] = {'method': method, 'dim': dim, 'basis': basis or 'coordinate', 'order': order}
+
+        # The least-squares solver handles unconstrained and bound-constrained problems. Otherwise, the selected solver
+        # minimizes the sum of the squares of the residuals.
+        prob_info['least_squares'] = None
+        if least_squares and prob_info['refined_type'] not in ['unconstrained', 'bound-constrained']:
+            warn_message = \
+                '{}: bobyqa-ls handles only unconstrained and bound-constrained problems; {} is used ' \
+                'instead.'.format(invoker, method)
+            warnings.warn(warn_message, Warning)
+            list_warnings.append(warn_message)
+        elif least_squares and not prob_info['nofreex'] and not prob_info['infeasible'] and \
+                not prob_info['feasibility_problem']:
+            prob_info['least_squares'] = residuals
+
+        # The partially separable solver handles unconstrained and bound-constrained problems. Otherwise, the selected
+        # solver minimizes the sum of the elements. The variables fixed by the bounds are removed from the index sets.
+        prob_info['separable'] = None
+        if elements['index_sets'] is not None and \
+                (prob_info['refined_type'] not in ['unconstrained', 'bound-constrained'] or space_chg is not None):
+            warn_message = \
+                '{}: bobyqa-ps handles only unconstrained and bound-constrained problems; {} is used ' \
+                'instead.'.format(invoker, method)
+            warnings.warn(warn_message, Warning)
+            list_warnings.append(warn_message)
+        elif elements['index_sets'] is not None and not prob_info['nofreex'] and not prob_info['infeasible']:
+            index_sets = [np.unique(indices) for indices in elements['index_sets']]
+            if prob_info['reduced']:
+                positions = np.cumsum(free_indices) - 1
+                index_sets = [positions[indices[free_indices[indices]]] for indices in index_sets]
+            elements['index_sets'] = index_sets
+            prob_info['separable'] = elements
+
+        # The usual solvers are restarted when their trust-region radius reaches its final value with budget left.
+        prob_info['restarts'] = 0
+        restarts = options_c[Options.RESTARTS.value]
+        if restarts > 0 and (prob_info['portfolio'] or prob_info['subspace'] or prob_info['least_squares'] or
+                             prob_info['separable']):
+            warn_message = \
+                '{}: {} is ignored in the portfolio, subspace, least-squares, and partially separable modes.'.format(
+                    invoker, Options.RESTARTS.value)
+            warnings.warn(warn_message, Warning)
+            list_warnings.append(warn_message)
+        elif not prob_info['nofreex'] and not prob_info['infeasible'] and not prob_info['feasibility_problem']:
+            prob_info['restarts'] = restarts
+
+        # In the noise-aware mode, the solver is run in stages, each of which decreases the trust-region radius, and the
+        # objective function is evaluated several times at each point, as many as needed for its average to be resolved
+        # at the current radius. It replaces the restarts.
+        prob_info['noise'] = None
+        if options_c[Options.NOISY.value] and (prob_info['portfolio'] or prob_info['subspace'] or
+                                               prob_info['least_squares'] or prob_info['separable']):
+            warn_message = \
+                '{}: {} is ignored in the portfolio, subspace, least-squares, and partially separable modes.'.format(
+                    invoker, Options.NOISY.value)
+            warnings.warn(warn_message, Warning)
+            list_warnings.append(warn_message)
+        elif options_c[Options.NOISY.value] and not prob_info['nofreex'] and not prob_info['infeasible'] and \
+                not prob_info['feasibility_problem']:
+            if prob_info['restarts'] > 0:
+                warn_message = '{}: {} is ignored in the noise-aware mode.'.format(invoker, Options.RESTARTS.value)
+                warnings.warn(warn_message, Warning)
+                list_warnings.append(warn_message)
+                prob_info['restarts'] = 0
+            prob_info['noise'] = {'max_replicates': options_c[Options.MAX_REPLICATES.value],
+                                  'executor': options_c[Options.EXECUTOR.value]}
+
+        # The initial interpolation points of NEWUOA, BOBYQA, and UOBYQA may be evaluated in parallel on the executor,
+        # the following points being evaluated sequentially by the solver. The initial points of LINCOA and COBYLA
+        # depend on the values at the previous ones.
+        prob_info['parallel_initial_points'] = None
+        if options_c[Options.PARALLEL_INITIAL_POINTS.value]:
+            if options_c[Options.EXECUTOR.value] is None or method.lower() not in ['newuoa', 'bobyqa', 'uobyqa'] or \
+                    prob_info['portfolio'] or prob_info['subspace'] or prob_info['least_squares'] or \
+                    prob_info['separable'] or prob_info['restarts'] > 0 or prob_info['noise'] is not None:
+                warn_message = \
+                    '{}: {} is ignored; it requires {} and applies only to NEWUOA, BOBYQA, and UOBYQA, without the ' \
+                    'portfolio, subspace, least-squares, partially separable, and noise-aware modes and the ' \
+                    'restarts.'.format(
+                        invoker, Options.PARALLEL_INITIAL_POINTS.value, Options.EXECUTOR.value)
+                warnings.warn(warn_message, Warning)
+                list_warnings.append(warn_message)
+            elif not prob_info['nofreex'] and not prob_info['infeasible'] and not prob_info['feasibility_problem']:
+                prob_info['parallel_initial_points'] = options_c[Options.EXECUTOR.value]
+
+        # The options of the cost model, of the portfolio, of the subspace mode, of the restarts, of the noise-aware
+        # mode, and of the parallel initial points are not needed by the solver that is called by pdfo.
+        options_c.pop(Options.COST_MODEL.value, None)
+        options_c.pop(Options.PORTFOLIO.value, None)
+        options_c.pop(Options.WORKERS.value, None)
+        options_c.pop(Options.SUBSPACE_DIM.value, None)
+        options_c.pop(Options.SUBSPACE_BASIS.value, None)
+        options_c.pop(Options.RESTARTS.value, None)
+        options_c.pop(Options.NOISY.value, None)
+        options_c.pop(Options.MAX_REPLICATES.value, None)
+        options_c.pop(Options.EXECUTOR.value, None)
+        options_c.pop(Options.MAX_IN_FLIGHT.value, None)
+        options_c.pop(Options.PARALLEL_INITIAL_POINTS.value, None)
+
+    # The default npt (or the user-defined one) may require more memory than allowed.
+    if options_c[Options.MAX_MEMORY.value] is not None and method.lower() in ['bobyqa', 'lincoa', 'newuoa'] and \
+            not prob_info['nofreex'] and not prob_info['infeasible']:
+        options_c = _pre_npt_memory(invoker, method.lower(), lenx0, _linear_constraint_count(lb, ub, constraints_c),
+                                    prob_info['user_options_fields'], options_c, list_warnings)
+
     if method.lower() == 'bobyqa' and not prob_info['nofreex'] and not prob_info['infeasible'] and \
             not prob_info['feasibility_problem']:
         # The Fortran code of BOBYQA will revise x0 so that the distance between x0 and the inactive bounds is at least
@@ -944,7 +1383,7 @@ def _constraints_validation(invoker, constraints, lenx0, fixed_indices, fixed_va
         for linear_constraint, i_meta in zip(list_linear, prob_info['constr_meta']['linear_indices']):
             # The type of linear_constraint is necessarily LinearConstraint.
             a_local = linear_constraint.A
-            if a_local.size == 0:
+            if _matrix_size(a_local) == 0:
                 a_local = a_local.reshape(0, lenx0)
             if a_local.shape[1] != lenx0:
                 raise ValueError(
@@ -965,19 +1404,19 @@ def _constraints_validation(invoker, constraints, lenx0, fixed_indices, fixed_va
             prob_info['constr_meta']['data'][i_meta] = {'trivial': False, 'A': a_local}
 
             # Add the current linear constraint to the global one.
-            if a_local.size > 0:
+            if _matrix_size(a_local) > 0:
                 # If an empty matrix A is provided, it would be reshaped to (0, 1) and hence, the vectors lb_local and
                 # ub_local would be set respectively to [-inf] and [+inf]. Thus, it would create an incompatibility if
-                # we try to add them to lb_linear and ub_linear.
-                a_linear = np.concatenate((a_linear, a_local), axis=0)
+                # we try to add them to lb_linear and ub_linear. If any of the matrices is sparse, so is a_linear.
+                a_linear = _vstack((a_linear, a_local))
                 lb_linear = np.r_[lb_linear, lb_local]
                 ub_linear = np.r_[ub_linear, ub_local]
 
         # Remove the abnormal constraints and check infeasibility.
+        free_indices = np.logical_not(fixed_indices)
         if prob_info['reduced']:
-            free_indices = np.logical_not(fixed_indices)
             a_reduced = a_linear[:, free_indices]
-            a_fixed = np.dot(a_linear[:, fixed_indices], fixed_values)
+            a_fixed = a_linear[:, fixed_indices] @ fixed_values
             lb_reduced = lb_linear - a_fixed
             ub_reduced = ub_linear - a_fixed
         else:
@@ -985,11 +1424,11 @@ def _constraints_validation(invoker, constraints, lenx0, fixed_indices, fixed_va
             lb_reduced = lb_linear.copy()
             ub_reduced = ub_linear.copy()
 
-        if a_reduced.size == 0:
+        if _matrix_size(a_reduced) == 0:
             trivial = np.asarray([], dtype=bool)
             infeasible_linear = np.asarray([], dtype=bool)
         else:
-            row_norm_inf = np.nanmax(np.abs(a_reduced), 1)
+            row_norm_inf = _row_norm_inf(a_reduced)
             zero_rows = (row_norm_inf == 0)
             infeasible_zero = np.logical_or(np.logical_and(zero_rows, lb_reduced > 0),
                                             np.logical_and(zero_rows, ub_reduced < 0))
@@ -1010,7 +1449,7 @@ def _constraints_validation(invoker, constraints, lenx0, fixed_indices, fixed_va
         if infeasible:
             fixed_values = x0[fixed_indices]
             prob_info['fixedx_value'] = fixed_values
-            a_fixed = np.dot(a_linear[:, fixed_indices], fixed_values)
+            a_fixed = a_linear[:, fixed_indices] @ fixed_values
             lb_reduced = lb_linear - a_fixed
             ub_reduced = ub_linear - a_fixed
 
@@ -1021,112 +1460,26 @@ def _constraints_validation(invoker, constraints, lenx0, fixed_indices, fixed_va
             ub_reduced = ub_reduced[np.logical_not(trivial)]
 
         # Build the nonlinear constraints.
-        try:
-            from .gethuge import gethuge
-        except ImportError:
-            # If gethuge cannot be imported, the package is most likely not built.
-            import_error_so('gethuge')
-        hugecon = gethuge('con')
+        hugecon = _huge('con')
 
         # Define the indices of the nonlinear constraints that are not trivial
         non_trivial = [i for i in range(len(constraints_c)) if not prob_info['constr_meta']['data'][i]['trivial']]
         non_linear_non_trivial_indices = [i for i in prob_info['constr_meta']['nonlinear_indices'] if i in non_trivial]
 
         # Define the global constraint function.
-        def fun_nonlinear(x, raw=False):
-            fun_x = np.asarray([], dtype=np.float64)
-
-            for nlc_constraint, b_type, i_meta in zip(list_nonlinear, list_nonlinear_bound_types,
-                                                      non_linear_non_trivial_indices):
-                # Get the value of the constraint function.
-                if not raw and prob_info['reduced']:
-                    x_full = _fullx(x, fixed_values, free_indices, fixed_indices)
-                else:
-                    x_full = x
-                if isinstance(nlc_constraint, nonlinear_constraint_types):
-                    constraint_x = nlc_constraint.fun(x_full)
-                elif nlc_constraint['fun'] is not None:
-                    constraint_x = nlc_constraint['fun'](x_full)
-                else:
-                    constraint_x = np.asarray([], dtype=np.float64)
-
-                if constraint_x is None:
-                    # If the constraint function returned anything, we convert the default None value to NaN, which can
-                    # be understood by Fortran.
-                    constraint_x = [np.nan]
-                elif isinstance(constraint_x, scalar_types):
-                    constraint_x = [constraint_x]
-
-                if not hasattr(constraint_x, '__len__'):
-                    raise ValueError('{}: the constraint function should return a vector or a scalar.'.format(invoker))
-
-                constraint_x = np.asarray(constraint_x, dtype=np.float64)
+        from ._problem import NonlinearConstraints
 
-                # Use extreme barrier to cope with the 'hidden constraints'.
-                constraint_x[np.logical_or(np.isnan(constraint_x), constraint_x > hugecon)] = hugecon
-
-                # This part is NOT extreme barrier. We replace extremely negative values of cineq (which leads to no
-                # constraint violation) by -hugecon. Otherwise, NaN or Inf may occur in the interpolation models.
-                constraint_x[constraint_x < -hugecon] = -hugecon
-
-                if len(constraint_x.shape) != 1:
-                    raise ValueError('{}: the constraint function should return a vector or a scalar.'.format(invoker))
-
-                # Set the metadata related to this constraint if it has not been done yet.
-                if prob_info['constr_meta']['data'][i_meta]['len'] < 0:
-                    prob_info['constr_meta']['data'][i_meta]['len'] = constraint_x.size
-                    prob_info['constr_meta']['data'][i_meta]['dropped_indices_lb'] = np.full(constraint_x.shape, False)
-                    prob_info['constr_meta']['data'][i_meta]['lb'] = np.zeros_like(constraint_x)
-
-                    # if the metadata has not been set, nlc_constraint is necessarily defined as a dictionary.
-                    prob_info['constr_meta']['data'][i_meta]['dropped_indices_ub'] = \
-                        np.full(constraint_x.shape, not nlc_constraint['type'] == 'eq')
-                    if nlc_constraint['type'] == 'eq':
-                        prob_info['constr_meta']['data'][i_meta]['ub'] = np.zeros_like(constraint_x)
-                    else:
-                        prob_info['constr_meta']['data'][i_meta]['ub'] = np.full_like(constraint_x, np.inf)
-
-                lenm = constraint_x.size
-                if isinstance(nlc_constraint, nonlinear_constraint_types) and not infeasible:
-                    if nlc_constraint.lb.size not in [0, lenm] or \
-                            nlc_constraint.ub.size not in [0, lenm] or \
-                            (nlc_constraint.lb.size == 0 and nlc_constraint.ub.size == 0):
-                        raise ValueError(
-                            '{}: the size of the vector returned by the constraint function is inconsistent with the '
-                            'constraint bounds; check the shapes of the arrays.'.format(invoker))
-
-                    # Convert the constraints defined as lb <= c(x) <= ub into c_extended(x) <= 0.
-                    constraint_x_tmp = np.array([], dtype=np.float64)
-                    if not b_type['lb_free']:
-                        lbx = b_type['lbx']
-                        constraint_x_tmp = np.r_[constraint_x_tmp, nlc_constraint.lb[lbx] - constraint_x[lbx]]
-                    if not b_type['ub_free']:
-                        ubx = b_type['ubx']
-                        constraint_x_tmp = np.r_[constraint_x_tmp, constraint_x[ubx] - nlc_constraint.ub[ubx]]
-                    constraint_x = constraint_x_tmp
-                elif isinstance(nlc_constraint, dict) and nlc_constraint['type'] == 'eq' and not infeasible:
-                    # Necessarily, nlc_constraint is defined as a dictionary, for which all the constraints have to be
-                    # considered.
-                    constraint_x = np.r_[-constraint_x, constraint_x]
-                elif not infeasible:
-                    # nlc_constraint is defined as a dictionary, for which all the constraints have to be considered.
-                    # Moreover, it consists of an inequality constraint c(x) >= 0, which has to be inversed,
-                    constraint_x *= -1
-                else:
-                    # The problem is infeasible, only the constraint evaluation should be stored.
-                    pass
-
-                # Add the current nonlinear constraint evaluation to the general one.
-                fun_x = np.r_[fun_x, constraint_x]
-
-            return fun_x
+        fun_nonlinear = NonlinearConstraints(
+            invoker, list_nonlinear, list_nonlinear_bound_types, non_linear_non_trivial_indices,
+            prob_info['constr_meta'], nonlinear_constraint_types, prob_info['reduced'], fixed_values, free_indices,
+            fixed_indices, infeasible, hugecon)
 
         # Define the global linear and nonlinear constraints.
         linear_constraints = None if len(list_linear) == 0 else LinearConstraint(a_reduced, lb_reduced, ub_reduced)
         nonlinear_constraints = None if len(list_nonlinear) == 0 else {'type': 'ineq', 'fun': fun_nonlinear}
         raw_linear_constraints = None if len(list_linear) == 0 else LinearConstraint(a_linear, lb_linear, ub_linear)
         raw_nonlinear_constraints = None if len(list_nonlinear) == 0 else {'type': 'ineq',
-                                                                           'fun': lambda x: fun_nonlinear(x, raw=True)}
+                                                                           'fun': partial(fun_nonlinear, raw=True)}
     else:
         # No constraints have been provided.
         linear_constraints = None
@@ -1190,6 +1543,8 @@ def _eliminate_linear_equalities(invoker, constraints, x0, lb, ub, prob_info, li
 
     Dedicated to the late Professor M. J. D. Powell FRS (1936--2015).
     """
+    from ._problem import AffineSpace
+
     if not isinstance(constraints, dict) or not ({'linear', 'nonlinear'} <= set(constraints.keys())):
         raise ValueError('{}: UNEXPECTED ERROR: the constraint should be defined as internal type.'.format(invoker))
 
@@ -1208,7 +1563,7 @@ def _eliminate_linear_equalities(invoker, constraints, x0, lb, ub, prob_info, li
             # Since x0 has previously been projected onto the bound and linear constraints, it is likely to satisfy, but
             # if not, attempt to project it.
             lin_ineq_indices = np.logical_not(lin_eq_indices)
-            a_eq = constraints['linear'].A[lin_eq_indices]
+            a_eq = _dense(constraints['linear'].A[lin_eq_indices])  # only the equality rows are densified
             col_norm = np.sum(np.square(a_eq), axis=0)
             zero_col = np.less(col_norm, 10 * eps * np.sum(col_norm))
             p_zeros = np.arange(x0.size)
@@ -1224,27 +1579,24 @@ def _eliminate_linear_equalities(invoker, constraints, x0, lb, ub, prob_info, li
 
                 # Scipy is installed. Compute the QR factorization with pivoting of the Jacobian of the linear equality
                 # constraints, and deduced from it the consistency of the system and the reduced form of the linear
-                # equality constraints.
-                q_eq, r_eq, p_eq = qr(a_eq, pivoting=True)
-
-                # The rank of the Jacobian of the linear equality constraints is determined with a relative error of 10
-                # times the machine epsilon.
-                rcn = np.cumsum(np.flip(np.sum(np.square(r_eq), axis=1)))
-                rank_a_eq = sum(np.greater_equal(rcn, 10 * eps * rcn[-1]))
-
-                # Compute the coefficients of the hyperplane associated with the linear equality constraints.
-                qtb = np.dot(q_eq.T, b_eq)
-                riv = np.linalg.inv(r_eq[:rank_a_eq, :rank_a_eq])  # r_eq[:rank, :rank] is invertible and assumed small
-                comp = np.abs(qtb[rank_a_eq:])
-                if any(np.greater(comp, 10 * eps * np.max(np.abs(qtb), initial=1))):
+                # equality constraints. All the quantities that do not depend on x0 are stored in a cache, so that they
+                # are not computed again if the same constraints and bounds are given for another solve.
+                key = _fingerprint(constraints['linear'].A, constraints['linear'].lb, constraints['linear'].ub, lb, ub)
+                factors = _elimination_cache.get(key)
+                if factors is None:
+                    factors = _factorize_linear_equalities(qr, a_eq, b_eq, constraints['linear'].A[lin_ineq_indices, :],
+                                                           lb, ub, p_zeros, p_zeros_inv, n_red)
+                    _elimination_cache.put(key, factors)
+                rank_a_eq = factors['rank']
+                if factors['infeasible']:
                     # The linear equality constraints are infeasible
                     space_chg = None
                     intercept = None
                     prob_info['infeasible'] = True
                 else:
                     # Compute the reduced form.
-                    null_basis = -np.dot(riv, r_eq[:rank_a_eq, rank_a_eq:])
-                    p_inv = np.argsort(p_eq)  # equivalent to the transposition of the matrix of permutation
+                    riv, qtb, null_basis = factors['riv'], factors['qtb'], factors['null_basis']
+                    p_eq, p_inv = factors['p_eq'], factors['p_inv']
                     x0 = x0[p_zeros]
                     x0[:n_red] = x0[p_eq]
                     feasible = np.r_[np.dot(riv, qtb[:rank_a_eq]) + np.dot(null_basis, x0[rank_a_eq:n_red]),
@@ -1258,29 +1610,15 @@ def _eliminate_linear_equalities(invoker, constraints, x0, lb, ub, prob_info, li
                         ub = ub[p_zeros]
                         lb[:n_red] = lb[p_eq]
                         ub[:n_red] = ub[p_eq]
-                        p_restore = np.arange(x0.size)
-                        p_restore[:n_red] = p_restore[p_inv]
-                        p_restore = p_restore[p_zeros_inv]
 
-                        # Compute the reduced form of the linear constraints.
-                        A_perm = constraints['linear'].A[lin_ineq_indices, :]
-                        A_perm = A_perm[:, p_zeros]
-                        A_perm[:, :n_red] = A_perm[:, p_eq]
-                        constraints['linear'].A = np.c_[
-                            np.dot(A_perm[:, :rank_a_eq], null_basis) + A_perm[:, rank_a_eq:n_red], A_perm[:, n_red:]]
-                        bound_shift = np.dot(A_perm, feasible)
+                        # The reduced form of the linear constraints is given by the factorization, and only their
+                        # bounds depend on x0.
+                        constraints['linear'].A = factors['a_reduced'].copy()
+                        bound_shift = factors['a_perm'] @ feasible
                         constraints['linear'].lb = constraints['linear'].lb[lin_ineq_indices] - bound_shift
                         constraints['linear'].ub = constraints['linear'].ub[lin_ineq_indices] - bound_shift
-                        row_inf = np.logical_and(
-                            np.logical_and(np.isinf(lb[:rank_a_eq]), lb[:rank_a_eq] < 0),
-                            np.logical_and(np.isinf(ub[:rank_a_eq]), ub[:rank_a_eq] > 0))
-                        row_finite = np.logical_not(row_inf)
-                        constraints['linear'].A = np.r_[
-                            constraints['linear'].A,
-                            np.c_[null_basis[row_finite, :], np.zeros((sum(row_finite), x0.size - n_red))]]
-                        row_finite_bounds = np.r_[row_finite, np.full(x0.size - rank_a_eq, False)]
-                        prob_info['bounds_in_lin_eq'] = np.where(np.logical_and(p_restore < rank_a_eq,
-                                                                                row_finite_bounds[p_restore]))[0]
+                        row_finite_bounds = factors['row_finite_bounds']
+                        prob_info['bounds_in_lin_eq'] = factors['bounds_in_lin_eq'].copy()
                         constraints['linear'].lb = np.r_[constraints['linear'].lb,
                                                          lb[row_finite_bounds] - feasible[row_finite_bounds]]
                         constraints['linear'].ub = np.r_[constraints['linear'].ub,
@@ -1290,12 +1628,7 @@ def _eliminate_linear_equalities(invoker, constraints, x0, lb, ub, prob_info, li
                         lb = lb[rank_a_eq:] - x0[rank_a_eq:]
                         ub = ub[rank_a_eq:] - x0[rank_a_eq:]
 
-                    def space_chg(y):
-                        x = np.r_[np.dot(null_basis, y[:n_red-rank_a_eq]), y] + feasible
-                        x[:n_red] = x[p_inv]
-                        x = x[p_zeros_inv]
-
-                        return x
+                    space_chg = AffineSpace('qr', null_basis, n_red, rank_a_eq, feasible, p_zeros_inv, p_inv)
 
             except ImportError:
                 # SciPy is not installed so that the SVD factorization is used instead.
@@ -1350,24 +1683,20 @@ def _eliminate_linear_equalities(invoker, constraints, x0, lb, ub, prob_info, li
                         lb = np.r_[np.full(n_red - rank_a_eq, -np.inf), lb[n_red:] - x0[n_red:]]
                         ub = np.r_[np.full(n_red - rank_a_eq, np.inf), ub[n_red:] - x0[n_red:]]
 
-                    def space_chg(y):
-                        x = np.r_[np.dot(y[:n_red-rank_a_eq], vh_eq[rank_a_eq:, :]), y[n_red-rank_a_eq:]] + feasible
-                        x = x[p_zeros_inv]
-
-                        return x
+                    space_chg = AffineSpace('svd', vh_eq[rank_a_eq:, :], n_red, rank_a_eq, feasible, p_zeros_inv)
 
             if space_chg is not None and not prob_info['infeasible'] and rank_a_eq < x0.size:
                 # The process may have created rows of zero in the Jacobian matrix of the linear inequality constraints.
                 # They should be removed.
-                if constraints['linear'].A.size > 0:
-                    row_norm_inf = np.nanmax(np.abs(constraints['linear'].A), 1)
+                if _matrix_size(constraints['linear'].A) > 0:
+                    row_norm_inf = _row_norm_inf(constraints['linear'].A)
                     if np.logical_or(constraints['linear'].lb[row_norm_inf == 0] > 0,
                                      constraints['linear'].ub[row_norm_inf == 0] < 0).any():
                         raise ValueError('{}: the linear inequalities are inconsistent.'.format(invoker))
                     constraints['linear'].A = constraints['linear'].A[row_norm_inf > 0, :]
                     constraints['linear'].lb = constraints['linear'].lb[row_norm_inf > 0]
                     constraints['linear'].ub = constraints['linear'].ub[row_norm_inf > 0]
-                    if constraints['linear'].A.size == 0:
+                    if _matrix_size(constraints['linear'].A) == 0:
                         constraints['linear'] = None
                 else:
                     constraints['linear'] = None
@@ -1399,6 +1728,70 @@ def _eliminate_linear_equalities(invoker, constraints, x0, lb, ub, prob_info, li
     return space_chg, lb, ub, constraints, prob_info
 
 
+def _factorize_linear_equalities(qr, a_eq, b_eq, a_ineq, lb, ub, p_zeros, p_zeros_inv, n_red):
+    """Factorization of the linear equality constraints and reduced form of the linear inequality constraints.
+
+    Only the quantities that do not depend on x0 are computed, so that they can be reused by later calls to
+    `_eliminate_linear_equalities` with the same constraints and bounds. See `_eliminate_linear_equalities` for the
+    meaning of the parameters; `qr` is `scipy.linalg.qr`, and `a_ineq` contains the rows of the linear inequality
+    constraints.
+
+    Returns
+    -------
+    factors: dict
+        The quantities required by `_eliminate_linear_equalities`.
+    """
+    n = lb.size
+    q_eq, r_eq, p_eq = qr(a_eq, pivoting=True)
+
+    # The rank of the Jacobian of the linear equality constraints is determined with a relative error of 10 times the
+    # machine epsilon.
+    rcn = np.cumsum(np.flip(np.sum(np.square(r_eq), axis=1)))
+    rank_a_eq = sum(np.greater_equal(rcn, 10 * eps * rcn[-1]))
+
+    # Compute the coefficients of the hyperplane associated with the linear equality constraints.
+    qtb = np.dot(q_eq.T, b_eq)
+    comp = np.abs(qtb[rank_a_eq:])
+    factors = {'rank': rank_a_eq, 'infeasible': any(np.greater(comp, 10 * eps * np.max(np.abs(qtb), initial=1)))}
+    if factors['infeasible']:
+        return factors
+    riv = np.linalg.inv(r_eq[:rank_a_eq, :rank_a_eq])  # r_eq[:rank, :rank] is invertible and assumed small
+    null_basis = -np.dot(riv, r_eq[:rank_a_eq, rank_a_eq:])
+    p_inv = np.argsort(p_eq)  # equivalent to the transposition of the matrix of permutation
+    factors.update(riv=riv, qtb=qtb, null_basis=null_basis, p_eq=p_eq, p_inv=p_inv)
+
+    if rank_a_eq < n:
+        lb = lb[p_zeros]
+        ub = ub[p_zeros]
+        lb[:n_red] = lb[p_eq]
+        ub[:n_red] = ub[p_eq]
+        p_restore = np.arange(n)
+        p_restore[:n_red] = p_restore[p_inv]
+        p_restore = p_restore[p_zeros_inv]
+
+        # Compute the reduced form of the linear constraints. The columns are permuted at once, which is equivalent to
+        # permuting them by p_zeros and then the first n_red of them by p_eq. If the constraint matrix is sparse, so is
+        # its reduced form (up to the fill-in due to null_basis).
+        a_perm = a_ineq[:, p_zeros[np.r_[p_eq, np.arange(n_red, n)]]]
+        if _issparse(a_perm):
+            a_null = a_perm[:, :rank_a_eq] @ _csr(null_basis)
+        else:
+            a_null = np.dot(a_perm[:, :rank_a_eq], null_basis)
+        row_inf = np.logical_and(
+            np.logical_and(np.isinf(lb[:rank_a_eq]), lb[:rank_a_eq] < 0),
+            np.logical_and(np.isinf(ub[:rank_a_eq]), ub[:rank_a_eq] > 0))
+        row_finite = np.logical_not(row_inf)
+        a_reduced = _vstack((
+            _hstack((a_null + a_perm[:, rank_a_eq:n_red], a_perm[:, n_red:])),
+            np.c_[null_basis[row_finite, :], np.zeros((sum(row_finite), n - n_red))]))
+        row_finite_bounds = np.r_[row_finite, np.full(n - rank_a_eq, False)]
+        bounds_in_lin_eq = np.where(np.logical_and(p_restore < rank_a_eq, row_finite_bounds[p_restore]))[0]
+        factors.update(a_perm=a_perm, a_reduced=a_reduced, row_finite_bounds=row_finite_bounds,
+                       bounds_in_lin_eq=bounds_in_lin_eq)
+
+    return factors
+
+
 def _options_validation(invoker, options, method, lenx0, lb, ub, list_warnings):
     """Validation and pre-processing of the options.
 
@@ -1438,7 +1831,7 @@ def _options_validation(invoker, options, method, lenx0, lb, ub, list_warnings):
         raise ValueError('{}: the options should be defined as a dictionary.'.format(invoker))
 
     options = dict() if options is None else dict(options)
-    fun_name = stack()[0][3]  # name of the current function
+    fun_name = _frame_names()[0]  # name of the current function
 
     if invoker not in invoker_list:
         raise SystemError('{}: {} serves only {}'.format(fun_name, fun_name, ', '.join(invoker_list)))
@@ -1457,10 +1850,29 @@ def _options_validation(invoker, options, method, lenx0, lb, ub, list_warnings):
     classical = DEFAULT_OPTIONS[Options.CLASSICAL.value]  # call the classical Powell code?
     eliminate_lin_eq = DEFAULT_OPTIONS[Options.ELIMINATE_LIN_EQ.value]
     scale = DEFAULT_OPTIONS[Options.SCALE.value]  # scale the problem according to bounds?
+    auto_radius = DEFAULT_OPTIONS[Options.AUTO_RADIUS.value]  # scale the problem according to x0, bounds, and probes?
     honour_x0 = DEFAULT_OPTIONS[Options.HONOUR_X0.value]  # Respect the user-defined x0? Needed by BOBYQA
     quiet = DEFAULT_OPTIONS[Options.QUIET.value]
     debugflag = DEFAULT_OPTIONS[Options.DEBUG.value]
     chkfunval = DEFAULT_OPTIONS[Options.CHKFUNVAL.value]
+    compact_result = DEFAULT_OPTIONS[Options.COMPACT_RESULT.value]
+    max_memory = DEFAULT_OPTIONS[Options.MAX_MEMORY.value]  # memory budget of the Fortran code, in bytes
+    cost_model = DEFAULT_OPTIONS[Options.COST_MODEL.value]  # overrides pdfo._settings.COST_MODEL for method='auto-cost'
+    portfolio = DEFAULT_OPTIONS[Options.PORTFOLIO.value]  # solver configurations for method='portfolio'
+    workers = DEFAULT_OPTIONS[Options.WORKERS.value]  # number of worker processes
+    subspace_dim = DEFAULT_OPTIONS[Options.SUBSPACE_DIM.value]  # dimension of the subspaces for method='subspace'
+    subspace_basis = DEFAULT_OPTIONS[Options.SUBSPACE_BASIS.value]  # 'random' or 'coordinate'
+    return_model = DEFAULT_OPTIONS[Options.RETURN_MODEL.value]  # return the final models of the solver?
+    restarts = DEFAULT_OPTIONS[Options.RESTARTS.value]  # maximum number of restarts of the solver
+    noisy = DEFAULT_OPTIONS[Options.NOISY.value]  # is the objective function stochastic?
+    max_replicates = DEFAULT_OPTIONS[Options.MAX_REPLICATES.value]  # maximum number of evaluations at each point
+    executor = DEFAULT_OPTIONS[Options.EXECUTOR.value]  # executor of the parallel evaluations
+    max_in_flight = DEFAULT_OPTIONS[Options.MAX_IN_FLIGHT.value]  # maximum number of tasks in flight on the executor
+    parallel_initial_points = DEFAULT_OPTIONS[Options.PARALLEL_INITIAL_POINTS.value]  # evaluate them in parallel?
+    low_fidelity = DEFAULT_OPTIONS[Options.LOW_FIDELITY.value]  # cheap objective function screening the evaluations
+    model_screening = DEFAULT_OPTIONS[Options.MODEL_SCREENING.value]  # screen the evaluations by a model?
+    evaluation_policy = DEFAULT_OPTIONS[Options.EVALUATION_POLICY.value]  # timeout and retries of the evaluations
+    evaluation_cache = DEFAULT_OPTIONS[Options.EVALUATION_CACHE.value]  # cache of the values shared by processes
 
     # DO NOT REMOVE THE FOLLOWING!! Scale only if all variables are with finite lower and upper bounds.
     scale = scale and np.all(np.logical_not(np.isinf(np.r_[lb, ub])))
@@ -1504,13 +1916,20 @@ def _options_validation(invoker, options, method, lenx0, lb, ub, list_warnings):
 
     # Check whether the used provided any unknown option.
     known_field = [Options.MAXFEV.value, Options.RHOBEG.value, Options.RHOEND.value, Options.FTARGET.value, Options.CLASSICAL.value, Options.ELIMINATE_LIN_EQ.value, Options.QUIET.value, Options.DEBUG.value,
-                   Options.CHKFUNVAL.value]
+                   Options.CHKFUNVAL.value, Options.COMPACT_RESULT.value, Options.MAX_MEMORY.value, Options.RETURN_MODEL.value,
+                   Options.EVALUATION_POLICY.value, Options.EVALUATION_CACHE.value, Options.AUTO_RADIUS.value]
     if method is None or method.lower() in ['bobyqa', 'lincoa', 'newuoa']:
         known_field.append(Options.NPT.value)
     if method is None or method.lower() in ['bobyqa', 'cobyla', 'lincoa']:
         known_field.append(Options.SCALE.value)
     if method is None or method.lower() == 'bobyqa':
         known_field.append(Options.HONOUR_X0.value)
+    if invoker == 'pdfo':
+        known_field += [Options.COST_MODEL.value, Options.PORTFOLIO.value, Options.WORKERS.value,
+                        Options.SUBSPACE_DIM.value, Options.SUBSPACE_BASIS.value, Options.RESTARTS.value,
+                        Options.NOISY.value, Options.MAX_REPLICATES.value, Options.EXECUTOR.value,
+                        Options.MAX_IN_FLIGHT.value, Options.PARALLEL_INITIAL_POINTS.value, Options.LOW_FIDELITY.value,
+                        Options.MODEL_SCREENING.value]
     unknown_field = list(set(option_fields).difference(set(known_field)))
 
     # Remove the unknown fields. If we do not removed unknown fields, we may still complain later if an unknown field is
@@ -1562,11 +1981,32 @@ def _options_validation(invoker, options, method, lenx0, lb, ub, list_warnings):
         options[Options.SCALE.value] = scale
     options[Options.SCALE.value] = bool(options[Options.SCALE.value])
 
+    # Validate options[Options.AUTO_RADIUS.value], which also affects the trust-region radii. It supersedes
+    # options[Options.SCALE.value], since it scales the variables with both bounds in the same way.
+    validated = False
+    if Options.AUTO_RADIUS.value in option_fields:
+        if not isinstance(options[Options.AUTO_RADIUS.value], (bool, np.bool_)) and \
+                options[Options.AUTO_RADIUS.value] != 'probe':
+            warn_message = \
+                "{}: invalid {}; it should be True, False, or 'probe'; it is set to {}.".format(invoker, Options.AUTO_RADIUS.value, auto_radius)
+            warnings.warn(warn_message, Warning)
+            list_warnings.append(warn_message)
+        else:
+            validated = True
+
+    if not validated:  # options[Options.AUTO_RADIUS.value] has not got a valid value yet.
+        options[Options.AUTO_RADIUS.value] = auto_radius
+    if options[Options.AUTO_RADIUS.value] != 'probe':
+        options[Options.AUTO_RADIUS.value] = bool(options[Options.AUTO_RADIUS.value])
+    if options[Options.AUTO_RADIUS.value]:
+        options[Options.SCALE.value] = False
+    scaled = options[Options.SCALE.value] or bool(options[Options.AUTO_RADIUS.value])
+
     # Revise default rhobeg and rhoend if the solver is BOBYQA.
-    if options[Options.SCALE.value]:
+    if scaled:
         rhobeg = 0.5  # this value cannot be bigger than 1. Otherwise, BOBYQA will complain
         rhoend = DEFAULT_OPTIONS[Options.RHOEND.value]
-    if method is not None and method.lower() == 'bobyqa' and not options[Options.SCALE.value]:
+    if method is not None and method.lower() == 'bobyqa' and not scaled:
         lb_mod, ub_mod = lb.copy(), ub.copy()
         lb_mod[np.logical_and(lb_mod > 0, np.isinf(lb_mod))] = -np.inf
         ub_mod[np.logical_and(ub_mod < 0, np.isinf(ub_mod))] = np.inf
@@ -1658,7 +2098,7 @@ def _options_validation(invoker, options, method, lenx0, lb, ub, list_warnings):
     if not validated:  # options[Options.MAXFEV.value] has not got a valid value yet.
         options[Options.MAXFEV.value] = max(maxfev, npt+1)
     if not np.isnan(options[Options.MAXFEV.value]):
-        options[Options.MAXFEV.value] = np.int32(options[Options.MAXFEV.value])
+        options[Options.MAXFEV.value] = np.int64(options[Options.MAXFEV.value])
 
     # Validate options[Options.RHOBEG.value].
     # NOTE: if the problem is to be scaled, then options[Options.RHOBEG.value] and options[Options.RHOEND.value] will be used as the initial and
@@ -1673,14 +2113,14 @@ def _options_validation(invoker, options, method, lenx0, lb, ub, list_warnings):
             warnings.warn(warn_message, Warning)
             list_warnings.append(warn_message)
         elif method is not None and method.lower() == 'bobyqa':
-            if options[Options.SCALE.value] and options[Options.RHOBEG.value] > 1:
+            if scaled and options[Options.RHOBEG.value] > 1:
                 warn_message = \
                     '{}: invalid {}; {} requires {} <= 1 when the problem is scaled; it is set to ' \
                     '0.5.'.format(invoker, Options.RHOBEG.value, method, Options.RHOBEG.value)
                 warnings.warn(warn_message, Warning)
                 list_warnings.append(warn_message)
                 options[Options.RHOBEG.value] = 0.5
-            elif not options[Options.SCALE.value] and options[Options.RHOBEG.value] > np.min(ub - lb) / 2:
+            elif not scaled and options[Options.RHOBEG.value] > np.min(ub - lb) / 2:
                 warn_message = \
                     '{}: invalid {}; {} requires {} <= min(ub-lb)/2; it is set to ' \
                     'min(ub-lb)/4.'.format(invoker, Options.RHOBEG.value, method, Options.RHOBEG.value)
@@ -1846,6 +2286,331 @@ def _options_validation(invoker, options, method, lenx0, lb, ub, list_warnings):
         warnings.warn(warn_message, Warning)
         list_warnings.append(warn_message)
 
+    # Validate options[Options.COMPACT_RESULT.value].
+    validated = False
+    if Options.COMPACT_RESULT.value in option_fields:
+        if not isinstance(options[Options.COMPACT_RESULT.value], (bool, np.bool_)):
+            warn_message = \
+                '{}: invalid {} flag; it should be True or False; it is set to {}.'.format(invoker, Options.COMPACT_RESULT.value, compact_result)
+            warnings.warn(warn_message, Warning)
+            list_warnings.append(warn_message)
+        else:
+            validated = True
+
+    if not validated:  # options[Options.COMPACT_RESULT.value] has not got a valid value yet.
+        options[Options.COMPACT_RESULT.value] = compact_result
+    options[Options.COMPACT_RESULT.value] = bool(options[Options.COMPACT_RESULT.value])
+
+    # Validate options[Options.MAX_MEMORY.value].
+    validated = False
+    if Options.MAX_MEMORY.value in option_fields and options[Options.MAX_MEMORY.value] is not None:
+        if not isinstance(options[Options.MAX_MEMORY.value], scalar_types) or options[Options.MAX_MEMORY.value] <= 0 or \
+                np.isnan(options[Options.MAX_MEMORY.value]):
+            warn_message = \
+                '{}: invalid {}; it should be a positive number of bytes or None; it is set to {}.'.format(invoker, Options.MAX_MEMORY.value, max_memory)
+            warnings.warn(warn_message, Warning)
+            list_warnings.append(warn_message)
+        else:
+            validated = True
+
+    if not validated:  # options[Options.MAX_MEMORY.value] has not got a valid value yet.
+        options[Options.MAX_MEMORY.value] = max_memory
+    elif np.isinf(options[Options.MAX_MEMORY.value]):
+        options[Options.MAX_MEMORY.value] = None
+    else:
+        options[Options.MAX_MEMORY.value] = np.float64(options[Options.MAX_MEMORY.value])
+
+    # Validate options[Options.RETURN_MODEL.value].
+    validated = False
+    if Options.RETURN_MODEL.value in option_fields:
+        if not isinstance(options[Options.RETURN_MODEL.value], (bool, np.bool_)):
+            warn_message = \
+                '{}: invalid {} flag; it should be True or False; it is set to {}.'.format(invoker, Options.RETURN_MODEL.value, return_model)
+            warnings.warn(warn_message, Warning)
+            list_warnings.append(warn_message)
+        else:
+            validated = True
+
+    if not validated:  # options[Options.RETURN_MODEL.value] has not got a valid value yet.
+        options[Options.RETURN_MODEL.value] = return_model
+    options[Options.RETURN_MODEL.value] = bool(options[Options.RETURN_MODEL.value])
+
+    # Validate options[Options.EVALUATION_POLICY.value]. It should be a dictionary whose fields are among 'timeout' (a
+    # positive number or None), 'retries' (a nonnegative integer), 'backoff' (a nonnegative number), and 'isolation'
+    # ('thread' or 'process'). The missing fields take their default values.
+    validated = False
+    if Options.EVALUATION_POLICY.value in option_fields and options[Options.EVALUATION_POLICY.value] is not None:
+        policy = options[Options.EVALUATION_POLICY.value]
+        if isinstance(policy, dict) and set(policy).issubset({'timeout', 'retries', 'backoff', 'isolation'}) and \
+                (policy.get('timeout') is None or
+                 (isinstance(policy['timeout'], scalar_types) and policy['timeout'] > 0)) and \
+                isinstance(policy.get('retries', 0), (int, np.integer)) and policy.get('retries', 0) >= 0 and \
+                isinstance(policy.get('backoff', 0), scalar_types) and policy.get('backoff', 0) >= 0 and \
+                policy.get('isolation', 'thread') in ['thread', 'process']:
+            options[Options.EVALUATION_POLICY.value] = {
+                'timeout': None if policy.get('timeout') is None else float(policy['timeout']),
+                'retries': int(policy.get('retries', 0)), 'backoff': float(policy.get('backoff', .1)),
+                'isolation': policy.get('isolation', 'thread')}
+            validated = True
+        else:
+            warn_message = \
+                "{}: invalid {}; it should be a dictionary whose fields are among 'timeout' (a positive number or " \
+                "None), 'retries' (a nonnegative integer), 'backoff' (a nonnegative number), and 'isolation' " \
+                "('thread' or 'process'); it is set to {}.".format(invoker, Options.EVALUATION_POLICY.value, evaluation_policy)
+            warnings.warn(warn_message, Warning)
+            list_warnings.append(warn_message)
+
+    if not validated:  # options[Options.EVALUATION_POLICY.value] has not got a valid value yet.
+        options[Options.EVALUATION_POLICY.value] = evaluation_policy
+
+    # Validate options[Options.EVALUATION_CACHE.value]. It should be a pdfo.EvaluationCache, or the path of the file of
+    # one, which is then opened with the default size.
+    validated = False
+    if Options.EVALUATION_CACHE.value in option_fields and options[Options.EVALUATION_CACHE.value] is not None:
+        import sqlite3
+        from ._cache import EvaluationCache
+
+        cache = options[Options.EVALUATION_CACHE.value]
+        if isinstance(cache, (str, os.PathLike)):
+            try:
+                options[Options.EVALUATION_CACHE.value] = EvaluationCache(cache)
+                validated = True
+            except sqlite3.Error:
+                pass
+        else:
+            validated = isinstance(cache, EvaluationCache)
+        if not validated:
+            warn_message = \
+                '{}: invalid {}; it should be a pdfo.EvaluationCache or the path of a database that can be ' \
+                'opened; it is set to {}.'.format(invoker, Options.EVALUATION_CACHE.value, evaluation_cache)
+            warnings.warn(warn_message, Warning)
+            list_warnings.append(warn_message)
+
+    if not validated:  # options[Options.EVALUATION_CACHE.value] has not got a valid value yet.
+        options[Options.EVALUATION_CACHE.value] = evaluation_cache
+
+    # Validate options[Options.COST_MODEL.value]. Each entry should be a known solver configuration, associated with a
+    # dictionary whose fields 'overhead' and 'evaluations' (both optional) are pairs of nonnegative numbers.
+    if invoker == 'pdfo':
+        validated = False
+        if Options.COST_MODEL.value in option_fields and options[Options.COST_MODEL.value] is not None:
+            entries = options[Options.COST_MODEL.value]
+            if isinstance(entries, dict) and all(
+                    config in COST_MODEL and isinstance(entry, dict) and
+                    set(entry.keys()) <= {'overhead', 'evaluations'} and
+                    all(np.shape(value) == (2,) and all(isinstance(v, scalar_types) and v >= 0 for v in value)
+                        for value in entry.values())
+                    for config, entry in entries.items()):
+                validated = True
+            else:
+                warn_message = \
+                    '{}: invalid {}; it should be a dictionary whose keys are among {} and whose values are ' \
+                    "dictionaries with fields 'overhead' and 'evaluations'; it is set to {}.".format(invoker, Options.COST_MODEL.value, ', '.join(COST_MODEL), cost_model)
+                warnings.warn(warn_message, Warning)
+                list_warnings.append(warn_message)
+
+        if not validated:  # options[Options.COST_MODEL.value] has not got a valid value yet.
+            options[Options.COST_MODEL.value] = cost_model
+
+    # Validate options[Options.PORTFOLIO.value]. It should be a nonempty list of solver configurations, i.e., dictionaries
+    # with a field 'method' and possibly other options (e.g., 'npt') that override the ones given to pdfo.
+    if invoker == 'pdfo':
+        validated = False
+        if Options.PORTFOLIO.value in option_fields and options[Options.PORTFOLIO.value] is not None:
+            configurations = options[Options.PORTFOLIO.value]
+            if isinstance(configurations, (list, tuple)) and len(configurations) > 0 and all(
+                    isinstance(c, dict) and isinstance(c.get('method'), str) and c['method'].lower() in solver_list
+                    for c in configurations):
+                options[Options.PORTFOLIO.value] = [dict(c, method=c['method'].lower()) for c in configurations]
+                validated = True
+            else:
+                warn_message = \
+                    "{}: invalid {}; it should be a nonempty list of dictionaries whose field 'method' is among {}; it " \
+                    "is set to {}.".format(invoker, Options.PORTFOLIO.value, ', '.join(solver_list), portfolio)
+                warnings.warn(warn_message, Warning)
+                list_warnings.append(warn_message)
+
+        if not validated:  # options[Options.PORTFOLIO.value] has not got a valid value yet.
+            options[Options.PORTFOLIO.value] = portfolio
+
+    # Validate options[Options.WORKERS.value].
+    if invoker == 'pdfo':
+        validated = False
+        if Options.WORKERS.value in option_fields and options[Options.WORKERS.value] is not None:
+            if not isinstance(options[Options.WORKERS.value], (int, np.integer)) or options[Options.WORKERS.value] < 1:
+                warn_message = \
+                    '{}: invalid {}; it should be a positive integer or None; it is set to {}.'.format(invoker, Options.WORKERS.value, workers)
+                warnings.warn(warn_message, Warning)
+                list_warnings.append(warn_message)
+            else:
+                validated = True
+
+        if not validated:  # options[Options.WORKERS.value] has not got a valid value yet.
+            options[Options.WORKERS.value] = workers
+
+    # Validate options[Options.SUBSPACE_DIM.value]. The subspaces should contain at least two variables, which is
+    # required by NEWUOA and BOBYQA.
+    if invoker == 'pdfo':
+        validated = False
+        if Options.SUBSPACE_DIM.value in option_fields and options[Options.SUBSPACE_DIM.value] is not None:
+            if not isinstance(options[Options.SUBSPACE_DIM.value], (int, np.integer)) or \
+                    options[Options.SUBSPACE_DIM.value] < 2:
+                warn_message = \
+                    '{}: invalid {}; it should be an integer at least 2 or None; it is set to {}.'.format(invoker, Options.SUBSPACE_DIM.value, subspace_dim)
+                warnings.warn(warn_message, Warning)
+                list_warnings.append(warn_message)
+            else:
+                validated = True
+
+        if not validated:  # options[Options.SUBSPACE_DIM.value] has not got a valid value yet.
+            options[Options.SUBSPACE_DIM.value] = subspace_dim
+
+    # Validate options[Options.SUBSPACE_BASIS.value].
+    if invoker == 'pdfo':
+        validated = False
+        if Options.SUBSPACE_BASIS.value in option_fields and options[Options.SUBSPACE_BASIS.value] is not None:
+            if not isinstance(options[Options.SUBSPACE_BASIS.value], str) or \
+                    options[Options.SUBSPACE_BASIS.value].lower() not in ['random', 'coordinate']:
+                warn_message = \
+                    "{}: invalid {}; it should be 'random', 'coordinate', or None; it is set to {}.".format(invoker, Options.SUBSPACE_BASIS.value, subspace_basis)
+                warnings.warn(warn_message, Warning)
+                list_warnings.append(warn_message)
+            else:
+                options[Options.SUBSPACE_BASIS.value] = options[Options.SUBSPACE_BASIS.value].lower()
+                validated = True
+
+        if not validated:  # options[Options.SUBSPACE_BASIS.value] has not got a valid value yet.
+            options[Options.SUBSPACE_BASIS.value] = subspace_basis
+
+    # Validate options[Options.RESTARTS.value].
+    if invoker == 'pdfo':
+        validated = False
+        if Options.RESTARTS.value in option_fields:
+            if not isinstance(options[Options.RESTARTS.value], (int, np.integer)) or options[Options.RESTARTS.value] < 0:
+                warn_message = \
+                    '{}: invalid {}; it should be a nonnegative integer; it is set to {}.'.format(invoker, Options.RESTARTS.value, restarts)
+                warnings.warn(warn_message, Warning)
+                list_warnings.append(warn_message)
+            else:
+                validated = True
+
+        if not validated:  # options[Options.RESTARTS.value] has not got a valid value yet.
+            options[Options.RESTARTS.value] = restarts
+        options[Options.RESTARTS.value] = int(options[Options.RESTARTS.value])
+
+    # Validate options[Options.NOISY.value].
+    if invoker == 'pdfo':
+        validated = False
+        if Options.NOISY.value in option_fields:
+            if not isinstance(options[Options.NOISY.value], (bool, np.bool_)):
+                warn_message = \
+                    '{}: invalid {} flag; it should be True or False; it is set to {}.'.format(invoker, Options.NOISY.value, noisy)
+                warnings.warn(warn_message, Warning)
+                list_warnings.append(warn_message)
+            else:
+                validated = True
+
+        if not validated:  # options[Options.NOISY.value] has not got a valid value yet.
+            options[Options.NOISY.value] = noisy
+        options[Options.NOISY.value] = bool(options[Options.NOISY.value])
+
+    # Validate options[Options.MAX_REPLICATES.value].
+    if invoker == 'pdfo':
+        validated = False
+        if Options.MAX_REPLICATES.value in option_fields:
+            if not isinstance(options[Options.MAX_REPLICATES.value], (int, np.integer)) or \
+                    options[Options.MAX_REPLICATES.value] < 1:
+                warn_message = \
+                    '{}: invalid {}; it should be a positive integer; it is set to {}.'.format(invoker, Options.MAX_REPLICATES.value, max_replicates)
+                warnings.warn(warn_message, Warning)
+                list_warnings.append(warn_message)
+            else:
+                validated = True
+
+        if not validated:  # options[Options.MAX_REPLICATES.value] has not got a valid value yet.
+            options[Options.MAX_REPLICATES.value] = max_replicates
+        options[Options.MAX_REPLICATES.value] = int(options[Options.MAX_REPLICATES.value])
+
+    # Validate options[Options.EXECUTOR.value]. Any object with a method map, as concurrent.futures.Executor, is accepted.
+    if invoker == 'pdfo':
+        validated = False
+        if Options.EXECUTOR.value in option_fields and options[Options.EXECUTOR.value] is not None:
+            if not callable(getattr(options[Options.EXECUTOR.value], 'map', None)):
+                warn_message = \
+                    '{}: invalid {}; it should be a concurrent.futures.Executor or None; it is set to {}.'.format(invoker, Options.EXECUTOR.value, executor)
+                warnings.warn(warn_message, Warning)
+                list_warnings.append(warn_message)
+            else:
+                validated = True
+
+        if not validated:  # options[Options.EXECUTOR.value] has not got a valid value yet.
+            options[Options.EXECUTOR.value] = executor
+
+    # Validate options[Options.MAX_IN_FLIGHT.value].
+    if invoker == 'pdfo':
+        validated = False
+        if Options.MAX_IN_FLIGHT.value in option_fields and options[Options.MAX_IN_FLIGHT.value] is not None:
+            if not isinstance(options[Options.MAX_IN_FLIGHT.value], (int, np.integer)) or \
+                    isinstance(options[Options.MAX_IN_FLIGHT.value], (bool, np.bool_)) or \
+                    options[Options.MAX_IN_FLIGHT.value] < 1:
+                warn_message = \
+                    '{}: invalid {}; it should be a positive integer or None; it is set to {}.'.format(invoker, Options.MAX_IN_FLIGHT.value, max_in_flight)
+                warnings.warn(warn_message, Warning)
+                list_warnings.append(warn_message)
+            else:
+                validated = True
+                options[Options.MAX_IN_FLIGHT.value] = int(options[Options.MAX_IN_FLIGHT.value])
+
+        if not validated:  # options[Options.MAX_IN_FLIGHT.value] has not got a valid value yet.
+            options[Options.MAX_IN_FLIGHT.value] = max_in_flight
+
+    # Validate options[Options.PARALLEL_INITIAL_POINTS.value].
+    if invoker == 'pdfo':
+        validated = False
+        if Options.PARALLEL_INITIAL_POINTS.value in option_fields:
+            if not isinstance(options[Options.PARALLEL_INITIAL_POINTS.value], (bool, np.bool_)):
+                warn_message = \
+                    '{}: invalid {} flag; it should be True or False; it is set to {}.'.format(invoker, Options.PARALLEL_INITIAL_POINTS.value, parallel_initial_points)
+                warnings.warn(warn_message, Warning)
+                list_warnings.append(warn_message)
+            else:
+                validated = True
+
+        if not validated:  # options[Options.PARALLEL_INITIAL_POINTS.value] has not got a valid value yet.
+            options[Options.PARALLEL_INITIAL_POINTS.value] = parallel_initial_points
+        options[Options.PARALLEL_INITIAL_POINTS.value] = bool(options[Options.PARALLEL_INITIAL_POINTS.value])
+
+    # Validate options[Options.LOW_FIDELITY.value].
+    if invoker == 'pdfo':
+        validated = False
+        if Options.LOW_FIDELITY.value in option_fields and options[Options.LOW_FIDELITY.value] is not None:
+            if not callable(options[Options.LOW_FIDELITY.value]):
+                warn_message = \
+                    '{}: invalid {}; it should be a callable or None; it is set to {}.'.format(invoker, Options.LOW_FIDELITY.value, low_fidelity)
+                warnings.warn(warn_message, Warning)
+                list_warnings.append(warn_message)
+            else:
+                validated = True
+
+        if not validated:  # options[Options.LOW_FIDELITY.value] has not got a valid value yet.
+            options[Options.LOW_FIDELITY.value] = low_fidelity
+
+    # Validate options[Options.MODEL_SCREENING.value].
+    if invoker == 'pdfo':
+        validated = False
+        if Options.MODEL_SCREENING.value in option_fields:
+            if not isinstance(options[Options.MODEL_SCREENING.value], (bool, np.bool_)):
+                warn_message = \
+                    '{}: invalid {} flag; it should be True or False; it is set to {}.'.format(invoker, Options.MODEL_SCREENING.value, model_screening)
+                warnings.warn(warn_message, Warning)
+                list_warnings.append(warn_message)
+            else:
+                validated = True
+
+        if not validated:  # options[Options.MODEL_SCREENING.value] has not got a valid value yet.
+            options[Options.MODEL_SCREENING.value] = model_screening
+        options[Options.MODEL_SCREENING.value] = bool(options[Options.MODEL_SCREENING.value])
+
     return options, user_option_fields, method
 
 
@@ -1906,7 +2671,7 @@ def _constr_violation(invoker, x, lb, ub, constraints, prob_info):
 
         # Compute the constraint violation as the largest absolute distance to the bounds and the linear constraints.
         if b.size > 0:
-            constr_violation = np.max((constr_violation, np.nanmax(np.dot(a, x) - b)))
+            constr_violation = np.max((constr_violation, np.nanmax(a @ x - b)))
 
     if constraints['nonlinear'] is not None:
         nonlinear = constraints['nonlinear']
@@ -1978,11 +2743,11 @@ def _problem_type(lb, ub, constraints):
     Dedicated to the late Professor M. J. D. Powell FRS (1936--2015).
     """
     # possible solvers
-    fun_name = stack()[0][3]  # name of the current function
+    fun_name = _frame_names()[0]  # name of the current function
     local_invoker_list = ['prepdfo']
-    if len(stack()) < 3 or stack()[1][3].lower() not in local_invoker_list:
+    if len(_frame_names()) < 3 or _frame_names()[1].lower() not in local_invoker_list:
         raise SystemError('`{}` should only be called by {}'.format(fun_name, ', '.join(local_invoker_list)))
-    invoker = stack()[1][3].lower()
+    invoker = _frame_names()[1].lower()
 
     if not (hasattr(lb, '__len__') and hasattr(ub, '__len__')):
         raise TypeError('{}: UNEXPECTED ERROR: the bounds should be vectors.'.format(invoker))
@@ -2006,6 +2771,130 @@ def _problem_type(lb, ub, constraints):
         return 'unconstrained'
 
 
+def _frame_names():
+    """Names of the functions in the call stack, the first one being the caller of this function.
+
+    It is used instead of ``inspect.stack()`` to identify the invokers, because the latter reads the source file of every
+    frame, which dominates the cost of solving small problems.
+    """
+    frame = sys._getframe(1)
+    names = []
+    while frame is not None:
+        names.append(frame.f_code.co_name)
+        frame = frame.f_back
+    return names
+
+
+def _huge(data_type):
+    """Huge value of type `data_type` ('integer', 'fun' or 'con') defined in pdfoconst.F."""
+    if _huge_values is None:
+        # If gethuge cannot be imported, the execution should stop because the package is most likely not built.
+        import_error_so('gethuge')
+    return _huge_values[data_type]
+
+
+def _integer_backend(solver, classical, nw, maxfev=0):
+    """Largest integer of the Fortran backend of `solver`, and whether the backend uses 64-bit integers.
+
+    The backend built with 64-bit default integers is selected if a workspace of `nw` entries or the maximum number
+    `maxfev` of function evaluations would overflow the default Fortran integers, unless the classical version is
+    requested or this backend is not available. The factor 0.99 provides a buffer.
+    """
+    max_int = np.floor(0.99 * _huge('integer'))
+    if max(nw, maxfev) < max_int or classical:
+        return max_int, False
+    try:
+        import_module('.f{}_int64'.format(solver), __package__)
+    except ImportError:
+        return max_int, False
+    return np.floor(0.99 * np.iinfo(np.int64).max), True
+
+
+def _issparse(a):
+    """Whether `a` is a SciPy sparse array or matrix."""
+    try:
+        from scipy.sparse import issparse
+    except ImportError:
+        return False
+    return issparse(a)
+
+
+def _csr(a, copy=False):
+    """Conversion of `a` to a SciPy sparse array in CSR format with double precision entries."""
+    from scipy.sparse import csr_array
+
+    return csr_array(a, dtype=np.float64, copy=copy)
+
+
+def _dense(a):
+    """Dense version of `a`, which may be a sparse matrix."""
+    return a.toarray() if _issparse(a) else a
+
+
+def _matrix_size(a):
+    """Number of entries of the matrix `a`, including the implicit zeros of a sparse matrix."""
+    return a.shape[0] * a.shape[1] if _issparse(a) else a.size
+
+
+def _row_norm_inf(a):
+    """Infinity norm of each row of the matrix `a`, which may be sparse."""
+    if _issparse(a):
+        return abs(a).max(axis=1).toarray().ravel()
+    return np.nanmax(np.abs(a), 1)
+
+
+def _vstack(blocks):
+    """Vertical concatenation of matrices, which is sparse if any of the blocks is sparse."""
+    if any(map(_issparse, blocks)):
+        from scipy.sparse import vstack
+
+        return _csr(vstack([_csr(block) for block in blocks], format='csr'))
+    return np.concatenate(blocks, axis=0)
+
+
+def _hstack(blocks):
+    """Horizontal concatenation of matrices, which is sparse if any of the blocks is sparse."""
+    if any(map(_issparse, blocks)):
+        from scipy.sparse import hstack
+
+        return _csr(hstack([_csr(block) for block in blocks], format='csr'))
+    return np.concatenate(blocks, axis=1)
+
+
+def _scale_columns(a, factors):
+    """Product of the matrix `a` with the diagonal matrix whose diagonal is `factors`."""
+    if _issparse(a):
+        return _csr(a.multiply(factors))
+    return a * factors
+
+
+def _identity_rows(n, indices, sparse=False):
+    """Rows of the identity matrix of order `n` whose indices are `indices`."""
+    if sparse:
+        from scipy.sparse import csr_array
+
+        return csr_array((np.ones(indices.size), (np.arange(indices.size), indices)), shape=(indices.size, n))
+    rows = np.zeros((indices.size, n), dtype=np.float64)
+    rows[np.arange(indices.size), indices] = 1.0
+    return rows
+
+
+def _fingerprint(*arrays):
+    """Digest of a sequence of arrays, which may be sparse, used as a cache key."""
+    digest = hashlib.blake2b(digest_size=20)
+    for a in arrays:
+        if _issparse(a):
+            a = _csr(a, copy=True)
+            a.sum_duplicates()
+            parts = (a.data, a.indices, a.indptr)
+        else:
+            parts = (np.asarray(a, dtype=np.float64),)
+        digest.update(repr((_issparse(a), a.shape)).encode())
+        for part in parts:
+            digest.update(np.ascontiguousarray(part).tobytes())
+    return digest.hexdigest()
+
+
 def _linear_constraints_constr(linear_constraint):
     """Construction of the matrices A and b such that A.x <= b.
 
@@ -2030,7 +2919,7 @@ def _linear_constraints_constr(linear_constraint):
 
     Dedicated to the late Professor M. J. D. Powell FRS (1936--2015).
     """
-    fun_name = stack()[0][3]  # name of the current function
+    fun_name = _frame_names()[0]  # name of the current function
 
     if not isinstance(linear_constraint, LinearConstraint) or len(linear_constraint.A.shape) != 2 or \
             len(linear_constraint.lb.shape) != 1 or len(linear_constraint.ub.shape) != 1 or \
@@ -2048,7 +2937,7 @@ def _linear_constraints_constr(linear_constraint):
     is_ub = not np.logical_and(np.isinf(ub), ub > 0).all()
     if is_lb and is_ub:
         b = np.r_[ub, -lb]
-        a = np.concatenate((a, -a), axis=0)
+        a = _vstack((a, -a))
     elif is_lb:
         b = -lb
         a = -a
@@ -2086,7 +2975,7 @@ def _fullx(freex_value, fixedx_value, freex, fixedx):
 
     Dedicated to the late Professor M. J. D. Powell FRS (1936--2015).
     """
-    fun_name = stack()[0][3]  # name of the current function
+    fun_name = _frame_names()[0]  # name of the current function
 
     if not (hasattr(freex_value, '__len__') and hasattr(fixedx_value, '__len__') and
             hasattr(freex, '__len__') and hasattr(fixedx, '__len__')):
@@ -2132,11 +3021,11 @@ def _prob_solv_match(problem_type, solver):
     Dedicated to the late Professor M. J. D. Powell FRS (1936--2015).
     """
     # possible solvers
-    fun_name = stack()[0][3]  # name of the current function
+    fun_name = _frame_names()[0]  # name of the current function
     local_invoker_list = ['_solver_selection', 'prepdfo']
-    if len(stack()) < 3 or stack()[1][3].lower() not in local_invoker_list:
+    if len(_frame_names()) < 3 or _frame_names()[1].lower() not in local_invoker_list:
         raise SystemError('`{}` should only be called by {}'.format(fun_name, ', '.join(local_invoker_list)))
-    invoker = stack()[1][3].lower()
+    invoker = _frame_names()[1].lower()
 
     if solver not in ['bobyqa', 'cobyla', 'lincoa', 'newuoa', 'uobyqa', 'pdfo']:
         raise SystemError('{}: UNEXPECTED ERROR: {} is not a known solver.'.format(fun_name, solver))
@@ -2165,7 +3054,7 @@ def _prob_solv_match(problem_type, solver):
     return match
 
 
-def _scale_problem(fun, x0, lb, ub, constraints, list_warnings):
+def _scale_problem(fun, x0, lb, ub, constraints, list_warnings, scaling_factor=None, shift=None):
     """Scale the problem.
 
     Parameters
@@ -2188,6 +3077,11 @@ def _scale_problem(fun, x0, lb, ub, constraints, list_warnings):
                 The nonlinear constraints of the problem.
     list_warnings: list
         The same as in prepdfo.
+    scaling_factor: ndarray, shape (n,), optional
+        The scaling factor of each variable, given with `shift` (see _auto_scaling). By default, they are defined
+        according to the bounds, which must then be all finite.
+    shift: ndarray, shape (n,), optional
+        The shift of the variables.
 
     Returns
     -------
@@ -2208,12 +3102,14 @@ def _scale_problem(fun, x0, lb, ub, constraints, list_warnings):
 
     Dedicated to the late Professor M. J. D. Powell FRS (1936--2015).
     """
+    from ._problem import Composition, Scaling
+
     # possible solvers
-    fun_name = stack()[0][3]  # name of the current function
+    fun_name = _frame_names()[0]  # name of the current function
     local_invoker_list = ['prepdfo']
-    if len(stack()) < 3 or stack()[1][3].lower() not in local_invoker_list:
+    if len(_frame_names()) < 3 or _frame_names()[1].lower() not in local_invoker_list:
         raise SystemError('`{}` should only be called by {}'.format(fun_name, ', '.join(local_invoker_list)))
-    invoker = stack()[1][3].lower()
+    invoker = _frame_names()[1].lower()
 
     if not (hasattr(x0, '__len__') and hasattr(lb, '__len__') and hasattr(ub, '__len__')):
         raise TypeError('{}: UNEXPECTED ERROR: the initial guess and the bounds should be vectors.'.format(invoker))
@@ -2247,18 +3143,19 @@ def _scale_problem(fun, x0, lb, ub, constraints, list_warnings):
     # index_lub = np.logical_and(lb > -np.inf, ub < np.inf)
     # scaling_factor = np.ones(lenx0, dtype=np.float64)
     # shift = np.zeros(lenx0, dtype=np.float64)
-    if np.any(np.isinf(ub - lb)):
-        raise ValueError(
-            '{}: UNEXPECTED ERROR: at least one of [-lb; ub] is infinity. Scaling should not be '
-            'performed.'.format(invoker))
+    if scaling_factor is None:
+        if np.any(np.isinf(ub - lb)):
+            raise ValueError(
+                '{}: UNEXPECTED ERROR: at least one of [-lb; ub] is infinity. Scaling should not be '
+                'performed.'.format(invoker))
 
-    # Define the scaling factor and the shift according to the bounds.
-    scaling_factor = (ub - lb) / 2
-    shift = (ub + lb) / 2
+        # Define the scaling factor and the shift according to the bounds.
+        scaling_factor = (ub - lb) / 2
+        shift = (ub + lb) / 2
 
     # Build the scaled objective function.
-    def fun_c(x):
-        return np.float64(fun(scaling_factor * x + shift))
+    scaling = Scaling(scaling_factor, shift)
+    fun_c = Composition(fun, scaling)
 
     # Scale the initial guess and the bounds.
     x0_c = (x0 - shift) / scaling_factor
@@ -2272,13 +3169,12 @@ def _scale_problem(fun, x0, lb, ub, constraints, list_warnings):
         a = constraints['linear'].A
         lb = constraints['linear'].lb
         ub = constraints['linear'].ub
-        ashift = np.dot(a, shift)
-        constraints_c['linear'] = LinearConstraint(np.dot(a, np.diag(scaling_factor)), lb=lb - ashift, ub=ub - ashift)
+        ashift = a @ shift
+        constraints_c['linear'] = LinearConstraint(_scale_columns(a, scaling_factor), lb=lb - ashift, ub=ub - ashift)
 
     # Scale the nonlinear constraints.
     if constraints['nonlinear'] is not None:
-        constraints_c['nonlinear'] = \
-            {'type': 'ineq', 'fun': lambda x: constraints['nonlinear']['fun'](scaling_factor * x + shift)}
+        constraints_c['nonlinear'] = {'type': 'ineq', 'fun': Composition(constraints['nonlinear']['fun'], scaling)}
 
     # From v1.0, we do not warn about scaling anymore. Scaling works well in several real problems.
     # if any(scaling_factor != 1):
@@ -2305,6 +3201,68 @@ def _scale_problem(fun, x0, lb, ub, constraints, list_warnings):
     return fun_c, x0_c, lb_c, ub_c, constraints_c, scaling_factor, shift, substantially_scaled
 
 
+def _auto_scaling(fun, x0, lb, ub, probe, maxfev):
+    """Scaling factors and shifts of the variables for options['auto_radius'], so that the initial trust-region radius
+    0.5 of the scaled problem corresponds, for each variable, to
+
+        1. a quarter of the range of its bounds, if it has both a lower and an upper bound (as with options['scale']),
+        2. the magnitude of its component of x0, if it is nonzero, and otherwise its distance to the bound of x0, if any,
+        3. the length of the step along the variable that minimizes the quadratic interpolating `fun` at x0 and at two
+           other points at distances one and two from it, kept between 1e-4 and 1e4, if `probe` is True and the other
+           quantities are zero,
+        4. one otherwise, as without scaling.
+
+    The variables without two bounds are shifted so that the corresponding components of x0 become zero. The probes
+    are made only if they leave to the solver at least nine tenths of `maxfev`, and at least the number of evaluations
+    needed to build a fully quadratic model.
+
+    Returns the scaling factors, the shifts, and the values of `fun` at the points evaluated, the first one being x0,
+    or None if the probes are skipped because of `maxfev`.
+    """
+    bounded = np.logical_and(np.isfinite(lb), np.isfinite(ub))
+    magnitude = np.abs(x0)
+    distance = np.minimum(x0 - lb, ub - x0)  # distance to the closest bound, infinite if there is none
+    to_bound = np.logical_and(magnitude <= eps, np.isfinite(distance))
+    magnitude[to_bound] = distance[to_bound]
+    magnitude[magnitude <= eps] = 0.
+    scaling_factor = 2 * np.where(magnitude > 0, magnitude, 1.)
+    scaling_factor[bounded] = (ub[bounded] - lb[bounded]) / 2
+    shift = np.copy(x0)
+    shift[bounded] = (ub[bounded] + lb[bounded]) / 2
+
+    values = []
+    probed = np.flatnonzero(np.logical_and(np.logical_not(bounded), magnitude == 0))
+    n = x0.size
+    if probe and probed.size > 0 and maxfev - 2 * probed.size < max(0.9 * maxfev, (n + 1) * (n + 2) // 2 + 1):
+        values = None
+    elif probe and probed.size > 0:
+        f0 = fun(x0)
+        values.append(f0)
+        for i in probed:
+            # The two other points are x0 - e_i and x0 + e_i, unless one of them is not feasible, in which case they are
+            # on the other side of x0, at a distance one and two from it.
+            if x0[i] + 1. > ub[i]:
+                steps = np.array([-1., -2.])
+            elif x0[i] - 1. < lb[i]:
+                steps = np.array([1., 2.])
+            else:
+                steps = np.array([-1., 1.])
+            differences = []
+            for step in steps:
+                x = np.copy(x0)
+                x[i] += step
+                values.append(fun(x))
+                differences.append(values[-1] - f0)
+
+            # The interpolating quadratic is f0 + g * t + c * t ** 2 / 2, and its minimizer is at a distance |g / c|.
+            c = 2 * (differences[1] / steps[1] - differences[0] / steps[0]) / (steps[1] - steps[0])
+            g = differences[0] / steps[0] - c * steps[0] / 2
+            if np.isfinite(g) and np.isfinite(c) and g != 0 and c > 0:
+                scaling_factor[i] = 2 * min(max(abs(g / c), 1e-4), 1e4)
+
+    return scaling_factor, shift, values
+
+
 def _solver_selection(invoker, method, options, prob_info, list_warnings):
     """Select the solver that corresponds to the problem.
 
@@ -2336,12 +3294,12 @@ def _solver_selection(invoker, method, options, prob_info, list_warnings):
     Dedicated to the late Professor M. J. D. Powell FRS (1936--2015).
     """
     # possible solvers
-    fun_name = stack()[0][3]  # name of the current function
+    fun_name = _frame_names()[0]  # name of the current function
     local_invoker_list = ['pdfo']
 
     if invoker not in local_invoker_list:
         raise SystemError('`{}` should only be called by {}'.format(fun_name, ', '.join(local_invoker_list)))
-    invoker = stack()[1][3].lower()
+    invoker = _frame_names()[1].lower()
 
     # Validate invoker.
     if not isinstance(invoker, str):
@@ -2381,8 +3339,15 @@ def _solver_selection(invoker, method, options, prob_info, list_warnings):
             warnings.warn(warn_message, Warning)
             list_warnings.append(warn_message)
 
-        # Define the solver depending on the problem characteristics.
-        if ptype == 'unconstrained':
+        # Define the solver depending on the problem characteristics, or on the cost model if the evaluations of the
+        # objective function have been timed.
+        if prob_info.get('evaluation_time') is not None:
+            m = _linear_constraint_count(prob_info['refined_data']['lb'], prob_info['refined_data']['ub'],
+                                         prob_info['refined_data']['constraints'])
+            solver, npt = _cost_selection(ptype, n, m, options, prob_info['evaluation_time'])
+            if npt is not None:
+                options[Options.NPT.value] = np.int32(npt)
+        elif ptype == 'unconstrained':
             if 2 <= n <= 8 and options[Options.MAXFEV.value] >= (n + 1) * (n + 2) / 2:
                 solver = 'uobyqa'  # does not need options[Options.NPT.value]
             elif options[Options.MAXFEV.value] <= n + 2:  # options[Options.MAXFEV.value] == n + 2
@@ -2409,6 +3374,29 @@ def _solver_selection(invoker, method, options, prob_info, list_warnings):
         else:
             raise SystemError("{}: UNEXPECTED ERROR: unknown problem type '{}' received.".format(fun_name, ptype))
 
+        # If a memory budget is given, the solver selected above is replaced by the first fallback whose memory
+        # footprint (with the smallest npt, which may be increased later) fits in the budget. NEWUOA is a fallback only
+        # for unconstrained problems, and COBYLA can solve any problem. The nonlinear constraints are not counted by the
+        # model, since their number is unknown before evaluating them. The cost-model-driven selection handles the budget.
+        max_memory = options.get(Options.MAX_MEMORY.value)
+        if max_memory is not None and 'constraints' in prob_info['refined_data'] and \
+                prob_info.get('evaluation_time') is None:
+            m = _linear_constraint_count(prob_info['refined_data']['lb'], prob_info['refined_data']['ub'],
+                                         prob_info['refined_data']['constraints'])
+            fallbacks = ['newuoa', 'cobyla'] if ptype == 'unconstrained' else ['cobyla']
+            candidates = [solver] + [s for s in fallbacks if s != solver]
+            footprints = [_memory_footprint(s, n, n + 2, m, options[Options.MAXFEV.value]) for s in candidates]
+            fitting = [s for s, footprint in zip(candidates, footprints) if footprint <= max_memory]
+            if len(fitting) > 0:
+                solver = fitting[0]
+            else:
+                solver = candidates[int(np.argmin(footprints))]
+                warn_message = \
+                    '{}: no solver fits in {} = {} bytes; {}, whose memory footprint is the smallest, is ' \
+                    'selected.'.format(invoker, Options.MAX_MEMORY.value, max_memory, solver)
+                warnings.warn(warn_message, Warning)
+                list_warnings.append(warn_message)
+
     # Revise options[Options.NPT.value] according to the selected solver.
     if solver.lower() in ['bobyqa', 'lincoa', 'newuoa'] and \
             (np.isnan(options[Options.NPT.value]) or options[Options.NPT.value] < n + 2 or
@@ -2445,12 +3433,12 @@ def _solver_selection(invoker, method, options, prob_info, list_warnings):
 
 def _pre_rhobeg_x0(invoker, x0, lb, ub, user_options_fields, options, list_warnings):
     # possible solvers
-    fun_name = stack()[0][3]  # name of the current function
+    fun_name = _frame_names()[0]  # name of the current function
     local_invoker_list = ['pdfo', 'bobyqa']
 
     if invoker not in local_invoker_list:
         raise SystemError('`{}` should only be called by {}'.format(fun_name, ', '.join(local_invoker_list)))
-    invoker = stack()[1][3].lower()
+    invoker = _frame_names()[1].lower()
 
     # Validate invoker.
     if not isinstance(invoker, str):
@@ -2529,6 +3517,234 @@ def _pre_npt_elimination(invoker, n, user_options_fields, options, list_warnings
     return options
 
 
+def _pre_npt_memory(invoker, method, n, m, user_options_fields, options, list_warnings):
+    """Reduce npt so that the memory footprint of `method` does not exceed options[Options.MAX_MEMORY.value]."""
+    npt_old = options[Options.NPT.value]
+    max_npt = _max_npt_within_memory(method, n, m, options[Options.MAXFEV.value], options[Options.MAX_MEMORY.value])
+    options[Options.NPT.value] = np.int32(min(npt_old, n + 2 if max_npt is None else max_npt))
+
+    if npt_old != options[Options.NPT.value] and Options.NPT.value in user_options_fields:
+        warn_message = \
+            '{}: {} is set to {} so that the memory required by {} does not exceed {} (or is as small as ' \
+            'possible).'.format(invoker, Options.NPT.value, options[Options.NPT.value], method, Options.MAX_MEMORY.value)
+        warnings.warn(warn_message, Warning)
+        list_warnings.append(warn_message)
+
+    return options
+
+
+def _linear_constraint_count(lb, ub, constraints):
+    """Number of linear inequality constraints received by LINCOA, i.e., the number of finite bounds and of finite
+    sides of the linear constraints."""
+    m = np.count_nonzero(lb > -np.inf) + np.count_nonzero(ub < np.inf)
+    if constraints['linear'] is not None:
+        m += np.count_nonzero(constraints['linear'].lb > -np.inf) + np.count_nonzero(constraints['linear'].ub < np.inf)
+    return int(m)
+
+
+def _workspace_size(solver, n, npt=0, m=0):
+    """Number of entries of the double-precision workspace of `solver`, as declared in its signature file.
+
+    The number of interpolation points `npt` is used by BOBYQA, LINCOA and NEWUOA, and the number of constraints `m` by
+    LINCOA (linear inequality constraints) and COBYLA (all the constraints).
+    """
+    n, npt, m = int(n), int(npt), int(m)  # avoid overflows of NumPy integers
+    if solver == 'uobyqa':
+        return (n * (42 + n * (23 + n * (8 + n))) + max(2 * n * n + 4, 18 * n)) // 4 + 1
+    elif solver == 'newuoa':
+        return (npt + 13) * (npt + n) + 3 * n * (n + 3) // 2 + 1
+    elif solver == 'bobyqa':
+        return (npt + 5) * (npt + n) + 3 * n * (n + 5) // 2 + 1
+    elif solver == 'lincoa':
+        return m * (2 + n) + npt * (4 + n + npt) + n * (9 + 3 * n) + max(m + 3 * n, 2 * m + n, 2 * npt)
+    else:
+        # The solver is necessarily COBYLA.
+        return n * (3 * n + 2 * m + 11) + 4 * m + 6
+
+
+def _solver_model(solver, w, x, nf, n, npt=0, m=0):
+    """Final models of `solver`, decoded from its workspace `w` at the return of the Fortran code.
+
+    The returned dictionary contains the gradient at `x` and the Hessian matrix of the quadratic model of the objective
+    function for BOBYQA, LINCOA, NEWUOA, and UOBYQA, and the gradients of the linear models of the objective function
+    and of the `m` constraints for COBYLA, in the variables of the solver. The models are None if the solver returned
+    before building them, i.e., before the end of its initialization.
+
+    The offsets in `w` are those of the partitions made by the Fortran codes (e.g., see newuoa.f). For BOBYQA, LINCOA
+    and NEWUOA, the Hessian matrix is HQ + sum_k PQ(k) XPT(k, :)^T XPT(k, :), and the gradient is obtained from the
+    interpolation conditions satisfied by the model, because the point at which GOPT is evaluated depends on the stage
+    of the algorithm at which it returned.
+    """
+    n, npt, m = int(n), int(npt), int(m)
+    model = {'model_gradient': None, 'model_hessian': None}
+    if solver == 'cobyla':
+        model['model_jacobian'] = None
+        if nf <= n + 1:
+            return model
+        mpp = m + 2
+        isimi = mpp + n * (n + 1)
+        idatm = isimi + n * n
+        simi = w[isimi:isimi + n * n].reshape((n, n), order='F')
+        datmat = w[idatm:idatm + mpp * (n + 1)].reshape((mpp, n + 1), order='F')
+
+        # The vertex n + 1 of the simplex is the best one, and SIMI is the inverse of the matrix of the displacements
+        # of the other vertices from it. The constraints received by COBYLA are nonnegative at feasible points.
+        gradients = (datmat[:m + 1, :n] - datmat[:m + 1, [n]]) @ simi
+        model['model_gradient'] = gradients[m]
+        model['model_jacobian'] = -gradients[:m]
+        return model
+
+    if solver == 'uobyqa':
+        npt = (n + 1) * (n + 2) // 2
+    if nf <= npt:
+        return model
+    packed = np.zeros((n, n))
+    col, row = np.tril_indices(n)  # HQ(IH) is H(ROW, COL) with IH running over COL and then ROW <= COL
+    if solver == 'uobyqa':
+        ixp = 3 * n
+        ipq = ixp + n * npt
+        xbase = w[:n]
+        packed[row, col] = w[ipq + n:ipq + npt - 1]
+        hessian = packed + np.triu(packed, 1).T
+        model['model_gradient'] = w[ipq:ipq + n] + hessian @ (x - xbase)
+        model['model_hessian'] = hessian
+        return model
+
+    if solver == 'newuoa':
+        ixb = 0
+        ixp = 3 * n
+        ihq = ixp + n * npt + npt + n
+    elif solver == 'bobyqa':
+        ixb = 0
+        ixp = n
+        ihq = ixp + n * npt + npt + 2 * n
+    else:
+        # The solver is necessarily LINCOA.
+        ixb = max(m + 3 * n, 2 * m + n, 2 * npt) + m * n + m
+        ixp = ixb + n
+        ihq = ixp + n * npt + npt + 3 * n
+    ifv = ixp + n * npt
+    ipq = ihq + n * (n + 1) // 2
+    xbase = w[ixb:ixb + n]
+    xpt = w[ixp:ixp + n * npt].reshape((npt, n), order='F')
+    packed[row, col] = w[ihq:ipq]
+    hessian = packed + np.triu(packed, 1).T + (xpt.T * w[ipq:ipq + npt]) @ xpt
+
+    # The model is c + g^T d + d^T H d / 2 at x + d, and interpolates FVAL at the points XBASE + XPT(k, :).
+    d = xpt - (x - xbase)
+    rhs = w[ifv:ifv + npt] - .5 * np.sum((d @ hessian) * d, axis=1)
+    coefficients = np.linalg.lstsq(np.c_[np.ones(npt), d], rhs, rcond=None)[0]
+    model['model_gradient'] = coefficients[1:]
+    model['model_hessian'] = hessian
+    return model
+
+
+def _memory_footprint(solver, n, npt, m, maxfev):
+    """Estimated memory, in bytes, allocated when calling the Fortran code of `solver`.
+
+    It consists of the workspace, of the histories of length `maxfev` of the function values (and of the constraint
+    violations for LINCOA and COBYLA), and of the constraint matrix given to LINCOA, all in double precision.
+    """
+    size = _workspace_size(solver, n, npt, m) + int(maxfev)
+    if solver in ['lincoa', 'cobyla']:
+        size += int(maxfev)
+    if solver == 'lincoa':
+        size += int(m) * int(n)
+    return 8 * size
+
+
+def _max_npt_within_memory(solver, n, m, maxfev, max_memory):
+    """Largest npt in [n+2, (n+1)*(n+2)/2] such that the memory footprint of `solver` does not exceed `max_memory`, or
+    None if no such npt exists. The footprint increases with npt, so that a bisection is used."""
+    low, high = n + 2, (n + 1) * (n + 2) // 2
+    if _memory_footprint(solver, n, low, m, maxfev) > max_memory:
+        return None
+    while low < high:
+        mid = (low + high + 1) // 2
+        if _memory_footprint(solver, n, mid, m, maxfev) <= max_memory:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _time_evaluations(fun, x0, lb, ub, ptype, rhobeg, count=4):
+    """Time the evaluations of `fun` at x0 and, for unconstrained and bound-constrained problems, at the first points
+    x0 + rhobeg * e_i that satisfy the bounds, which are evaluated by every solver in its initialization.
+
+    Returns `fun` wrapped so that each of these points is not evaluated again when it is requested, and the median
+    evaluation time, in seconds.
+    """
+    from ._problem import PrecomputedValues
+
+    points = [x0]
+    if ptype in ['unconstrained', 'bound-constrained']:
+        for i in range(min(count - 1, x0.size)):
+            x = np.copy(x0)
+            x[i] += rhobeg
+            if x[i] <= ub[i]:
+                points.append(x)
+
+    values = dict()
+    times = []
+    for x in points:
+        start = time.perf_counter()
+        values[x.tobytes()] = fun(x)
+        times.append(time.perf_counter() - start)
+
+    return PrecomputedValues(fun, values), float(np.median(times))
+
+
+def _cost_selection(ptype, n, m, options, evaluation_time):
+    """Solver configuration that minimizes the expected running time according to the cost model.
+
+    The expected running time of a configuration of COST_MODEL (updated with options[Options.COST_MODEL.value]) is the
+    expected number of function evaluations, at most maxfev, times the sum of `evaluation_time` and of the overhead of the
+    solver per evaluation. If npt is provided by the user, only the configurations with the closest npt are considered,
+    and if a memory budget is given, the configurations that exceed it are discarded, unless none fits.
+
+    Returns the name of the solver and npt (None for UOBYQA and COBYLA).
+    """
+    cost_model = {config: dict(entry) for config, entry in COST_MODEL.items()}
+    for config, entry in (options.get(Options.COST_MODEL.value) or {}).items():
+        cost_model[config].update(entry)
+    maxfev = options[Options.MAXFEV.value]
+    user_npt = options[Options.NPT.value]
+    max_memory = options.get(Options.MAX_MEMORY.value)
+
+    candidates = {
+        'unconstrained': ['uobyqa', 'newuoa:n+2', 'newuoa:2n+1', 'cobyla'],
+        'bound-constrained': ['bobyqa:n+2', 'bobyqa:2n+1', 'cobyla'],
+        'linearly-constrained': ['lincoa:n+2', 'lincoa:2n+1', 'cobyla'],
+        'nonlinearly-constrained': ['cobyla'],
+    }[ptype]
+    configurations = []
+    for config in candidates:
+        solver, _, level = config.partition(':')
+        npt = None
+        if level:
+            npt = n + 2 if level == 'n+2' else 2 * n + 1
+            if not np.isnan(user_npt):
+                if abs(user_npt - npt) > abs(user_npt - (3 * n + 3 - npt)):
+                    continue  # the other level is closer to the npt of the user
+                npt = int(user_npt)
+            if npt > min((n + 1) * (n + 2) // 2, maxfev - 1):
+                continue
+        elif solver == 'uobyqa' and (n < 2 or maxfev <= (n + 1) * (n + 2) // 2):
+            continue
+        elif solver == 'cobyla' and maxfev < n + 2:
+            continue
+        a, b = cost_model[config]['overhead']
+        c, g = cost_model[config]['evaluations']
+        expected_time = min(c * n ** g, maxfev) * (evaluation_time + a + b * _workspace_size(solver, n, npt or 0, m))
+        footprint = _memory_footprint(solver, n, npt or 0, m, maxfev)
+        configurations.append((max_memory is not None and footprint > max_memory, expected_time, solver, npt))
+
+    # COBYLA is always a candidate, since n+2 <= maxfev at this stage.
+    _, _, solver, npt = min(configurations, key=lambda configuration: configuration[:2])
+    return solver, npt
+
+
 def _project(x0, lb, ub, constraints):
     """Projection of the initial guess onto the feasible set.
 
@@ -2563,12 +3779,14 @@ def _project(x0, lb, ub, constraints):
 
     Dedicated to the late Professor M. J. D. Powell FRS (1936--2015).
     """
+    from scipy.optimize import OptimizeResult
+
     # possible solvers
-    fun_name = stack()[0][3]  # name of the current function
+    fun_name = _frame_names()[0]  # name of the current function
     local_invoker_list = ['prepdfo']
-    if len(stack()) < 3 or stack()[1][3].lower() not in local_invoker_list:
+    if len(_frame_names()) < 3 or _frame_names()[1].lower() not in local_invoker_list:
         raise SystemError('`{}` should only be called by {}'.format(fun_name, ', '.join(invoker_list)))
-    invoker = stack()[1][3].lower()
+    invoker = _frame_names()[1].lower()
 
     # Validate x0.
     if isinstance(x0, scalar_types):
@@ -2632,7 +3850,12 @@ def _project(x0, lb, ub, constraints):
         # least-squares problem: min ||A*x - (b - A*x_0)||.
         a = constraints['linear'].A
         b = (constraints['linear'].lb + constraints['linear'].ub) / 2
-        xi, _, _, _ = np.linalg.lstsq(a, b - np.dot(a, x0_c), rcond=None)
+        if _issparse(a):
+            from scipy.sparse.linalg import lsqr
+
+            xi = lsqr(a, b - a @ x0_c, atol=eps, btol=eps)[0]
+        else:
+            xi, _, _, _ = np.linalg.lstsq(a, b - np.dot(a, x0_c), rcond=None)
 
         # The problem is not bounded. However, if the least-square solver returned values bigger in absolute value
         # than max_con, they will be reduced to this bound.
@@ -2642,7 +3865,8 @@ def _project(x0, lb, ub, constraints):
 
     if constraints['linear'] is not None:
         try:
-            # Project the initial guess onto the linear constraints via SciPy.
+            # Project the initial guess onto the linear constraints, by a dedicated dual active-set method if possible
+            # and via SciPy otherwise.
             from scipy.optimize import minimize
             from scipy.optimize import Bounds as ScipyBounds
             from scipy.optimize import LinearConstraint as ScipyLinearConstraint
@@ -2650,39 +3874,34 @@ def _project(x0, lb, ub, constraints):
             linear = constraints['linear']
 
             # To be more efficient, SciPy asks to separate the equality and the inequality constraints into two
-            # different LinearConstraint structures
-            pc_args_ineq, pc_args_eq = dict(), dict()
-            pc_args_ineq['A'], pc_args_eq['A'] = np.asarray([[]], order='F'), np.asarray([[]], order='F')
-            pc_args_ineq['A'] = pc_args_ineq['A'].reshape(0, linear.A.shape[1])
-            pc_args_eq['A'] = pc_args_eq['A'].reshape(0, linear.A.shape[1])
-            pc_args_ineq['lb'], pc_args_eq['lb'] = np.asarray([]), np.asarray([])
-            pc_args_ineq['ub'], pc_args_eq['ub'] = np.asarray([]), np.asarray([])
-
-            for i in range(linear.lb.size):
-                if linear.lb[i] != linear.ub[i]:
-                    pc_args_ineq['A'] = np.concatenate((pc_args_ineq['A'], linear.A[i:i+1, :]), axis=0)
-                    pc_args_ineq['lb'] = np.r_[pc_args_ineq['lb'], linear.lb[i]]
-                    pc_args_ineq['ub'] = np.r_[pc_args_ineq['ub'], linear.ub[i]]
-                else:
-                    pc_args_eq['A'] = np.concatenate((pc_args_eq['A'], linear.A[i:i+1, :]), axis=0)
-                    pc_args_eq['lb'] = np.r_[pc_args_eq['lb'], linear.lb[i]]
-                    pc_args_eq['ub'] = np.r_[pc_args_eq['ub'], linear.ub[i]]
-
-            if pc_args_ineq['A'].size > 0 and pc_args_ineq['lb'].size > 0 and pc_args_eq['lb'].size > 0:
-                project_constraints = [ScipyLinearConstraint(**pc_args_ineq), ScipyLinearConstraint(**pc_args_eq)]
-            elif pc_args_ineq['A'].size > 0 and pc_args_ineq['lb'].size > 0:
-                project_constraints = ScipyLinearConstraint(**pc_args_ineq)
-            elif pc_args_eq['A'].size > 0:
-                project_constraints = ScipyLinearConstraint(**pc_args_eq)
-            else:
-                project_constraints = ()
+            # different LinearConstraint structures. The rows are split at once using boolean masks.
+            is_eq = np.equal(linear.lb, linear.ub)
+            is_ineq = np.logical_not(is_eq)
+            pc_args_ineq = {'A': linear.A[is_ineq, :], 'lb': linear.lb[is_ineq], 'ub': linear.ub[is_ineq]}
+            pc_args_eq = {'A': linear.A[is_eq, :], 'lb': linear.lb[is_eq], 'ub': linear.ub[is_eq]}
 
             # Perform the actual projection.
-            ax_ineq = np.dot(pc_args_ineq['A'], x0_c)
-            ax_eq = np.dot(pc_args_eq['A'], x0_c)
+            ax_ineq = pc_args_ineq['A'] @ x0_c
+            ax_eq = pc_args_eq['A'] @ x0_c
             if np.greater(ax_ineq, pc_args_ineq['ub']).any() or np.greater(pc_args_ineq['lb'], ax_ineq).any() or \
                     np.not_equal(ax_eq, pc_args_eq['lb']).any() or \
                     np.greater(x0_c, ub_c).any() or np.greater(lb_c, x0_c).any():
+                x_proj = _project_polyhedron(x0_c, lb_c, ub_c, linear.A, linear.lb, linear.ub)
+                if x_proj is not None:
+                    return OptimizeResult(x=x_proj)
+
+                # The dedicated method failed, which may happen if the constraints are inconsistent. SLSQP will then
+                # return a point that minimizes the constraint violation, and works with dense matrices anyway.
+                pc_args_ineq['A'] = _dense(pc_args_ineq['A'])
+                pc_args_eq['A'] = _dense(pc_args_eq['A'])
+                if pc_args_ineq['lb'].size > 0 and pc_args_eq['lb'].size > 0:
+                    project_constraints = [ScipyLinearConstraint(**pc_args_ineq), ScipyLinearConstraint(**pc_args_eq)]
+                elif pc_args_ineq['lb'].size > 0:
+                    project_constraints = ScipyLinearConstraint(**pc_args_ineq)
+                elif pc_args_eq['lb'].size > 0:
+                    project_constraints = ScipyLinearConstraint(**pc_args_eq)
+                else:
+                    project_constraints = ()
                 return minimize(lambda x: np.dot(x - x0_c, x - x0_c) / 2, x0_c, jac=lambda x: (x - x0_c),
                                 bounds=ScipyBounds(lb_c, ub_c), constraints=project_constraints)
             else:
@@ -2695,6 +3914,108 @@ def _project(x0, lb, ub, constraints):
     return OptimizeResult(x=x0_c)
 
 
+def _project_polyhedron(x0, lb, ub, a, alb, aub):
+    """Projection of `x0` onto the polyhedron {x : lb <= x <= ub, alb <= A.x <= aub}.
+
+    The projection is computed by the dual active-set method of Goldfarb and Idnani (1983), specialized to the objective
+    function ||x - x0||^2 / 2, whose Hessian matrix is the identity. The method starts from the unconstrained minimizer
+    x0 and adds the most violated constraints to the active set one after the other, dropping an active constraint when
+    its Lagrange multiplier would become negative. The QR factorization of the matrix of the active normals is updated
+    at each iteration, and each iteration costs only O(n*k) operations, where k is the size of the active set.
+
+    Parameters
+    ----------
+    x0: ndarray, shape (n,)
+        The point to be projected.
+    lb: ndarray, shape (n,)
+        The lower bounds on the variables.
+    ub: ndarray, shape (n,)
+        The upper bounds on the variables.
+    a: ndarray or scipy.sparse.csr_array, shape (m, n)
+        The matrix of the linear constraints.
+    alb: ndarray, shape (m,)
+        The lower bounds on the linear constraints.
+    aub: ndarray, shape (m,)
+        The upper bounds on the linear constraints.
+
+    Returns
+    -------
+    x: ndarray, shape (n,) or None
+        The projection of `x0`, or None if the method failed (e.g., if the polyhedron is empty). The caller should then
+        fall back to a general-purpose solver.
+    """
+    from scipy.linalg import qr_delete, qr_insert, solve_triangular
+
+    n, m = x0.size, alb.size
+    if _issparse(a):
+        a_norm = np.sqrt(np.asarray(a.multiply(a).sum(axis=1)).ravel())
+    else:
+        a_norm = np.sqrt(np.sum(a ** 2, axis=1))
+    a_norm[a_norm == 0] = 1.0
+
+    def normal(p):
+        # Each of the 2*(m+n) one-sided constraints is of the form normal(p).x >= rhs[p]. The indices p < m correspond
+        # to the lower linear constraints, m <= p < 2*m to the upper linear constraints, and the next n and n indices
+        # respectively to the lower and upper bounds.
+        if p < 2 * m:
+            row = a[[p % m]].toarray().ravel() if _issparse(a) else np.array(a[p % m], dtype=np.float64)
+            return row if p < m else -row
+        row = np.zeros(n, dtype=np.float64)
+        row[(p - 2 * m) % n] = 1.0 if p < 2 * m + n else -1.0
+        return row
+
+    rhs = np.r_[alb, -aub, lb, -ub]
+    scale = np.r_[a_norm, a_norm, np.ones(2 * n)]
+
+    x = np.copy(x0)
+    active = []
+    mult = np.empty(0)
+    q, r = np.empty((n, 0)), np.empty((0, 0))
+    tol = 1e2 * eps * max(1.0, np.max(np.abs(np.r_[x0, rhs[np.isfinite(rhs)]]), initial=0.0))
+    maxiter = 10 * (m + n)
+    for _ in range(maxiter):
+        # Select the most violated constraint, relatively to the norm of its normal vector.
+        ax = a @ x
+        violation = (rhs - np.r_[ax, -ax, x, -x]) / scale
+        p = np.argmax(violation)
+        if not violation[p] > tol:
+            return np.nanmin((np.nanmax((x, lb), axis=0), ub), axis=0)
+        np_vec = normal(p)
+        mult_p = 0.0
+
+        # Take partial steps (and drop active constraints) until the selected constraint is satisfied.
+        while True:
+            qtn = q.T @ np_vec
+            z = np_vec - q @ qtn
+            dual_step = solve_triangular(r, qtn) if active else np.empty(0)
+            positive = dual_step > 0
+            t_partial = np.inf
+            if np.any(positive):
+                ratios = np.full(len(active), np.inf)
+                ratios[positive] = np.maximum(mult[positive], 0.0) / dual_step[positive]
+                j = int(np.argmin(ratios))
+                t_partial = ratios[j]
+            dependent = np.linalg.norm(z) <= 1e2 * eps * np.linalg.norm(np_vec)
+            if dependent and np.isinf(t_partial):
+                return None  # the constraints are inconsistent
+            t_full = np.inf if dependent else (rhs[p] - np.dot(np_vec, x)) / np.dot(z, np_vec)
+            t = min(t_full, t_partial)
+            if not dependent:
+                x += t * z
+            mult -= t * dual_step
+            mult_p += t
+            if t_full <= t_partial:
+                q, r = qr_insert(q, r, np_vec, len(active), which='col')
+                active.append(p)
+                mult = np.r_[mult, mult_p]
+                break
+            q, r = qr_delete(q, r, j, which='col')
+            q, r = q[:, :r.shape[1]], r[:r.shape[1], :]  # qr_delete returns a full factorization if q is square
+            del active[j]
+            mult = np.delete(mult, j)
+    return None
+
+
 def _augmented_linear_constraint(n, bounds, constraints):
     """Concatenate bound and linear constraints into one constraint.
 
@@ -2718,8 +4039,8 @@ def _augmented_linear_constraint(n, bounds, constraints):
 
     Returns
     -------
-    a_aug: ndarray, shape (m,n)
-        The coefficient matrix of the augmented linear constraints.
+    a_aug: {ndarray, scipy.sparse.csr_array}, shape (m,n)
+        The coefficient matrix of the augmented linear constraints. It is sparse if the linear constraints are sparse.
     b_aug: ndarray, shape (m,)
         The right-hand side vector of the augmented linear constraints.
 
@@ -2732,10 +4053,10 @@ def _augmented_linear_constraint(n, bounds, constraints):
 
     Dedicated to the late Professor M. J. D. Powell FRS (1936--2015).
     """
-    fun_name = stack()[0][3]  # name of the current function
-    if len(stack()) < 3 or stack()[1][3].lower() not in invoker_list:
+    fun_name = _frame_names()[0]  # name of the current function
+    if len(_frame_names()) < 3 or _frame_names()[1].lower() not in invoker_list:
         raise SystemError('`{}` should only be called by {}'.format(fun_name, ', '.join(invoker_list)))
-    invoker = stack()[1][3].lower()
+    invoker = _frame_names()[1].lower()
 
     if not isinstance(n, scalar_types):
         raise ValueError('{}: UNEXPECTED ERROR: the size of the problem should be a scalar.'.format(invoker))
@@ -2753,19 +4074,14 @@ def _augmented_linear_constraint(n, bounds, constraints):
             not (constraints['linear'] is None or isinstance(constraints['linear'], LinearConstraint)):
         raise ValueError('{}: UNEXPECTED ERROR: the constraints are ill-defined.'.format(invoker))
 
-    # Construct the linear constraints that refers to the bounds.
-    idmatrix = np.eye(n)
+    # Construct the linear constraints that refers to the bounds. Only the rows of the identity matrix that correspond
+    # to finite bounds are built, and they are sparse if the linear constraints are sparse.
     lb, ub = bounds['lb'], bounds['ub']
     lb_kept_indices = np.logical_not(np.logical_and(np.isinf(lb), lb < 0))
     ub_kept_indices = np.logical_not(np.logical_and(np.isinf(ub), ub > 0))
-    alb = idmatrix[lb_kept_indices, :]
-    aub = idmatrix[ub_kept_indices, :]
-
-    # Reshape the empty matrices to avoid concatenate exception.
-    if aub.size == 0:
-        aub = aub.reshape(0, n)
-    if alb.size == 0:
-        alb = alb.reshape(0, n)
+    sparse = constraints['linear'] is not None and _issparse(constraints['linear'].A)
+    alb = _identity_rows(n, np.flatnonzero(lb_kept_indices), sparse)
+    aub = _identity_rows(n, np.flatnonzero(ub_kept_indices), sparse)
 
     # Remove infinite bounds.
     lb, ub = lb[lb_kept_indices], ub[ub_kept_indices]
@@ -2776,12 +4092,12 @@ def _augmented_linear_constraint(n, bounds, constraints):
         bineq = np.array([], dtype=np.float64)
     else:
         aineq, bineq = _linear_constraints_constr(constraints['linear'])
-    if aineq.size == 0:
+    if _matrix_size(aineq) == 0:
         aineq = aineq.reshape(0, n)
 
-    a_aug = np.concatenate((aineq, -alb, aub), axis=0)
+    a_aug = _vstack((aineq, -alb, aub))
     b_aug = np.concatenate((bineq, -lb, ub), axis=0)
-    if not (a_aug.size == 0 and b_aug.size == 0) and \
+    if not (_matrix_size(a_aug) == 0 and b_aug.size == 0) and \
             not (len(a_aug.shape) == 2 and a_aug.shape[0] == b_aug.size and a_aug.shape[1] == n):
         raise SystemError('{}: UNEXPECTED ERROR: invalid augmented linear constraints.'.format(invoker))
 
@@ -2833,98 +4149,108 @@ def postpdfo(x, fx, exitflag, output, method, nf, fhist, options, prob_info, con
     # With extreme barrier (implemented when options[Options.CLASSICAL.value]=False), all the function values that are NaN or larger
     # than hugefun are replaced by hugefun; all the constraint values that are NaN or larger than hugecon are replaced
     # by hugecon. hugefun and hugecon are defined in pdfoconst.F, and can be obtained by gethuge.
-    try:
-        from .gethuge import gethuge
-    except ImportError:
-        import_error_so('gethuge')
-    hugefun = gethuge('fun')
-    hugecon = gethuge('con')
+    from scipy.optimize import OptimizeResult
 
-    fun_name = stack()[0][3]  # name of the current function
+    hugefun = _huge('fun')
+    hugecon = _huge('con')
 
-    if len(stack()) < 3 or stack()[1][3].lower() not in invoker_list:
-        raise SystemError('`{}` should only be called by {}'.format(fun_name, ', '.join(invoker_list)))
-    invoker = stack()[1][3].lower()
+    fun_name = _frame_names()[0]  # name of the current function
 
-    # Validate x.
-    if not hasattr(x, '__len__') and \
-            not isinstance(x, scalar_types):
-        raise ValueError('{}: UNEXPECTED ERROR: x should be a scalar or a vector.'.format(invoker))
-    try:
-        x_c = np.asarray(x, dtype=np.float64)
-    except ValueError:
-        raise ValueError('{}: UNEXPECTED ERROR: x should contain only scalars.'.format(invoker))
-    if len(x_c.shape) > 1:
-        raise ValueError('{}: UNEXPECTED ERROR: x should be a vector.'.format(invoker))
+    if len(_frame_names()) < 3 or _frame_names()[1].lower() not in invoker_list:
+        raise SystemError('`{}` should only be called by {}'.format(fun_name, ', '.join(invoker_list)))
+    invoker = _frame_names()[1].lower()
+
+    # The internal consistency checks of the arguments are only performed in debug mode. Otherwise, the arguments are
+    # built by pdfo itself and are only converted, which matters when many small problems are solved.
+    debug = not isinstance(options, dict) or options.get(Options.DEBUG.value, True)
+    if debug:
+        # Validate x.
+        if not hasattr(x, '__len__') and \
+                not isinstance(x, scalar_types):
+            raise ValueError('{}: UNEXPECTED ERROR: x should be a scalar or a vector.'.format(invoker))
+        try:
+            x_c = np.asarray(x, dtype=np.float64)
+        except ValueError:
+            raise ValueError('{}: UNEXPECTED ERROR: x should contain only scalars.'.format(invoker))
+        if len(x_c.shape) > 1:
+            raise ValueError('{}: UNEXPECTED ERROR: x should be a vector.'.format(invoker))
 
-    # Validate fx.
-    if hasattr(fx, '__len__') and len(fx) == 1:
-        fx_c = np.float64(fx[0])
+        # Validate fx.
+        if hasattr(fx, '__len__') and len(fx) == 1:
+            fx_c = np.float64(fx[0])
+        else:
+            fx_c = np.float64(fx)
+        if not isinstance(fx_c, scalar_types):
+            raise ValueError('{}: UNEXPECTED ERROR: fx should be a scalar.'.format(invoker))
+
+        # Validate exitflag.
+        if not isinstance(exitflag, scalar_types):
+            raise ValueError('{}: UNEXPECTED ERROR: exitflag should be a scalar.'.format(invoker))
+        exitflag_c = np.int32(exitflag)
+        if exitflag_c != exitflag:
+            raise ValueError('{}: UNEXPECTED ERROR: exitflag should not be a floating number.'.format(invoker))
+
+        # Validate output.
+        if output is None or not isinstance(output, dict):
+            raise ValueError('{}: UNEXPECTED ERROR: output should be a valid dictionary.'.format(invoker))
+
+        # Validate method.
+        if method is None or not isinstance(method, str):
+            raise ValueError('{}: UNEXPECTED ERROR: method should be a string.'.format(invoker))
+
+        # Validate nf.
+        if not isinstance(nf, scalar_types):
+            raise ValueError('{}: UNEXPECTED ERROR: nf should be a scalar.'.format(invoker))
+        nf_c = np.int32(nf)
+        if nf_c != nf:
+            raise ValueError('{}: UNEXPECTED ERROR: nf should not be a floating number.'.format(invoker))
+
+        # Validate fhist.
+        if not hasattr(fhist, '__len__') and not isinstance(fhist, scalar_types):
+            raise ValueError('{}: UNEXPECTED ERROR: fhist should be a scalar of a vector.'.format(invoker))
+        try:
+            fhist_c = np.asarray(fhist[:nf], dtype=np.float64)
+        except ValueError:
+            raise ValueError('{}: UNEXPECTED ERROR: fhist should contain nf scalars.'.format(invoker))
+        if len(fhist_c.shape) != 1:
+            raise ValueError('{}: UNEXPECTED ERROR: fhist should be a vector.'.format(invoker))
+
+        # Validate constrviolation.
+        if not np.isnan(constrviolation) and not isinstance(constrviolation, scalar_types):
+            raise ValueError('{}: UNEXPECTED ERROR: constrviolation should be a scalar.'.format(invoker))
+        if np.isnan(constrviolation):
+            constrviolation_c = constrviolation
+        else:
+            constrviolation_c = np.float64(constrviolation)
+
+        # Validate chist.
+        if not (chist is None and method in ['pdfo', 'newuoa', 'uobyqa', 'bobyqa-ls', 'bobyqa-ps']) and \
+                not hasattr(chist, '__len__') and not isinstance(chist, scalar_types):
+            raise ValueError('{}: UNEXPECTED ERROR: chist should be a scalar or a vector.'.format(invoker))
+        if chist is None:
+            chist_c = chist
+        else:
+            try:
+                chist_c = np.asarray(chist[:nf], dtype=np.float64)
+            except ValueError:
+                raise ValueError('{}: UNEXPECTED ERROR: chist should contain nf scalars.'.format(invoker))
+        if chist_c is not None and len(chist_c.shape) != 1:
+            raise ValueError('{}: UNEXPECTED ERROR: chist should be a vector.'.format(invoker))
     else:
-        fx_c = np.float64(fx)
-    if not isinstance(fx_c, scalar_types):
-        raise ValueError('{}: UNEXPECTED ERROR: fx should be a scalar.'.format(invoker))
-
-    # Validate exitflag.
-    if not isinstance(exitflag, scalar_types):
-        raise ValueError('{}: UNEXPECTED ERROR: exitflag should be a scalar.'.format(invoker))
-    exitflag_c = np.int32(exitflag)
-    if exitflag_c != exitflag:
-        raise ValueError('{}: UNEXPECTED ERROR: exitflag should not be a floating number.'.format(invoker))
-
-    # Validate output.
-    if output is None or not isinstance(output, dict):
-        raise ValueError('{}: UNEXPECTED ERROR: output should be a valid dictionary.'.format(invoker))
-
-    # Validate method.
-    if method is None or not isinstance(method, str):
-        raise ValueError('{}: UNEXPECTED ERROR: method should be a string.'.format(invoker))
-
-    # Validate nf.
-    if not isinstance(nf, scalar_types):
-        raise ValueError('{}: UNEXPECTED ERROR: nf should be a scalar.'.format(invoker))
-    nf_c = np.int32(nf)
-    if nf_c != nf:
-        raise ValueError('{}: UNEXPECTED ERROR: nf should not be a floating number.'.format(invoker))
-
-    # Validate fhist.
-    if not hasattr(fhist, '__len__') and not isinstance(fhist, scalar_types):
-        raise ValueError('{}: UNEXPECTED ERROR: fhist should be a scalar of a vector.'.format(invoker))
-    try:
+        x_c = np.asarray(x, dtype=np.float64)
+        fx_c = np.float64(fx[0] if hasattr(fx, '__len__') and len(fx) == 1 else fx)
+        exitflag_c = np.int32(exitflag)
+        nf_c = np.int32(nf)
         fhist_c = np.asarray(fhist[:nf], dtype=np.float64)
-    except ValueError:
-        raise ValueError('{}: UNEXPECTED ERROR: fhist should contain nf scalars.'.format(invoker))
-    if len(fhist_c.shape) != 1:
-        raise ValueError('{}: UNEXPECTED ERROR: fhist should be a vector.'.format(invoker))
-
-    # Validate constrviolation.
-    if not np.isnan(constrviolation) and not isinstance(constrviolation, scalar_types):
-        raise ValueError('{}: UNEXPECTED ERROR: constrviolation should be a scalar.'.format(invoker))
-    if np.isnan(constrviolation):
-        constrviolation_c = constrviolation
-    else:
         constrviolation_c = np.float64(constrviolation)
-
-    # Validate chist.
-    if not (chist is None and method in ['pdfo', 'newuoa', 'uobyqa']) and \
-            not hasattr(chist, '__len__') and not isinstance(chist, scalar_types):
-        raise ValueError('{}: UNEXPECTED ERROR: chist should be a scalar or a vector.'.format(invoker))
-    if chist is None:
-        chist_c = chist
-    else:
-        try:
-            chist_c = np.asarray(chist[:nf], dtype=np.float64)
-        except ValueError:
-            raise ValueError('{}: UNEXPECTED ERROR: chist should contain nf scalars.'.format(invoker))
-    if chist_c is not None and len(chist_c.shape) != 1:
-        raise ValueError('{}: UNEXPECTED ERROR: chist should be a vector.'.format(invoker))
+        chist_c = None if chist is None else np.asarray(chist[:nf], dtype=np.float64)
 
     # If the invoker is a solver called by pdfo, then let pdfo do the post-processing.
     output['x'] = x_c
     output['fun'] = fx_c
     output['status'] = exitflag_c
     output['success'] = exitflag_c in [ExitStatus.RADIUS_SUCCESS.value, ExitStatus.TARGET_SUCCESS.value, ExitStatus.FEASIBILITY_SUCCESS.value, ExitStatus.FIXED_SUCCESS.value] and constrviolation_c <= np.sqrt(np.finfo(float).eps)
-    if len(stack()) >= 4 and stack()[2][3].lower() == 'pdfo':
+    if len(_frame_names()) >= 4 and _frame_names()[2].lower() in preprocessed_invokers:
         output['nfev'] = nf_c
         output['constrviolation'] = constrviolation_c
         output['fhist'] = fhist_c
@@ -2933,53 +4259,55 @@ def postpdfo(x, fx, exitflag, output, method, nf, fhist, options, prob_info, con
         return OptimizeResult(**output)
 
     # If the solver is not called by pdfo (can be pdfo directly), perform the post-processing.
-    option_fields = {Options.QUIET.value, Options.DEBUG.value, Options.CLASSICAL.value, Options.CHKFUNVAL.value}
-    if options is None or not isinstance(options, dict) or not (option_fields <= set(options.keys())) or \
-            not isinstance(options[Options.QUIET.value], (bool, np.bool_)) or not isinstance(options[Options.DEBUG.value], (bool, np.bool_)) or \
-            not isinstance(options[Options.CLASSICAL.value], (bool, np.bool_)) or \
-            not isinstance(options[Options.CHKFUNVAL.value], (bool, np.bool_)):
-        raise ValueError('{}: UNEXPECTED ERROR: options should be a valid dictionary.'.format(invoker))
+    if debug:
+        option_fields = {Options.QUIET.value, Options.DEBUG.value, Options.CLASSICAL.value, Options.CHKFUNVAL.value}
+        if options is None or not isinstance(options, dict) or not (option_fields <= set(options.keys())) or \
+                not isinstance(options[Options.QUIET.value], (bool, np.bool_)) or not isinstance(options[Options.DEBUG.value], (bool, np.bool_)) or \
+                not isinstance(options[Options.CLASSICAL.value], (bool, np.bool_)) or \
+                not isinstance(options[Options.CHKFUNVAL.value], (bool, np.bool_)):
+            raise ValueError('{}: UNEXPECTED ERROR: options should be a valid dictionary.'.format(invoker))
+
+        # Validate prob_info.
+        prob_info_fields = \
+            {'infeasible', 'nofreex', 'warnings', 'scaled', 'reduced', 'space_chg', 'fixedx', 'fixedx_value',
+             'refined_type', 'raw_type', 'infeasible_linear', 'infeasible_bound', 'feasibility_problem'}
+        if prob_info is None or not isinstance(prob_info, dict) or not (prob_info_fields <= set(prob_info.keys())) or \
+                not isinstance(prob_info['infeasible'], (bool, np.bool_)) or \
+                not isinstance(prob_info['nofreex'], (bool, np.bool_)) or \
+                not hasattr(prob_info['warnings'], '__len__') or \
+                not all(map(lambda pi: isinstance(pi, str), prob_info['warnings'])) or \
+                not isinstance(prob_info['scaled'], (bool, np.bool_)) or \
+                not isinstance(prob_info['reduced'], (bool, np.bool_)) or \
+                not (prob_info['space_chg'] is None or callable(prob_info['space_chg'])) or \
+                not hasattr(prob_info['fixedx'], '__len__') or \
+                not all(map(lambda pi: isinstance(pi, (bool, np.bool_)), prob_info['fixedx'])) or \
+                not hasattr(prob_info['fixedx_value'], '__len__') or \
+                not all(map(lambda pi: isinstance(pi, scalar_types), prob_info['fixedx_value'])) or \
+                not hasattr(prob_info['infeasible_linear'], '__len__') or \
+                not all(map(lambda pi: isinstance(pi, (bool, np.bool_)), prob_info['infeasible_linear'])) or \
+                not hasattr(prob_info['infeasible_bound'], '__len__') or \
+                not all(map(lambda pi: isinstance(pi, (bool, np.bool_)), prob_info['infeasible_bound'])) or \
+                not isinstance(prob_info['refined_type'], str) or not isinstance(prob_info['raw_type'], str) or \
+                not isinstance(prob_info['feasibility_problem'], (bool, np.bool_)):
+            raise ValueError('{}: UNEXPECTED ERROR: prob_info should be a valid dictionary.'.format(invoker))
 
-    # Validate prob_info.
-    prob_info_fields = \
-        {'infeasible', 'nofreex', 'warnings', 'scaled', 'reduced', 'space_chg', 'fixedx', 'fixedx_value',
-         'refined_type', 'raw_type', 'infeasible_linear', 'infeasible_bound', 'feasibility_problem'}
-    if prob_info is None or not isinstance(prob_info, dict) or not (prob_info_fields <= set(prob_info.keys())) or \
-            not isinstance(prob_info['infeasible'], (bool, np.bool_)) or \
-            not isinstance(prob_info['nofreex'], (bool, np.bool_)) or \
-            not hasattr(prob_info['warnings'], '__len__') or \
-            not all(map(lambda pi: isinstance(pi, str), prob_info['warnings'])) or \
-            not isinstance(prob_info['scaled'], (bool, np.bool_)) or \
-            not isinstance(prob_info['reduced'], (bool, np.bool_)) or \
-            not (prob_info['space_chg'] is None or callable(prob_info['space_chg'])) or \
-            not hasattr(prob_info['fixedx'], '__len__') or \
-            not all(map(lambda pi: isinstance(pi, (bool, np.bool_)), prob_info['fixedx'])) or \
-            not hasattr(prob_info['fixedx_value'], '__len__') or \
-            not all(map(lambda pi: isinstance(pi, scalar_types), prob_info['fixedx_value'])) or \
-            not hasattr(prob_info['infeasible_linear'], '__len__') or \
-            not all(map(lambda pi: isinstance(pi, (bool, np.bool_)), prob_info['infeasible_linear'])) or \
-            not hasattr(prob_info['infeasible_bound'], '__len__') or \
-            not all(map(lambda pi: isinstance(pi, (bool, np.bool_)), prob_info['infeasible_bound'])) or \
-            not isinstance(prob_info['refined_type'], str) or not isinstance(prob_info['raw_type'], str) or \
-            not isinstance(prob_info['feasibility_problem'], (bool, np.bool_)):
-        raise ValueError('{}: UNEXPECTED ERROR: prob_info should be a valid dictionary.'.format(invoker))
+        if prob_info['scaled']:
+            prob_info_fields_scaled = {'scaling_factor', 'shift'}
+            if not (prob_info_fields_scaled <= set(prob_info.keys())) or \
+                    not hasattr(prob_info['scaling_factor'], '__len__') or \
+                    not all(map(lambda pi: isinstance(pi, scalar_types), prob_info['scaling_factor'])) or \
+                    not hasattr(prob_info['shift'], '__len__') or \
+                    not all(map(lambda pi: isinstance(pi, scalar_types), prob_info['shift'])):
+                raise ValueError(
+                    '{}: UNEXPECTED ERROR: prob_info should contain scaling factors if the problem has been '
+                    'scaled.'.format(invoker))
 
     prob_info_keys = prob_info.keys()
-    if prob_info['scaled']:
-        prob_info_fields_scaled = {'scaling_factor', 'shift'}
-        if not (prob_info_fields_scaled <= set(prob_info_keys)) or \
-                not hasattr(prob_info['scaling_factor'], '__len__') or \
-                not all(map(lambda pi: isinstance(pi, scalar_types), prob_info['scaling_factor'])) or \
-                not hasattr(prob_info['shift'], '__len__') or \
-                not all(map(lambda pi: isinstance(pi, scalar_types), prob_info['shift'])):
-            raise ValueError(
-                '{}: UNEXPECTED ERROR: prob_info should contain scaling factors if the problem has been '
-                'scaled.'.format(invoker))
     prob_info_c = dict(prob_info)
 
     # Manage the extreme barriers.
     if not options[Options.CLASSICAL.value]:
-        if ((fhist_c > hugefun).any() or np.isnan(fhist_c).any()) and not prob_info_c['infeasible'] and \
+        if debug and ((fhist_c > hugefun).any() or np.isnan(fhist_c).any()) and not prob_info_c['infeasible'] and \
                 not prob_info_c['nofreex']:
             raise ValueError(
                 '{}: UNEXPECTED ERROR: {} returns an fhist with NaN or values larger than hugefun={}; this is '
@@ -2991,7 +4319,7 @@ def postpdfo(x, fx, exitflag, output, method, nf, fhist, options, prob_info, con
             warnings.warn(warn_message, Warning)
             output['warnings'].append(warn_message)
 
-        if method == 'cobyla' and chist_c is not None and hasattr(chist_c, '__len__') and \
+        if debug and method == 'cobyla' and chist_c is not None and hasattr(chist_c, '__len__') and \
                 ((chist_c > hugecon).any() or np.isnan(chist_c).any()) and not prob_info_c['infeasible'] and \
                 not prob_info_c['nofreex']:
             raise ValueError(
@@ -3004,7 +4332,7 @@ def postpdfo(x, fx, exitflag, output, method, nf, fhist, options, prob_info, con
             output['warnings'].append(warn_message)
 
     # Validate the value of the inputs.
-    if nf_c <= 0:
+    if debug and nf_c <= 0:
         raise ValueError(
             '{}: UNEXPECTED ERROR: {} returns a nf <= 0 unexpectedly with exitflag '
             '{}'.format(invoker, method, exitflag_c))
@@ -3024,7 +4352,7 @@ def postpdfo(x, fx, exitflag, output, method, nf, fhist, options, prob_info, con
         # information is already contained in the evaluation.
         linear = prob_info_c['refined_data']['constraints']['linear']
         if linear is not None:
-            ax = np.dot(linear.A, x_c)
+            ax = linear.A @ x_c
             r1 = linear.lb - ax
             r2 = ax - linear.ub
             if prob_info_c['space_chg'] is not None:
@@ -3091,6 +4419,10 @@ def postpdfo(x, fx, exitflag, output, method, nf, fhist, options, prob_info, con
         x_c = _fullx(x_c, prob_info_c['fixedx_value'], np.logical_not(prob_info_c['fixedx']), prob_info_c['fixedx'])
     output['x'] = x_c
 
+    # Express the final models of the solver in the variables of the problem.
+    if options[Options.RETURN_MODEL.value]:
+        _full_model(output, prob_info_c)
+
     # Set output.{nf, constrviolation, fhist, chist, method}.
     output['nfev'] = nf_c
     output['constrviolation'] = constrviolation_c
@@ -3126,7 +4458,7 @@ def postpdfo(x, fx, exitflag, output, method, nf, fhist, options, prob_info, con
         output['chist'] = np.zeros(nf_c)
 
     # Revise output['constr_value'] according to problem type.
-    if prob_info_c['refined_type'] != 'nonlinearly-constrained' and 'constr_value' in output.keys() and \
+    if debug and prob_info_c['refined_type'] != 'nonlinearly-constrained' and 'constr_value' in output.keys() and \
             output['constr_value'].size > 0:
         raise ValueError(
             '{}: UNEXPECTED ERROR: {} returns values of nonlinear constraints for a problem that does not admit '
@@ -3223,6 +4555,9 @@ def postpdfo(x, fx, exitflag, output, method, nf, fhist, options, prob_info, con
         if 'raw_data' not in prob_info_keys:
             raise ValueError("{}: UNEXPECTED ERROR: 'raw_data' should be a field of prob_info".format(invoker))
 
+        # In the noise-aware mode, fx is an average of the values in fhist, and it does not appear in fhist.
+        noisy = prob_info_c.get('noise') is not None
+
         # Check whether fx is 'optimal'.
         fhistf = fhist_c
         if method in ['bobyqa', 'lincoa', 'cobyla']:
@@ -3236,7 +4571,7 @@ def postpdfo(x, fx, exitflag, output, method, nf, fhist, options, prob_info, con
         # Tom 2021-05-26: The following test is disabled for lincoa for the moment.
         # if fx != min_f and not (np.isnan(fx) and np.isnan(min_f)) and method != 'lincoa' and \
         #         'constr_modified' in output.keys() and output['constr_modified']:
-        if fx != min_f and not (np.isnan(fx) and np.isnan(min_f)) and method != 'lincoa':
+        if fx != min_f and not (np.isnan(fx) and np.isnan(min_f)) and method != 'lincoa' and not noisy:
             raise ValueError(
                 '{}: UNEXPECTED ERROR: {} returns an fhist that does not match nf or fx'.format(invoker, method))
 
@@ -3264,7 +4599,7 @@ def postpdfo(x, fx, exitflag, output, method, nf, fhist, options, prob_info, con
             # Compute the linear constraint value.
             if linear is not None:
                 try:
-                    ax = np.dot(linear.A, x_c)
+                    ax = linear.A @ x_c
                     r = np.r_[linear.lb - ax, ax - linear.ub]
                 except ValueError:
                     raise ValueError(
@@ -3294,7 +4629,8 @@ def postpdfo(x, fx, exitflag, output, method, nf, fhist, options, prob_info, con
                 cf = chist_c[np.isnan(fhist_c)]
             else:
                 cf = chist_c[fhist_c == fx_c]
-            if (cf != constrv_returned).all() and not (np.isnan(constrv_returned) and np.isnan(cf).all()):
+            if (cf != constrv_returned).all() and not (np.isnan(constrv_returned) and np.isnan(cf).all()) and \
+                    not noisy:
                 raise ValueError(
                     '{}: UNEXPECTED ERROR: {} returns a CONSTRVIOLATION that does not match '
                     'chist.'.format(invoker, method))
@@ -3312,7 +4648,7 @@ def postpdfo(x, fx, exitflag, output, method, nf, fhist, options, prob_info, con
 
             # It seems that COBYLA can return fx~=fun(x) due to rounding errors. Moreover, in the general case, the
             # objective function may be noisy, in which case the exact comparison makes no sense.
-            if not (np.isnan(fx_c) and np.isnan(fun_x)) and \
+            if not (np.isnan(fx_c) and np.isnan(fun_x)) and not noisy and \
                     not (abs(fun_x - fx_c) <= gen_prec * max(1, abs(fx_c)) or
                          (abs(fun_x - fx_c) <= cobyla_prec * max(1, abs(fx_c))) and method == 'cobyla'):
                 raise ValueError(
@@ -3360,7 +4696,7 @@ def postpdfo(x, fx, exitflag, output, method, nf, fhist, options, prob_info, con
                     # If the problem turned infeasible, the raw constraint values have been recorded, they just need to
                     # be read in order.
                     if i_meta in prob_info['constr_meta']['linear_indices']:
-                        constr_value.append(np.dot(metadata['A'], output['x']))
+                        constr_value.append(metadata['A'] @ output['x'])
                     else:
                         constr_value.append(output['constr_value'][k_nonlinear:k_nonlinear + metadata['len']])
                         k_nonlinear += metadata['len']
@@ -3371,7 +4707,7 @@ def postpdfo(x, fx, exitflag, output, method, nf, fhist, options, prob_info, con
                         # The constraint is a linear constraint: we just need to compute the product Ax. Since the
                         # computation of the value of the linear constraint is considered low, we do not built the
                         # global evaluation by using the computation already done by the Fortran code.
-                        constr_value.append(np.dot(metadata['A'], output['x']))
+                        constr_value.append(metadata['A'] @ output['x'])
                     else:
                         # The current constraint is a nonlinear constraint: since we should absolutely not re-evaluated
                         # the nonlinear constraint function, we decode the values contain in the constraint array,
@@ -3431,20 +4767,133 @@ def postpdfo(x, fx, exitflag, output, method, nf, fhist, options, prob_info, con
         else:
             output['constr_value'] = constr_value[0]
 
+        if 'model_jacobian' in output:
+            output['model_jacobian'] = _constraints_jacobian(output['model_jacobian'], prob_info, output['x'].size)
+    else:
+        output.pop('model_jacobian', None)
+
+    # Count the failed evaluations of the objective function under the evaluation policy.
+    policy = prob_info.get('policy')
+    if policy is not None:
+        policy.close()
+        output['failures'] = dict(policy.failures)
+        if policy.failures['barriers'] > 0:
+            warn_message = '{}: {} evaluations of the objective function failed and were replaced by the extreme ' \
+                           'barrier; the last error is {!r}.'.format(invoker, policy.failures['barriers'],
+                                                                     policy.last_error)
+            warnings.warn(warn_message, Warning)
+            warning_list.append(warn_message)
+
+    # Count the evaluations of each fidelity of the objective function.
+    fidelity = prob_info.get('fidelity')
+    if fidelity is not None:
+        output['fidelity_nfev'] = dict(fidelity.evaluations)
+
+    # Count the evaluations of the objective function made before the solver started, to time them (method='auto-cost')
+    # or to choose the initial trust-region radii (options['auto_radius']='probe'), and that the solver did not request.
+    precomputed = prob_info.get('precomputed', [])
+    if prob_info.get('probe_nfev') is not None or len(precomputed) > 0:
+        output['probe_nfev'] = (prob_info.get('probe_nfev') or 0) + sum(len(fun.values) for fun in precomputed)
+
+    # Count the evaluations replaced by the predictions of the model screening.
+    screening = prob_info.get('screening')
+    if screening is not None:
+        output['screened'] = screening.evaluations['screened']
+
     # Give back all the warning messages to the user.
     if len(warning_list) > 0:
         output['warnings'] = warning_list
 
     # Build the result and return.
-    result = _build_result(output)
+    result = _build_result(output, options.get(Options.COMPACT_RESULT.value, False))
     if not options[Options.QUIET.value]:
         print(output['message'], end='\n\n')
     return result
 
 
-def _build_result(output):
-    """Build the result of the optimization."""
-    result = OptimizeResult()
+def _full_model(output, prob_info):
+    """Express the models returned by the solver (see _solver_model) in the variables of the problem given by the user.
+
+    The gradients are scaled back and, if the problem was reduced, the derivatives with respect to the fixed variables
+    are NaN. If linear equality constraints were eliminated, the models are only known on the affine subspace that they
+    define, and the returned derivatives are those of the models along this subspace.
+    """
+    for key in ['model_gradient', 'model_hessian', 'model_jacobian']:
+        output.setdefault(key, None)
+    if output['model_gradient'] is None:
+        output['model_jacobian'] = None
+        return
+
+    # The transformations act on the last axis of the arrays, which corresponds to the variables of the solver.
+    pinv = None
+    if prob_info['space_chg'] is not None:
+        # The change of space is affine, and its linear part is obtained from the images of the canonical vectors.
+        n_red = output['model_gradient'].size
+        origin = prob_info['space_chg'](np.zeros(n_red))
+        linear = np.array([prob_info['space_chg'](e) - origin for e in np.eye(n_red)]).T
+        pinv = np.linalg.pinv(linear)
+
+    def full(a):
+        if pinv is not None:
+            a = a @ pinv
+        if prob_info['scaled']:
+            a = a / prob_info['scaling_factor']
+        if prob_info['reduced'] and not prob_info['nofreex']:
+            a_full = np.full(a.shape[:-1] + (prob_info['fixedx'].size,), np.nan)
+            a_full[..., np.logical_not(prob_info['fixedx'])] = a
+            a = a_full
+        return a
+
+    output['model_gradient'] = full(output['model_gradient'])
+    if output['model_hessian'] is not None:
+        output['model_hessian'] = full(full(output['model_hessian']).T).T
+    if output['model_jacobian'] is not None:
+        output['model_jacobian'] = full(output['model_jacobian'])
+
+
+def _constraints_jacobian(jacobian, prob_info, n):
+    """Jacobian matrices of the constraints, with the structure of the constraints given by the user.
+
+    The matrices of the linear constraints are returned as given. Those of the nonlinear constraints are decoded from
+    the rows of `jacobian`, which correspond to the nonlinear constraints received by the solver, as the values of the
+    nonlinear constraints in postpdfo. It returns None if the matrices of some nonlinear constraints are not known.
+    """
+    constr_meta = prob_info['constr_meta']
+    if jacobian is None and len(constr_meta['nonlinear_indices']) > 0:
+        return None
+    jacobians = []
+    k_nonlinear = 0  # index of the current nonlinear constraint in jacobian
+    for i_meta, metadata in enumerate(constr_meta['data']):
+        if i_meta in constr_meta['linear_indices']:
+            jacobians.append(metadata['A'])
+        elif metadata['trivial']:
+            jacobians.append(np.full((metadata['len'], n), np.nan))
+        else:
+            # A component bounded on both sides appears twice, as lb - c(x) and c(x) - ub, and the average of both
+            # estimates is taken. The components bounded on no side are not evaluated.
+            keep_lb = np.logical_not(metadata['dropped_indices_lb'])
+            keep_ub = np.logical_not(metadata['dropped_indices_ub'])
+            n_lb, n_ub = np.count_nonzero(keep_lb), np.count_nonzero(keep_ub)
+            rows_lb = np.full((metadata['len'], n), np.nan)
+            rows_lb[keep_lb] = -jacobian[k_nonlinear:k_nonlinear + n_lb]
+            rows_ub = np.full((metadata['len'], n), np.nan)
+            rows_ub[keep_ub] = jacobian[k_nonlinear + n_lb:k_nonlinear + n_lb + n_ub]
+            rows = np.where(keep_lb[:, np.newaxis], rows_lb, rows_ub)
+            both = keep_lb & keep_ub
+            rows[both] = (rows_lb[both] + rows_ub[both]) / 2
+            jacobians.append(rows)
+            k_nonlinear += n_lb + n_ub
+    return jacobians if constr_meta['is_list'] else jacobians[0]
+
+
+def _build_result(output, compact=False):
+    """Build the result of the optimization, as a CompactOptimizeResult if `compact` is True."""
+    if compact:
+        result = CompactOptimizeResult()
+    else:
+        from scipy.optimize import OptimizeResult
+
+        result = OptimizeResult()
     result.message=output['message']
     result.success=output['success']
     result.status=output['status']
@@ -3467,6 +4916,26 @@ def _build_result(output):
         result.infeasible_linear_constraints = output['InfeasibleLinear']
     if 'InfeasibleNonlinear' in output:
         result.infeasible_nonlinear_constraints = output['InfeasibleNonlinear']
+    if 'portfolio' in output:
+        result.portfolio = output['portfolio']
+    if 'restarts' in output:
+        result.restarts = output['restarts']
+    if 'noise' in output:
+        result.noise = output['noise']
+        result.replicates = output['replicates']
+    if 'failures' in output:
+        result.failures = output['failures']
+    if 'fidelity_nfev' in output:
+        result.fidelity_nfev = output['fidelity_nfev']
+    if 'screened' in output:
+        result.screened = output['screened']
+    if 'probe_nfev' in output:
+        result.probe_nfev = output['probe_nfev']
+    if 'model_gradient' in output:
+        result.model_gradient = output['model_gradient']
+        result.model_hessian = output['model_hessian']
+    if 'model_jacobian' in output:
+        result.model_jacobian = output['model_jacobian']
     if 'warnings' in output:
         result.warnings = output['warnings']
     return result
@@ -3493,7 +4962,7 @@ def import_error_so(missing_file=None):
 
     Dedicated to the late Professor M. J. D. Powell FRS (1936--2015).
     """
-    invoker = stack()[1][3].lower()
+    invoker = _frame_names()[1].lower()
 
     if missing_file is None:
         missing_file = invoker
@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+"""Executors of the parallel evaluations of pdfo: a bound on the number of tasks in flight, and workers on sockets.
+
+Any `concurrent.futures.Executor` (or any object with the methods submit and map) can be given to pdfo in
+``options['executor']`` and to `pdfo.ElementValueCache`. This module provides a wrapper limiting the number of tasks
+in flight on such an executor, and a small transport on sockets, made of a worker server and an executor sending it
+the tasks, which can be replaced by a cluster scheduler offering the same interface.
+"""
+import os
+import pickle
+import secrets
+import socket
+import struct
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+
+def _in_threads(executor):
+    """Whether the tasks of an executor run in threads of the current process, to which nothing is pickled."""
+    return isinstance(getattr(executor, 'executor', executor), ThreadPoolExecutor)
+
+
+class BoundedExecutor(Executor):
+    """Executor forwarding its tasks to another one, with at most `max_in_flight` of them submitted and not done.
+
+    The method submit blocks until a task is done if the limit is reached. The lifetime of the underlying executor is
+    managed by the caller, and shutting down a `BoundedExecutor` only waits for its tasks.
+
+    Parameters
+    ----------
+    executor : `concurrent.futures.Executor`
+        Executor of the tasks.
+    max_in_flight : int
+        Maximum number of tasks in flight.
+    """
+
+    def __init__(self, executor, max_in_flight):
+        if not isinstance(max_in_flight, int) or max_in_flight < 1:
+            raise ValueError('BoundedExecutor: max_in_flight should be a positive integer.')
+        self.executor = executor
+        self.max_in_flight = max_in_flight
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._futures = set()
+        self._lock = threading.Lock()
+
+    def submit(self, fn, /, *args, **kwargs):
+        self._slots.acquire()
+        try:
+            future = self.executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future):
+        with self._lock:
+            self._futures.discard(future)
+        self._slots.release()
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        with self._lock:
+            futures = list(self._futures)
+        if cancel_futures:
+            for future in futures:
+                future.cancel()
+        if wait:
+            for future in futures:
+                try:
+                    future.exception()
+                except BaseException:
+                    pass  # the cancelled futures raise CancelledError
+
+
+# The messages are pickled with the protocol 5, so that the buffers of the arrays they contain (e.g., the points x at
+# which the function is evaluated) are sent as they are after the pickle, and received in preallocated buffers on which
+# the arrays are rebuilt, without any copy in pickle.
+_HEADER = struct.Struct('!Q')
+
+
+def _no_delay(connection):
+    """Disable Nagle's algorithm on the socket of a connection, which would delay the small messages."""
+    try:
+        with socket.socket(fileno=os.dup(connection.fileno())) as sock:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    except OSError:
+        pass  # not a TCP socket
+    return connection
+
+
+def _send(connection, message):
+    buffers = []
+    data = pickle.dumps(message, protocol=5, buffer_callback=buffers.append)
+    raws = [buffer.raw() for buffer in buffers]
+    header = _HEADER.pack(len(raws)) + b''.join(_HEADER.pack(raw.nbytes) for raw in raws)
+    connection.send_bytes(header + data)
+    for raw in raws:
+        connection.send_bytes(raw)
+
+
+def _recv(connection):
+    message = connection.recv_bytes()
+    count = _HEADER.unpack_from(message)[0]
+    sizes = [_HEADER.unpack_from(message, _HEADER.size * (i + 1))[0] for i in range(count)]
+    data = memoryview(message)[_HEADER.size * (count + 1):]
+    buffers = []
+    for size in sizes:
+        buffer = bytearray(size)
+        if size > 0:
+            connection.recv_bytes_into(buffer)
+        else:
+            connection.recv_bytes()
+        buffers.append(buffer)
+    return pickle.loads(data, buffers=buffers)
+
+
+class WorkerServer:
+    """Server running the tasks sent by instances of `pdfo.SocketExecutor`.
+
+    The tasks are pickled callables with their arguments, which is why the server must only accept connections from
+    trusted clients: it listens on the local host by default, and the clients must know its key `authkey`, which is
+    random by default. The tasks are run on `executor`, which is a `concurrent.futures.ThreadPoolExecutor` of `workers`
+    threads by default.
+
+    Parameters
+    ----------
+    address : tuple, optional
+        Address (host, port) on which the server listens. Default is an available port on the local host.
+    workers : int, optional
+        Number of threads of the default executor. Default is the default of `concurrent.futures.ThreadPoolExecutor`.
+    executor : `concurrent.futures.Executor`, optional
+        Executor on which the tasks are run (e.g., a `concurrent.futures.ProcessPoolExecutor`), whose lifetime is
+        managed by the caller.
+    authkey : {bytes, 'random', None}, optional
+        Key authenticating the clients. Default is 'random', i.e., a random key of 32 bytes. None disables the
+        authentication, and any process that can connect to `address` can then run code on the server.
+
+    Attributes
+    ----------
+    authkey : bytes
+        Key authenticating the clients, to be given to `pdfo.SocketExecutor` (None if the authentication is disabled).
+
+    Examples
+    --------
+    A server can be run in its own process as follows, its key being given to the clients by a secure channel.
+
+    >>> from pdfo import WorkerServer
+    >>> server = WorkerServer(('localhost', 6000), workers=8)  # doctest: +SKIP
+    >>> print(server.authkey.hex())  # doctest: +SKIP
+    >>> server.serve_forever()  # doctest: +SKIP
+    """
+
+    def __init__(self, address=('localhost', 0), workers=None, executor=None, authkey='random'):
+        if isinstance(authkey, str) and authkey == 'random':
+            authkey = secrets.token_bytes(32)
+        elif authkey is not None and not isinstance(authkey, bytes):
+            raise ValueError("WorkerServer: authkey should be bytes, 'random', or None.")
+        self.authkey = authkey
+        self._listener = Listener(address, authkey=authkey)
+        self._own_executor = executor is None
+        self.executor = ThreadPoolExecutor(workers) if executor is None else executor
+        self._closed = threading.Event()
+        self._thread = None
+
+    @property
+    def address(self):
+        """Address (host, port) on which the server listens."""
+        return self._listener.address
+
+    def serve_forever(self):
+        """Accept the connections of the clients until the server is closed."""
+        while not self._closed.is_set():
+            try:
+                connection = self._listener.accept()
+            except AuthenticationError:
+                continue  # the client does not know the key
+            except (EOFError, OSError):
+                if self._closed.is_set():
+                    break  # the listener has been closed
+                continue  # the client disconnected during the authentication
+            if self._closed.is_set():
+                connection.close()
+                break
+            threading.Thread(target=self._serve, args=(_no_delay(connection),), daemon=True).start()
+
+    def start(self):
+        """Serve the clients in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def _serve(self, connection):
+        lock = threading.Lock()
+        pending = threading.Condition()  # guards the number of tasks not answered yet
+        in_flight = [0]
+
+        def reply(task_id, future):
+            try:
+                message = (task_id, True, future.result())
+            except BaseException as exc:
+                message = (task_id, False, exc)
+            with lock:
+                try:
+                    _send(connection, message)
+                except (pickle.PicklingError, TypeError, AttributeError) as exc:
+                    _send(connection, (task_id, False, RuntimeError('unpicklable result: {!r}'.format(exc))))
+                except OSError:
+                    pass  # the client is gone
+            with pending:
+                in_flight[0] -= 1
+                pending.notify_all()
+
+        with connection:
+            while True:
+                try:
+                    message = _recv(connection)
+                except (EOFError, OSError):
+                    break
+                if message is None:
+                    # The client shuts down: it is answered once all its tasks are done, and closes the connection.
+                    with pending:
+                        pending.wait_for(lambda: in_flight[0] == 0)
+                    with lock:
+                        _send(connection, None)
+                    break
+                task_id, fn, args, kwargs = message
+                with pending:
+                    in_flight[0] += 1
+                future = self.executor.submit(fn, *args, **kwargs)
+                future.add_done_callback(lambda f, task_id=task_id: reply(task_id, f))
+
+    def close(self):
+        """Stop accepting connections, and shut down the default executor."""
+        self._closed.set()
+        if self._thread is not None:
+            # A connection wakes up the thread waiting for one, as closing the listener does not.
+            try:
+                Client(self.address, authkey=self.authkey).close()
+            except OSError:
+                pass
+            self._thread.join()
+        self._listener.close()
+        if self._own_executor:
+            self.executor.shutdown()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SocketExecutor(Executor):
+    """Executor sending its tasks to a `pdfo.WorkerServer`.
+
+    The callables and their arguments must be picklable. The NumPy arrays are sent without being copied into the
+    pickles. At most `max_in_flight` tasks are sent and not done, and submit blocks until a task is done if the limit is
+    reached.
+
+    Parameters
+    ----------
+    address : tuple
+        Address (host, port) of the server.
+    max_in_flight : int, optional
+        Maximum number of tasks in flight. Default is None, i.e., no limit.
+    authkey : bytes, optional
+        Key authenticating the client to the server, i.e., the attribute `authkey` of the server. Default is None, for
+        the servers whose authentication is disabled.
+    """
+
+    def __init__(self, address, max_in_flight=None, authkey=None):
+        if max_in_flight is not None and (not isinstance(max_in_flight, int) or max_in_flight < 1):
+            raise ValueError('SocketExecutor: max_in_flight should be a positive integer or None.')
+        self._connection = _no_delay(Client(address, authkey=authkey))
+        self._slots = None if max_in_flight is None else threading.BoundedSemaphore(max_in_flight)
+        self._futures = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._shutdown = False
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def submit(self, fn, /, *args, **kwargs):
+        if self._shutdown:
+            raise RuntimeError('SocketExecutor: cannot schedule new tasks after shutdown.')
+        if self._slots is not None:
+            self._slots.acquire()
+        future = Future()
+        with self._lock:
+            task_id = self._next_id
+            self._next_id += 1
+            self._futures[task_id] = future
+            # The future runs before the task is sent, as the reader thread may set its result as soon as it is.
+            future.set_running_or_notify_cancel()
+            try:
+                _send(self._connection, (task_id, fn, args, kwargs))
+            except BaseException:
+                del self._futures[task_id]
+                if self._slots is not None:
+                    self._slots.release()
+                raise
+        return future
+
+    def _read(self):
+        while True:
+            try:
+                message = _recv(self._connection)
+            except (EOFError, OSError):
+                break
+            if message is None:
+                break  # answer to the shutdown
+            task_id, success, value = message
+            with self._lock:
+                future = self._futures.pop(task_id)
+            if self._slots is not None:
+                self._slots.release()
+            if success:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+        # The connection is closed: the tasks in flight, if any, are lost.
+        with self._lock:
+            futures, self._futures = list(self._futures.values()), {}
+        for future in futures:
+            future.set_exception(ConnectionError('SocketExecutor: the connection to the server is closed.'))
+        if self._shutdown:
+            self._connection.close()
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            try:
+                _send(self._connection, None)
+            except OSError:
+                pass  # the server is gone, and so is the reader
+        if wait:
+            self._reader.join()
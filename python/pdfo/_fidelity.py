@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""Multi-fidelity evaluations of the objective function, the expensive ones being screened by a cheap one."""
+import numpy as np
+
+from ._screening import Screening
+
+
+class MultiFidelity(Screening):
+    """Objective function whose expensive (high-fidelity) evaluations are screened by a cheap (low-fidelity) one.
+
+    At each point x requested by the solver, the low-fidelity function is evaluated first, and corrected by the
+    difference between the two fidelities at the nearest point evaluated in high fidelity. The error of this prediction
+    is bounded by the distance to this point times a slope, the largest ratio of the prediction errors to these
+    distances at the last high-fidelity evaluations, enlarged by a safety factor. If the prediction minus its error bound
+    is not less than the least high-fidelity value so far, the prediction is returned to the solver, which sees no
+    decrease at x and builds its model on it; otherwise, the high-fidelity function is evaluated. Hence, the high-fidelity
+    evaluations are saved if the difference between the fidelities varies slowly. The points where the low-fidelity
+    value is not finite are always evaluated in high fidelity.
+    """
+
+    def __init__(self, fun, low):
+        super().__init__(fun)
+        self.low = low
+        self.evaluations = {'low': 0, 'high': 0}
+
+    def _predict(self, x, args, points, values):
+        flow = np.asarray(self.low(x, *args), dtype=np.float64).reshape(-1)
+        if flow.size != 1:
+            raise ValueError('pdfo: the low-fidelity objective function should return a scalar.')
+        flow = flow[0]
+        with self._lock:
+            self.evaluations['low'] += 1
+        if values.size == 0 or not np.isfinite(flow):
+            return np.nan, np.nan, flow
+        distances = np.linalg.norm(points - x, axis=1)
+        nearest = np.argmin(distances)
+        return flow + values[nearest], distances[nearest], flow
+
+    def _count(self, screened):
+        if not screened:
+            self.evaluations['high'] += 1
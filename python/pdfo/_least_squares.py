@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""Least-squares solver of pdfo (method='bobyqa-ls'), which builds a linear model of each residual."""
+import numpy as np
+
+from ._settings import ExitStatus, Options
+
+
+def _trsbox(g, h, delta, sl, su):
+    """Approximate minimizer of the quadratic g^T s + s^T h s / 2 subject to ||s|| <= delta and sl <= s <= su.
+
+    It is the truncated conjugate gradient method of the first stage of TRSBOX in BOBYQA: the variables are fixed at
+    their bounds when they reach them, and the conjugate gradient method is then restarted on the other variables. The
+    bounds satisfy sl <= 0 <= su.
+    """
+    n = g.size
+    s = np.zeros(n)
+    gs = np.copy(g)  # gradient of the quadratic at s
+    fixed = ((sl >= 0) & (g < 0)) | ((su <= 0) & (g > 0))
+    d = np.where(fixed, 0., -gs)
+    gg = np.dot(d, d)
+    for _ in range(2 * n):
+        if gg <= 1e-30 * max(1., np.dot(g, g)):
+            break
+
+        # Largest step along d in the trust region and within the bounds.
+        dd, sd = np.dot(d, d), np.dot(s, d)
+        alpha_tr = (np.sqrt(max(sd ** 2 + dd * (delta ** 2 - np.dot(s, s)), 0.)) - sd) / dd
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bound_steps = np.where(d > 0, (su - s) / d, np.where(d < 0, (sl - s) / d, np.inf))
+        i_bound = np.argmin(bound_steps)
+        alpha_bound = bound_steps[i_bound]
+        hd = h @ d
+        dhd = np.dot(d, hd)
+        alpha = -np.dot(gs, d) / dhd if dhd > 0 else np.inf
+        alpha = min(alpha, alpha_tr, alpha_bound)
+
+        s += alpha * d
+        gs += alpha * hd
+        if alpha == alpha_tr:
+            break  # the boundary of the trust region is reached
+        if alpha == alpha_bound:
+            # The variable is fixed at its bound, and the conjugate gradient method is restarted.
+            s[i_bound] = su[i_bound] if d[i_bound] > 0 else sl[i_bound]
+            fixed[i_bound] = True
+            d = np.where(fixed, 0., -gs)
+            gg = np.dot(d, d)
+        else:
+            gg_new = np.dot(gs[~fixed], gs[~fixed])
+            d = np.where(fixed, 0., -gs + gg_new / gg * d)
+            gg = gg_new
+    return s
+
+
+def fit(fun, residuals, x0, bounds, options):
+    """Minimize the sum of the squares of the residuals for the problem preprocessed by prepdfo.
+
+    The method is a derivative-free Gauss-Newton trust-region method. The residuals are modeled by linear functions
+    interpolating them at n + 1 points, whose Jacobian J gives the model ||r + J s||^2 of the objective function, which
+    is minimized in the trust region and within the bounds by the method of TRSBOX. As in BOBYQA, the trust-region
+    radius is at least a lower bound rho, decreased from rhobeg to rhoend when the steps become short and the
+    interpolation points are close. `fun` returns the sum of the squares of the residuals and sets residuals['value'].
+    """
+    from scipy.optimize import OptimizeResult
+
+    n = x0.size
+    lb, ub = bounds['lb'], bounds['ub']
+    maxfev = options[Options.MAXFEV.value]
+    rhobeg = options[Options.RHOBEG.value]
+    rhoend = options[Options.RHOEND.value]
+    ftarget = options[Options.FTARGET.value]
+
+    fhist = []
+
+    def evaluate(x):
+        residuals['value'] = None  # it remains None if the evaluation fails under the evaluation policy
+        fx = fun(x)
+        fhist.append(fx)
+        if residuals['value'] is None:
+            if len(fhist) == 1:
+                raise ValueError('bobyqa-ls: the residuals could not be evaluated at the initial point.')
+            rx = np.full(rvals.shape[1], np.nan)
+        else:
+            rx = np.copy(residuals['value'])
+        if not np.all(np.isfinite(rx)):
+            rx = np.full(rx.size, np.sqrt(fx / rx.size))  # fx is the extreme barrier set by prepdfo
+        return fx, rx
+
+    # The initial interpolation points are x0 and x0 +/- rhobeg * e_i, as in BOBYQA (prepdfo ensured that x0 is either
+    # on the bounds or at least rhobeg away from them).
+    f0, r0 = evaluate(x0)
+    points = np.tile(x0, (n + 1, 1))
+    fvals = np.full(n + 1, f0)
+    rvals = np.zeros((n + 1, r0.size))
+    rvals[0] = r0
+    status = None
+    for i in range(n):
+        if fvals.min() <= ftarget or len(fhist) >= maxfev:
+            break
+        points[i + 1, i] += rhobeg if x0[i] + rhobeg <= ub[i] else -rhobeg
+        fvals[i + 1], rvals[i + 1] = evaluate(points[i + 1])
+
+    kopt = np.argmin(fvals)
+    rho = delta = rhobeg
+    while status is None:
+        if fvals[kopt] <= ftarget:
+            status = ExitStatus.TARGET_SUCCESS.value
+            break
+        if len(fhist) >= maxfev:
+            status = ExitStatus.MAX_EVAL_WARNING.value
+            break
+
+        # Linear models of the residuals around the best point.
+        xopt, fopt, ropt = points[kopt], fvals[kopt], rvals[kopt]
+        others = np.flatnonzero(np.arange(n + 1) != kopt)
+        displacements = points[others] - xopt
+        jacobian = np.linalg.lstsq(displacements, rvals[others] - ropt, rcond=None)[0].T
+        gradient = jacobian.T @ ropt
+        distances = np.linalg.norm(displacements, axis=1)
+
+        step = _trsbox(2 * gradient, 2 * jacobian.T @ jacobian, delta, lb - xopt, ub - xopt)
+        step_norm = np.linalg.norm(step)
+        if step_norm >= rho / 2:
+            predicted = fopt - np.sum((ropt + jacobian @ step) ** 2)
+            xnew = np.clip(xopt + step, lb, ub)
+            fnew, rnew = evaluate(xnew)
+            ratio = (fopt - fnew) / predicted if predicted > 0 else -1.
+
+            # Update the trust-region radius.
+            if ratio <= .1:
+                delta = min(delta / 2, step_norm)
+            elif ratio <= .7:
+                delta = max(delta / 2, step_norm)
+            else:
+                delta = max(delta, 2 * step_norm)
+            if delta <= 1.5 * rho:
+                delta = rho
+
+            # The new point replaces the one whose Lagrange function is the largest at it, weighted by its distance.
+            lagrange = np.linalg.lstsq(displacements.T, xnew - xopt, rcond=None)[0]
+            weights = np.abs(lagrange) * np.maximum(1., distances / delta) ** 2
+            k = others[np.argmax(weights)]
+            points[k], fvals[k], rvals[k] = xnew, fnew, rnew
+            if fnew < fopt:
+                kopt = k
+            if ratio > .1 or kopt == k:
+                continue
+            displacements = points[others] - xopt
+            distances = np.linalg.norm(displacements, axis=1)
+        else:
+            delta = max(delta / 10, rho)
+
+        # The step is short or has failed. If an interpolation point is far from the best one, it is replaced by a
+        # point that improves the geometry. Otherwise, rho is decreased as in BOBYQA once delta has reached it.
+        far = np.argmax(distances)
+        if distances[far] > 2 * delta:
+            k = others[far]
+            direction = np.linalg.lstsq(displacements, np.eye(n)[far], rcond=None)[0]  # gradient of the Lagrange function
+            direction *= delta / max(np.linalg.norm(direction), np.finfo(float).tiny)
+            candidates = [np.clip(xopt + direction, lb, ub), np.clip(xopt - direction, lb, ub)]
+            xnew = max(candidates, key=lambda x: abs(np.dot(x - xopt, direction)))
+            points[k] = xnew
+            fvals[k], rvals[k] = evaluate(xnew)
+            if fvals[k] < fopt:
+                kopt = k
+        elif delta > rho:
+            continue
+        elif rho <= rhoend:
+            status = ExitStatus.RADIUS_SUCCESS.value
+        else:
+            if rho <= 16 * rhoend:
+                rho_new = rhoend
+            elif rho <= 250 * rhoend:
+                rho_new = np.sqrt(rho * rhoend)
+            else:
+                rho_new = rho / 10
+            delta = max(rho / 2, rho_new)
+            rho = rho_new
+
+    if status is None:
+        status = ExitStatus.TARGET_SUCCESS.value if fvals.min() <= ftarget else ExitStatus.MAX_EVAL_WARNING.value
+    kopt = np.argmin(fvals)
+    fhist = np.array(fhist, dtype=np.float64)
+    result = OptimizeResult({'x': np.copy(points[kopt]), 'fun': fvals[kopt], 'status': status, 'nfev': fhist.size,
+                             'fhist': fhist, 'warnings': []})
+    if np.any(np.isfinite(np.r_[lb, ub])):
+        result.update(constrviolation=0., chist=np.zeros_like(fhist))
+    if options[Options.RETURN_MODEL.value]:
+        # Gauss-Newton model of the objective function at the returned point, available once the n + 1 initial points
+        # have been evaluated.
+        result.update(model_gradient=None, model_hessian=None)
+        if fhist.size > n:
+            others = np.flatnonzero(np.arange(n + 1) != kopt)
+            jacobian = np.linalg.lstsq(points[others] - points[kopt], rvals[others] - rvals[kopt], rcond=None)[0].T
+            result.update(model_gradient=2 * jacobian.T @ rvals[kopt], model_hessian=2 * jacobian.T @ jacobian)
+    return result
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""Lockstep solution of many problems of the same shape, whose objective functions are evaluated together."""
+import multiprocessing
+import os
+from collections import deque
+
+import numpy as np
+
+
+def _lockstep_worker(connection):
+    """Loop of a worker process, which solves the instances it receives, and sends the points at which their objective
+    functions are requested as ('x', x), and their results as ('result', res) or ('error', exc)."""
+    from ._pdfo import pdfo
+
+    def fun(x):
+        connection.send(('x', x))
+        return connection.recv()
+
+    while True:
+        task = connection.recv()
+        if task is None:
+            break
+        x0, method, bounds, options = task
+        try:
+            res = pdfo(fun, x0, method=method, bounds=bounds, options=options)
+        except Exception as exc:
+            connection.send(('error', exc))
+        else:
+            connection.send(('result', res))
+
+
+def lockstep(fun, x0, args=(), method=None, bounds=None, options=None, workers=None):
+    """Solve many instances of a problem with NEWUOA or BOBYQA, whose objective functions are evaluated together.
+
+    The instances have the same number of variables and the same options, and they differ in their initial guesses, and
+    possibly in their bounds and in the data of their objective functions. The solvers of the instances advance in
+    lockstep: at each round, every active instance requests its next point, and the objective function is called once
+    for all of them, with a matrix of points. An instance leaves the batch when its solver returns, and the next instance
+    not solved yet takes its place.
+
+    Each solver runs on a worker process, as the Fortran solvers cannot be interrupted in the middle of a solve, so that
+    at most `workers` instances are solved at the same time. The objective function is evaluated in the current process.
+
+    Parameters
+    ----------
+    fun : callable
+        Objective functions of the active instances, called as
+
+            ``fun(x, indices, *args) -> array_like, shape (k,)``
+
+        where ``x`` is an array with shape (k, n), whose row i is the point requested by the instance ``indices[i]``.
+    x0 : array_like, shape (K, n)
+        Initial guesses of the K instances.
+    args : tuple, optional
+        Extra arguments of the objective function.
+    method : {'newuoa', 'bobyqa'}, optional
+        Solver of the instances. Default is 'bobyqa' if `bounds` is given, and 'newuoa' otherwise.
+    bounds : `scipy.optimize.Bounds` or array_like, optional
+        Bound constraints of the instances, either a `scipy.optimize.Bounds` or a sequence of n pairs (lb, ub), in the
+        same way as in `pdfo.pdfo`. The lower and upper bounds may also be arrays with shape (K, n), one row for each
+        instance.
+    options : dict, optional
+        Options of the solver, shared by all the instances. See `pdfo.pdfo`.
+    workers : int, optional
+        Number of worker processes, i.e., maximum number of instances solved at the same time. Default is
+        ``min(K, 4 * os.cpu_count())``.
+
+    Returns
+    -------
+    list of `scipy.optimize.OptimizeResult`
+        Results of the instances, in their order in `x0`.
+
+    Examples
+    --------
+    The following minimizes the quadratic functions of minimizers ``c[k]`` from ``x0 = 0``.
+
+    >>> import numpy as np
+    >>> from pdfo import lockstep
+    >>> c = np.arange(12.).reshape(4, 3)
+    >>> results = lockstep(lambda x, indices: np.sum((x - c[indices]) ** 2, axis=1), np.zeros((4, 3)))
+    >>> np.allclose([res.x for res in results], c, atol=1e-4)
+    True
+    """
+    from scipy.optimize import Bounds
+
+    x0 = np.asarray(x0, dtype=np.float64)
+    if x0.ndim != 2 or x0.size == 0:
+        raise ValueError('lockstep: the initial guesses should be a nonempty matrix of shape (K, n).')
+    n_instances, n = x0.shape
+    if method is None:
+        method = 'newuoa' if bounds is None else 'bobyqa'
+    if not isinstance(method, str) or method.lower() not in ['newuoa', 'bobyqa']:
+        raise ValueError("lockstep: the method should be 'newuoa' or 'bobyqa'.")
+    method = method.lower()
+    if method == 'newuoa' and bounds is not None:
+        raise ValueError('lockstep: NEWUOA cannot solve bound-constrained problems.')
+    args = () if args is None else tuple(args) if hasattr(args, '__len__') else (args,)
+    if workers is None:
+        workers = min(n_instances, 4 * (os.cpu_count() or 1))
+    elif not isinstance(workers, (int, np.integer)) or workers < 1:
+        raise ValueError('lockstep: workers should be a positive integer.')
+    workers = min(int(workers), n_instances)
+
+    # The bounds of each instance are extracted from those of all the instances.
+    if bounds is not None:
+        if isinstance(bounds, Bounds):
+            lb, ub = bounds.lb, bounds.ub
+        else:
+            bounds = np.asarray(bounds, dtype=np.float64)
+            if bounds.shape != (n, 2):
+                raise ValueError('lockstep: the bounds should be a Bounds or a sequence of n pairs (lb, ub).')
+            lb, ub = bounds[:, 0], bounds[:, 1]
+        try:
+            lb = np.broadcast_to(np.asarray(lb, dtype=np.float64), x0.shape)
+            ub = np.broadcast_to(np.asarray(ub, dtype=np.float64), x0.shape)
+        except ValueError:
+            raise ValueError('lockstep: the bounds should have shape (n,) or (K, n).')
+
+    def task(k):
+        return x0[k], method, None if bounds is None else Bounds(lb[k], ub[k]), options
+
+    results = [None] * n_instances
+    pending = deque(range(n_instances))
+    context = multiprocessing.get_context()
+    connections, processes = [], []
+    active = {}  # instance solved by each worker
+    try:
+        for _ in range(workers):
+            connection, child_connection = context.Pipe()
+            process = context.Process(target=_lockstep_worker, args=(child_connection,), daemon=True)
+            process.start()
+            child_connection.close()
+            connections.append(connection)
+            processes.append(process)
+
+        for connection in connections:
+            k = pending.popleft()
+            connection.send(task(k))
+            active[connection] = k
+
+        while active:
+            # Gather the next point requested by each active instance. The workers whose instance is solved receive the
+            # next one, which requests its initial guess.
+            requests = []
+            for connection in list(active):
+                while True:
+                    kind, value = connection.recv()
+                    if kind == 'x':
+                        requests.append((connection, value))
+                        break
+                    if kind == 'error':
+                        raise value
+                    results[active.pop(connection)] = value
+                    if not pending:
+                        break
+                    k = pending.popleft()
+                    connection.send(task(k))
+                    active[connection] = k
+            if not requests:
+                break
+
+            # Evaluate the objective functions of the batch, and scatter their values.
+            indices = np.array([active[connection] for connection, _ in requests])
+            values = np.asarray(fun(np.array([x for _, x in requests]), indices, *args), dtype=np.float64)
+            if values.shape != (len(requests),):
+                raise ValueError('lockstep: the objective function should return one value for each row of x.')
+            for (connection, _), value in zip(requests, values):
+                connection.send(value)
+    finally:
+        # The workers are stopped, or terminated if the lockstep was interrupted while they wait for a value.
+        for process, connection in zip(processes, connections):
+            if active:
+                process.terminate()
+            else:
+                connection.send(None)
+            process.join()
+            connection.close()
+    return results
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""Noise-aware mode of pdfo, in which the objective function is stochastic and its values are averaged."""
+import numpy as np
+
+from ._restart import _restart_solve
+from ._settings import ExitStatus, Options
+
+# Number of evaluations of the objective function at the initial point, from which the noise level is first estimated.
+NOISE_SAMPLES = 5
+
+# Factor by which the trust-region radius is decreased at each stage.
+STAGE_REDUCTION = 10.
+
+
+def _noise_level(values):
+    """Pooled estimate of the standard deviation of the noise from the replicated values at all the points."""
+    squares, freedom = 0., 0
+    for replicates in values.values():
+        if len(replicates) > 1:
+            squares += np.var(replicates) * len(replicates)
+            freedom += len(replicates) - 1
+    return np.sqrt(squares / freedom) if freedom > 0 else np.nan
+
+
+def resample(fun, x0, bounds, constraints, options, method, noise):
+    """Solve the problem preprocessed by prepdfo with `method`, its objective function being stochastic.
+
+    The solver is run in stages, each of which decreases the trust-region radius by STAGE_REDUCTION, from
+    `options['radius_init']` to `options['radius_final']`. The value given to the solver at a point is the average of k
+    replicated evaluations of the objective function, mapped on `noise['executor']` if any. The noise level sigma is
+    estimated from all the replicates, and a stage is considered to be below the noise when the decrease of the
+    objective function it achieves is less than twice the standard deviation of the difference of two averages. The
+    stage is then repeated with four times as many replicates (which halves the standard deviation of the averages), and
+    the solver stops once `noise['max_replicates']` is reached. The nonlinear constraint functions are assumed to be
+    deterministic, and are evaluated once at each point.
+
+    The budget `options['maxfev']` and the number of function evaluations count each replicate, and the histories
+    contain the values of all the replicates (the constraint violation at a point being repeated for each of them).
+    """
+    from scipy.optimize import OptimizeResult
+
+    n = x0.size
+    maxfev = options[Options.MAXFEV.value]
+    rhoend = options[Options.RHOEND.value]
+    max_replicates = noise['max_replicates']
+    executor = noise['executor']
+    if method == 'uobyqa':
+        npt = (n + 1) * (n + 2) // 2
+    elif method == 'cobyla':
+        npt = n + 1
+    else:
+        npt = options[Options.NPT.value]
+
+    # The replicates of each point are kept, so that a point is only evaluated again to complete them when the number
+    # of replicates increases. The number of new evaluations at each call of the solver is recorded for the histories.
+    values = {}
+    fhist = []
+    counts = []
+    replicates = 1
+
+    def evaluate(x, count):
+        key = x.tobytes()
+        known = values.setdefault(key, [])
+        missing = min(count - len(known), max(maxfev - len(fhist), 0 if known else 1))  # within the budget if possible
+        if missing > 1 and executor is not None:
+            known.extend(executor.map(fun, [np.copy(x) for _ in range(missing)]))
+        else:
+            known.extend(fun(np.copy(x)) for _ in range(missing))
+        fhist.extend(known[len(known) - max(missing, 0):])
+        counts.append(max(missing, 0))
+        return np.mean(known)
+
+    def averaged_fun(x):
+        return evaluate(x, replicates)
+
+    # First estimate of the noise level at the initial point, leaving enough budget for the solver to build its first
+    # model.
+    f0 = evaluate(x0, min(NOISE_SAMPLES, max(maxfev - npt, 1)))
+    sigma = _noise_level(values)
+
+    best = None
+    chist, warning_list = [], []
+    radius = options[Options.RHOBEG.value]
+    radius_end = max(radius / STAGE_REDUCTION, rhoend)
+    fstart = f0
+    while True:
+        xstart = x0 if best is None else best.x
+        if best is not None:
+            if best.status != ExitStatus.RADIUS_SUCCESS.value:
+                break
+            if fstart - best.fun < 2 * np.sqrt(2) * sigma / np.sqrt(replicates):
+                # The decrease achieved by the stage is below the noise, and the stage is repeated with more replicates.
+                if 4 * replicates > max_replicates:
+                    break
+                replicates *= 4
+            elif radius_end <= rhoend:
+                break
+            else:
+                radius, radius_end = radius_end, max(radius_end / STAGE_REDUCTION, rhoend)
+            fstart = best.fun
+
+        # The first call of the solver only completes the replicates at the starting point, and the other calls need
+        # at most `replicates` evaluations each, which gives the budget of the solver.
+        remaining = maxfev - len(fhist) - max(replicates - len(values[xstart.tobytes()]), 0)
+        if best is not None and remaining < npt * replicates:
+            break
+        options_c = dict(options)
+        options_c.update({Options.RHOBEG.value: radius, Options.RHOEND.value: radius_end,
+                          Options.MAXFEV.value: max(remaining // replicates, 0) + 1})
+        counts.clear()
+        res = _restart_solve(method, averaged_fun, xstart, bounds, constraints, options_c)
+        if res.get('chist') is not None:
+            chist.append(np.repeat(res.chist[:res.nfev], counts[:res.nfev]))
+        warning_list.extend(w for w in res.warnings if w not in warning_list)
+        best = res
+        sigma = _noise_level(values)
+
+    fhist = np.array(fhist, dtype=np.float64)
+    result = OptimizeResult(best)
+    result.update(nfev=fhist.size, fhist=fhist, warnings=warning_list, noise=sigma, replicates=replicates)
+    if len(chist) > 0:
+        chist = np.concatenate(chist)
+        result.chist = np.r_[np.full(fhist.size - chist.size, chist[0]), chist]  # the first values are at x0
+    return result
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""Parallel evaluation of the initial interpolation points of the solvers of pdfo, before the solvers request them."""
+import numpy as np
+
+from ._restart import _restart_solve
+from ._settings import ExitStatus, Options
+
+
+def _key(x):
+    """Key of a point in the cache; adding zero identifies -0.0 with 0.0, as the Fortran code may produce either."""
+    return (x + 0.).tobytes()
+
+
+def _cross_indices(n, npt):
+    """Pairs of coordinates (i, j) of the initial interpolation points beyond the first 2n + 1 ones in NEWUOA and
+    BOBYQA, as computed in newuob.f and prelim.f (0-based)."""
+    pairs = []
+    for nfm in range(2 * n + 1, npt):
+        itemp = (nfm - n - 1) // n
+        jpt = nfm - itemp * n - n
+        ipt = jpt + itemp
+        if ipt > n:
+            ipt, jpt = jpt, ipt - n
+        pairs.append((ipt - 1, jpt - 1))
+    return pairs
+
+
+def _newuoa_batches(x0, rhobeg, npt):
+    """Initial interpolation points of NEWUOA (see newuob.f), by batches whose points depend on the values at the
+    points of the previous batches."""
+    n = x0.size
+    steps = np.r_[np.zeros((1, n)), rhobeg * np.eye(n), -rhobeg * np.eye(n)][:npt]
+    fvals = yield [x0 + step for step in steps]
+    if npt > 2 * n + 1:
+        points = []
+        for i, j in _cross_indices(n, npt):
+            step = np.zeros(n)
+            step[i] = -rhobeg if fvals[i + n + 1] < fvals[i + 1] else rhobeg
+            step[j] = -rhobeg if fvals[j + n + 1] < fvals[j + 1] else rhobeg
+            points.append(x0 + step)
+        yield points
+
+
+def _bobyqa_batches(x0, rhobeg, npt, lb, ub):
+    """Initial interpolation points of BOBYQA (see bobyqa.f and prelim.f), including the shift of the initial point
+    onto the bounds that are closer than rhobeg."""
+    n = x0.size
+    x0 = np.copy(x0)
+    sl, su = lb - x0, ub - x0
+    for j in range(n):
+        if sl[j] >= -rhobeg:
+            if sl[j] >= 0:
+                x0[j], sl[j], su[j] = lb[j], 0., ub[j] - lb[j]
+            else:
+                x0[j], sl[j] = lb[j] + rhobeg, -rhobeg
+                su[j] = max(ub[j] - x0[j], rhobeg)
+        elif su[j] <= rhobeg:
+            if su[j] <= 0:
+                x0[j], sl[j], su[j] = ub[j], -(ub[j] - lb[j]), 0.
+            else:
+                x0[j], su[j] = ub[j] - rhobeg, rhobeg
+                sl[j] = min(lb[j] - x0[j], -rhobeg)
+
+    def point(step):
+        x = np.minimum(np.maximum(lb, x0 + step), ub)
+        x[step == sl] = lb[step == sl]
+        x[step == su] = ub[step == su]
+        return x
+
+    stepa = np.where(su == 0, -rhobeg, rhobeg)
+    stepb = np.full(n, -rhobeg)
+    stepb = np.where(sl == 0, np.minimum(2 * rhobeg, su), stepb)
+    stepb = np.where(su == 0, np.maximum(-2 * rhobeg, sl), stepb)
+    steps = np.r_[np.zeros((1, n)), np.diag(stepa), np.diag(stepb)][:npt]
+    fvals = yield [point(step) for step in steps]
+    if npt > 2 * n + 1:
+        # The two points along each coordinate are exchanged in prelim.f if the second one is better and on the other
+        # side of the initial point, and the other initial points are built from the first ones.
+        swap = (stepa * stepb < 0) & (np.asarray(fvals[n + 1:2 * n + 1]) < np.asarray(fvals[1:n + 1]))
+        first = np.where(swap, stepb, stepa)
+        points = []
+        for i, j in _cross_indices(n, npt):
+            step = np.zeros(n)
+            step[i], step[j] = first[i], first[j]
+            points.append(point(step))
+        yield points
+
+
+def _uobyqa_batches(x0, rhobeg):
+    """Initial interpolation points of UOBYQA (see uobyqb.f)."""
+    n = x0.size
+    fvals = yield [x0] + [x0 + rhobeg * e for e in np.eye(n)]
+    w = np.where(np.asarray(fvals[1:]) < fvals[0], rhobeg, -rhobeg)
+    points = [x0 + (2 * rhobeg if w[j] > 0 else -rhobeg) * e for j, e in enumerate(np.eye(n))]
+    for q in range(1, n):
+        for p in range(q):
+            step = np.zeros(n)
+            step[p], step[q] = w[p], w[q]
+            points.append(x0 + step)
+    yield points
+
+
+def prefetch(fun, x0, bounds, constraints, options, method, executor):
+    """Solve the problem preprocessed by prepdfo with `method`, the initial interpolation points being evaluated in
+    parallel on `executor`.
+
+    The solvers evaluate the objective function sequentially, and their iterations depend on the values just computed.
+    However, their initial interpolation points are known in advance, or only depend on the values at the previous
+    initial points. They are computed as in the Fortran code, by at most two batches, whose evaluations are mapped on
+    the executor. The solver then receives the values of these points from a cache, and only the following points are
+    evaluated sequentially. The points are compared by their bits, so that a point is taken from the cache only if the
+    solver would have evaluated the function at it. Up to `options['maxfev']` initial points are evaluated, and those
+    that are not requested by the solver (because it reaches `options['ftarget']` before) are appended to the history.
+    """
+    maxfev = options[Options.MAXFEV.value]
+    rhobeg = options[Options.RHOBEG.value]
+    if method == 'uobyqa':
+        batches = _uobyqa_batches(x0, rhobeg)
+    elif method == 'bobyqa':
+        batches = _bobyqa_batches(x0, rhobeg, options[Options.NPT.value], bounds['lb'], bounds['ub'])
+    else:
+        batches = _newuoa_batches(x0, rhobeg, options[Options.NPT.value])
+
+    # The values of the initial points, in the order of the solver.
+    points, fvals = [], []
+    batch = next(batches)
+    while len(points) < maxfev:
+        batch = batch[:maxfev - len(points)]
+        points.extend(batch)
+        fvals.extend(executor.map(fun, batch))
+        if len(points) == maxfev or np.min(fvals) <= options[Options.FTARGET.value]:
+            break
+        try:
+            batch = batches.send(fvals)
+        except StopIteration:
+            break
+    # Each value is given once to the solver, which evaluates the function again if it requests the same point later.
+    values = {_key(x): f for x, f in zip(points, fvals)}
+
+    def cached_fun(x):
+        key = _key(x)
+        if key in values:
+            return values.pop(key)
+        return fun(x)
+
+    res = _restart_solve(method, cached_fun, x0, bounds, constraints, options)
+
+    # The initial points that have not been requested by the solver have nonetheless been evaluated.
+    unused = [i for i, x in enumerate(points) if _key(x) in values]
+    if len(unused) > 0:
+        nf = res.nfev
+        res.update(nfev=nf + len(unused), fhist=np.r_[res.fhist[:nf], [fvals[i] for i in unused]])
+        if res.get('chist') is not None:
+            res.chist = np.r_[res.chist[:nf], np.zeros(len(unused))]  # only BOBYQA, whose points are feasible
+        best = min(unused, key=lambda i: fvals[i])
+        if fvals[best] < res.fun:
+            res.update(x=points[best], fun=fvals[best])
+            if res.fun <= options[Options.FTARGET.value]:
+                res.status = ExitStatus.TARGET_SUCCESS.value
+    return res
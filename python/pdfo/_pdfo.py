@@ -22,7 +22,13 @@ def pdfo(fun, x0, args=(), method=None, bounds=None, constraints=(), options=Non
 
             ``fun(x, *args) -> float``
 
-        where ``x`` is an array with shape (n,) and `args` is a tuple.
+        where ``x`` is an array with shape (n,) and `args` is a tuple. If the
+        function is a sum of element functions of few variables, it can be
+        given as a `pdfo.ElementValueCache`, which caches the values of the
+        elements and evaluates only those whose variables changed, whose
+        elements are modeled separately by ``method='bobyqa-ps'``, and whose
+        structure is used by ``method='subspace'`` to build the blocks of
+        coordinates.
     x0 : array_like, shape (n,)
         Initial guess.
     args : tuple, optional
@@ -34,13 +40,36 @@ def pdfo(fun, x0, args=(), method=None, bounds=None, constraints=(), options=Non
 
             ``pdfo(lambda x: fun(x, *args), x0, ...)``
 
-    method : {'uobyqa', 'newuoa', 'bobyqa', 'lincoa', 'cobyla'}, optional
+        If the evaluations may be sent to worker processes (with
+        ``options['executor']`` or ``method='portfolio'``), the NumPy arrays
+        of at least 1 MiB in `args` are copied once into shared memory (see
+        `pdfo.share`), and the workers receive read-only views of them
+        instead of pickled copies.
+    method : {'uobyqa', 'newuoa', 'bobyqa', 'lincoa', 'cobyla', 'auto-cost', 'portfolio', 'subspace', 'bobyqa-ls', 'bobyqa-ps'}, optional
         Name of the Powell method that will be used. By default, 'uobyqa'
         is selected if the problem is unconstrained with ``2 <= n <= 8``,
         'newuoa' is selected if the problem is unconstrained with ``n = 1``
         or ``n >= 9``, 'bobyqa' is selected if the problem is
         bound-constrained, 'lincoa' is selected if the problem is linearly
-        constrained, and 'cobyla' is selected otherwise.
+        constrained, and 'cobyla' is selected otherwise. If 'auto-cost' is
+        given, the solver and ``options['npt']`` are selected to minimize the
+        expected running time, according to the time taken by the first
+        function evaluations and to a cost model of the solvers (see
+        ``options['cost_model']``). If 'portfolio' is given, several solver
+        configurations race on worker processes (see ``options['portfolio']``)
+        and the best point found by all of them is returned. If 'subspace' is
+        given, NEWUOA (or BOBYQA if the problem is bound-constrained) minimizes
+        the objective function on successive low-dimensional subspaces, which
+        is suitable for problems with thousands of variables (see
+        ``options['subspace_dim']``). If 'bobyqa-ls' is given, `fun` returns
+        the vector of the residuals of a least-squares problem, and the sum of
+        their squares is minimized by a Gauss-Newton method that builds a
+        linear model of each residual. If 'bobyqa-ps' is given, `fun` is a
+        `pdfo.ElementValueCache`, and a trust-region method builds a quadratic
+        model of each element in its own variables, whose initial
+        interpolation points are shared by the elements that have no variable
+        in common. Only unconstrained and bound-constrained problems are
+        handled by 'bobyqa-ls' and 'bobyqa-ps'.
     bounds : {`scipy.optimize.Bounds`, array_like, shape (n, 2)}, optional
         Bound constraints of the problem. It can be one of the cases below.
 
@@ -75,6 +104,22 @@ def pdfo(fun, x0, args=(), method=None, bounds=None, constraints=(), options=Non
                 Final value of the trust-region radius. It must be smaller than
                 or equal to ``options['radius_init']`` and should indicate the
                 accuracy required in the final values of the variables.
+            auto_radius : bool or {'probe'}, optional
+                Whether to scale the variables so that the initial and final
+                trust-region radii are relative to their scales. The scale of a
+                variable is the range of its bounds if it has two, the
+                magnitude of its initial value if it is nonzero, and its
+                distance to its bound otherwise. If it is 'probe', the scales of
+                the remaining variables are estimated from the objective
+                function at two points around x0 for each of them. These
+                evaluations are not counted in ``nfev`` but are taken off
+                ``options['maxfev']``, and the probes are skipped (with a
+                warning) if they would leave too few evaluations to the
+                solver. The radii then apply to the scaled
+                problem, ``options['radius_init']`` defaulting to 0.5, which is
+                a quarter of the range of the bounds, or the magnitude of the
+                initial value. It supersedes ``options['scale']``. Default is
+                False.
             maxfev : int, optional
                 Maximum number of function evaluations.
             ftarget : float, optional
@@ -102,6 +147,182 @@ def pdfo(fun, x0, args=(), method=None, bounds=None, constraints=(), options=Non
                 functions at the solution. This is only done in the debug mode,
                 and requires one extra function evaluation. It is highly
                 discouraged in production.
+            compact_result : bool, optional
+                Whether to return the result as a lightweight
+                `pdfo._common.CompactOptimizeResult`, which has the same fields
+                as `scipy.optimize.OptimizeResult` but stores them in slots
+                rather than in a dictionary. It is useful when many small
+                problems are solved.
+            max_memory : float, optional
+                Memory budget, in bytes, of the Fortran solver (workspace,
+                histories, and constraint matrix). If the solver that would be
+                selected exceeds it, a solver that fits is selected instead, and
+                ``options['npt']`` is reduced if necessary. Default is None,
+                i.e., no budget.
+            cost_model : dict, optional
+                Entries overriding those of `pdfo._settings.COST_MODEL`, the
+                cost model used when ``method='auto-cost'``. For each solver
+                configuration (e.g., 'newuoa:2n+1'), it gives the coefficients
+                ``(a, b)`` of the overhead ``a + b * w`` seconds of the solver
+                per function evaluation, where ``w`` is the size of its
+                workspace, and ``(c, g)`` of the expected number
+                ``c * n ** g`` of function evaluations. The script
+                ``benchmarks/bench_cost_model.py`` calibrates it on a machine.
+            portfolio : list, optional
+                Solver configurations raced when ``method='portfolio'``. Each
+                configuration is a dict with a field 'method' and, optionally,
+                fields of `options` (e.g., 'npt'). The workers share a cache of
+                the function values and the budget ``options['maxfev']``, and
+                they all stop as soon as one of them reaches
+                ``options['ftarget']``. Default is a few configurations chosen
+                according to the type of the problem. The problem is sent to
+                the workers once preprocessed, and the objective and constraint
+                functions must be picklable if the workers are not forked from
+                the current process (e.g., on ``options['executor']``, or if the
+                start method of `multiprocessing` is not 'fork'). Nonlinearly
+                constrained problems are solved by COBYLA alone.
+            workers : int, optional
+                Number of worker processes of the portfolio if
+                ``options['executor']`` is None. Default is the number of
+                configurations, up to the number of CPUs. If there are more
+                configurations than workers, the last ones start only when
+                workers become free, and may not start at all.
+            subspace_dim : int, optional
+                Dimension of the subspaces when ``method='subspace'``. Default
+                is ``min(n, 10)``. ``options['npt']`` is ignored in this mode,
+                and ``2 * subspace_dim + 1`` interpolation points are used on
+                each subspace.
+            subspace_basis : {'random', 'coordinate'}, optional
+                Subspaces used when ``method='subspace'``: spanned by random
+                orthonormal directions (the first one being the last successful
+                step), or by blocks of coordinates. Default is 'coordinate'.
+                Bound-constrained problems always use blocks of coordinates. If
+                `fun` is a `pdfo.ElementValueCache`, the variables appearing in
+                common elements are gathered in the same blocks.
+            return_model : bool, optional
+                Whether to return the final models of the objective (and, for
+                COBYLA, of the constraint) functions, built by the solver from
+                their values, in the fields ``model_gradient``,
+                ``model_hessian``, and ``model_jacobian`` of the result. They
+                are not available in portfolio and subspace modes. Default is
+                False.
+            restarts : int, optional
+                Maximum number of restarts of the solver. When it returns
+                because the trust-region radius reached
+                ``options['radius_final']`` while budget remains, it is
+                restarted from the best point so far, with an initial radius of
+                ``options['radius_init']``, halved after each restart that does
+                not improve the best point. The budget ``options['maxfev']``,
+                the histories, and the number of function evaluations are shared
+                by all the runs, and no point is evaluated twice. It is ignored
+                in portfolio, least-squares, and subspace modes. Default is 0.
+            noisy : bool, optional
+                Whether the objective function is stochastic. If True, the
+                solver is run in stages, each of which decreases the
+                trust-region radius by a factor 10, and the value given to the
+                solver at each point is the average of several evaluations of
+                the objective function. The standard deviation of the noise is
+                estimated from these replicates (and from 5 evaluations at
+                `x0`), and a stage whose decrease of the objective function is
+                below the noise is repeated with four times as many
+                replicates. The optimization stops once the maximal number of
+                replicates is reached. The nonlinear constraint functions are
+                assumed to be deterministic. Every replicate counts in
+                ``options['maxfev']``, ``nfev``, and ``fun_history``. It is
+                ignored in portfolio, least-squares, and subspace modes, and
+                ``options['restarts']`` is ignored if it is True. Default is
+                False.
+            max_replicates : int, optional
+                Maximal number of evaluations of the objective function at each
+                point if ``options['noisy']`` is True. Default is 16.
+            executor : `concurrent.futures.Executor`, optional
+                Executor on which the replicated evaluations of the objective
+                function are mapped if ``options['noisy']`` is True, the
+                initial points if ``options['parallel_initial_points']`` is True,
+                and the
+                solver configurations are run if ``method='portfolio'``, e.g., a
+                `concurrent.futures.ThreadPoolExecutor`, a
+                `concurrent.futures.ProcessPoolExecutor`, or a
+                `pdfo.SocketExecutor` sending the evaluations to a
+                `pdfo.WorkerServer`. The objective function must then be safe
+                to call concurrently, and it must draw independent random
+                numbers in each call if it is stochastic. The workers of the
+                portfolio must be threads or processes started by the current
+                one. Its lifetime is managed by the caller. Default is None,
+                i.e., the evaluations are sequential, and the portfolio runs on
+                ``options['workers']`` processes.
+            max_in_flight : int, optional
+                Maximal number of tasks submitted to ``options['executor']``
+                and not done yet; the submission of further tasks waits for
+                them. Default is None, i.e., no limit.
+            parallel_initial_points : bool, optional
+                Whether to evaluate the initial interpolation points of NEWUOA,
+                BOBYQA, and UOBYQA in parallel on ``options['executor']``. These
+                points are computed in advance as by the solvers, in at most two
+                batches, and the solvers then take their values without waiting,
+                so that their results are the same as with sequential
+                evaluations. The iterations that follow evaluate the objective
+                function sequentially, one point at a time. The
+                points evaluated but not requested by a solver that reaches
+                ``options['ftarget']`` early are counted in ``nfev``. It is
+                ignored for LINCOA and COBYLA, whose initial points depend on
+                the values at the previous ones, and in the portfolio, subspace,
+                least-squares, and noise-aware modes and with restarts. Default
+                is False.
+            evaluation_policy : dict, optional
+                Policy for the evaluations of the objective function, with the
+                optional fields 'timeout' (the maximal time of an evaluation in
+                seconds, or None), 'retries' (the number of times a failed
+                evaluation is attempted again), 'backoff' (the time waited
+                before the first retry in seconds, doubled after each one,
+                default is 0.1), and 'isolation' ('thread' or 'process', where
+                the evaluations with a timeout are run; a process is terminated
+                when it times out, whereas a thread keeps running in the
+                background, concurrently with the retries, and each thread
+                calling the objective function has its own process). An
+                evaluation fails if it raises an exception or times out, and if
+                all its attempts fail, the objective function is given the
+                extreme barrier value at this point instead of the exception
+                being propagated. The numbers of failures are returned in the
+                field ``failures`` of the result. Default is None, i.e., no
+                timeout and no retry.
+            evaluation_cache : `pdfo.EvaluationCache` or str, optional
+                Cache of the values of the objective function, or the path of
+                its SQLite file, shared by all the processes that use it. The
+                values are looked up at the points at which the objective
+                function is evaluated, keyed by the bytes of their float64
+                entries, so that the points already evaluated by another solve
+                (possibly in another process) are not evaluated again. They are
+                counted in ``nfev``. The extra arguments `args` are not part of
+                the keys. Default is None, i.e., no cache.
+            low_fidelity : callable, optional
+                Cheap approximation of the objective function, called as
+                ``low_fidelity(x, *args)``. At each point, its value is
+                corrected by the difference between the two functions at the
+                nearest point where the objective function has been evaluated,
+                and the objective function is only evaluated if this prediction,
+                minus an estimate of its error, is less than the least value so
+                far. Otherwise, the prediction is given to the solver. This
+                saves evaluations of the objective function if the difference
+                between the two functions varies slowly. It is ignored in the
+                portfolio, least-squares, and noise-aware modes. The numbers of
+                evaluations of each function are returned in the field
+                ``fidelity_nfev`` of the result, while ``nfev`` counts the
+                values given to the solver. Default is None.
+            model_screening : bool, optional
+                Whether to skip the evaluations of the objective function at
+                the points where a quadratic model with a diagonal Hessian
+                matrix, fitted to the values at the 2n + 1 nearest points
+                evaluated so far, predicts a value far above the least one,
+                relatively to an estimate of its error. The prediction is then
+                given to the solver. These points are mostly those sampled to
+                improve the geometry of the interpolation sets, and this saves
+                evaluations if the objective function is steep away from its
+                minimizers. It is ignored in the portfolio,
+                least-squares, noise-aware, and multi-fidelity modes, and with
+                nonlinear constraints. The number of evaluations skipped is
+                returned in the field ``screened`` of the result, while ``nfev``
+                counts the values given to the solver. Default is False.
 
     Returns
     -------
@@ -124,7 +345,14 @@ def pdfo(fun, x0, args=(), method=None, bounds=None, constraints=(), options=Non
             fun_history : `numpy.ndarray`, shape (nfev,)
                 History of the objective function values.
             method : str
-                Name of the Powell method used.
+                Name of the Powell method used. In portfolio mode, it is the
+                method of the configuration that found the solution.
+            portfolio : list
+                In portfolio mode only, the configurations raced, with their
+                exit status (None if they have been interrupted), number of
+                function evaluations, and whether they have started ('started'
+                is False for those still waiting for a worker when the race
+                ended, which are also reported in the warnings).
 
         For constrained problems, the following fields are also returned:
 
@@ -158,6 +386,80 @@ def pdfo(fun, x0, args=(), method=None, bounds=None, constraints=(), options=Non
             infeasible_nonlinear_constraints : `numpy.ndarray`
                 Indices of the nonlinear constraints that are infeasible.
 
+        If ``options['return_model']`` is True, the following fields are also
+        returned (they are None if the solver stopped before building its first
+        model, and in portfolio and subspace modes):
+
+            model_gradient : `numpy.ndarray`, shape (n,)
+                Gradient at ``x`` of the final model of the objective function,
+                an estimate of its gradient. The components corresponding to
+                variables fixed by the bounds are NaN. If linear equality
+                constraints have been eliminated (see
+                ``options['eliminate_lin_eq']``), the models are only known on
+                the affine subspace they define, and the gradient and Hessian
+                matrix are those of the restriction of the model to it.
+            model_hessian : `numpy.ndarray`, shape (n, n)
+                Hessian matrix of the final model of the objective function (or
+                of the Gauss-Newton model with ``method='bobyqa-ls'``, and of
+                the sum of the models of the elements with
+                ``method='bobyqa-ps'``). It is
+                None for COBYLA, which builds linear models.
+            model_jacobian : {`numpy.ndarray`, list}
+                For linearly and nonlinearly constrained problems, estimates of
+                the Jacobian matrices of the constraints, with the same
+                structure as ``constraints``. Those of the linear constraints
+                are their matrices ``A``, and those of the nonlinear
+                constraints are given by the final linear models of COBYLA.
+
+        If ``options['restarts']`` is positive, the following field is also
+        returned:
+
+            restarts : int
+                Number of restarts of the solver that have been performed.
+
+        If ``options['noisy']`` is True, the following fields are also
+        returned:
+
+            noise : float
+                Estimated standard deviation of the noise of the objective
+                function. The field ``fun`` is the average of the values of the
+                objective function at ``x``.
+            replicates : int
+                Number of evaluations of the objective function at each point
+                in the last stage.
+
+        If ``options['evaluation_policy']`` is given, the following field is
+        also returned:
+
+            failures : dict
+                Numbers of evaluations of the objective function that raised an
+                exception ('exceptions') or timed out ('timeouts'), including
+                the retries, and of points at which all the attempts failed and
+                the extreme barrier was used ('barriers').
+
+        If ``options['low_fidelity']`` is given, the following field is also
+        returned:
+
+            fidelity_nfev : dict
+                Numbers of evaluations of the low-fidelity function ('low') and
+                of the objective function ('high').
+
+        If ``options['model_screening']`` is True, the following field is also
+        returned:
+
+            screened : int
+                Number of evaluations of the objective function replaced by the
+                predictions of the model.
+
+        If `method` is 'auto-cost' or ``options['auto_radius']`` is 'probe',
+        the following field is also returned:
+
+            probe_nfev : int
+                Number of evaluations of the objective function made before the
+                solver starts, to time them or to estimate the scales of the
+                variables, and not counted in ``nfev`` because the solver did
+                not request them.
+
         Finally, if warnings are raised during the optimization procedure, the
         following field is also returned:
 
@@ -307,7 +609,36 @@ def pdfo(fun, x0, args=(), method=None, bounds=None, constraints=(), options=Non
         # The problem turns out 'normal' during prepdfo.
         lower_method = method.lower()
         try:
-            if lower_method == 'uobyqa':
+            if prob_info.get('portfolio') is not None:
+                from ._portfolio import race
+                opti_res = race(fun_c, x0_c, bounds_c, constraints_c, options_c, prob_info['portfolio'])
+                method = opti_res.method
+                output['portfolio'] = opti_res.portfolio
+            elif prob_info.get('least_squares') is not None:
+                from ._least_squares import fit
+                opti_res = fit(fun_c, prob_info['least_squares'], x0_c, bounds_c, options_c)
+                method = 'bobyqa-ls'
+            elif prob_info.get('separable') is not None:
+                from ._separable import assemble
+                opti_res = assemble(fun_c, prob_info['separable'], x0_c, bounds_c, options_c)
+                method = 'bobyqa-ps'
+            elif prob_info.get('subspace') is not None:
+                from ._subspace import descend
+                opti_res = descend(fun_c, x0_c, bounds_c, options_c, prob_info['subspace'])
+            elif prob_info.get('noise') is not None:
+                from ._noise import resample
+                opti_res = resample(fun_c, x0_c, bounds_c, constraints_c, options_c, lower_method, prob_info['noise'])
+                output['noise'] = opti_res.noise
+                output['replicates'] = opti_res.replicates
+            elif prob_info.get('parallel_initial_points') is not None:
+                from ._parallel_init import prefetch
+                opti_res = prefetch(fun_c, x0_c, bounds_c, constraints_c, options_c, lower_method,
+                                     prob_info['parallel_initial_points'])
+            elif prob_info.get('restarts'):
+                from ._restart import restart
+                opti_res = restart(fun_c, x0_c, bounds_c, constraints_c, options_c, lower_method, prob_info['restarts'])
+                output['restarts'] = opti_res.restarts
+            elif lower_method == 'uobyqa':
                 from . import uobyqa
                 opti_res = uobyqa(fun_c, x0_c, options=options_c)
             elif lower_method == 'newuoa':
@@ -349,6 +680,9 @@ def pdfo(fun, x0, args=(), method=None, bounds=None, constraints=(), options=Non
             output['constr_modified'] = opti_res.constr_modified
         except AttributeError:
             pass
+        for key in ['model_gradient', 'model_hessian', 'model_jacobian']:
+            if key in opti_res:
+                output[key] = opti_res[key]
 
         # The warnings that have been raised in the solvers and treated during their own calls to postpdfo should be
         # transfer to the call to postpdfo of pdfo to appear to the output of pdfo.
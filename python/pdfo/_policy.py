@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""Evaluation policy of the objective function: timeout, retries, and extreme barrier for the failed evaluations."""
+import threading
+import time
+
+import numpy as np
+
+
+def _policy_worker(connection, fun):
+    """Loop of the process evaluating the objective function, which sends back either ('value', f) or ('error', e)."""
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        x, args = message
+        try:
+            connection.send(('value', fun(x, *args)))
+        except Exception as exc:
+            try:
+                connection.send(('error', exc))
+            except Exception:
+                # The exception cannot be pickled, and only its representation is sent.
+                connection.send(('error', RuntimeError(repr(exc))))
+
+
+class EvaluationPolicy:
+    """Objective function evaluated under an evaluation policy.
+
+    Each evaluation is interrupted after `timeout` seconds, and the failed evaluations (that raise an exception or time
+    out) are attempted again at most `retries` times, after waiting `backoff` seconds, doubled after each attempt. If
+    all the attempts fail, NaN is returned, which prepdfo replaces by the extreme barrier hugefun.
+
+    The evaluations with a timeout are run either in a thread, which cannot be stopped and is left running in the
+    background when it times out, or in a worker process, which is terminated and replaced when it times out. In the
+    first case, a retry after a timeout runs concurrently with the evaluation that timed out, which must therefore be
+    safe; if it is not, the evaluations must be run in processes. In the second case, each thread calling the policy
+    (e.g., the threads of an executor) has its own worker process, and the objective function must be picklable if the
+    start method of `multiprocessing` is not 'fork'. The exceptions raised in a worker process are raised again by the
+    policy, as a RuntimeError if they cannot be pickled.
+    """
+
+    def __init__(self, fun, timeout=None, retries=0, backoff=.1, isolation='thread'):
+        self.fun = fun
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.isolation = isolation
+        self.failures = {'exceptions': 0, 'timeouts': 0, 'barriers': 0}
+        self.last_error = None
+        self._workers = dict()  # worker process and connection of each calling thread
+        self._lock = threading.Lock()  # the policy may be called by the threads of an executor
+
+    def __getstate__(self):
+        # The worker processes are not sent with the policy, and each copy of the policy starts its own.
+        state = self.__dict__.copy()
+        del state['_workers'], state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._workers = dict()
+        self._lock = threading.Lock()
+
+    def __call__(self, x, *args):
+        for attempt in range(self.retries + 1):
+            if attempt > 0:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                return self._evaluate(x, args)
+            except TimeoutError as exc:
+                with self._lock:
+                    self.failures['timeouts'] += 1
+                    self.last_error = exc
+            except Exception as exc:
+                with self._lock:
+                    self.failures['exceptions'] += 1
+                    self.last_error = exc
+        with self._lock:
+            self.failures['barriers'] += 1
+        return np.nan
+
+    def _evaluate(self, x, args):
+        if self.timeout is None:
+            return self.fun(x, *args)
+        if self.isolation == 'process':
+            return self._evaluate_in_process(x, args)
+
+        # The evaluation is run in a daemon thread, so that a hanging evaluation does not prevent Python from exiting.
+        outcome = []
+
+        def target():
+            try:
+                outcome.append(('value', self.fun(x, *args)))
+            except Exception as exc:
+                outcome.append(('error', exc))
+
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        thread.join(self.timeout)
+        if thread.is_alive() or len(outcome) == 0:
+            raise TimeoutError('the evaluation of the objective function exceeds {} seconds'.format(self.timeout))
+        if outcome[0][0] == 'error':
+            raise outcome[0][1]
+        return outcome[0][1]
+
+    def _evaluate_in_process(self, x, args):
+        import multiprocessing
+
+        thread = threading.get_ident()
+        with self._lock:
+            worker = self._workers.get(thread)
+        if worker is None:
+            connection, child_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_policy_worker, args=(child_connection, self.fun), daemon=True)
+            process.start()
+            worker = process, connection
+            with self._lock:
+                self._workers[thread] = worker
+        process, connection = worker
+        connection.send((np.asarray(x), args))
+        if not connection.poll(self.timeout):
+            # The worker process is terminated, and a new one is started at the next evaluation.
+            self._stop(thread, terminate=True)
+            raise TimeoutError('the evaluation of the objective function exceeds {} seconds'.format(self.timeout))
+        try:
+            kind, value = connection.recv()
+        except EOFError:
+            self._stop(thread, terminate=True)
+            raise RuntimeError('the worker process evaluating the objective function died')
+        if kind == 'error':
+            raise value
+        return value
+
+    def _stop(self, thread, terminate=False):
+        """Stop the worker process of a thread, if any."""
+        with self._lock:
+            worker = self._workers.pop(thread, None)
+        if worker is not None:
+            process, connection = worker
+            if terminate:
+                process.terminate()
+            else:
+                try:
+                    connection.send(None)
+                except (BrokenPipeError, OSError):
+                    process.terminate()
+            process.join()
+            connection.close()
+
+    def close(self, terminate=False):
+        """Stop the worker processes, if any."""
+        with self._lock:
+            threads = list(self._workers)
+        for thread in threads:
+            self._stop(thread, terminate)
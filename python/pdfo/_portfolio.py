@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""Portfolio mode of pdfo, in which several solver configurations race on worker processes."""
+import contextlib
+import multiprocessing
+import os
+import warnings
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from ._settings import ExitStatus, Options
+
+# State of a worker process, set by _portfolio_init.
+_worker = dict()
+
+# Value in the shared cache of the points being evaluated by a worker.
+_PENDING = 'pending'
+
+
+def _default_portfolio(ptype, n, maxfev):
+    """Default solver configurations of the portfolio for a problem of type `ptype` and dimension `n`."""
+    configurations = []
+    if ptype == 'unconstrained':
+        configurations += [{'method': 'newuoa', 'npt': 2 * n + 1}, {'method': 'newuoa', 'npt': n + 2}]
+        if 2 <= n <= 8 and maxfev > (n + 1) * (n + 2) // 2:
+            configurations.append({'method': 'uobyqa'})
+    elif ptype == 'bound-constrained':
+        configurations += [{'method': 'bobyqa', 'npt': 2 * n + 1}, {'method': 'bobyqa', 'npt': n + 2},
+                           {'method': 'lincoa', 'npt': 2 * n + 1}]
+    elif ptype == 'linearly-constrained':
+        configurations += [{'method': 'lincoa', 'npt': 2 * n + 1}, {'method': 'lincoa', 'npt': n + 2}]
+    configurations.append({'method': 'cobyla'})
+
+    # Remove the duplicated configurations (e.g., if n = 1) and those that require too many points.
+    unique = []
+    for configuration in configurations:
+        if configuration not in unique and configuration.get('npt', 0) < maxfev:
+            unique.append(configuration)
+    return unique
+
+
+def _portfolio_init(fun, cache, count, lock, stop, maxfev, lb, ub, linear):
+    """Initialize a worker process."""
+    _worker.update(fun=fun, cache=cache, count=count, lock=lock, stop=stop, maxfev=maxfev, lb=lb, ub=ub, linear=linear)
+
+
+def _portfolio_task(state, method, x0, bounds, constraints, options):
+    """Run a solver configuration on a worker process of an executor, which receives its state with the task."""
+    _portfolio_init(*state)
+    return _portfolio_solve(method, x0, bounds, constraints, options)
+
+
+def _constraint_violation(x):
+    """Violation of the bound and linear constraints at x."""
+    violation = np.r_[_worker['lb'] - x, x - _worker['ub'], 0.]
+    if _worker['linear'] is not None:
+        ax = _worker['linear'].A @ x
+        violation = np.r_[violation, _worker['linear'].lb - ax, ax - _worker['linear'].ub]
+    return np.max(violation)
+
+
+def _portfolio_objective(x):
+    """Objective function of the solvers, evaluated at most once at each point by all the workers.
+
+    The worker that evaluates the objective function at a point first reserves it in the cache with a pending marker,
+    and the other workers requesting the same point wait for its value. To interrupt a solver, it returns NaN, with
+    which all the Fortran solvers exit immediately.
+    """
+    if _worker['interrupted'] or _worker['stop'].is_set():
+        _worker['interrupted'] = True
+        return np.nan
+    key = np.asarray(x, dtype=np.float64).tobytes()
+    with _worker['lock']:
+        fx = _worker['cache'].get(key)
+        if fx is None:
+            if _worker['count'].value >= _worker['maxfev']:
+                _worker['stop'].set()
+                _worker['interrupted'] = True
+                return np.nan
+            index = _worker['count'].value
+            _worker['count'].value += 1
+            _worker['cache'][key] = _PENDING
+    if fx is None:
+        fx = _worker['fun'](x)
+        _worker['cache'][key] = fx
+        _worker['history'].append((index, np.copy(x), fx, _constraint_violation(x)))
+    while isinstance(fx, str) and fx == _PENDING:
+        # Another worker is evaluating the objective function at x. The race is stopped if it fails.
+        if _worker['stop'].wait(1e-3):
+            _worker['interrupted'] = True
+            return np.nan
+        fx = _worker['cache'][key]
+    _worker['requests'] += 1
+    return fx
+
+
+def _portfolio_solve(method, x0, bounds, constraints, options):
+    """Run a solver configuration in a worker.
+
+    Returns the exit status of the solver (None if it has been interrupted), its number of function evaluations (or of
+    requests of function values, including those found in the cache, if it has been interrupted), the evaluations
+    made by the worker, as tuples (global index, x, f(x), constraint violation), and whether the solver has been run,
+    which is not the case if the race ended before the worker started it.
+    """
+    from . import bobyqa, cobyla, lincoa, newuoa, uobyqa
+
+    _worker.update(requests=0, history=[], interrupted=False)
+    if _worker['stop'].is_set() or _worker['count'].value >= _worker['maxfev']:
+        return None, 0, [], False
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        if method == 'uobyqa':
+            res = uobyqa(_portfolio_objective, x0, options=options)
+        elif method == 'newuoa':
+            res = newuoa(_portfolio_objective, x0, options=options)
+        elif method == 'bobyqa':
+            res = bobyqa(_portfolio_objective, x0, bounds=bounds, options=options)
+        elif method == 'lincoa':
+            res = lincoa(_portfolio_objective, x0, bounds=bounds, constraints=constraints, options=options)
+        else:
+            res = cobyla(_portfolio_objective, x0, bounds=bounds, constraints=constraints, options=options)
+    if _worker['interrupted']:
+        return None, _worker['requests'], _worker['history'], True
+    if res.status == ExitStatus.TARGET_SUCCESS.value:
+        _worker['stop'].set()
+    return int(res.status), int(res.nfev), _worker['history'], True
+
+
+def race(fun, x0, bounds, constraints, options, portfolio):
+    """Race the solver configurations of `portfolio` on the problem preprocessed by prepdfo.
+
+    Each configuration is run on a worker process, which is either a worker of `portfolio['executor']` or a process of
+    a pool of `portfolio['workers']` processes. The workers of an executor must be processes started by the current one
+    (the solvers cannot run concurrently in threads of the same process), as they share the state of the race through a
+    manager of `multiprocessing`. The objective function is evaluated at most once at each point by all the workers,
+    which share a cache of the function values. All the workers are stopped as soon as a configuration reaches the
+    target, or when the total number of function evaluations reaches maxfev. If there are fewer workers than
+    configurations, the last configurations start only when the first ones end, and those that have not started when
+    the race ends are reported in the warnings and by the field 'started' of the summary. The result is the best point
+    evaluated by all the workers, and the histories gather all the evaluations in their chronological order.
+    """
+    from scipy.optimize import OptimizeResult
+
+    configurations = portfolio['configurations']
+    executor = portfolio.get('executor')
+    workers = portfolio['workers'] or min(len(configurations), os.cpu_count() or 1)
+    maxfev = options[Options.MAXFEV.value]
+
+    context = multiprocessing.get_context()
+    with context.Manager() as manager:
+        cache = manager.dict()
+        if executor is None:
+            count = context.Value('q', 0)
+            lock, stop = count.get_lock(), context.Event()
+        else:
+            # The shared state is sent with each task, which requires proxies instead of the synchronized objects.
+            count, lock, stop = manager.Value('q', 0), manager.Lock(), manager.Event()
+        state = (fun, cache, count, lock, stop, maxfev, bounds['lb'], bounds['ub'], constraints['linear'])
+        with contextlib.ExitStack() as stack:
+            if executor is None:
+                pool = stack.enter_context(ProcessPoolExecutor(workers, context, _portfolio_init, state))
+            futures = []
+            for configuration in configurations:
+                options_c = dict(options)
+                if configuration['method'] in ('newuoa', 'bobyqa', 'lincoa'):
+                    # The configurations without npt use the default of the solvers, as in the default portfolio.
+                    options_c[Options.NPT.value] = 2 * x0.size + 1
+                else:
+                    options_c.pop(Options.NPT.value, None)
+                options_c[Options.RETURN_MODEL.value] = False  # the models of the workers are not sent back
+                options_c.update({key: value for key, value in configuration.items() if key != 'method'})
+                task = (configuration['method'], x0, bounds, constraints, options_c)
+                if executor is None:
+                    futures.append(pool.submit(_portfolio_solve, *task))
+                else:
+                    futures.append(executor.submit(_portfolio_task, state, *task))
+            done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+            if any(future.exception() is not None for future in done):
+                # An error occurred in a worker (e.g., in the objective function): stop the others and raise it.
+                stop.set()
+                for future in futures:
+                    future.result()
+            outcomes = [future.result() for future in futures]
+        budget_reached = count.value >= maxfev
+
+    # Gather the evaluations of all the workers in their chronological order.
+    evaluations = sorted((evaluation + (k,) for k, outcome in enumerate(outcomes) for evaluation in outcome[2]),
+                         key=lambda evaluation: evaluation[0])
+    fhist = np.array([evaluation[2] for evaluation in evaluations], dtype=np.float64)
+    chist = np.array([evaluation[3] for evaluation in evaluations], dtype=np.float64)
+
+    # The best point is the one with the least objective function value among the nearly feasible ones, or the one with
+    # the least constraint violation if none is nearly feasible.
+    tol = np.sqrt(np.finfo(np.float64).eps)
+    best = min(range(len(evaluations)), key=lambda i: (max(chist[i] - tol, 0.), fhist[i]))
+    _, x, fx, constrviolation, k_best = evaluations[best]
+
+    statuses = [outcome[0] for outcome in outcomes]
+    if ExitStatus.TARGET_SUCCESS.value in statuses:
+        status = ExitStatus.TARGET_SUCCESS.value
+    elif statuses[k_best] is not None:
+        status = statuses[k_best]
+    elif budget_reached:
+        status = ExitStatus.MAX_EVAL_WARNING.value
+    else:
+        status = next(s for s in statuses if s is not None)
+
+    summary = [dict(configuration, status=outcome[0], nfev=outcome[1], started=outcome[3]) for
+               configuration, outcome in zip(configurations, outcomes)]
+    list_warnings = []
+    if not all(outcome[3] for outcome in outcomes):
+        idle = ', '.join(configuration['method'] for configuration, outcome in zip(configurations, outcomes) if
+                         not outcome[3])
+        list_warnings.append(f'The race ended before the configurations {idle} started; increase the number of '
+                             f'workers to run them.')
+    result = OptimizeResult({'x': x, 'fun': fx, 'status': status, 'nfev': len(evaluations), 'fhist': fhist,
+              'method': configurations[k_best]['method'], 'portfolio': summary, 'warnings': list_warnings,
+              'constrviolation': constrviolation, 'chist': chist})
+    return result
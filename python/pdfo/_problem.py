@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""Functions of the problems preprocessed by prepdfo.
+
+They are instances of the classes below rather than closures, so that they can be pickled: a preprocessed problem is
+made of these functions, which only hold plain data (arrays, index maps, the affine transform of the variables) and a
+reference to the functions of the user, and it can be sent as is to worker processes, without being preprocessed and
+validated again there.
+"""
+import numpy as np
+
+from ._common import _fullx, scalar_types
+
+
+def zero_objective(x, *args):
+    """Objective function of the feasibility problems."""
+    return np.float64(0)
+
+
+class Objective:
+    """Objective function of the user, with its extra arguments, whose values are checked and given the extreme barrier
+    `hugefun` if they are not finite or larger than it (fun_c in prepdfo)."""
+
+    def __init__(self, fun, args, invoker, hugefun):
+        self.fun = fun
+        self.args = args
+        self.invoker = invoker
+        self.hugefun = hugefun
+
+    def __call__(self, x):
+        try:
+            fun_x = self.fun(x) if hasattr(self.args, '__len__') and len(self.args) == 0 else self.fun(x, *self.args)
+        except TypeError:
+            raise TypeError('{}: the number of parameters is inconsistent with `args`.'.format(self.invoker))
+
+        if hasattr(fun_x, '__len__') and len(fun_x) == 1:
+            fun_x = fun_x[0]
+        elif (hasattr(fun_x, '__len__') or not isinstance(fun_x, scalar_types)) and fun_x is not None:
+            raise ValueError('{}: the objective function should return a scalar.'.format(self.invoker))
+
+        fun_x = np.float64(fun_x)
+        if not np.isfinite(fun_x) or fun_x > self.hugefun:
+            fun_x = np.float64(self.hugefun)
+
+        return fun_x
+
+
+class SumOfSquares:
+    """Sum of the squares of the residuals returned by `fun` (method='bobyqa-ls'), the residuals at the last point
+    evaluated being kept in ``residuals['value']``."""
+
+    def __init__(self, fun, residuals):
+        self.fun = fun
+        self.residuals = residuals
+
+    def __call__(self, x, *args):
+        self.residuals['value'] = np.asarray(self.fun(x, *args), dtype=np.float64).reshape(-1)
+        return np.dot(self.residuals['value'], self.residuals['value'])
+
+
+class SumOfElements:
+    """Sum of the values of the elements returned by `fun` (method='bobyqa-ps'), the values at the last point evaluated
+    being kept in ``elements['value']``."""
+
+    def __init__(self, fun, elements):
+        self.fun = fun
+        self.elements = elements
+
+    def __call__(self, x, *args):
+        self.elements['value'] = np.asarray(self.fun(x, *args), dtype=np.float64).reshape(-1)
+        return np.sum(self.elements['value'])
+
+
+class Composition:
+    """Composition ``outer(inner(x))``, e.g., of a function of the original variables with the change of variables."""
+
+    def __init__(self, outer, inner):
+        self.outer = outer
+        self.inner = inner
+
+    def __call__(self, x):
+        return self.outer(self.inner(x))
+
+
+class FullPoint:
+    """Vector of all the variables, made of the free ones and of the values of those fixed by the bounds."""
+
+    def __init__(self, fixed_values, free_indices, fixed_indices):
+        self.fixed_values = fixed_values
+        self.free_indices = free_indices
+        self.fixed_indices = fixed_indices
+
+    def __call__(self, freex_value):
+        return _fullx(freex_value, self.fixed_values, self.free_indices, self.fixed_indices)
+
+
+class Scaling:
+    """Variables before scaling, ``scaling_factor * x + shift``."""
+
+    def __init__(self, scaling_factor, shift):
+        self.scaling_factor = scaling_factor
+        self.shift = shift
+
+    def __call__(self, x):
+        return self.scaling_factor * x + self.shift
+
+
+class AffineSpace:
+    """Variables on the affine space of the linear equality constraints, as functions of the reduced variables y.
+
+    The affine space is given by a feasible point and a basis of the null space of the permuted Jacobian matrix of the
+    linear equality constraints, computed either by a QR factorization with pivoting (method 'qr', the basis being
+    applied as ``basis @ y``, and the columns permuted by `p_inv`) or by an SVD (method 'svd', the basis being made of
+    rows, applied as ``y @ basis``). The columns of zeros, which are not permuted, are restored by `p_zeros_inv`.
+    """
+
+    def __init__(self, method, basis, n_red, rank, feasible, p_zeros_inv, p_inv=None):
+        self.method = method
+        self.basis = basis
+        self.n_red = n_red
+        self.rank = rank
+        self.feasible = feasible
+        self.p_zeros_inv = p_zeros_inv
+        self.p_inv = p_inv
+
+    def __call__(self, y):
+        dim = self.n_red - self.rank
+        if self.method == 'qr':
+            x = np.r_[np.dot(self.basis, y[:dim]), y] + self.feasible
+            x[:self.n_red] = x[self.p_inv]
+        else:
+            x = np.r_[np.dot(y[:dim], self.basis), y[dim:]] + self.feasible
+        return x[self.p_zeros_inv]
+
+
+class PrecomputedValues:
+    """Function whose values at some points are already known, each of them being returned once instead of evaluating
+    the function again."""
+
+    def __init__(self, fun, values):
+        self.fun = fun
+        self.values = values
+
+    def __call__(self, x):
+        key = np.asarray(x, dtype=np.float64).tobytes()
+        if key in self.values:
+            return self.values.pop(key)
+        return self.fun(x)
+
+
+class NonlinearConstraints:
+    """Nonlinear constraint functions of the user gathered into a single one, ``c(x) <= 0`` (fun_nonlinear in
+    _constraints_validation).
+
+    The constraints are evaluated at the full vector of variables if some are fixed by the bounds, unless `raw` is
+    True. The metadata of the constraints defined by dictionaries (their sizes and bounds) are recorded in
+    `constr_meta` at their first evaluation.
+    """
+
+    def __init__(self, invoker, constraints, bound_types, meta_indices, constr_meta, constraint_types, reduced,
+                 fixed_values, free_indices, fixed_indices, infeasible, hugecon):
+        self.invoker = invoker
+        self.constraints = constraints
+        self.bound_types = bound_types
+        self.meta_indices = meta_indices
+        self.constr_meta = constr_meta
+        self.constraint_types = constraint_types
+        self.reduced = reduced
+        self.fixed_values = fixed_values
+        self.free_indices = free_indices
+        self.fixed_indices = fixed_indices
+        self.infeasible = infeasible
+        self.hugecon = hugecon
+
+    def __call__(self, x, raw=False):
+        fun_x = np.asarray([], dtype=np.float64)
+        hugecon, infeasible = self.hugecon, self.infeasible
+
+        for nlc_constraint, b_type, i_meta in zip(self.constraints, self.bound_types, self.meta_indices):
+            # Get the value of the constraint function.
+            if not raw and self.reduced:
+                x_full = _fullx(x, self.fixed_values, self.free_indices, self.fixed_indices)
+            else:
+                x_full = x
+            if isinstance(nlc_constraint, self.constraint_types):
+                constraint_x = nlc_constraint.fun(x_full)
+            elif nlc_constraint['fun'] is not None:
+                constraint_x = nlc_constraint['fun'](x_full)
+            else:
+                constraint_x = np.asarray([], dtype=np.float64)
+
+            if constraint_x is None:
+                # If the constraint function returned anything, we convert the default None value to NaN, which can be
+                # understood by Fortran.
+                constraint_x = [np.nan]
+            elif isinstance(constraint_x, scalar_types):
+                constraint_x = [constraint_x]
+
+            if not hasattr(constraint_x, '__len__'):
+                raise ValueError('{}: the constraint function should return a vector or a scalar.'.format(self.invoker))
+
+            constraint_x = np.asarray(constraint_x, dtype=np.float64)
+
+            # Use extreme barrier to cope with the 'hidden constraints'.
+            constraint_x[np.logical_or(np.isnan(constraint_x), constraint_x > hugecon)] = hugecon
+
+            # This part is NOT extreme barrier. We replace extremely negative values of cineq (which leads to no
+            # constraint violation) by -hugecon. Otherwise, NaN or Inf may occur in the interpolation models.
+            constraint_x[constraint_x < -hugecon] = -hugecon
+
+            if len(constraint_x.shape) != 1:
+                raise ValueError('{}: the constraint function should return a vector or a scalar.'.format(self.invoker))
+
+            # Set the metadata related to this constraint if it has not been done yet.
+            meta = self.constr_meta['data'][i_meta]
+            if meta['len'] < 0:
+                meta['len'] = constraint_x.size
+                meta['dropped_indices_lb'] = np.full(constraint_x.shape, False)
+                meta['lb'] = np.zeros_like(constraint_x)
+
+                # if the metadata has not been set, nlc_constraint is necessarily defined as a dictionary.
+                meta['dropped_indices_ub'] = np.full(constraint_x.shape, not nlc_constraint['type'] == 'eq')
+                if nlc_constraint['type'] == 'eq':
+                    meta['ub'] = np.zeros_like(constraint_x)
+                else:
+                    meta['ub'] = np.full_like(constraint_x, np.inf)
+
+            lenm = constraint_x.size
+            if isinstance(nlc_constraint, self.constraint_types) and not infeasible:
+                if nlc_constraint.lb.size not in [0, lenm] or \
+                        nlc_constraint.ub.size not in [0, lenm] or \
+                        (nlc_constraint.lb.size == 0 and nlc_constraint.ub.size == 0):
+                    raise ValueError(
+                        '{}: the size of the vector returned by the constraint function is inconsistent with the '
+                        'constraint bounds; check the shapes of the arrays.'.format(self.invoker))
+
+                # Convert the constraints defined as lb <= c(x) <= ub into c_extended(x) <= 0.
+                constraint_x_tmp = np.array([], dtype=np.float64)
+                if not b_type['lb_free']:
+                    lbx = b_type['lbx']
+                    constraint_x_tmp = np.r_[constraint_x_tmp, nlc_constraint.lb[lbx] - constraint_x[lbx]]
+                if not b_type['ub_free']:
+                    ubx = b_type['ubx']
+                    constraint_x_tmp = np.r_[constraint_x_tmp, constraint_x[ubx] - nlc_constraint.ub[ubx]]
+                constraint_x = constraint_x_tmp
+            elif isinstance(nlc_constraint, dict) and nlc_constraint['type'] == 'eq' and not infeasible:
+                # Necessarily, nlc_constraint is defined as a dictionary, for which all the constraints have to be
+                # considered.
+                constraint_x = np.r_[-constraint_x, constraint_x]
+            elif not infeasible:
+                # nlc_constraint is defined as a dictionary, for which all the constraints have to be considered.
+                # Moreover, it consists of an inequality constraint c(x) >= 0, which has to be inversed,
+                constraint_x *= -1
+            else:
+                # The problem is infeasible, only the constraint evaluation should be stored.
+                pass
+
+            # Add the current nonlinear constraint evaluation to the general one.
+            fun_x = np.r_[fun_x, constraint_x]
+
+        return fun_x
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""Restarts of the solvers of pdfo when the trust-region radius reaches its final value before the budget is used."""
+import numpy as np
+
+from ._settings import ExitStatus, Options
+
+
+def _restart_solve(method, fun, x0, bounds, constraints, options):
+    """Run a solver on the problem preprocessed by prepdfo."""
+    from . import bobyqa, cobyla, lincoa, newuoa, uobyqa
+
+    if method == 'uobyqa':
+        return uobyqa(fun, x0, options=options)
+    elif method == 'newuoa':
+        return newuoa(fun, x0, options=options)
+    elif method == 'bobyqa':
+        return bobyqa(fun, x0, bounds=bounds, options=options)
+    elif method == 'lincoa':
+        return lincoa(fun, x0, bounds=bounds, constraints=constraints, options=options)
+    return cobyla(fun, x0, bounds=bounds, constraints=constraints, options=options)
+
+
+def _better(res, best):
+    """Whether the result `res` is better than `best`: it has a lower value if both are feasible (up to the tolerance
+    of postpdfo for success), and a lower constraint violation otherwise."""
+    tol = np.sqrt(np.finfo(float).eps)
+    cv, cv_best = res.get('constrviolation', 0.), best.get('constrviolation', 0.)
+    if cv <= tol and cv_best <= tol:
+        return res.fun < best.fun
+    return cv < cv_best
+
+
+def restart(fun, x0, bounds, constraints, options, method, restarts):
+    """Solve the problem preprocessed by prepdfo with `method`, restarting it at most `restarts` times.
+
+    The solver is restarted from the best point so far whenever it returns because its trust-region radius reached
+    `options['radius_final']` while enough of the budget `options['maxfev']` remains for it to build its first model.
+    The first restart resets the radius to `options['radius_init']`, which is halved after each restart that does not
+    improve the best point, and the restarts stop once it reaches the final radius. The budget, the histories, and the
+    number of function evaluations are shared by all the runs.
+
+    The Fortran solvers build their initial interpolation sets themselves and cannot be given the points of a previous
+    run. Instead, the values of the objective (and nonlinear constraint) functions at all the points evaluated so far
+    are cached, so that no point is evaluated twice: the best point, at which each restart begins, and the initial
+    interpolation points that coincide with earlier ones (e.g., when the best point did not move during a run) are not
+    evaluated again and are not counted.
+    """
+    from scipy.optimize import OptimizeResult
+
+    n = x0.size
+    maxfev = options[Options.MAXFEV.value]
+    rhobeg = options[Options.RHOBEG.value]
+    rhoend = options[Options.RHOEND.value]
+    if method == 'uobyqa':
+        npt = (n + 1) * (n + 2) // 2
+    elif method == 'cobyla':
+        npt = n + 1
+    else:
+        npt = options[Options.NPT.value]
+
+    # The cached values are replayed without being evaluated. The calls of each run are recorded, so that the replayed
+    # values are removed from the histories returned by the solver.
+    values = {}
+    replayed = []
+
+    def cached_fun(x):
+        key = x.tobytes()
+        replayed.append(key in values)
+        if key not in values:
+            values[key] = fun(x)
+        return values[key]
+
+    if constraints['nonlinear'] is not None:
+        constraint_values = {}
+        constraint_fun = constraints['nonlinear']['fun']
+
+        def cached_constraint(x):
+            key = x.tobytes()
+            if key not in constraint_values:
+                constraint_values[key] = constraint_fun(x)
+            return constraint_values[key]
+
+        constraints = dict(constraints)
+        constraints['nonlinear'] = dict(constraints['nonlinear'], fun=cached_constraint)
+
+    best = None
+    fhist, chist, warning_list = [], [], []
+    nfev, count, radius = 0, -1, rhobeg
+    while True:
+        remaining = maxfev - nfev
+        if best is not None:
+            # The first call of the solver replays the value at the best point, which does not count in the budget.
+            if best.status != ExitStatus.RADIUS_SUCCESS.value or count >= restarts or radius <= rhoend or \
+                    remaining < npt:
+                break
+            remaining += 1
+        options_c = dict(options)
+        options_c.update({Options.RHOBEG.value: radius, Options.MAXFEV.value: remaining})
+        replayed.clear()
+        res = _restart_solve(method, cached_fun, x0 if best is None else best.x, bounds, constraints, options_c)
+        count += 1
+
+        # Only the values that have been evaluated during this run are added to the histories.
+        evaluated = np.logical_not(replayed[:res.nfev])
+        fhist.append(res.fhist[:res.nfev][evaluated])
+        if res.get('chist') is not None:
+            chist.append(res.chist[:res.nfev][evaluated])
+        nfev += int(np.count_nonzero(evaluated))
+        warning_list.extend(w for w in res.warnings if w not in warning_list)
+
+        if best is None or _better(res, best):
+            best = res
+        else:
+            radius = max(radius / 2, rhoend)
+        best.status = res.status  # the status of the last run decides whether to restart
+
+    result = OptimizeResult(best)
+    result.update(nfev=nfev, fhist=np.concatenate(fhist), warnings=warning_list, restarts=count)
+    if len(chist) > 0:
+        result.chist = np.concatenate(chist)
+    return result
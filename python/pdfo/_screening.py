@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""Screening of the evaluations of the objective function by predictions of its values."""
+import threading
+
+import numpy as np
+
+
+class Screening:
+    """Objective function whose evaluations at points that are clearly worse than the best one are replaced by
+    predictions.
+
+    At each point x requested by the solver, a prediction of the objective function is computed by `_predict` from the
+    points evaluated so far. The error of the predictions is bounded by the distance to the nearest point evaluated
+    times a slope, the largest ratio of the prediction errors to these distances at the last evaluations, enlarged by
+    the factor `_factor`. If the prediction minus this bound is not less than the least value so far, the prediction is
+    returned to the solver; otherwise, the objective function is evaluated. The first points, at which the error bound
+    cannot be estimated yet, are always evaluated. Since the predictions returned are never less than the least value,
+    the best point found by the solver is always evaluated.
+
+    The points evaluated are stored in arrays whose capacity is doubled when they are full, and the predictions are
+    computed out of the lock on the points stored so far, so that the evaluations mapped on the threads of an executor
+    are not serialized.
+    """
+
+    # Number of prediction errors needed to bound the error of the predictions, and safety factor of the bound.
+    _min_slopes = 3
+    _factor = 4.
+
+    def __init__(self, fun):
+        self.fun = fun
+        self.fbest = np.inf
+        self._points = None
+        self._values = None
+        self._size = 0
+        self._slopes = []
+        self._lock = threading.Lock()  # the evaluations may be mapped on the threads of an executor
+
+    def _predict(self, x, args, points, values):
+        """Prediction at `x` from the `points` evaluated so far and their recorded `values`, distance from `x` to the
+        nearest of them, and offset subtracted from the value at `x` before it is recorded (NaN if it is not)."""
+        raise NotImplementedError
+
+    def _count(self, screened):
+        """Count an evaluation (screened or not) in the statistics, under the lock."""
+        raise NotImplementedError
+
+    def _record(self, x, value):
+        """Store a point and its value, under the lock."""
+        if self._points is None or self._size == self._values.size:
+            capacity = max(2 * self._size, 16)
+            points, values = np.empty((capacity, x.size)), np.empty(capacity)
+            if self._points is not None:
+                points[:self._size], values[:self._size] = self._points, self._values
+            # The arrays given to the predictions in progress are left unchanged.
+            self._points, self._values = points, values
+        self._points[self._size] = x
+        self._values[self._size] = value
+        self._size += 1
+
+    def __call__(self, x, *args):
+        x = np.array(x, dtype=np.float64)
+        with self._lock:
+            if self._points is None:
+                points, values = np.empty((0, x.size)), np.empty(0)
+            else:
+                points, values = self._points[:self._size], self._values[:self._size]
+            slope = max(self._slopes[-5:]) if len(self._slopes) >= self._min_slopes else np.nan
+            fbest = self.fbest
+        predicted, distance, offset = self._predict(x, args, points, values)
+        if np.isfinite(predicted) and predicted - self._factor * slope * distance >= fbest:
+            with self._lock:
+                self._count(screened=True)
+            return predicted
+
+        fx = self.fun(x, *args)
+        try:
+            fvalue = np.float64(np.asarray(fx, dtype=np.float64).reshape(-1)[0])
+        except (TypeError, ValueError, IndexError):
+            fvalue = np.nan  # the error is raised when the value is validated
+        with self._lock:
+            self._count(screened=False)
+            if np.isfinite(fvalue):
+                if np.isfinite(predicted) and distance > 0:
+                    self._slopes.append(abs(fvalue - predicted) / distance)
+                self.fbest = min(self.fbest, fvalue)
+                if np.isfinite(offset):
+                    self._record(x, fvalue - offset)
+        return fx
+
+
+class ModelScreening(Screening):
+    """Objective function whose evaluations at points that are clearly worse than the best one are replaced by the
+    predictions of a model.
+
+    At each point x requested by the solver, a quadratic model of the objective function around x with a diagonal
+    Hessian matrix is fitted by least squares to the values at the 2n + 1 nearest points evaluated so far (a linear
+    model if there are fewer of them), and its value at x is the prediction. The model is kept that small so that its
+    cost, of order n ** 3, stays negligible. The prediction is returned to the solver if it exceeds the least value so
+    far by much more than the error bound (by a factor 1000). The points screened in this way are mostly those sampled
+    by the solvers to improve the geometry of their interpolation sets or to rescue them, in regions where the
+    objective function is far above its best value.
+
+    The solvers build their models on the predictions returned, so that the factor is large: with smaller ones, the
+    errors of the predictions slow down the convergence more than the screening saves evaluations.
+    """
+
+    _min_slopes = 5
+    _factor = 1e3
+
+    def __init__(self, fun):
+        super().__init__(fun)
+        self.evaluations = {'evaluated': 0, 'screened': 0}
+
+    def _predict(self, x, args, points, values):
+        n = x.size
+        if values.size < n + 2:
+            return np.nan, np.nan, 0.
+        steps = points - x
+        distances = np.linalg.norm(steps, axis=1)
+        m = min(values.size, 2 * n + 1)
+        nearest = np.argpartition(distances, m - 1)[:m]
+        steps = steps[nearest]
+        curvature = steps ** 2 if m == 2 * n + 1 else np.empty((m, 0))
+        matrix = np.c_[np.ones(m), steps, curvature]
+        scale = np.max(np.abs(matrix), axis=0)
+        scale[scale == 0.] = 1.
+        coefficients = np.linalg.lstsq(matrix / scale, values[nearest], rcond=None)[0]
+        return coefficients[0] / scale[0], np.min(distances[nearest]), 0.
+
+    def _count(self, screened):
+        self.evaluations['screened' if screened else 'evaluated'] += 1
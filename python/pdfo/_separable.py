@@ -0,0 +1,466 @@
+# -*- coding: utf-8 -*-
+"""Partially separable objective functions, i.e., sums of element functions of few variables."""
+import threading
+
+import numpy as np
+
+from ._executor import _in_threads
+from ._settings import ExitStatus, Options
+from ._shared import share_args
+
+
+def _call(function, x, args):
+    """Evaluate an element function; defined at the module level to be picklable."""
+    return function(x, *args)
+
+
+class ElementValueCache:
+    """Objective function ``f(x) = sum_i f_i(x[S_i])`` that caches the values of its elements.
+
+    An instance is a callable that can be given to pdfo and to the solvers as
+    the objective function. It keeps the values of the elements at the
+    previous point, and evaluates only the elements whose variables changed
+    since then. The usual solvers model `f` as a whole, and each call is
+    one function evaluation for them. With ``method='bobyqa-ps'``, pdfo
+    builds a quadratic model of each element in its own variables instead,
+    which needs far fewer evaluations of `f` when the elements have few
+    variables. With ``method='subspace'``, pdfo builds the blocks of
+    coordinates from the index sets, so that the variables of the same
+    elements are optimized together, and a step in a block evaluates only
+    the elements involving its variables.
+
+    The extra arguments `args` are compared by identity with those of the
+    previous call, and all the elements are evaluated if they differ. Arrays
+    modified in place between two calls are not detected: `clear` must then
+    be called, or new arrays passed. The instance can be called from several
+    threads: each call evaluates the elements from the values of the
+    previous call that ended, and the calls in progress do not interfere.
+
+    Parameters
+    ----------
+    elements : list
+        Elements of the function, as pairs ``(f_i, S_i)``, where ``f_i`` is a
+        callable and ``S_i`` is an array_like of indices. The element
+        function is called as ``f_i(x[S_i], *args)`` and returns a scalar.
+    n : int, optional
+        Number of variables. Default is one plus the largest index.
+    executor : `concurrent.futures.Executor`, optional
+        Executor on which the elements to be evaluated are mapped, e.g., a
+        `concurrent.futures.ProcessPoolExecutor` or a `pdfo.SocketExecutor`
+        (in which case the element functions must be picklable), as in
+        ``options['executor']`` of pdfo. Its lifetime is managed by the
+        caller. Default is None, i.e., the elements are evaluated
+        sequentially.
+    max_in_flight : int, optional
+        Maximal number of elements submitted to `executor` and not evaluated
+        yet. Default is None, i.e., no limit.
+
+    Attributes
+    ----------
+    element_nfev : numpy.ndarray, shape (m,)
+        Number of evaluations of each element function.
+    """
+
+    def __init__(self, elements, n=None, executor=None, max_in_flight=None):
+        if not hasattr(elements, '__len__') or len(elements) == 0:
+            raise ValueError('ElementValueCache: the elements should be a nonempty list of pairs (function, indices).')
+        self.functions, self.index_sets = [], []
+        for element in elements:
+            if not hasattr(element, '__len__') or len(element) != 2 or not callable(element[0]):
+                raise ValueError('ElementValueCache: each element should be a pair (function, indices).')
+            indices = np.asarray(element[1], dtype=np.intp).reshape(-1)
+            if indices.size == 0 or np.any(indices < 0):
+                raise ValueError('ElementValueCache: the indices of an element should be nonempty and nonnegative.')
+            self.functions.append(element[0])
+            self.index_sets.append(indices)
+        self.n = max(int(np.max(indices)) for indices in self.index_sets) + 1 if n is None else int(n)
+        if any(np.max(indices) >= self.n for indices in self.index_sets):
+            raise ValueError('ElementValueCache: the indices of the elements should be less than n.')
+        if executor is not None and max_in_flight is not None:
+            from ._executor import BoundedExecutor
+
+            executor = BoundedExecutor(executor, max_in_flight)
+        self.executor = executor
+        self.element_nfev = np.zeros(len(self.functions), dtype=int)
+
+        # Incidence of the variables in the elements, in the compressed sparse row format: the elements involving the
+        # variable j are elements[pointers[j]:pointers[j + 1]].
+        variables = np.concatenate(self.index_sets)
+        owners = np.repeat(np.arange(len(self.index_sets)), [indices.size for indices in self.index_sets])
+        self._variables, self._owners = variables, owners
+        permutation = np.argsort(variables, kind='stable')
+        self._elements = owners[permutation]
+        self._pointers = np.r_[0, np.cumsum(np.bincount(variables, minlength=self.n))]
+
+        # Point and extra arguments of the previous call, and values of the elements at this point.
+        self._x, self._args, self._shared_args = None, (), None
+        self._values = np.zeros(len(self.functions), dtype=np.float64)
+        self._lock = threading.Lock()  # the function may be called by the threads of an executor
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __call__(self, x, *args):
+        return np.sum(self.element_values(x, *args))
+
+    def element_values(self, x, *args):
+        """Values of the elements at `x`, those whose variables did not change since the previous call being reused."""
+        x = np.array(x, dtype=np.float64)
+        if x.shape != (self.n,):
+            raise ValueError('ElementValueCache: x should be a vector of size {}.'.format(self.n))
+
+        # The elements are evaluated out of the lock, from a snapshot of the state left by the previous call.
+        with self._lock:
+            previous_x, previous_args, shared_args = self._x, self._args, self._shared_args
+            values = np.copy(self._values)
+        same_args = len(args) == len(previous_args) and all(a is b for a, b in zip(args, previous_args))
+        if previous_x is None or not same_args:
+            affected = np.arange(len(self.functions))
+            shared_args = None
+        else:
+            # NaN components are always considered as changed.
+            changed = x != previous_x
+            if np.count_nonzero(changed) <= 64:
+                affected = np.unique(np.concatenate([self._elements[self._pointers[j]:self._pointers[j + 1]]
+                                                     for j in np.flatnonzero(changed)] + [np.zeros(0, np.intp)]))
+            else:
+                affected = np.unique(self._owners[changed[self._variables]])
+
+        points = [x[self.index_sets[i]] for i in affected]
+        if self.executor is not None and affected.size > 1:
+            # The large arrays of the extra arguments are shared with the worker processes once for all the calls
+            # with the same arguments, instead of being pickled with each element.
+            if shared_args is None:
+                shared_args = args if _in_threads(self.executor) else share_args(args)
+            functions = [self.functions[i] for i in affected]
+            values[affected] = list(self.executor.map(_call, functions, points, [shared_args] * affected.size))
+        else:
+            values[affected] = [self.functions[i](point, *args) for i, point in zip(affected, points)]
+        with self._lock:
+            self.element_nfev[affected] += 1
+            self._x, self._args, self._values, self._shared_args = x, args, values, shared_args
+        return np.copy(values)
+
+    def clear(self):
+        """Forget the values of the elements, so that they are all evaluated at the next call."""
+        with self._lock:
+            self._x, self._args, self._shared_args = None, (), None
+
+    def variable_order(self):
+        """Order of the variables in which those appearing in common elements are close to each other.
+
+        It is the reverse Cuthill-McKee ordering of the graph linking the variables that appear in a common element.
+        """
+        from scipy.sparse import csr_array
+        from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+        incidence = csr_array((np.ones(self._variables.size), (self._variables, self._owners)),
+                              shape=(self.n, len(self.index_sets)))
+        adjacency = (incidence @ incidence.T).tocsr()
+        return np.asarray(reverse_cuthill_mckee(adjacency, symmetric_mode=True), dtype=np.intp)
+
+
+def _quadratic_basis(u):
+    """Values at the points `u`, with shape (..., d), of the basis 1, u_a, u_a ** 2 / 2, u_a * u_b (a < b) of the
+    quadratic functions of d variables."""
+    a, b = np.triu_indices(u.shape[-1], 1)
+    return np.concatenate([np.ones(u.shape[:-1] + (1,)), u, u ** 2 / 2, u[..., a] * u[..., b]], axis=-1)
+
+
+def _color(index_sets, n):
+    """Greedy coloring of the variables, in which the variables appearing in a common element have distinct colors."""
+    neighbors = [[] for _ in range(n)]
+    for indices in index_sets:
+        for j in indices:
+            neighbors[j].append(indices)
+    colors = np.full(n, -1, dtype=np.intp)
+    for j in range(n):
+        used = {colors[k] for indices in neighbors[j] for k in indices}
+        colors[j] = next(color for color in range(n) if color not in used)
+    return colors
+
+
+def _models(groups, xopt, n):
+    """Gradient and Hessian matrix at `xopt` of the sum of the quadratic models of the elements.
+
+    The models interpolate the values of the elements at the points of their interpolation sets, in coordinates
+    centered at `xopt` and scaled by the largest distance to it. The inverses of the interpolation matrices, which give
+    the Lagrange functions, are stored in the groups of elements.
+    """
+    from scipy.sparse import csr_array
+
+    gradient = np.zeros(n)
+    rows, columns, entries = [], [], []
+    for group in groups:
+        variables = group['variables']
+        d = variables.shape[1]
+        displacements = group['points'] - xopt[variables][:, np.newaxis, :]
+        scale = np.max(np.linalg.norm(displacements, axis=2), axis=1)
+        scale[scale == 0.] = 1.
+        group['scale'] = scale
+        basis = _quadratic_basis(displacements / scale[:, np.newaxis, np.newaxis])
+        try:
+            group['inverse'] = np.linalg.inv(basis)
+        except np.linalg.LinAlgError:
+            group['inverse'] = np.linalg.pinv(basis)  # an interpolation set is degenerate
+        values = group['values'] - group['values'][np.arange(variables.shape[0]), group['kopt']][:, np.newaxis]
+        coefficients = np.einsum('epq,eq->ep', group['inverse'], values)
+        np.add.at(gradient, variables, coefficients[:, 1:d + 1] / scale[:, np.newaxis])
+        curvatures = coefficients[:, d + 1:] / scale[:, np.newaxis] ** 2
+        a, b = np.triu_indices(d, 1)
+        rows += [variables, variables[:, a], variables[:, b]]
+        columns += [variables, variables[:, b], variables[:, a]]
+        entries += [curvatures[:, :d], curvatures[:, d:], curvatures[:, d:]]
+    if len(entries) == 0:
+        return gradient, csr_array((n, n))
+    rows, columns, entries = [np.concatenate([array.ravel() for array in arrays])
+                              for arrays in [rows, columns, entries]]
+    return gradient, csr_array((entries, (rows, columns)), shape=(n, n))
+
+
+def _insert(groups, x, values, xopt, delta, improved, targets=None):
+    """Insert the point `x` and the values of the elements at it in the interpolation sets of the elements whose
+    variables differ from those of `xopt`.
+
+    As in BOBYQA, the point replaces the one whose Lagrange function is the largest at it, weighted by its distance to
+    `xopt`, unless `targets` gives the point to be replaced. The point at `xopt` is never replaced, and the new point
+    takes its role if `improved` is true. The inverses of the interpolation matrices must be those computed by `_models`
+    at `xopt`.
+    """
+    for g, group in enumerate(groups):
+        variables = group['variables']
+        z = x[variables]
+        moved = np.flatnonzero(np.any(z != xopt[variables], axis=1))
+        if moved.size == 0:
+            continue
+        zopt = xopt[variables[moved]][:, np.newaxis, :]
+        u = (z[moved] - zopt[:, 0, :]) / group['scale'][moved, np.newaxis]
+        lagrange = np.einsum('ep,epq->eq', _quadratic_basis(u), group['inverse'][moved])
+        distances = np.linalg.norm(group['points'][moved] - zopt, axis=2)
+        weights = np.abs(lagrange) * np.maximum(1., distances / delta) ** 2
+        weights[np.arange(moved.size), group['kopt'][moved]] = -1.
+        k = np.argmax(weights, axis=1)
+        if targets is not None:
+            k = np.where(targets[g][moved] >= 0, targets[g][moved], k)
+        group['points'][moved, k] = z[moved]
+        group['values'][moved, k] = values[group['elements'][moved]]
+        if improved:
+            group['kopt'][moved] = k
+
+
+def _geometry_point(groups, xopt, delta, lb, ub):
+    """Point improving the geometry of the interpolation sets of the elements, and points it replaces.
+
+    The elements whose interpolation sets have a point farther than 2 * delta from `xopt` are taken from the farthest,
+    as long as their variables are not already moved by the previous ones. For each of them, the variables are moved
+    within distance delta and within the bounds to where the Lagrange function of the farthest point is the largest
+    along its gradient at `xopt` (projected or not on the bounds) and along the lines through the interpolation points,
+    as ALTMOV does in BOBYQA. The inverses of the interpolation matrices must be those computed by
+    `_models` at `xopt`.
+    """
+    candidates, targets = [], []
+    for g, group in enumerate(groups):
+        variables, points = group['variables'], group['points']
+        targets.append(np.full(variables.shape[0], -1))
+        zopt = xopt[variables]
+        distances = np.linalg.norm(points - zopt[:, np.newaxis, :], axis=2)
+        far = np.argmax(distances, axis=1)
+        distances = distances[np.arange(far.size), far]
+        e = np.flatnonzero(distances > 2 * delta)
+        if e.size == 0:
+            continue
+        d = variables.shape[1]
+        zopt, lower, upper, k = zopt[e], lb[variables[e]], ub[variables[e]], far[e]
+        coefficients = group['inverse'][e, :, k]
+        gradient = coefficients[:, 1:d + 1]
+        plus = np.where(((zopt >= upper) & (gradient > 0)) | ((zopt <= lower) & (gradient < 0)), 0., gradient)
+        minus = np.where(((zopt >= upper) & (gradient < 0)) | ((zopt <= lower) & (gradient > 0)), 0., -gradient)
+        directions = np.concatenate([np.stack([gradient, plus, minus], axis=1), points[e] - zopt[:, np.newaxis, :]],
+                                    axis=1)
+        directions *= delta / np.maximum(np.linalg.norm(directions, axis=2, keepdims=True), np.finfo(float).tiny)
+        directions = np.concatenate([directions, -directions, directions / 2, -directions / 2], axis=1)
+        z = np.clip(zopt[:, np.newaxis, :] + directions, lower[:, np.newaxis, :], upper[:, np.newaxis, :])
+        u = (z - zopt[:, np.newaxis, :]) / group['scale'][e, np.newaxis, np.newaxis]
+        lagrange = np.abs(np.einsum('ecp,ep->ec', _quadratic_basis(u), coefficients))
+        best = np.argmax(lagrange, axis=1)
+        z, lagrange = z[np.arange(e.size), best], lagrange[np.arange(e.size), best]
+        # The Lagrange function may vanish on all the points tried, e.g., near a corner of the bounds.
+        valid = lagrange > 1e-8
+        candidates += zip(distances[e[valid]], [g] * np.count_nonzero(valid), e[valid], k[valid], z[valid])
+    x = np.copy(xopt)
+    moved = np.zeros(x.size, dtype=bool)
+    for _, g, e, k, z in sorted(candidates, key=lambda candidate: -candidate[0]):
+        variables = groups[g]['variables'][e]
+        if not np.any(moved[variables]):
+            x[variables] = z
+            moved[variables] = True
+            targets[g][e] = k
+    return x, targets
+
+
+def assemble(fun, elements, x0, bounds, options):
+    """Minimize a partially separable function for the problem preprocessed by prepdfo (method='bobyqa-ps').
+
+    The function is a sum of elements, the i-th of which depends on the variables ``elements['index_sets'][i]`` of the
+    preprocessed problem, and `fun` returns its value and sets elements['value'] to the values of the elements. Each
+    element of d variables is modeled by a quadratic function of them interpolating its values at (d + 1)(d + 2) / 2
+    points, and the sum of the models, whose Hessian matrix is sparse, is minimized in the trust region and within the
+    bounds by the method of TRSBOX. The initial points move the variables of each color of a coloring of the variables
+    (those of a common element having distinct colors) as BOBYQA moves each variable, and the pairs of colors appearing
+    in a common element together, so that they give every element a complete interpolation set with a number of
+    evaluations that depends on the number of colors instead of n. As in BOBYQA, the trust-region radius is at least a
+    lower bound rho, decreased from rhobeg to rhoend when the steps become short and the interpolation points are close.
+    """
+    from scipy.optimize import OptimizeResult
+
+    from ._least_squares import _trsbox
+
+    n = x0.size
+    lb, ub = bounds['lb'], bounds['ub']
+    maxfev = options[Options.MAXFEV.value]
+    rhobeg = options[Options.RHOBEG.value]
+    rhoend = options[Options.RHOEND.value]
+    ftarget = options[Options.FTARGET.value]
+    index_sets = elements['index_sets']
+    m = len(index_sets)
+
+    fhist = []
+
+    def evaluate(x):
+        elements['value'] = None  # it remains None if the evaluation fails under the evaluation policy
+        fx = fun(x)
+        fhist.append(fx)
+        if elements['value'] is None:
+            if len(fhist) == 1:
+                raise ValueError('bobyqa-ps: the elements could not be evaluated at the initial point.')
+            ex = np.full(m, np.nan)
+        else:
+            ex = np.copy(elements['value'])
+        if not np.all(np.isfinite(ex)):
+            ex = np.full(m, fx / m)  # fx is the extreme barrier set by prepdfo
+        return fx, ex
+
+    # The initial points are x0, the points moving the variables of each color by the first and the second steps of
+    # BOBYQA along the coordinates (+/- rhobeg, or rhobeg and 2 * rhobeg from a bound, prepdfo having ensured that x0 is
+    # either on the bounds or at least rhobeg away from them), and the points moving the variables of each pair of
+    # colors appearing in a common element by their first steps.
+    colors = _color(index_sets, n)
+    ncolors = int(np.max(colors)) + 1
+    first = np.where(x0 >= ub, -rhobeg, rhobeg)
+    second = np.where(x0 <= lb, 2 * rhobeg, np.where(x0 >= ub, -2 * rhobeg, -rhobeg))
+    pairs = sorted({(a, b) for indices in index_sets for a in colors[indices] for b in colors[indices] if a < b})
+    design = np.tile(x0, (1 + 2 * ncolors + len(pairs), 1))
+    for color in range(ncolors):
+        design[1 + color] += np.where(colors == color, first, 0.)
+        design[1 + ncolors + color] += np.where(colors == color, second, 0.)
+    for i, (a, b) in enumerate(pairs):
+        design[1 + 2 * ncolors + i] += np.where((colors == a) | (colors == b), first, 0.)
+    design = np.clip(design, lb, ub)
+    fvals = np.full(design.shape[0], np.nan)
+    evals = np.full((design.shape[0], m), np.nan)
+    for i in range(design.shape[0]):
+        if i > 0 and (np.nanmin(fvals) <= ftarget or len(fhist) >= maxfev):
+            break
+        fvals[i], evals[i] = evaluate(design[i])
+    kopt = np.nanargmin(fvals)
+    xopt, fopt = np.copy(design[kopt]), fvals[kopt]
+
+    # The elements are grouped by number of variables, so that their models are built together. The i-th point of the
+    # interpolation set of an element in a group is the design point slots[i].
+    groups = []
+    sizes = np.array([indices.size for indices in index_sets])
+    pair_index = {pair: i for i, pair in enumerate(pairs)}
+    for d in np.unique(sizes[sizes > 0]):
+        members = np.flatnonzero(sizes == d)
+        variables = np.array([index_sets[i] for i in members], dtype=np.intp).reshape(members.size, d)
+        element_colors = colors[variables]
+        a, b = np.triu_indices(d, 1)
+        pair_slots = [[pair_index[tuple(sorted(pair))] for pair in zip(row[a], row[b])] for row in element_colors]
+        slots = np.c_[np.zeros(members.size, dtype=np.intp), 1 + element_colors, 1 + ncolors + element_colors,
+                      1 + 2 * ncolors + np.array(pair_slots, dtype=np.intp).reshape(members.size, a.size)]
+        points = design[slots[:, :, np.newaxis], variables[:, np.newaxis, :]]
+        kopt = np.argmax(np.all(points == xopt[variables][:, np.newaxis, :], axis=2), axis=1)
+        groups.append({'elements': members, 'variables': variables, 'points': points,
+                       'values': evals[slots, members[:, np.newaxis]], 'kopt': kopt})
+
+    status = None
+    rho = delta = rhobeg
+    while status is None:
+        if fopt <= ftarget:
+            status = ExitStatus.TARGET_SUCCESS.value
+            break
+        if len(fhist) >= maxfev:
+            status = ExitStatus.MAX_EVAL_WARNING.value
+            break
+
+        gradient, hessian = _models(groups, xopt, n)
+        step = _trsbox(gradient, hessian, delta, lb - xopt, ub - xopt)
+        step_norm = np.linalg.norm(step)
+        if step_norm >= rho / 2:
+            predicted = -np.dot(gradient, step) - np.dot(step, hessian @ step) / 2
+            xnew = np.clip(xopt + step, lb, ub)
+            fnew, enew = evaluate(xnew)
+            ratio = (fopt - fnew) / predicted if predicted > 0 else -1.
+
+            # Update the trust-region radius.
+            if ratio <= .1:
+                delta = min(delta / 2, step_norm)
+            elif ratio <= .7:
+                delta = max(delta / 2, step_norm)
+            else:
+                delta = max(delta, 2 * step_norm)
+            if delta <= 1.5 * rho:
+                delta = rho
+
+            improved = fnew < fopt
+            _insert(groups, xnew, enew, xopt, delta, improved)
+            if improved:
+                xopt, fopt = xnew, fnew
+            if ratio > .1 or improved:
+                continue
+            _models(groups, xopt, n)  # the Lagrange functions of the interpolation sets changed
+        else:
+            delta = max(delta / 10, rho)
+
+        # The step is short or has failed. If interpolation points are far from the best one, they are replaced by
+        # points that improve the geometry. Otherwise, rho is decreased as in BOBYQA once delta has reached it.
+        xgeo, targets = _geometry_point(groups, xopt, delta, lb, ub)
+        if any(np.any(target >= 0) for target in targets):
+            fgeo, egeo = evaluate(xgeo)
+            improved = fgeo < fopt
+            _insert(groups, xgeo, egeo, xopt, delta, improved, targets)
+            if improved:
+                xopt, fopt = xgeo, fgeo
+        elif delta > rho:
+            continue
+        elif rho <= rhoend:
+            status = ExitStatus.RADIUS_SUCCESS.value
+        else:
+            if rho <= 16 * rhoend:
+                rho_new = rhoend
+            elif rho <= 250 * rhoend:
+                rho_new = np.sqrt(rho * rhoend)
+            else:
+                rho_new = rho / 10
+            delta = max(rho / 2, rho_new)
+            rho = rho_new
+
+    fhist = np.array(fhist, dtype=np.float64)
+    result = OptimizeResult({'x': xopt, 'fun': fopt, 'status': status, 'nfev': fhist.size, 'fhist': fhist,
+                             'warnings': []})
+    if np.any(np.isfinite(np.r_[lb, ub])):
+        result.update(constrviolation=0., chist=np.zeros_like(fhist))
+    if options[Options.RETURN_MODEL.value]:
+        # Sum of the models of the elements at the returned point, available once the initial points have been
+        # evaluated.
+        result.update(model_gradient=None, model_hessian=None)
+        if fhist.size >= design.shape[0]:
+            gradient, hessian = _models(groups, xopt, n)
+            result.update(model_gradient=gradient, model_hessian=hessian.toarray())
+    return result
@@ -43,6 +43,25 @@ class Options(str, Enum):
     CLASSICAL = 'classical'
     DEBUG = 'debug'
     CHKFUNVAL = 'chkfunval'
+    COMPACT_RESULT = 'compact_result'
+    MAX_MEMORY = 'max_memory'
+    COST_MODEL = 'cost_model'
+    PORTFOLIO = 'portfolio'
+    WORKERS = 'workers'
+    SUBSPACE_DIM = 'subspace_dim'
+    SUBSPACE_BASIS = 'subspace_basis'
+    RETURN_MODEL = 'return_model'
+    RESTARTS = 'restarts'
+    NOISY = 'noisy'
+    MAX_REPLICATES = 'max_replicates'
+    EXECUTOR = 'executor'
+    MAX_IN_FLIGHT = 'max_in_flight'
+    PARALLEL_INITIAL_POINTS = 'parallel_initial_points'
+    EVALUATION_POLICY = 'evaluation_policy'
+    EVALUATION_CACHE = 'evaluation_cache'
+    LOW_FIDELITY = 'low_fidelity'
+    MODEL_SCREENING = 'model_screening'
+    AUTO_RADIUS = 'auto_radius'
 
 
 # Default options.
@@ -59,4 +78,39 @@ DEFAULT_OPTIONS = {
     Options.CLASSICAL.value: False,
     Options.DEBUG.value: False,
     Options.CHKFUNVAL.value: False,
+    Options.COMPACT_RESULT.value: False,
+    Options.MAX_MEMORY.value: None,
+    Options.COST_MODEL.value: None,
+    Options.PORTFOLIO.value: None,
+    Options.WORKERS.value: None,
+    Options.SUBSPACE_DIM.value: None,
+    Options.SUBSPACE_BASIS.value: None,
+    Options.RETURN_MODEL.value: False,
+    Options.RESTARTS.value: 0,
+    Options.NOISY.value: False,
+    Options.MAX_REPLICATES.value: 16,
+    Options.EXECUTOR.value: None,
+    Options.MAX_IN_FLIGHT.value: None,
+    Options.PARALLEL_INITIAL_POINTS.value: False,
+    Options.EVALUATION_POLICY.value: None,
+    Options.EVALUATION_CACHE.value: None,
+    Options.LOW_FIDELITY.value: None,
+    Options.MODEL_SCREENING.value: False,
+    Options.AUTO_RADIUS.value: False,
+}
+
+# Cost model used when pdfo is called with method='auto-cost', obtained with benchmarks/bench_cost_model.py. For each
+# solver configuration (the solver and, for BOBYQA, LINCOA, and NEWUOA, the number of interpolation points), the overhead
+# of the solver per function evaluation is modeled by a + b * w seconds, where w is the size of the workspace of the
+# solver, and the number of function evaluations needed to converge by c * n ** g. It can be overridden entry by entry
+# with options['cost_model'].
+COST_MODEL = {
+    'uobyqa': {'overhead': (4.67e-06, 1.55e-09), 'evaluations': (6.2, 1.61)},
+    'newuoa:n+2': {'overhead': (6.02e-06, 3.15e-09), 'evaluations': (39.2, 1.26)},
+    'newuoa:2n+1': {'overhead': (7.38e-06, 3.65e-09), 'evaluations': (13.0, 1.12)},
+    'bobyqa:n+2': {'overhead': (6.11e-06, 4.01e-09), 'evaluations': (40.5, 1.31)},
+    'bobyqa:2n+1': {'overhead': (5.45e-06, 5.84e-09), 'evaluations': (16.7, 1.09)},
+    'lincoa:n+2': {'overhead': (1.21e-05, 2.52e-09), 'evaluations': (42.9, 1.25)},
+    'lincoa:2n+1': {'overhead': (1.09e-05, 3.89e-09), 'evaluations': (22.2, 0.96)},
+    'cobyla': {'overhead': (5.43e-07, 1.11e-08), 'evaluations': (183.0, 1.16)},
 }
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""Large NumPy arrays in shared memory, sent by reference to the worker processes instead of being pickled."""
+import os
+import sys
+import weakref
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+# Size in bytes from which the arrays of the extra arguments of the objective function are placed in shared memory.
+SHARE_THRESHOLD = 1 << 20
+
+# Arrays rebuilt in the current process from shared memory, by segment and layout, so that the arrays sent several
+# times to a worker are attached once.
+_attached = weakref.WeakValueDictionary()
+
+
+def _tracker():
+    """Identity of the pipe to the resource tracker of the current process, which is shared by the processes it
+    started, or None if the blocks of shared memory are not tracked (Python 3.13 or later with track=False, Windows)."""
+    if sys.version_info >= (3, 13) or os.name != 'posix':
+        return None
+    from multiprocessing import resource_tracker
+
+    stat = os.fstat(resource_tracker.getfd())  # getfd starts the tracker if needed
+    return stat.st_dev, stat.st_ino
+
+
+class _Segment(SharedMemory):
+    """Block of shared memory, closed when the last array using it is garbage-collected.
+
+    SharedMemory.close raises BufferError if arrays still use the memory, which happens when the segment is collected
+    with the array holding it. The memory is then unmapped once the buffer of the array is released.
+    """
+
+    def __del__(self):
+        try:
+            self.close()
+        except (BufferError, OSError):
+            pass
+
+
+class SharedArray(np.ndarray):
+    """NumPy array in shared memory, pickled by reference to its memory.
+
+    An instance is created in a process by `pdfo.share`, and the block of shared memory is freed when the instance and
+    all the views of it are garbage-collected in this process. When it is pickled (e.g., by a
+    `concurrent.futures.ProcessPoolExecutor` or a `pdfo.SocketExecutor`), only the name of the block and the layout of
+    the array are sent, and the array is rebuilt as a read-only view of the same memory in the process that unpickles
+    it, which must run on the same host. It must then remain alive in the creating process until the workers have
+    received it. The results of operations on such arrays are pickled as usual.
+    """
+
+    def __array_finalize__(self, obj):
+        self._segment = getattr(obj, '_segment', None)
+
+    def __reduce__(self):
+        segment = self._segment
+        if segment is not None and self.size > 0:
+            # Only the arrays whose memory lies in the block are sent by reference, and not, e.g., the results of the
+            # ufuncs, which are also instances of SharedArray.
+            address = self.__array_interface__['data'][0]
+            extent = np.multiply(np.subtract(self.shape, 1), self.strides)
+            low = address + np.sum(np.minimum(extent, 0)) - segment['address']
+            high = address + np.sum(np.maximum(extent, 0)) + self.itemsize - segment['address']
+            if 0 <= low and high <= segment['memory'].size:
+                layout = (self.shape, self.dtype, address - segment['address'], self.strides)
+                return _attach, (segment['memory'].name,) + layout + (segment['tracker'],)
+        return np.asarray(self).__reduce__()
+
+
+def _new(memory, shape, dtype, offset=0, strides=None, tracker=None):
+    """Array on a block of shared memory, which is kept alive by the array and its views. `tracker` identifies the
+    resource tracker of the process that created the block."""
+    array = SharedArray(shape, dtype, buffer=memory.buf, offset=offset, strides=strides)
+    base = np.frombuffer(memory.buf, np.uint8) if memory.size > 0 else np.zeros(0, np.uint8)
+    array._segment = {'memory': memory, 'address': base.__array_interface__['data'][0], 'tracker': tracker}
+    return array
+
+
+def _attach(name, shape, dtype, offset, strides, tracker):
+    """Rebuild a `SharedArray` sent by reference, as a read-only view of the shared memory."""
+    key = (name, shape, dtype.str, offset, strides)
+    array = _attached.get(key)
+    if array is None:
+        if sys.version_info >= (3, 13):
+            memory = _Segment(name, track=False)  # the block is freed by the process that created it
+        else:
+            memory = _Segment(name)
+            if tracker is not None and tracker != _tracker():
+                # The block has been registered with the resource tracker of the current process (e.g., that of a
+                # pdfo.WorkerServer), which would unlink it when the process ends. The block is freed by the process
+                # that created it, and left to its tracker, which the processes it started share and must not
+                # unregister the block from.
+                from multiprocessing import resource_tracker
+
+                resource_tracker.unregister(memory._name, 'shared_memory')
+        array = _new(memory, shape, dtype, offset, strides, tracker)
+        array.flags.writeable = False
+        _attached[key] = array
+    return array
+
+
+def _unlink(memory, pid):
+    """Free a block of shared memory, if the current process created it (and not one forked from it)."""
+    if os.getpid() == pid:
+        try:
+            memory.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def share(array):
+    """Copy an array into shared memory, so that it is sent to the worker processes without being pickled.
+
+    Parameters
+    ----------
+    array : array_like
+        Array to share. Its data type must not contain Python objects.
+
+    Returns
+    -------
+    `pdfo.SharedArray`
+        Copy of `array` in shared memory, or `array` itself if it is already a `pdfo.SharedArray`. The memory is freed
+        when the copy and all the views of it are garbage-collected.
+
+    Examples
+    --------
+    The large extra arguments of an objective function can be shared before many calls of pdfo are submitted to a
+    `concurrent.futures.ProcessPoolExecutor`.
+
+    >>> import numpy as np
+    >>> from pdfo import share
+    >>> data = share(np.random.default_rng(0).standard_normal((1000, 1000)))
+    >>> data.shape
+    (1000, 1000)
+    """
+    if isinstance(array, SharedArray) and array._segment is not None:
+        return array
+    array = np.asarray(array)
+    if array.dtype.hasobject:
+        raise ValueError('share: the array should not contain Python objects.')
+    memory = _Segment(create=True, size=max(array.nbytes, 1))
+    shared = _new(memory, array.shape, array.dtype, tracker=_tracker())
+    shared[...] = array
+    weakref.finalize(shared, _unlink, memory, os.getpid())
+    return shared
+
+
+def share_args(args, threshold=SHARE_THRESHOLD):
+    """Extra arguments of the objective function whose NumPy arrays of at least `threshold` bytes are shared."""
+    if not hasattr(args, '__len__'):
+        return args
+    shared = [share(arg) if type(arg) is np.ndarray and not arg.dtype.hasobject and arg.nbytes >= threshold else arg
+              for arg in args]
+    return tuple(shared) if isinstance(args, tuple) else shared
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""Subspace mode of pdfo, in which NEWUOA or BOBYQA minimize the objective function on low-dimensional subspaces."""
+import warnings
+
+import numpy as np
+
+from ._settings import ExitStatus, Options
+
+
+def _default_subspace_dim(n):
+    """Default dimension of the subspaces for a problem of dimension `n`."""
+    return min(n, 10)
+
+
+def _subspace_solve(method, fun, y0, bounds, options):
+    """Run NEWUOA or BOBYQA on a subspace; the inputs are already preprocessed."""
+    from . import bobyqa, newuoa
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        if method == 'newuoa':
+            return newuoa(fun, y0, options=options)
+        return bobyqa(fun, y0, bounds=bounds, options=options)
+
+
+def descend(fun, x0, bounds, options, subspace):
+    """Minimize the problem preprocessed by prepdfo by successive minimizations on subspaces of dimension `dim`.
+
+    Each outer iteration runs NEWUOA or BOBYQA on a subspace through the current iterate, with a trust-region radius
+    that decreases from the current radius by a factor of ten. If the basis is 'coordinate', the subspace is spanned by
+    a block of coordinates, the blocks covering all the free variables in a random order at each sweep. If the basis is
+    'random', it is spanned by random orthonormal directions, the first of which is the last successful step. Only the
+    coordinate blocks preserve the bound constraints, which are then handled by BOBYQA.
+
+    The Fortran solvers cannot be given an initial model, so the information carried from a subspace to the next is the
+    function value at the current iterate, which is not evaluated again, and the radius: the length of the last
+    successful step in the subspace (at least a tenth of the radius), or a tenth of the radius after a failure. Each
+    block of coordinates keeps its own radius, and the mode terminates once all of them reach the final radius.
+    """
+    from scipy.optimize import OptimizeResult
+
+    n = x0.size
+    method, dim, basis = subspace['method'], subspace['dim'], subspace['basis']
+    lb, ub = bounds['lb'], bounds['ub']
+    maxfev = options[Options.MAXFEV.value]
+    rhobeg = options[Options.RHOBEG.value]
+    rhoend = options[Options.RHOEND.value]
+    ftarget = options[Options.FTARGET.value]
+    rng = np.random.default_rng(0)
+
+    x = np.copy(x0)
+    fx = fun(x)
+    fhist = [fx]
+    if basis == 'coordinate':
+        # The blocks contain at least two variables, which are not fixed by the bounds.
+        free = np.flatnonzero(ub - lb > 2 * rhoend)
+        nblocks = max(1, free.size // dim)
+        radii0 = np.minimum(rhobeg, (ub - lb) / 2)
+        radii = np.copy(radii0)
+        blocks = []
+    else:
+        radius = rhobeg
+        direction = None
+
+    while True:
+        if fx <= ftarget:
+            status = ExitStatus.TARGET_SUCCESS.value
+            break
+        if len(fhist) >= maxfev:
+            status = ExitStatus.MAX_EVAL_WARNING.value
+            break
+
+        # Build the subspace, and the problem on the subspace.
+        if basis == 'coordinate':
+            if len(blocks) == 0:
+                active = free[radii[free] > rhoend]
+                if active.size < 2:
+                    status = ExitStatus.RADIUS_SUCCESS.value
+                    break
+                if subspace.get('order') is None:
+                    sequence = rng.permutation(active)
+                else:
+                    # Contiguous blocks of the given order, with a random offset, in a random order.
+                    sequence = np.roll(subspace['order'], rng.integers(n))
+                    sequence = sequence[np.isin(sequence, active)]
+                blocks = np.array_split(sequence, max(1, min(nblocks, active.size // 2)))
+                blocks = [blocks[i] for i in rng.permutation(len(blocks))]
+            block = blocks.pop()
+            center = x[block]
+            sub_radius = np.min(radii[block])
+            sub_bounds = {'lb': lb[block] - center, 'ub': ub[block] - center}
+
+            def point(y):
+                z = np.copy(x)
+                z[block] = np.clip(center + y, lb[block], ub[block])
+                return z
+        else:
+            if radius <= rhoend:
+                status = ExitStatus.RADIUS_SUCCESS.value
+                break
+            directions = rng.standard_normal((n, dim))
+            if direction is not None:
+                directions[:, 0] = direction
+            q, _ = np.linalg.qr(directions)
+            sub_radius = radius
+            sub_bounds = None
+
+            def point(y):
+                return x + q @ y
+
+        def sub_fun(y):
+            if not np.any(y):
+                return fx  # the value at the current iterate is known
+            fy = fun(point(y))
+            fhist.append(fy)
+            return fy
+
+        sub_options = dict(options)
+        sub_options.update({Options.NPT.value: 2 * len(block) + 1 if basis == 'coordinate' else 2 * dim + 1,
+                            Options.RHOBEG.value: sub_radius, Options.RHOEND.value: max(rhoend, sub_radius / 10),
+                            Options.MAXFEV.value: maxfev - len(fhist) + 1, Options.RETURN_MODEL.value: False})
+        y0 = np.zeros(len(block) if basis == 'coordinate' else dim)
+        res = _subspace_solve(method, sub_fun, y0, sub_bounds, sub_options)
+
+        # Update the iterate and the radius of the subspace.
+        success = res.fun < fx
+        if success:
+            step = point(res.x) - x
+            x, fx = x + step, res.fun
+            sub_radius = max(np.linalg.norm(step), sub_radius / 10)
+        else:
+            sub_radius /= 10
+        if basis == 'coordinate':
+            radii[block] = np.minimum(sub_radius, radii0[block])
+        else:
+            radius = min(sub_radius, rhobeg)
+            if success:
+                direction = step
+        if res.status == ExitStatus.NAN_EVAL_ERROR.value:
+            status = res.status
+            break
+
+    fhist = np.array(fhist, dtype=np.float64)
+    result = OptimizeResult({'x': x, 'fun': fx, 'status': status, 'nfev': fhist.size, 'fhist': fhist,
+                             'warnings': []})
+    if np.any(np.isfinite(np.r_[lb, ub])):
+        result.update(constrviolation=0., chist=np.zeros_like(fhist))
+    return result
@@ -1,6 +1,5 @@
 # -*- coding: utf-8 -*-
 import warnings
-from inspect import stack
 
 import numpy as np
 
@@ -43,6 +42,21 @@ def uobyqa(fun, x0, args=(), options=None):
                 Final value of the trust-region radius. It must be smaller than
                 or equal to ``options['radius_init']`` and should indicate the
                 accuracy required in the final values of the variables.
+            auto_radius : bool or {'probe'}, optional
+                Whether to scale the variables so that the initial and final
+                trust-region radii are relative to their scales. The scale of a
+                variable is the range of its bounds if it has two, the
+                magnitude of its initial value if it is nonzero, and its
+                distance to its bound otherwise. If it is 'probe', the scales of
+                the remaining variables are estimated from the objective
+                function at two points around x0 for each of them. These
+                evaluations are not counted in ``nfev`` but are taken off
+                ``options['maxfev']``, and the probes are skipped (with a
+                warning) if they would leave too few evaluations to the
+                solver. The radii then apply to the scaled
+                problem, ``options['radius_init']`` defaulting to 0.5, which is
+                a quarter of the range of the bounds, or the magnitude of the
+                initial value. Default is False.
             maxfev : int, optional
                 Maximum number of function evaluations.
             ftarget : float, optional
@@ -62,6 +76,35 @@ def uobyqa(fun, x0, args=(), options=None):
                 functions at the solution. This is only done in the debug mode,
                 and requires one extra function evaluation. It is highly
                 discouraged in production.
+            return_model : bool, optional
+                Whether to return the final quadratic model of the objective
+                function, built by UOBYQA from the function values, in the
+                fields ``model_gradient`` and ``model_hessian`` of the result.
+                Default is False.
+            evaluation_policy : dict, optional
+                Policy for the evaluations of the objective function, with the
+                optional fields 'timeout' (the maximal time of an evaluation in
+                seconds, or None), 'retries' (the number of times a failed
+                evaluation is attempted again), 'backoff' (the time waited
+                before the first retry in seconds, doubled after each one,
+                default is 0.1), and 'isolation' ('thread' or 'process', where
+                the evaluations with a timeout are run; a process is terminated
+                when it times out, whereas a thread keeps running in the
+                background). An evaluation fails if it raises an exception or
+                times out, and if all its attempts fail, the objective function
+                is given the extreme barrier value at this point instead of the
+                exception being propagated. The numbers of failures are returned
+                in the field ``failures`` of the result. Default is None, i.e.,
+                no timeout and no retry.
+            evaluation_cache : `pdfo.EvaluationCache` or str, optional
+                Cache of the values of the objective function, or the path of
+                its SQLite file, shared by all the processes that use it. The
+                values are looked up at the points at which the objective
+                function is evaluated, keyed by the bytes of their float64
+                entries, so that the points already evaluated by another solve
+                (possibly in another process) are not evaluated again. They are
+                counted in ``nfev``. The extra arguments `args` are not part of
+                the keys. Default is None, i.e., no cache.
 
     Returns
     -------
@@ -86,6 +129,34 @@ def uobyqa(fun, x0, args=(), options=None):
             method : str
                 Name of the Powell method used.
 
+        If ``options['return_model']`` is True, the following fields are also
+        returned (they are None if UOBYQA stopped before building its first
+        model):
+
+            model_gradient : `numpy.ndarray`, shape (n,)
+                Gradient of the final model at ``x``, an estimate of the
+                gradient of the objective function.
+            model_hessian : `numpy.ndarray`, shape (n, n)
+                Hessian matrix of the final model, an estimate of that of the
+                objective function.
+
+        If ``options['evaluation_policy']`` is given, the following field is
+        also returned:
+
+            failures : dict
+                Numbers of evaluations of the objective function that raised an
+                exception ('exceptions') or timed out ('timeouts'), including
+                the retries, and of points at which all the attempts failed and
+                the extreme barrier was used ('barriers').
+
+        If ``options['auto_radius']`` is 'probe', the following field is also
+        returned:
+
+            probe_nfev : int
+                Number of evaluations of the objective function made to
+                estimate the scales of the variables, besides those counted in
+                ``nfev``.
+
         Finally, if warnings are raised during the optimization procedure, the
         following field is also returned:
 
@@ -173,23 +244,15 @@ def uobyqa(fun, x0, args=(), options=None):
     >>> res.x
     array([0., 0.])
     """
-    try:
-        from .gethuge import gethuge
-    except ImportError:
-        from ._common import import_error_so
-
-        # If gethuge cannot be imported, the execution should stop because the package is most likely not built.
-        import_error_so('gethuge')
-
-    from ._common import prepdfo, postpdfo
+    from ._common import prepdfo, _frame_names, preprocessed_invokers, _integer_backend, _workspace_size, _solver_model, postpdfo
     from ._settings import ExitStatus, Options
 
     # This method is deprecated. Warn the user.
     warnings.warn('The `uobyqa` function is deprecated. Use the `pdfo` function with the argument `method=\'uobyqa\'` to use the UOBYQA method.', DeprecationWarning, 2)
 
-    fun_name = stack()[0][3]  # name of the current function
-    if len(stack()) >= 3:
-        invoker = stack()[1][3].lower()
+    fun_name = _frame_names()[0]  # name of the current function
+    if len(_frame_names()) >= 3:
+        invoker = _frame_names()[1].lower()
     else:
         invoker = ''
 
@@ -203,7 +266,7 @@ def uobyqa(fun, x0, args=(), options=None):
     # Preprocess the inputs.
     fun_c, x0_c, _, _, options_c, _, prob_info = prepdfo(fun, x0, args, options=options)
 
-    if invoker != 'pdfo' and prob_info['feasibility_problem']:
+    if invoker not in preprocessed_invokers and prob_info['feasibility_problem']:
         # An "unconstrained feasibility problem" is ridiculous yet nothing wrong mathematically.
         # We could set fx=[], funcCount=0, and fhist=[] since no function evaluation occurred. But then we will have to
         # modify the validation of fx, funcCount, and fhist in postpdfo. To avoid such a modification, we set fx,
@@ -227,8 +290,10 @@ def uobyqa(fun, x0, args=(), options=None):
             warnings.warn(w_message, Warning, 2)
             output['warnings'].append(w_message)
 
-        # The largest integer in the fortran functions; the factor 0.99 provides a buffer.
-        max_int = np.floor(0.99 * gethuge('integer'))
+        # The largest integer in the fortran functions. If the workspace or maxfev would overflow the default Fortran
+        # integers, the backend built with 64-bit integers is used, if available.
+        nw = _workspace_size('uobyqa', n)
+        max_int, int64 = _integer_backend('uobyqa', options_c[Options.CLASSICAL.value], nw, maxfev)
 
         # The smallest nw, i.e., the nw with npt = (n+1)*(n+2)/2. If it is larger than a threshold (system dependent),
         # the problem is too large to be executed on the system.
@@ -248,14 +313,18 @@ def uobyqa(fun, x0, args=(), options=None):
         try:
             if options_c[Options.CLASSICAL.value]:
                 from . import fuobyqa_classical as fuobyqa
+            elif int64:
+                from . import fuobyqa_int64 as fuobyqa
             else:
                 from . import fuobyqa
         except ImportError:
             from ._common import import_error_so
             import_error_so()
 
-        x, fx, exitflag, fhist = fuobyqa.muobyqa(x0_c, rhobeg, rhoend, 0, maxfev, ftarget, fun_c)
+        x, w, fx, exitflag, fhist = fuobyqa.muobyqa(x0_c, rhobeg, rhoend, 0, maxfev, ftarget, lambda x: fun_c(x))
         nf = int(fuobyqa.fuobyqa.nf)
+        if options_c[Options.RETURN_MODEL.value]:
+            output.update(_solver_model('uobyqa', w, x, nf, x.size))
 
     # Postprocess the result.
     return postpdfo(x, fx, exitflag, output, fun_name, nf, fhist, options_c, prob_info)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the scaling of the variables that makes the trust-region radii relative to their scales."""
+import unittest
+import warnings
+
+import numpy as np
+from pdfo import pdfo
+from scipy.optimize import Bounds
+
+SCALES = 10. ** np.arange(-3, 4)
+
+
+def badly_scaled(x):
+    """Quadratic function whose variables have scales ranging from 1e-3 to 1e3."""
+    return np.sum(((x - SCALES) / SCALES) ** 2)
+
+
+class TestAutoRadius(unittest.TestCase):
+
+    def setUp(self):
+        warnings.filterwarnings('ignore')
+
+    def runTest(self):
+        """The scales should be taken from x0, from the bounds, and from the probes."""
+        x0 = 1.7 * SCALES
+        res_plain = pdfo(badly_scaled, x0, method='newuoa')
+        res = pdfo(badly_scaled, x0, method='newuoa', options={'auto_radius': True})
+        self.assertLess(res.nfev, res_plain.nfev)
+        self.assertLessEqual(np.max(np.abs(res.x / SCALES - 1.)), 1e-4)
+        self.assertNotIn('probe_nfev', res)
+
+        # The variables with two bounds are scaled as with options['scale'].
+        bounds = Bounds(np.r_[-10. * SCALES[:4], np.full(3, -np.inf)], np.r_[10. * SCALES[:4], np.full(3, np.inf)])
+        res = pdfo(badly_scaled, x0, method='bobyqa', bounds=bounds, options={'auto_radius': True})
+        self.assertLessEqual(np.max(np.abs(res.x / SCALES - 1.)), 1e-4)
+
+        # The scales of the variables whose initial values are zero are estimated from probes.
+        res = pdfo(badly_scaled, np.zeros(SCALES.size), method='newuoa', options={'auto_radius': 'probe'})
+        self.assertEqual(res.probe_nfev, 2 * SCALES.size)
+        self.assertLessEqual(np.max(np.abs(res.x / SCALES - 1.)), 1e-4)
+
+        # The probes are taken off maxfev, and skipped if they would take too large a part of it.
+        for maxfev in [200, 60]:
+            count = []
+            res = pdfo(lambda x: count.append(x) or badly_scaled(x), np.zeros(SCALES.size), method='newuoa',
+                       options={'auto_radius': 'probe', 'maxfev': maxfev})
+            self.assertLessEqual(len(count), maxfev)
+            self.assertEqual(res.nfev + res.get('probe_nfev', 0), len(count))
+        self.assertNotIn('probe_nfev', res)
+        self.assertTrue(any('not probed' in message for message in res.warnings))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the cache of the elimination of the linear equality constraints."""
+import unittest
+import warnings
+
+import numpy as np
+from pdfo import elimination_cache_clear, elimination_cache_info, pdfo
+from scipy.optimize import Bounds, LinearConstraint
+
+
+class TestEliminationCache(unittest.TestCase):
+    PRECISION = np.float64(1e-10)
+
+    def setUp(self):
+        """Initializes the cache tests."""
+        self.n = 5
+        a = np.array([[1., 1., 0., 0., 0.], [0., 1., 1., 0., 0.], [1., 0., 0., 1., 1.]])
+        self.constraints = LinearConstraint(a, [1., 2., -np.inf], [1., 2., 4.])
+        self.bounds = Bounds(np.full(self.n, -5.), np.full(self.n, 5.))
+        warnings.filterwarnings('ignore')
+
+    def tearDown(self):
+        elimination_cache_clear(maxsize=32)
+
+    def fun(self, x):
+        """Separable convex quadratic."""
+        return np.sum((x - np.arange(self.n)) ** 2)
+
+    def solve(self, x0):
+        return pdfo(self.fun, x0, bounds=self.bounds, constraints=self.constraints, options={'quiet': True})
+
+    def runTest(self):
+        """The cached factorization should give the same results as a new one."""
+        x0_list = [np.zeros(self.n), np.ones(self.n), np.arange(self.n) / 2.]
+        elimination_cache_clear(maxsize=0)
+        reference = [self.solve(x0).x for x0 in x0_list]
+        self.assertEqual(elimination_cache_info().currsize, 0)
+
+        elimination_cache_clear(maxsize=1)
+        for x0, x_ref in zip(x0_list, reference):
+            self.assertLessEqual(np.linalg.norm(self.solve(x0).x - x_ref), self.PRECISION)
+        info = elimination_cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (2, 1, 1))
+
+        # Other bounds lead to another entry, which evicts the previous one.
+        self.bounds = Bounds(np.full(self.n, -4.), np.full(self.n, 4.))
+        self.solve(x0_list[0])
+        info = elimination_cache_info()
+        self.assertEqual((info.misses, info.evictions, info.currsize), (2, 1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the cost-model-driven selection of the solver."""
+import unittest
+import warnings
+
+import numpy as np
+from pdfo import pdfo
+from scipy.optimize import Bounds, NonlinearConstraint
+
+
+class TestAutoCost(unittest.TestCase):
+
+    def setUp(self):
+        self.count = 0
+        warnings.filterwarnings('ignore')
+
+    def fun(self, x):
+        self.count += 1
+        return np.sum((x - 1.) ** 2)
+
+    def runTest(self):
+        """The timed evaluations should be reused, and the cost model should drive the selection."""
+        problems = [
+            {},
+            {'bounds': Bounds(np.full(4, -2.), np.full(4, 2.))},
+            {'constraints': NonlinearConstraint(lambda x: np.sum(x ** 2), -np.inf, 1.)},
+        ]
+        for problem in problems:
+            self.count = 0
+            res = pdfo(self.fun, np.zeros(4), method='auto-cost', **problem, options={'quiet': True})
+            self.assertEqual(res.nfev, self.count)
+            self.assertEqual(res.probe_nfev, 0)
+
+        # The initial points of BOBYQA differ from the timed ones, which are then not all requested.
+        self.count = 0
+        res = pdfo(self.fun, np.zeros(4), method='auto-cost', bounds=Bounds(np.full(4, -1.), np.ones(4)))
+        self.assertEqual(res.method, 'bobyqa')
+        self.assertGreater(res.probe_nfev, 0)
+        self.assertEqual(res.nfev + res.probe_nfev, self.count)
+
+        # A cost model under which COBYLA is by far the cheapest solver.
+        cost_model = {'cobyla': {'overhead': (0., 0.), 'evaluations': (1e-3, 0.)}}
+        res = pdfo(self.fun, np.zeros(4), method='auto-cost', options={'cost_model': cost_model})
+        self.assertEqual(res.method, 'cobyla')
+
+        # A cost model under which NEWUOA is the cheapest solver, with the npt closest to the one provided.
+        cost_model = {config: {'evaluations': (1e-3, 0.)} for config in ['newuoa:n+2', 'newuoa:2n+1']}
+        res = pdfo(self.fun, np.zeros(4), method='auto-cost', options={'cost_model': cost_model, 'npt': 7})
+        self.assertEqual(res.method, 'newuoa')
+        self.assertLessEqual(np.linalg.norm(res.x - 1.), 1e-4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the cache of the values of the objective function shared by several processes."""
+import os
+import tempfile
+import unittest
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from pdfo import EvaluationCache, pdfo
+
+
+def rosenbrock(x):
+    return np.sum(1e2 * (x[1:] - x[:-1] ** 2) ** 2 + (1. - x[:-1]) ** 2)
+
+
+def solve(path):
+    res = pdfo(rosenbrock, np.zeros(4), method='newuoa', options={'maxfev': 200, 'evaluation_cache': path})
+    return res.x, res.nfev
+
+
+class Counter:
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, x):
+        self.count += 1
+        return rosenbrock(x)
+
+
+class TestEvaluationCache(unittest.TestCase):
+
+    def setUp(self):
+        warnings.filterwarnings('ignore')
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'cache.sqlite')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def runTest(self):
+        """The points evaluated in another process should not be evaluated again, and the least recently used values
+        should be evicted."""
+        with ProcessPoolExecutor(1) as executor:
+            x, nfev = executor.submit(solve, self.path).result()
+
+        cache = EvaluationCache(self.path)
+        fun = Counter()
+        res = pdfo(fun, np.zeros(4), method='newuoa', options={'maxfev': 200, 'evaluation_cache': cache})
+        self.assertEqual(fun.count, 0)
+        self.assertTrue(np.array_equal(res.x, x))
+        self.assertEqual(res.nfev, nfev)
+        self.assertEqual(cache.info().hits, nfev)
+        self.assertEqual(cache.info().currsize, nfev)
+
+        # The values read recently are kept when the least recently used one is evicted.
+        lru = EvaluationCache(self.path, maxsize=3, namespace='lru')
+        for i in range(3):
+            lru.put(np.array([i]), float(i))
+        lru.get(np.array([0.]))
+        lru.put(np.array([3.]), 3.)
+        self.assertEqual([lru.get(np.array([i])) for i in range(4)], [0., None, 2., 3.])
+        lru.close()
+
+        # Another namespace does not share the values, and its size is bounded independently.
+        other = EvaluationCache(self.path, maxsize=10, namespace='other')
+        fun = Counter()
+        res = pdfo(fun, np.zeros(4), method='newuoa', options={'maxfev': 200, 'evaluation_cache': other})
+        self.assertEqual(fun.count, nfev)
+        self.assertEqual(other.info().currsize, 10)
+        self.assertEqual(other.info().evictions, nfev - 10)
+        self.assertEqual(cache.info().currsize, nfev)
+
+        # The least-squares mode caches the residuals.
+        residuals = EvaluationCache(self.path, namespace='residuals')
+        fun = Counter()
+        options = {'maxfev': 100, 'evaluation_cache': residuals}
+        res_ls = pdfo(lambda x: x - 1., np.zeros(3), method='bobyqa-ls', options=options)
+        res = pdfo(lambda x: fun(x) and x - 1., np.zeros(3), method='bobyqa-ls', options=options)
+        self.assertEqual(fun.count, 0)
+        self.assertTrue(np.array_equal(res.x, res_ls.x))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the executors of the parallel evaluations: the worker server on sockets and the bound on the tasks in flight."""
+import threading
+import time
+import unittest
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import AuthenticationError
+
+import numpy as np
+from pdfo import ElementValueCache, SocketExecutor, WorkerServer, pdfo
+
+
+def element(x, shift):
+    return np.sum((x - shift) ** 2)
+
+
+class TestExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.running, self.peak = 0, 0
+        self.lock = threading.Lock()
+        warnings.filterwarnings('ignore')
+
+    def fun(self, x):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(1e-3)
+        with self.lock:
+            self.running -= 1
+        return np.sum((x - 1.) ** 2) + 1e-2 * np.random.default_rng().standard_normal()
+
+    def runTest(self):
+        """The tasks sent to a worker server should be run with their arrays, and an executor should never have more
+        tasks in flight than allowed."""
+        with WorkerServer(workers=4) as server:
+            # The server has a random key by default, and refuses the clients that do not know it.
+            self.assertEqual(len(server.authkey), 32)
+            self.assertRaises(AuthenticationError, SocketExecutor, server.address, authkey=bytes(32))
+            executor = SocketExecutor(server.address, max_in_flight=3, authkey=server.authkey)
+            x = np.arange(1e5)
+            self.assertTrue(np.array_equal(executor.submit(np.negative, x).result(), -x))
+            with self.assertRaises(ZeroDivisionError):
+                executor.submit(divmod, 1, 0).result()
+            futures = [executor.submit(abs, -i) for i in range(100)]
+            self.assertEqual([future.result() for future in futures], list(range(100)))
+
+            # The elements of a partially separable function are evaluated on the server.
+            fun = ElementValueCache([(element, [i, i + 1]) for i in range(5)], executor=executor)
+            res = pdfo(fun, np.zeros(6), args=(1.,), options={'maxfev': 200})
+            self.assertLess(res.fun, 1e-4)
+            executor.shutdown()
+
+        with ThreadPoolExecutor(8) as executor:
+            res = pdfo(self.fun, np.zeros(3), options={'noisy': True, 'executor': executor, 'max_in_flight': 2,
+                                                       'maxfev': 600})
+            self.assertLessEqual(self.peak, 2)
+            self.assertGreater(self.peak, 1)
+            self.assertEqual(res.nfev, res.fun_history.size)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the multi-fidelity evaluations, the expensive ones being screened by a cheap objective function."""
+import unittest
+import warnings
+
+import numpy as np
+from pdfo import pdfo
+
+
+def rosenbrock(x):
+    return np.sum(1e1 * (x[1:] - x[:-1] ** 2) ** 2 + (1. - x[:-1]) ** 2)
+
+
+def low_fidelity(x):
+    """Cheap approximation of rosenbrock, whose difference with it varies slowly."""
+    return 1.05 * rosenbrock(x) + .1 * np.sum(x) + 1.
+
+
+class TestFidelity(unittest.TestCase):
+
+    def setUp(self):
+        warnings.filterwarnings('ignore')
+
+    def runTest(self):
+        """Fewer expensive evaluations should be needed, and the solution should be evaluated in high fidelity."""
+        x0 = np.random.default_rng(0).uniform(-1., 1., 4)
+        res_high = pdfo(rosenbrock, x0, method='newuoa')
+        res = pdfo(rosenbrock, x0, method='newuoa', options={'low_fidelity': low_fidelity})
+        self.assertEqual(res.fidelity_nfev['low'], res.nfev)
+        self.assertLess(res.fidelity_nfev['high'], res_high.nfev)
+        self.assertEqual(res.fun, rosenbrock(res.x))
+        self.assertLessEqual(np.linalg.norm(res.x - 1.), 1e-4)
+        self.assertNotIn('fidelity_nfev', res_high)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests that importing pdfo does not import its heavy dependencies."""
+import subprocess
+import sys
+import unittest
+
+
+class TestImport(unittest.TestCase):
+
+    def runTest(self):
+        """Only the top-level package should be loaded by ``import pdfo``."""
+        code = 'import sys, pdfo; print(" ".join(sorted(sys.modules)))'
+        modules = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout.split()
+        for name in ['scipy', 'pdfo._common', 'pdfo.tests', 'pdfo.gethuge']:
+            self.assertNotIn(name, modules)
+
+        # The public names should nevertheless be available.
+        code = 'import pdfo; print(pdfo.pdfo.__name__, pdfo.testpdfo.__name__)'
+        output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout
+        self.assertEqual(output.split(), ['pdfo', 'pdfo.tests.test_pdfo'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the solvers built with 64-bit integers."""
+import unittest
+import warnings
+from unittest import mock
+
+import numpy as np
+from pdfo import pdfo
+from pdfo import _common
+from scipy.optimize import Bounds, LinearConstraint, NonlinearConstraint
+
+
+class TestInt64Backend(unittest.TestCase):
+
+    def setUp(self):
+        warnings.filterwarnings('ignore')
+
+    def runTest(self):
+        """If the workspace overflows the default integers, the 64-bit backend should give the same results."""
+        try:
+            _common.import_module('pdfo.fnewuoa_int64')
+        except ImportError:
+            self.skipTest('the solvers with 64-bit integers are not built')
+        fun = lambda x: np.sum((x - 1.) ** 2)
+        problems = [
+            {'method': 'uobyqa'},
+            {'method': 'newuoa'},
+            {'method': 'bobyqa', 'bounds': Bounds(np.zeros(4), np.full(4, .5))},
+            {'method': 'lincoa', 'constraints': LinearConstraint(np.ones((1, 4)), -np.inf, 1.)},
+            {'method': 'cobyla', 'constraints': NonlinearConstraint(lambda x: np.sum(x ** 2), -np.inf, 1.)},
+        ]
+        for problem in problems:
+            options = {'maxfev': 100, 'quiet': True}
+            res = pdfo(fun, np.zeros(4), **problem, options=options)
+            # With such a small limit, every workspace overflows the default integers.
+            with mock.patch.dict(_common._huge_values, {'integer': 100}):
+                res_int64 = pdfo(fun, np.zeros(4), **problem, options=options)
+            self.assertEqual(res_int64.method, res.method)
+            self.assertEqual(res_int64.nfev, res.nfev)
+            np.testing.assert_array_equal(res_int64.x, res.x)
+
+
+class TestInt64Maxfev(unittest.TestCase):
+
+    def setUp(self):
+        warnings.filterwarnings('ignore')
+
+    def runTest(self):
+        """If maxfev overflows the default integers, the 64-bit backend should be used instead of clamping maxfev."""
+        try:
+            _common.import_module('pdfo.fnewuoa_int64')
+        except ImportError:
+            self.skipTest('the solvers with 64-bit integers are not built')
+        max_int, int64 = _common._integer_backend('newuoa', False, 100, 2 ** 31 + 10)
+        self.assertTrue(int64)
+        self.assertGreater(max_int, 2 ** 31 + 10)
+
+        # The workspace of this problem fits in the default integers, but maxfev does not.
+        fun = lambda x: np.sum((x - 1.) ** 2)
+        with mock.patch.dict(_common._huge_values, {'integer': 1000}):
+            res = pdfo(fun, np.zeros(2), method='newuoa', options={'maxfev': 5000})
+        self.assertFalse(any('maxfev' in message for message in res.get('warnings', [])))
+        self.assertLessEqual(np.linalg.norm(res.x - 1.), 1e-4)
+
+
+if __name__ == '__main__':
+    unittest.main()
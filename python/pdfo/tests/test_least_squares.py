@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the least-squares solver of pdfo (method='bobyqa-ls')."""
+import unittest
+import warnings
+
+import numpy as np
+from pdfo import pdfo
+from scipy.optimize import Bounds, LinearConstraint
+
+
+class TestLeastSquares(unittest.TestCase):
+
+    def setUp(self):
+        warnings.filterwarnings('ignore')
+        self.t = np.linspace(0., 4., 100)
+        self.y = 2.5 * np.exp(-1.3 * self.t) + .5 * np.sin(.8 * self.t)
+
+    def residuals(self, p):
+        return p[0] * np.exp(-p[1] * self.t) + p[2] * np.sin(p[3] * self.t) - self.y
+
+    def runTest(self):
+        """The residuals should be modeled individually, which should save many function evaluations."""
+        x0 = np.ones(4)
+        res = pdfo(self.residuals, x0, method='bobyqa-ls')
+        self.assertEqual(res.method, 'bobyqa-ls')
+        self.assertEqual(res.fun_history.size, res.nfev)
+        self.assertAlmostEqual(res.fun, np.sum(self.residuals(res.x) ** 2))
+        self.assertLessEqual(np.linalg.norm(res.x - [2.5, 1.3, .5, .8]), 1e-4)
+        plain = pdfo(lambda p: np.sum(self.residuals(p) ** 2), x0)
+        self.assertLess(3 * res.nfev, plain.nfev)
+
+        bounds = Bounds([0., 0., 0., 0.], [2., 5., 5., 5.])
+        res = pdfo(self.residuals, x0, method='bobyqa-ls', bounds=bounds)
+        self.assertTrue(np.all(res.x >= bounds.lb) and np.all(res.x <= bounds.ub))
+        self.assertAlmostEqual(res.x[0], 2.)
+
+        # Other constraints are handled by the usual solvers, applied to the sum of the squares.
+        res = pdfo(lambda x: x - 1., np.zeros(3), method='bobyqa-ls',
+                   constraints=LinearConstraint(np.ones(3), -np.inf, 1.))
+        self.assertEqual(res.method, 'lincoa')
+        self.assertAlmostEqual(res.fun, 4. / 3.)
+
+
+if __name__ == '__main__':
+    unittest.main()
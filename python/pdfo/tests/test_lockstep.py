@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the lockstep solution of many instances whose objective functions are evaluated together."""
+import unittest
+import warnings
+
+import numpy as np
+from pdfo import lockstep, pdfo
+from scipy.optimize import Bounds
+
+
+class TestLockstep(unittest.TestCase):
+
+    def setUp(self):
+        warnings.filterwarnings('ignore')
+        self.c = np.random.default_rng(0).standard_normal((6, 3))
+        self.batches = []
+
+    def fun(self, x, indices):
+        """Quartic functions of the instances, evaluated on a batch of points."""
+        self.batches.append(indices.size)
+        return np.sum((x - self.c[indices]) ** 2, axis=1) + np.sum(x ** 4, axis=1)
+
+    def runTest(self):
+        """The instances should be solved as if they were solved one by one, in batches of at most workers points."""
+        bounds = Bounds(np.full(3, -.5), np.full(3, .5))
+        for method, bounds in [('newuoa', None), ('bobyqa', bounds)]:
+            self.batches = []
+            results = lockstep(self.fun, np.zeros((6, 3)), bounds=bounds, options={'maxfev': 100}, workers=4)
+            self.assertLessEqual(max(self.batches), 4)
+            self.assertEqual(sum(self.batches), sum(res.nfev for res in results))
+            for k, res in enumerate(results):
+                res_single = pdfo(lambda x: self.fun(x[np.newaxis], np.array([k]))[0], np.zeros(3), method=method,
+                                  bounds=bounds, options={'maxfev': 100})
+                self.assertTrue(np.array_equal(res.x, res_single.x))
+                self.assertEqual(res.nfev, res_single.nfev)
+
+
+if __name__ == '__main__':
+    unittest.main()
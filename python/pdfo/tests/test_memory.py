@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the memory budget of the solvers."""
+import unittest
+import warnings
+
+import numpy as np
+from pdfo import newuoa, pdfo
+from pdfo._common import _memory_footprint
+from scipy.optimize import Bounds
+
+
+class TestMaxMemory(unittest.TestCase):
+
+    def setUp(self):
+        warnings.filterwarnings('ignore')
+
+    def fun(self, x):
+        return np.sum((x - 1.) ** 2)
+
+    def runTest(self):
+        """The selected solver and npt should fit in the memory budget."""
+        n, maxfev = 6, 100
+        options = {'maxfev': maxfev, 'quiet': True}
+        self.assertEqual(pdfo(self.fun, np.zeros(n), options=options).method, 'uobyqa')
+
+        # UOBYQA exceeds the budget, but not NEWUOA with the default npt.
+        budget = _memory_footprint('newuoa', n, 2 * n + 1, 0, maxfev)
+        self.assertGreater(_memory_footprint('uobyqa', n, 0, 0, maxfev), budget)
+        res = pdfo(self.fun, np.zeros(n), options=dict(options, max_memory=budget))
+        self.assertEqual(res.method, 'newuoa')
+        self.assertLessEqual(np.linalg.norm(res.x - 1.), 1e-4)
+
+        # npt is reduced to fit in the budget, with a warning since it is provided by the user.
+        res = newuoa(self.fun, np.zeros(n), options=dict(options, npt=20, max_memory=budget))
+        self.assertTrue(any('max_memory' in message for message in res.warnings))
+
+        # Nothing fits: the solver with the smallest footprint is used.
+        bounds = Bounds(np.full(n, -2.), np.full(n, 2.))
+        res = pdfo(self.fun, np.zeros(n), bounds=bounds, options=dict(options, max_memory=1.))
+        self.assertEqual(res.method, 'bobyqa')
+        self.assertTrue(any('max_memory' in message for message in res.warnings))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the final models returned by the solvers when options['return_model'] is True."""
+import unittest
+import warnings
+
+import numpy as np
+from pdfo import pdfo
+from scipy.optimize import Bounds, NonlinearConstraint
+
+
+class TestModel(unittest.TestCase):
+
+    def setUp(self):
+        warnings.filterwarnings('ignore')
+        self.hessian = np.array([[4., 1., 0.], [1., 3., .5], [0., .5, 2.]])
+        self.gradient = np.array([1., -2., .5])
+
+    def quadratic(self, x):
+        return .5 * np.dot(x, self.hessian @ x) + np.dot(self.gradient, x)
+
+    def runTest(self):
+        """The models should estimate the derivatives of a quadratic function, in the variables of the user."""
+        for method, tol in [('uobyqa', 1e-8), ('newuoa', .1), ('bobyqa', .1), ('lincoa', .1)]:
+            res = pdfo(self.quadratic, np.zeros(3), method=method, options={'return_model': True})
+            self.assertLessEqual(np.linalg.norm(res.model_gradient), 1e-4)
+            self.assertLessEqual(np.max(np.abs(res.model_hessian - self.hessian)), tol)
+        self.assertNotIn('model_gradient', pdfo(self.quadratic, np.zeros(3)))
+
+        # The gradient is not zero at the solution of a bound-constrained problem, and its components corresponding
+        # to the fixed variables are unknown.
+        bounds = Bounds([-1., .3, -1.], [1., .3, 1.])
+        res = pdfo(self.quadratic, np.zeros(3), bounds=bounds, options={'return_model': True, 'scale': True})
+        expected = self.hessian @ res.x + self.gradient
+        self.assertTrue(np.isnan(res.model_gradient[1]))
+        self.assertLessEqual(np.max(np.abs(res.model_gradient[[0, 2]] - expected[[0, 2]])), 1e-4)
+
+        # COBYLA estimates the Jacobian matrices of the nonlinear constraints.
+        constraint = NonlinearConstraint(lambda x: np.dot(x, x), -np.inf, 1.)
+        res = pdfo(self.quadratic, np.zeros(3), method='cobyla', constraints=constraint,
+                   options={'return_model': True})
+        self.assertIsNone(res.model_hessian)
+        self.assertEqual(res.model_jacobian.shape, (1, 3))
+        self.assertLessEqual(np.max(np.abs(res.model_jacobian[0] - 2 * res.x)), .1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the noise-aware mode, in which the values of a stochastic objective function are replicated and averaged."""
+import unittest
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from pdfo import pdfo
+from scipy.optimize import Bounds
+
+
+class TestNoise(unittest.TestCase):
+
+    def setUp(self):
+        self.count = 0
+        self.rng = np.random.default_rng(0)
+        warnings.filterwarnings('ignore')
+
+    def fun(self, x):
+        self.count += 1
+        return np.sum((x - 1.) ** 2) + .01 * self.rng.standard_normal()
+
+    def runTest(self):
+        """The noise level should be estimated, and every replicate should be counted in the budget and the history."""
+        n = 4
+        with ThreadPoolExecutor(4) as executor:
+            for bounds, executor in [(None, None), (Bounds(np.full(n, -3.), np.full(n, 3.)), executor)]:
+                self.count = 0
+                options = {'noisy': True, 'maxfev': 2000, 'executor': executor}
+                res = pdfo(self.fun, np.zeros(n), bounds=bounds, options=options)
+                self.assertEqual(res.nfev, self.count)
+                self.assertLessEqual(res.nfev, options['maxfev'])
+                self.assertEqual(res.fun_history.size, res.nfev)
+                self.assertTrue(.005 <= res.noise <= .02)
+                self.assertGreater(res.replicates, 1)
+                self.assertLessEqual(np.linalg.norm(res.x - 1.), .2)
+
+        # A deterministic function is not replicated.
+        res = pdfo(lambda x: np.sum((x - 1.) ** 2), np.zeros(n), options={'noisy': True})
+        self.assertEqual(res.noise, 0.)
+        self.assertEqual(res.replicates, 1)
+        self.assertLessEqual(np.linalg.norm(res.x - 1.), 1e-4)
+
+
+if __name__ == '__main__':
+    unittest.main()
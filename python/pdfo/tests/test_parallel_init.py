@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the parallel evaluation of the initial interpolation points."""
+import threading
+import unittest
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from pdfo import pdfo
+from scipy.optimize import Bounds
+
+
+class TestParallelInitialPoints(unittest.TestCase):
+
+    def setUp(self):
+        self.parallel = 0
+        self.main_thread = threading.get_ident()
+        warnings.filterwarnings('ignore')
+
+    def fun(self, x):
+        if threading.get_ident() != self.main_thread:
+            self.parallel += 1
+        return np.sum((x - np.arange(x.size)) ** 2) + .3 * np.dot(x[:-1], x[1:]) + np.sum(np.sin(x))
+
+    def runTest(self):
+        """The solvers should behave exactly as with sequential evaluations, all their initial points being evaluated in
+        parallel."""
+        n = 5
+        x0 = np.array([0., 0., .5, .3, -2.9])
+        bounds = Bounds([-1., 0., .5, -2., -3.], [2., 3., 4., .3, 5.])
+        problems = [
+            ('newuoa', None, 2 * n + 1),
+            ('newuoa', None, (n + 1) * (n + 2) // 2),
+            ('uobyqa', None, (n + 1) * (n + 2) // 2),
+            ('bobyqa', bounds, 2 * n + 1),
+            ('bobyqa', bounds, 3 * n + 3),
+        ]
+        with ThreadPoolExecutor(4) as executor:
+            for method, bounds, npt in problems:
+                options = {} if method == 'uobyqa' else {'npt': npt}
+                res_plain = pdfo(self.fun, x0, method=method, bounds=bounds, options=options)
+                self.parallel = 0
+                options.update(parallel_initial_points=True, executor=executor)
+                res = pdfo(self.fun, x0, method=method, bounds=bounds, options=options)
+                self.assertEqual(self.parallel, npt)
+                self.assertEqual(res.nfev, res_plain.nfev)
+                self.assertTrue(np.array_equal(res.x, res_plain.x))
+                self.assertTrue(np.array_equal(res.fun_history, res_plain.fun_history))
+
+
+if __name__ == '__main__':
+    unittest.main()
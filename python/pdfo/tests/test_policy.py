@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the evaluation policy of the objective function: timeout, retries, and extreme barrier."""
+import time
+import unittest
+import warnings
+
+import numpy as np
+from pdfo import newuoa, pdfo
+from pdfo._policy import EvaluationPolicy
+
+
+def invalid(x):
+    """Objective function raising an exception, defined at the module level to be picklable."""
+    raise ValueError('x is invalid')
+
+
+class TestPolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.count = 0
+        warnings.filterwarnings('ignore')
+
+    def fun(self, x):
+        self.count += 1
+        if self.count % 10 == 3:
+            raise RuntimeError('the simulation crashed')
+        if self.count % 10 == 6:
+            time.sleep(.5)
+        return np.sum((x - 1.) ** 2)
+
+    def runTest(self):
+        """The failed evaluations should be retried or replaced by the extreme barrier, and counted."""
+        n = 3
+        x0 = np.zeros(n)
+
+        # Without policy, the exception is propagated.
+        with self.assertRaises(RuntimeError):
+            pdfo(self.fun, x0)
+
+        # Every failure is replaced by the extreme barrier if there is no retry.
+        self.count = 0
+        res = newuoa(self.fun, x0, options={'evaluation_policy': {'timeout': .1}})
+        self.assertEqual(res.failures['barriers'], res.failures['exceptions'] + res.failures['timeouts'])
+        self.assertGreater(res.failures['exceptions'], 0)
+        self.assertGreater(res.failures['timeouts'], 0)
+        self.assertLess(res.fun, n)  # the value at x0
+        self.assertTrue(any('extreme barrier' in message for message in res.warnings))
+
+        # A failure is never repeated twice in a row, so that one retry always succeeds.
+        for isolation in ['thread', 'process']:
+            self.count = 0
+            policy = {'timeout': .1, 'retries': 1, 'backoff': 0., 'isolation': isolation}
+            res = pdfo(self.fun, x0, options={'evaluation_policy': policy})
+            self.assertEqual(res.failures['barriers'], 0)
+            self.assertGreater(res.failures['exceptions'] + res.failures['timeouts'], 0)
+            self.assertLessEqual(np.linalg.norm(res.x - 1.), 1e-4)
+
+        # The exceptions raised in a worker process keep their type.
+        policy = EvaluationPolicy(invalid, timeout=10., isolation='process')
+        self.assertTrue(np.isnan(policy(x0)))
+        policy.close()
+        self.assertIsInstance(policy.last_error, ValueError)
+        self.assertEqual(policy.failures, {'exceptions': 1, 'timeouts': 0, 'barriers': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
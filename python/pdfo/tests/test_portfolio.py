@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the portfolio mode, in which several solver configurations race on worker processes."""
+import unittest
+import warnings
+
+import numpy as np
+from pdfo import pdfo
+from scipy.optimize import Bounds, LinearConstraint
+
+
+def quadratic(x):
+    """Objective function of the tests, defined at the module level to be picklable."""
+    return np.sum((x - 1.) ** 2)
+
+
+class TestPortfolio(unittest.TestCase):
+
+    def setUp(self):
+        warnings.filterwarnings('ignore')
+
+    def runTest(self):
+        """The workers should share the budget and stop on the target, and the best point should be returned."""
+        problems = [
+            ({}, 1.),
+            ({'bounds': Bounds(np.full(4, -.5), np.full(4, .5))}, .5),
+            ({'constraints': LinearConstraint(np.ones((1, 4)), -np.inf, 2.)}, .5),
+        ]
+        for problem, solution in problems:
+            res = pdfo(quadratic, np.zeros(4), method='portfolio', **problem, options={'maxfev': 200})
+            self.assertLessEqual(res.nfev, 200)
+            self.assertEqual(res.fun_history.size, res.nfev)
+            self.assertEqual(res.fun, np.min(res.fun_history[res.get('maxcv_history', 0.) <= 1e-8]))
+            self.assertLessEqual(np.linalg.norm(res.x - solution), 1e-3)
+            self.assertIn(res.method, [configuration['method'] for configuration in res.portfolio])
+
+        portfolio = [{'method': 'newuoa', 'npt': 9}, {'method': 'cobyla'}]
+        res = pdfo(quadratic, np.zeros(4), method='portfolio', options={'portfolio': portfolio, 'ftarget': 1.})
+        self.assertEqual(res.status, 1)
+        self.assertLessEqual(res.fun, 1.)
+        self.assertEqual([configuration['method'] for configuration in res.portfolio], ['newuoa', 'cobyla'])
+
+        # The configurations without npt use the default one of the solvers.
+        portfolio_npt = [{'method': 'newuoa'}, {'method': 'bobyqa'}]
+        res = pdfo(quadratic, np.zeros(4), method='portfolio', options={'portfolio': portfolio_npt, 'maxfev': 200})
+        self.assertLessEqual(np.linalg.norm(res.x - 1.), 1e-3)
+        self.assertTrue(all(configuration['started'] for configuration in res.portfolio))
+
+        # With one worker, the second configuration does not start once the first one has exhausted the budget.
+        options = {'portfolio': portfolio, 'workers': 1, 'maxfev': 30}
+        res = pdfo(quadratic, np.zeros(4), method='portfolio', options=options)
+        self.assertEqual(res.nfev, 30)
+        self.assertEqual([configuration['started'] for configuration in res.portfolio], [True, False])
+        self.assertTrue(any('cobyla' in message for message in res.warnings))
+
+
+if __name__ == '__main__':
+    unittest.main()
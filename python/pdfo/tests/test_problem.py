@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the preprocessed problems sent to worker processes."""
+import unittest
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from pdfo import pdfo
+from scipy.optimize import Bounds, LinearConstraint, NonlinearConstraint
+
+
+def quadratic(x):
+    return np.sum((x - 1.) ** 2)
+
+
+def ball(x):
+    return np.sum(x ** 2)
+
+
+class TestProblem(unittest.TestCase):
+
+    def setUp(self):
+        warnings.filterwarnings('ignore')
+
+    def runTest(self):
+        """A problem with fixed variables, scaling, linear equality and nonlinear constraints should be pickled to the
+        workers of the portfolio, which should find the same solution as in the current process."""
+        problem = {
+            'bounds': Bounds([-2., -2., .5, -2., -2.], [2., 2., .5, 2., 2.]),
+            'constraints': [LinearConstraint(np.ones((1, 5)), 2., 2.), NonlinearConstraint(ball, -np.inf, 3.)],
+        }
+        portfolio = [{'method': 'cobyla'}, {'method': 'cobyla', 'rhobeg': .5}]
+        options = {'maxfev': 300, 'scale': True, 'portfolio': portfolio}
+        res_local = pdfo(quadratic, np.zeros(5), method='portfolio', **problem, options=options)
+        with ProcessPoolExecutor(2) as executor:
+            res = pdfo(quadratic, np.zeros(5), method='portfolio', **problem, options=dict(options, executor=executor))
+        self.assertEqual(res.fun, res_local.fun)
+        self.assertTrue(np.array_equal(res.x, res_local.x))
+        self.assertEqual(res.x[2], .5)
+        self.assertAlmostEqual(np.sum(res.x), 2.)
+        self.assertLessEqual(ball(res.x), 3. + 1e-8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the projection of the initial guess onto the bound and linear constraints."""
+import unittest
+import warnings
+from unittest import mock
+
+import numpy as np
+from pdfo import _common, pdfo
+from pdfo._common import _project_polyhedron
+from scipy.optimize import Bounds, LinearConstraint, minimize
+from scipy.sparse import csr_array
+
+
+def slsqp(x0, lb, ub, a, alb, aub):
+    """Projection computed by SLSQP, the general-purpose solver used as a fallback."""
+    return minimize(lambda x: np.dot(x - x0, x - x0) / 2, x0, jac=lambda x: (x - x0), bounds=Bounds(lb, ub),
+                    constraints=LinearConstraint(a, alb, aub), method='SLSQP', options={'ftol': 1e-12}).x
+
+
+class TestProjection(unittest.TestCase):
+
+    def setUp(self):
+        warnings.filterwarnings('ignore')
+
+    def assertFeasible(self, x, lb, ub, a, alb, aub):
+        ax = a @ x
+        self.assertTrue(np.all(x >= lb - 1e-10) and np.all(x <= ub + 1e-10))
+        self.assertTrue(np.all(ax >= alb - 1e-10) and np.all(ax <= aub + 1e-10))
+
+    def runTest(self):
+        """The dual active-set method should agree with SLSQP, and pdfo should fall back to SLSQP when it fails."""
+        rng = np.random.default_rng(0)
+        for n, m in [(2, 5), (5, 20), (10, 60)]:
+            for _ in range(5):
+                # Random polyhedron containing the origin, with one-sided and two-sided constraints, and a point
+                # outside it.
+                a = rng.standard_normal((m, n))
+                alb, aub = -rng.random(m), rng.random(m)
+                alb[::3] = -np.inf
+                aub[1::3] = np.inf
+                lb, ub = -np.ones(n), np.ones(n)
+                x0 = 3. * rng.standard_normal(n)
+                x_slsqp = slsqp(x0, lb, ub, a, alb, aub)
+                for matrix in [a, csr_array(a)]:
+                    x = _project_polyhedron(x0, lb, ub, matrix, alb, aub)
+                    self.assertIsNotNone(x)
+                    self.assertFeasible(x, lb, ub, a, alb, aub)
+                    self.assertLessEqual(np.linalg.norm(x - x0), np.linalg.norm(x_slsqp - x0) + 1e-8)
+                    self.assertLessEqual(np.linalg.norm(x - x_slsqp), 1e-5)
+
+        # Degenerate case: four constraints, two of them identical, are active at the projection in the plane.
+        a = np.array([[1., 1.], [1., 1.], [1., 0.], [0., 1.]])
+        alb, aub = np.full(4, -np.inf), np.array([1., 1., .5, .5])
+        lb, ub = np.full(2, -np.inf), np.full(2, np.inf)
+        x = _project_polyhedron(np.array([2., 2.]), lb, ub, a, alb, aub)
+        self.assertLessEqual(np.linalg.norm(x - .5), 1e-12)
+
+        # The method fails if the polyhedron is empty, in which case pdfo projects x0 by SLSQP.
+        a = np.array([[1., 1.], [1., 1.]])
+        alb, aub = np.array([1., -np.inf]), np.array([np.inf, -1.])
+        self.assertIsNone(_project_polyhedron(np.zeros(2), lb, ub, a, alb, aub))
+        results = []
+
+        def spy(*args):
+            results.append(_project_polyhedron(*args))
+            return results[-1]
+
+        with mock.patch.object(_common, '_project_polyhedron', spy), \
+                mock.patch('scipy.optimize.minimize', wraps=minimize) as fallback:
+            res = pdfo(lambda x: np.sum(x ** 2), np.zeros(2), constraints=LinearConstraint(a, alb, aub),
+                       options={'maxfev': 50})
+        self.assertEqual(results, [None])
+        self.assertEqual(fallback.call_count, 1)
+        self.assertIn('pdfo: x0 is revised to satisfy the constraints.', res.warnings)
+
+
+if __name__ == '__main__':
+    unittest.main()
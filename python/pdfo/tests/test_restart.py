@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the restarts of the solvers when the trust-region radius reaches its final value before the budget is used."""
+import unittest
+import warnings
+
+import numpy as np
+from pdfo import pdfo
+from scipy.optimize import Bounds, LinearConstraint, NonlinearConstraint
+
+
+class TestRestart(unittest.TestCase):
+
+    def setUp(self):
+        self.count = 0
+        warnings.filterwarnings('ignore')
+
+    def fun(self, x):
+        self.count += 1
+        return np.dot(x, x) + 2 * np.sum(1 - np.cos(3 * x)) + x[0] / 2
+
+    def runTest(self):
+        """The restarts should share the budget, count every evaluation once, and never worsen the solution."""
+        n = 4
+        x0 = np.array([2., -2., 1.5, 2.5])
+        problems = [
+            ('uobyqa', {}),
+            ('newuoa', {}),
+            ('bobyqa', {'bounds': Bounds(np.full(n, -3.), np.full(n, 3.))}),
+            ('lincoa', {'constraints': LinearConstraint(np.ones((1, n)), -np.inf, 3.)}),
+            ('cobyla', {'constraints': NonlinearConstraint(lambda x: np.dot(x, x), -np.inf, 10.)}),
+        ]
+        for method, kwargs in problems:
+            options = {'maxfev': 600, 'radius_final': 1e-4}
+            res_plain = pdfo(self.fun, x0, method=method, options=options, **kwargs)
+            self.count = 0
+            res = pdfo(self.fun, x0, method=method, options=dict(options, restarts=5), **kwargs)
+            self.assertGreater(res.restarts, 0)
+            self.assertEqual(res.nfev, self.count)
+            self.assertLessEqual(res.nfev, options['maxfev'])
+            self.assertEqual(res.fun_history.size, res.nfev)
+            self.assertLessEqual(res.fun, res_plain.fun)
+            if method in ['lincoa', 'cobyla']:
+                self.assertEqual(res.maxcv_history.size, res.nfev)
+                self.assertLessEqual(res.maxcv, 1e-8)
+
+
+if __name__ == '__main__':
+    unittest.main()
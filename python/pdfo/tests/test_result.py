@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the compact result returned by pdfo."""
+import unittest
+import warnings
+
+import numpy as np
+from pdfo import pdfo
+from pdfo._common import CompactOptimizeResult
+from scipy.optimize import Bounds, LinearConstraint
+
+
+class TestCompactResult(unittest.TestCase):
+
+    def setUp(self):
+        warnings.filterwarnings('ignore')
+
+    def runTest(self):
+        """The compact result should have the same fields and values as the default one."""
+        fun = lambda x: np.sum((x - 1.) ** 2)
+        problems = [
+            {'x0': np.zeros(3)},
+            {'x0': np.zeros(3), 'bounds': Bounds(np.zeros(3), np.full(3, .5))},
+            {'x0': np.zeros(3), 'constraints': LinearConstraint(np.ones((1, 3)), -np.inf, 1.)},
+        ]
+        for problem in problems:
+            for debug in [False, True]:
+                options = {'maxfev': 60, 'debug': debug, 'quiet': True}
+                res = pdfo(fun, **problem, options=options)
+                options['compact_result'] = True
+                res_compact = pdfo(fun, **problem, options=options)
+
+                self.assertIsInstance(res_compact, CompactOptimizeResult)
+                self.assertEqual(sorted(res_compact.keys()), sorted(res.keys()))
+                for key in res.keys():
+                    if isinstance(res[key], np.ndarray):
+                        np.testing.assert_array_equal(res_compact[key], res[key])
+                    else:
+                        self.assertEqual(res_compact[key], res[key])
+                self.assertNotIn('infeasible_bounds', res_compact)
+                with self.assertRaises(AttributeError):
+                    res_compact.infeasible_bounds
+
+
+if __name__ == '__main__':
+    unittest.main()
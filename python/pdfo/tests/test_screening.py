@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the screening of the evaluations of the objective function by a model of its values."""
+import unittest
+import warnings
+
+import numpy as np
+from pdfo import pdfo
+
+
+def wall(x):
+    """Quadratic function whose value rises steeply beyond x = 1."""
+    return np.sum((x - .5) ** 2) + np.sum(np.expm1(20. * np.maximum(x - 1., 0.)))
+
+
+class TestScreening(unittest.TestCase):
+
+    def setUp(self):
+        warnings.filterwarnings('ignore')
+
+    def runTest(self):
+        """Fewer evaluations should be needed, and the solution should be evaluated."""
+        x0 = np.random.default_rng(0).uniform(-.5, 1.5, 4)
+        options = {'radius_final': 1e-6}
+        res_plain = pdfo(wall, x0, method='bobyqa', options=options)
+        res = pdfo(wall, x0, method='bobyqa', options=dict(options, model_screening=True))
+        self.assertGreater(res.screened, 0)
+        self.assertLess(res.nfev - res.screened, res_plain.nfev)
+        self.assertEqual(res.fun, wall(res.x))
+        self.assertLessEqual(np.linalg.norm(res.x - .5), 1e-4)
+        self.assertNotIn('screened', res_plain)
+
+        # The screening is ignored with nonlinear constraints.
+        res = pdfo(wall, x0, constraints={'type': 'ineq', 'fun': lambda x: 2. - np.sum(x)},
+                   options={'model_screening': True})
+        self.assertNotIn('screened', res)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the partially separable objective functions that cache the values of their elements, and the solver that
+models their elements separately (method='bobyqa-ps')."""
+import unittest
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from pdfo import ElementValueCache, pdfo
+from scipy.optimize import Bounds
+
+
+def element(z, c):
+    """Element of the chained Rosenbrock function."""
+    return (c - z[0]) ** 2 + 4 * (z[1] - z[0] ** 2) ** 2
+
+
+class TestElementValueCache(unittest.TestCase):
+
+    def setUp(self):
+        warnings.filterwarnings('ignore')
+
+    def runTest(self):
+        """Only the elements whose variables changed should be evaluated, and the structure should drive the blocks."""
+        n = 40
+        permutation = np.random.default_rng(0).permutation(n)
+        elements = [(element, [permutation[i], permutation[i + 1]]) for i in range(n - 1)]
+        fun = ElementValueCache(elements)
+        x = np.random.default_rng(1).standard_normal(n)
+        self.assertAlmostEqual(fun(x, 1.), sum(f(x[s], 1.) for f, s in elements))
+        y = np.copy(x)
+        y[permutation[5]] += 1.
+        self.assertAlmostEqual(fun(y, 1.), sum(f(y[s], 1.) for f, s in elements))
+        self.assertEqual(fun.element_nfev.sum(), n - 1 + 2)
+        self.assertRaises(ValueError, ElementValueCache, [(element, [0, -1])])
+
+        # The arguments modified in place are not detected until the values are cleared.
+        c = np.array(1.)
+        fun = ElementValueCache(elements)
+        fun(x, c)
+        c[()] = 2.
+        self.assertAlmostEqual(fun(x, c), sum(f(x[s], 1.) for f, s in elements))
+        fun.clear()
+        self.assertAlmostEqual(fun(x, c), sum(f(x[s], 2.) for f, s in elements))
+
+        with ThreadPoolExecutor(2) as executor:
+            fun = ElementValueCache(elements, executor=executor)
+            res = pdfo(fun, np.zeros(n), args=(1.,), method='subspace', options={'subspace_dim': 8})
+        self.assertLessEqual(np.linalg.norm(res.x - 1.), 1e-3)
+        self.assertLess(fun.element_nfev.sum(), (n - 1) * res.nfev / 5)
+
+        # The calls from several threads should not mix the values of the elements at different points.
+        fun = ElementValueCache(elements)
+        points = [x + t * np.eye(n)[i] for i in range(n) for t in [-.5, .5]]
+        with ThreadPoolExecutor(8) as executor:
+            values = list(executor.map(fun, points, [1.] * len(points)))
+        for point, value in zip(points, values):
+            self.assertAlmostEqual(value, sum(f(point[s], 1.) for f, s in elements))
+        with ThreadPoolExecutor(8) as executor:
+            options = {'parallel_initial_points': True, 'executor': executor, 'maxfev': 300}
+            res = pdfo(fun, x, args=(1.,), method='newuoa', options=options)
+        plain = pdfo(lambda z: np.sum([f(z[s], 1.) for f, s in elements]), x, method='newuoa', options={'maxfev': 300})
+        self.assertTrue(np.array_equal(res.fun_history, plain.fun_history))
+
+
+class TestElementModels(unittest.TestCase):
+
+    def setUp(self):
+        warnings.filterwarnings('ignore')
+
+    def runTest(self):
+        """The elements should be modeled separately, which should save most of the function evaluations."""
+        n = 40
+        permutation = np.random.default_rng(0).permutation(n)
+        elements = [(element, [permutation[i], permutation[i + 1]]) for i in range(n - 1)]
+        fun = ElementValueCache(elements)
+        res = pdfo(fun, np.zeros(n), args=(1.,), method='bobyqa-ps', options={'return_model': True})
+        self.assertEqual(res.method, 'bobyqa-ps')
+        self.assertEqual(res.fun_history.size, res.nfev)
+        self.assertAlmostEqual(res.fun, fun(res.x, 1.))
+        self.assertLessEqual(np.linalg.norm(res.x - 1.), 1e-4)
+        self.assertLessEqual(np.linalg.norm(res.model_gradient), 1e-3)
+        plain = pdfo(lambda x: fun(x, 1.), np.zeros(n))
+        self.assertLess(5 * res.nfev, plain.nfev)
+
+        # Elements of three variables, bounds, and variables fixed by the bounds.
+        def triple(z, c):
+            return (z[0] - z[1]) ** 2 + (z[1] + z[2] - 1.) ** 2 + z[0] ** 4
+
+        fun = ElementValueCache(elements + [(triple, [i, i + 5, i + 9]) for i in range(0, n - 9, 3)])
+        lb, ub = np.full(n, -.5), np.full(n, .5)
+        lb[3] = ub[3] = .2
+        res = pdfo(fun, np.zeros(n), args=(1.,), method='bobyqa-ps', bounds=Bounds(lb, ub))
+        plain = pdfo(lambda x: fun(x, 1.), np.zeros(n), bounds=Bounds(lb, ub))
+        self.assertTrue(np.all(res.x >= lb) and np.all(res.x <= ub) and res.x[3] == .2)
+        self.assertLessEqual(res.fun, plain.fun + 1e-6)
+        self.assertLess(res.nfev, plain.nfev)
+
+        # Other objective functions and constraints are handled by the usual solvers.
+        res = pdfo(lambda x: np.sum(x ** 2), np.ones(3), method='bobyqa-ps')
+        self.assertEqual(res.method, 'uobyqa')
+        res = pdfo(ElementValueCache(elements), np.zeros(n), args=(1.,), method='bobyqa-ps',
+                   constraints={'type': 'ineq', 'fun': lambda x: 1. - np.sum(x)}, options={'maxfev': 100})
+        self.assertEqual(res.method, 'cobyla')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the arrays in shared memory, sent by reference to the worker processes."""
+import gc
+import pickle
+import subprocess
+import sys
+import time
+import unittest
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from pdfo import ElementValueCache, SharedArray, pdfo, share
+
+
+def element(x, data):
+    return np.sum((x - data[:x.size, 0]) ** 2)
+
+
+def checksum(data):
+    return float(np.sum(data)), data.flags.writeable
+
+
+class TestShared(unittest.TestCase):
+
+    def setUp(self):
+        warnings.filterwarnings('ignore')
+
+    def runTest(self):
+        """The shared arrays and their views should be pickled by reference and rebuilt without copy, and their
+        memory should be freed with them."""
+        data = np.random.default_rng(0).standard_normal((1000, 300))
+        shared = share(data)
+        self.assertIsInstance(shared, SharedArray)
+        self.assertTrue(np.array_equal(shared, data))
+        self.assertLess(len(pickle.dumps(shared)), 1000)
+        view = pickle.loads(pickle.dumps(shared[10:20, ::-3]))
+        self.assertTrue(np.array_equal(view, data[10:20, ::-3]))
+        self.assertFalse(view.flags.writeable)
+        self.assertGreater(len(pickle.dumps(shared + 1.)), data.nbytes)  # not in shared memory
+
+        with ProcessPoolExecutor(2) as executor:
+            self.assertEqual(executor.submit(checksum, shared).result(), (float(np.sum(data)), False))
+
+            # The elements of a partially separable function receive the shared data.
+            elements = [(element, [i, i + 1]) for i in range(4)]
+            res_plain = pdfo(ElementValueCache(elements), np.zeros(5), args=(data,), options={'maxfev': 100})
+            fun = ElementValueCache(elements, executor=executor)
+            res = pdfo(fun, np.zeros(5), args=(data,), options={'maxfev': 100})
+            self.assertTrue(np.array_equal(res.x, res_plain.x))
+            self.assertIsInstance(fun._shared_args[0], SharedArray)
+
+        # A process with its own resource tracker, like a pdfo.WorkerServer, should not free the memory when it ends.
+        code = 'import pickle, sys; print(float(pickle.load(sys.stdin.buffer).sum()))'
+        output = subprocess.run([sys.executable, '-c', code], input=pickle.dumps(shared), capture_output=True,
+                                check=True).stdout
+        self.assertEqual(float(output), float(np.sum(data)))
+        time.sleep(.5)  # the tracker of the process ends after it
+        from multiprocessing.shared_memory import SharedMemory
+        SharedMemory(shared._segment['memory'].name).close()
+
+        name = shared._segment['memory'].name
+        del shared, view, fun
+        gc.collect()
+        with self.assertRaises(FileNotFoundError):
+            SharedMemory(name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests pdfo on linearly constrained problems given with sparse matrices."""
+import unittest
+import warnings
+
+import numpy as np
+from pdfo import pdfo
+from scipy.optimize import Bounds, LinearConstraint
+from scipy.sparse import coo_matrix, csr_array
+
+
+class TestSparseLinearConstraints(unittest.TestCase):
+    PRECISION = np.float64(1e-6)
+
+    def setUp(self):
+        """Initializes the sparse tests."""
+        self.n = 6
+        self.a = np.array([[1., 1., 0., 0., 0., 0.], [0., 0., 1., 1., 0., 0.], [1., 0., 0., 0., 0., 1.]])
+        self.bounds = Bounds(np.full(self.n, -10.), np.full(self.n, 10.))
+        warnings.filterwarnings('ignore')
+
+    def fun(self, x):
+        """Separable convex quadratic."""
+        return np.sum((x - np.arange(self.n)) ** 2)
+
+    def runTest(self):
+        """Sparse and dense linear constraints should yield the same results."""
+        cases = [
+            ('lincoa', -np.inf, [1., 2., 3.]),
+            ('cobyla', -np.inf, [1., 2., 3.]),
+            (None, [1., 2., 3.], [1., 2., 3.]),  # pure equalities, eliminated beforehand
+            (None, [1., 2., -np.inf], [1., 2., 3.]),  # mixed equalities and inequalities
+        ]
+        for method, lb, ub in cases:
+            dense_res = pdfo(self.fun, np.zeros(self.n), method=method, bounds=self.bounds,
+                             constraints=LinearConstraint(self.a, lb, ub), options={'quiet': True})
+            for sparse_type in [csr_array, coo_matrix]:
+                sparse_res = pdfo(self.fun, np.zeros(self.n), method=method, bounds=self.bounds,
+                                  constraints=LinearConstraint(sparse_type(self.a), lb, ub), options={'quiet': True})
+                self.assertEqual(sparse_res.method, dense_res.method)
+                self.assertLessEqual(np.linalg.norm(sparse_res.x - dense_res.x), self.PRECISION)
+                self.assertLessEqual(sparse_res.maxcv, self.PRECISION)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests the subspace mode, in which NEWUOA or BOBYQA minimize the objective function on low-dimensional subspaces."""
+import unittest
+import warnings
+
+import numpy as np
+from pdfo import pdfo
+from scipy.optimize import Bounds
+
+
+class TestSubspace(unittest.TestCase):
+
+    def setUp(self):
+        self.count = 0
+        warnings.filterwarnings('ignore')
+
+    def fun(self, x):
+        self.count += 1
+        return np.dot(np.linspace(1., 10., x.size), (x - 1.) ** 2)
+
+    def runTest(self):
+        """The solution should be found on subspaces, with every evaluation counted only once."""
+        n = 30
+        problems = [
+            ({'subspace_basis': 'coordinate'}, None, np.ones(n)),
+            ({'subspace_basis': 'random', 'subspace_dim': 10}, None, np.ones(n)),
+            ({'subspace_dim': 4}, Bounds(np.full(n, -1.), np.full(n, .5)), np.full(n, .5)),
+        ]
+        for options, bounds, solution in problems:
+            self.count = 0
+            res = pdfo(self.fun, np.zeros(n), method='subspace', bounds=bounds, options=dict(options, maxfev=500 * n))
+            self.assertEqual(res.method, 'newuoa' if bounds is None else 'bobyqa')
+            self.assertEqual(res.nfev, self.count)
+            self.assertEqual(res.fun_history.size, res.nfev)
+            self.assertLessEqual(np.linalg.norm(res.x - solution), 1e-4)
+            if bounds is not None:
+                self.assertTrue(np.all(res.x >= bounds.lb) and np.all(res.x <= bounds.ub))
+
+        # The subspace mode is useless if the subspaces are the whole space.
+        res = pdfo(self.fun, np.zeros(4), method='subspace', options={'subspace_dim': 4})
+        self.assertEqual(res.method, 'uobyqa')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -22,7 +22,8 @@ integer, intent(in) :: n,npt,iprint,maxfun
 integer, intent(out) :: info
 integer :: i
 double precision, intent(inout) :: x(n)
-double precision, intent(in) :: xl(n),xu(n),rhobeg,rhoend,w((npt+5)*(npt+n)+3*n*(n+5)/2+1),ftarget
+double precision, intent(in) :: xl(n),xu(n),rhobeg,rhoend,ftarget
+double precision, intent(out) :: w((npt+5)*(npt+n)+3*n*(n+5)/2+1)
 double precision, intent(out) :: f,funhist(maxfun),conhist(maxfun),resmax
 
 nf=0
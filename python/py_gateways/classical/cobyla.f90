@@ -22,7 +22,8 @@ integer, intent(in) :: n,m,iprint,maxfun,iact(m+1)
 integer, intent(out) :: info
 integer :: i
 double precision, intent(inout) :: x(n),conval(m)
-double precision, intent(in) :: rhobeg,rhoend,w(n*(3*n+2*m+11)+4*m+6),ftarget
+double precision, intent(in) :: rhobeg,rhoend,ftarget
+double precision, intent(out) :: w(n*(3*n+2*m+11)+4*m+6)
 double precision, intent(out) :: f,funhist(maxfun),conhist(maxfun),resmax
 
 nf=0
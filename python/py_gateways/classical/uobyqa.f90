@@ -21,7 +21,8 @@ implicit none
 integer, intent(in) :: n,iprint,maxfun
 integer, intent(out) :: info
 double precision, intent(inout) :: x(n)
-double precision, intent(in) :: rhobeg,rhoend,w((n*(42+n*(23+n*(8+n)))+max(2*n*n+4,18*n))/4+1),ftarget
+double precision, intent(in) :: rhobeg,rhoend,ftarget
+double precision, intent(out) :: w((n*(42+n*(23+n*(8+n)))+max(2*n*n+4,18*n))/4+1)
 double precision, intent(out) :: f,funhist(maxfun)
 
 nf=0
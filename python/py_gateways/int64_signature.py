@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""Generate the signature file of a solver built with 64-bit default integers.
+
+The Python module `f<solver>` declared in the signature file is renamed into
+`f<solver>_int64`, so that both versions of the solver can be installed side
+by side. The Fortran modules and subroutines keep their names.
+
+Usage: python int64_signature.py <input.pyf> <output.pyf>
+"""
+import re
+import sys
+
+if __name__ == '__main__':
+    with open(sys.argv[1]) as f:
+        signature = f.read()
+    signature = re.sub(r'^([ \t]*(end\s+)?python module f[a-z]+)[ \t]*$', r'\1_int64', signature, flags=re.MULTILINE)
+    with open(sys.argv[2], 'w') as f:
+        f.write(signature)
@@ -22,7 +22,8 @@ integer, intent(in) :: n,npt,m,ia,iprint,maxfun
 integer, intent(out) :: info
 integer :: i,j
 double precision, intent(inout) :: x(n)
-double precision, intent(in) :: a(ia,m),b(m),rhobeg,rhoend,w(m*(2+n)+npt*(4+n+npt)+n*(9+3*n)+max(m+3*n,max(2*m+n,2*npt))),ftarget
+double precision, intent(in) :: a(ia,m),b(m),rhobeg,rhoend,ftarget
+double precision, intent(out) :: w(m*(2+n)+npt*(4+n+npt)+n*(9+3*n)+max(m+3*n,max(2*m+n,2*npt)))
 double precision, intent(out) :: f,funhist(maxfun),conhist(maxfun),resmax
 double precision :: cval
 
@@ -21,7 +21,8 @@ implicit none
 integer, intent(in) :: n,npt,iprint,maxfun
 integer, intent(out) :: info
 double precision, intent(inout) :: x(n)
-double precision, intent(in) :: rhobeg,rhoend,w((npt+13)*(npt+n)+3*n*(n+3)/2+1),ftarget
+double precision, intent(in) :: rhobeg,rhoend,ftarget
+double precision, intent(out) :: w((npt+13)*(npt+n)+3*n*(n+3)/2+1)
 double precision, intent(out) :: f,funhist(maxfun)
 
 nf=0